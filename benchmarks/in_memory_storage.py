@@ -0,0 +1,107 @@
+"""Benchmark of filling orders on the SQLite database and on the in-memory storage.
+
+Places a batch of `BTCUSD_PERP` limit buys above the replayed price, then measures one
+matching pass filling all of them and one positions pass turning the fills into a
+position, first on a SQLite database file and then with `IN_MEMORY_STORAGE_ENABLED`.
+
+Requires the usual `.env` settings, e.g. `set -a; source .env.example; set +a`.
+
+Usage:
+    python -m benchmarks.in_memory_storage --orders 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from fifi import DatabaseProvider
+from fifi.enums import Asset, Market, OrderSide, OrderType
+
+from src.common.clock import SimulationClock
+from src.common.settings import Setting
+from src.common.sqlite_profile import SqliteProfile
+from src.engines.matching_engine import MatchingEngine
+from src.engines.positions_orchestration_engine import PositionsOrchestrationEngine
+from src.engines.replay_engine import ReplayEngine
+from src.repository import InMemoryStorage, ReplayMarketDataRepository
+from src.schemas import PortfolioSchema
+from src.services import BalanceService, LeverageService, PortfolioService
+from benchmarks.replay import START_PRICE, write_candles
+from benchmarks.seed import database_provider
+
+
+async def measure(label: str, orders: int) -> None:
+    # engines built for the current settings
+    for engine_class in (ReplayEngine, MatchingEngine, PositionsOrchestrationEngine):
+        engine_class.instance = None
+    ReplayMarketDataRepository.instance = None
+    engine = ReplayEngine()
+    engine.replay.advance_to(0)
+
+    portfolio = await PortfolioService().create(PortfolioSchema(name=label))
+    await BalanceService().create_by_qty(
+        portfolio_id=portfolio.id, asset=Asset.USD, qty=orders * START_PRICE
+    )
+    await LeverageService().create_or_update_leverage(
+        portfolio_id=portfolio.id, market=Market.BTCUSD_PERP, leverage=5
+    )
+    for _ in range(orders):
+        await engine.matching_engine.create_order(
+            market=Market.BTCUSD_PERP,
+            portfolio_id=portfolio.id,
+            price=round(START_PRICE * 1.5),
+            size=0.01,
+            side=OrderSide.BUY,
+            order_type=OrderType.LIMIT,
+        )
+    engine.positions_engine.last_update = SimulationClock().now()
+
+    started = time.perf_counter()
+    await engine.matching_engine.run_once()
+    matching = time.perf_counter() - started
+    started = time.perf_counter()
+    await engine.positions_engine.run_once()
+    positions = time.perf_counter() - started
+    print(
+        f"{label:>9}: {orders / matching:>10,.0f} fills/s, "
+        f"{orders / positions:>10,.0f} fills into positions/s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=20_000)
+    args = parser.parse_args()
+    # as in production, rather than a log line per fill
+    setting = Setting()
+    logging.getLogger().setLevel(setting.LOG_LEVEL)
+
+    directory = tempfile.mkdtemp(prefix="in_memory_storage_benchmark_")
+    candles = os.path.join(directory, "btcusd_perp.npz")
+    write_candles(candles, count=10)
+    setting.REPLAY_ENABLED = True
+    setting.REPLAY_FILES = {Market.BTCUSD_PERP: candles}
+
+    path = os.path.join(directory, "bench.db")
+    db = database_provider(path)
+    SqliteProfile.apply(DatabaseProvider())
+    await db.init_models()
+    await measure("sqlite", args.orders)
+
+    setting.IN_MEMORY_STORAGE_ENABLED = True
+    await measure("in-memory", args.orders)
+    started = time.perf_counter()
+    dumped = await InMemoryStorage().dump()
+    print(f"dump of {dumped}: {time.perf_counter() - started:.1f} s")
+
+    SimulationClock().use(None)
+    await db.shutdown()
+    os.remove(path)
+    os.remove(candles)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
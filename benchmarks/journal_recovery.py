@@ -0,0 +1,113 @@
+"""Benchmark of event journal recovery time.
+
+Writes a synthetic journal of order, fill, balance and position events, then measures
+how long it takes to rebuild the engine state by replaying the whole log versus
+loading a snapshot and replaying only the tail.
+
+Usage:
+    python -m benchmarks.journal_recovery --events 10000000 --tail 100000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+from src.journal import EventJournal, JournalEventType
+
+
+def timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} {elapsed:>10.3f} s")
+    return result, elapsed
+
+
+def write_events(journal: EventJournal, count: int) -> None:
+    portfolio_ids = [str(uuid.uuid4()) for _ in range(1000)]
+    balance_ids = [str(uuid.uuid4()) for _ in portfolio_ids]
+    position_ids = [str(uuid.uuid4()) for _ in portfolio_ids]
+    written = 0
+    i = 0
+    while written < count:
+        slot = i % len(portfolio_ids)
+        order_id = str(uuid.uuid4())
+        order = {
+            "id": order_id,
+            "portfolio_id": portfolio_ids[slot],
+            "market": "btcusd_perp",
+            "price": 1000.0 + i % 100,
+            "size": 0.01,
+            "fee": 0.0045,
+            "status": "active",
+            "side": "buy",
+            "type": "limit",
+            "position_id": None,
+        }
+        balance = {
+            "id": balance_ids[slot],
+            "portfolio_id": portfolio_ids[slot],
+            "asset": "usd",
+            "quantity": 10000.0 - i * 0.01,
+            "available": 9000.0,
+            "frozen": 1000.0,
+            "burned": 0.0,
+            "fee_paid": i * 0.0045,
+        }
+        position = {
+            "id": position_ids[slot],
+            "portfolio_id": portfolio_ids[slot],
+            "market": "btcusd_perp",
+            "size": 0.01 * (i // len(portfolio_ids) + 1),
+            "entry_price": 1000.0,
+            "status": "open",
+        }
+        journal.append(JournalEventType.ORDER_ACCEPTED, order)
+        journal.append(JournalEventType.BALANCE_CHANGED, balance)
+        journal.append(JournalEventType.ORDER_FILLED, dict(order, status="filled"))
+        journal.append(JournalEventType.BALANCE_CHANGED, balance)
+        journal.append(JournalEventType.POSITION_MERGED, position, order_id)
+        written += 5
+        i += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--tail", type=int, default=100_000)
+    parser.add_argument("--path", type=str, default=None)
+    args = parser.parse_args()
+
+    path = args.path or tempfile.mkdtemp(prefix="journal_benchmark_")
+    journal = EventJournal(path=path, enabled=True, snapshot_interval=0, fsync=False)
+    try:
+        head = max(args.events - args.tail, 0)
+        print(f"writing {args.events} events to {path}")
+        _, elapsed = timed("write head", lambda: write_events(journal, head))
+        print(f"{'write throughput':<32} {head / max(elapsed, 1e-9):>10.0f} events/s")
+
+        timed("snapshot", journal.snapshot)
+        timed("write tail", lambda: write_events(journal, args.events - head))
+        journal.close()
+        size = os.path.getsize(journal.events_path)
+        print(f"{'log size':<32} {size / 2**20:>10.1f} MiB")
+
+        (state, _), _ = timed("recover from snapshot + tail", journal.recover)
+        print(f"{'events in recovered state':<32} {state.events_applied:>10}")
+
+        os.remove(journal.snapshot_path)
+        (state, _), elapsed = timed("recover by full replay", journal.recover)
+        print(
+            f"{'full replay throughput':<32} "
+            f"{state.events_applied / max(elapsed, 1e-9):>10.0f} events/s"
+        )
+    finally:
+        if not args.path:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
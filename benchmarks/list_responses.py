@@ -0,0 +1,132 @@
+"""Benchmark of the list endpoints serialized through pydantic versus orjson.
+
+Seeds one portfolio with orders and positions and requests its list endpoints
+in-process. The pydantic path is the previous handler: it loads the ORM rows and lets
+FastAPI validate and encode them against `response_model`. The orjson path is
+`GET /order` and `GET /position` as they are now, serializing column values directly.
+
+Requires the usual `.env` settings, e.g. `set -a; source .env.example; set +a`.
+
+Usage:
+    python -m benchmarks.list_responses --rows 1000 10000 --requests 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from fifi.enums import Market, PositionSide, PositionStatus
+
+from src.api.v1.order_router import order_router
+from src.api.v1.position_router import position_router
+from src.schemas import OrderSchema, PositionSchema
+from src.schemas.order_schema import OrderResponseSchema
+from src.schemas.position_schema import PositionResponseSchema
+from src.services import OrderService, PositionService
+from benchmarks.seed import database_provider
+
+app = FastAPI()
+app.include_router(order_router)
+app.include_router(position_router)
+
+
+@app.get("/pydantic/order", response_model=List[OrderResponseSchema])
+async def pydantic_orders(portfolio_id: str):
+    return await OrderService().read_orders_by_portfolio_id(portfolio_id=portfolio_id)
+
+
+@app.get("/pydantic/position", response_model=List[PositionResponseSchema])
+async def pydantic_positions(portfolio_id: str):
+    return await PositionService().get_positions(portfolio_id=portfolio_id)
+
+
+async def seed(portfolio_id: str, rows: int) -> None:
+    await OrderService().create_many(
+        data=[
+            OrderSchema(
+                portfolio_id=portfolio_id,
+                market=Market.BTCUSD,
+                price=50_000 + i * 0.1,
+                size=0.001,
+                fee=0.0002,
+            )
+            for i in range(rows)
+        ]
+    )
+    await PositionService().create_many(
+        data=[
+            PositionSchema(
+                portfolio_id=portfolio_id,
+                market=Market.BTCUSD_PERP,
+                side=PositionSide.LONG,
+                entry_price=50_000 + i * 0.1,
+                status=PositionStatus.CLOSE,
+                margin=10.0,
+                size=0.001,
+                leverage=5,
+                lqd_price=40_000.0,
+            )
+            for i in range(rows)
+        ]
+    )
+
+
+async def measure(client: AsyncClient, url: str, requests: int) -> List[float]:
+    latencies = list()
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(url)
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return latencies
+
+
+def report(label: str, latencies: List[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<32} p50 {quantiles[49] * 1e3:>8.2f} ms  "
+        f"p99 {quantiles[98] * 1e3:>8.2f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="list_benchmark_"), "bench.db")
+    db = database_provider(path)
+    await db.init_models()
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        for rows in args.rows:
+            portfolio_id = f"portfolio-{rows}"
+            await seed(portfolio_id, rows)
+            requests = max(args.requests * 1_000 // rows, 20)
+            for resource in ("order", "position"):
+                query = f"{resource}?portfolio_id={portfolio_id}"
+                report(
+                    f"{resource} {rows} rows pydantic",
+                    await measure(client, f"/pydantic/{query}", requests),
+                )
+                report(
+                    f"{resource} {rows} rows orjson",
+                    await measure(client, f"/{query}", requests),
+                )
+
+    await db.shutdown()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,191 @@
+"""Benchmark of order entry latency through the binary gateway versus `POST /order`.
+
+Both paths run in this process against a SQLite database and call the same
+`MatchingEngine.create_order`: the REST path through uvicorn and a keep-alive HTTP
+connection, the gateway over a TCP session. Every order is a resting limit buy, so
+the engine loops are not needed. Sequential round trips give the per-order latency;
+the gateway is also measured with a window of pipelined orders in flight. Orders on
+an inactive market are rejected before touching the database, so their round trip is
+the transport and protocol overhead alone.
+
+The market data comes from a last trade board created by the benchmark, so no market
+monitoring service is needed.
+
+Requires the usual `.env` settings, e.g. `set -a; source .env.example; set +a`.
+
+Usage:
+    python -m benchmarks.order_gateway --orders 2000 --window 64
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import time
+from contextlib import suppress
+from typing import Awaitable, Callable, List
+
+import uvicorn
+from httpx import AsyncClient
+
+from fifi import DatabaseProvider
+from fifi.enums import Asset, Market, OrderSide, OrderType
+
+from main import app
+from src.common.exceptions import InvalidOrder
+from src.common.settings import Setting
+from src.common.sqlite_profile import SqliteProfile
+from src.engines.matching_engine import MatchingEngine
+from src.gateway import OrderGateway, OrderGatewayClient
+from src.gateway.protocol import NewOrder
+from src.repository import LastTradeBoardRepository
+from src.schemas import PortfolioSchema
+from src.services import BalanceService, PortfolioService
+from benchmarks.seed import database_provider
+
+MARKET = Market.BTCUSD
+INACTIVE_MARKET = Market.ETHUSD
+PRICE = 1_000.0
+SIZE = 0.001
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def measure(send: Callable[[], Awaitable[None]], orders: int) -> List[float]:
+    latencies = list()
+    for _ in range(orders):
+        started = time.perf_counter()
+        await send()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def report(label: str, latencies: List[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<28} p50 {quantiles[49] * 1e6:>8.0f} us  "
+        f"p99 {quantiles[98] * 1e6:>8.0f} us"
+    )
+
+
+async def pipelined(
+    client: OrderGatewayClient, order: NewOrder, orders: int, window: int
+) -> None:
+    in_flight = set()
+    started = time.perf_counter()
+    for _ in range(orders):
+        if len(in_flight) >= window:
+            done, in_flight = await asyncio.wait(
+                in_flight, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                future.result()
+        in_flight.add(client.submit(order))
+    await asyncio.gather(*in_flight)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{f'gateway pipelined x{window}':<28} "
+        f"{orders / elapsed:>8.0f} orders/s, {elapsed / orders * 1e6:>6.0f} us/order"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=2_000)
+    parser.add_argument("--window", type=int, default=64)
+    args = parser.parse_args()
+
+    setting = Setting()
+    if INACTIVE_MARKET in setting.ACTIVE_MARKETS:
+        parser.error(f"{INACTIVE_MARKET=} has to be missing from ACTIVE_MARKETS")
+    setting.LAST_TRADE_BOARD_ENABLED = True
+    setting.LAST_TRADE_BOARD_NAME = f"order_gateway_benchmark_{os.getpid()}"
+    setting.ORDER_GATEWAY_HOST = "127.0.0.1"
+    setting.ORDER_GATEWAY_PORT = free_port()
+    board = LastTradeBoardRepository(create=True)
+    board.write(market=MARKET, last_trade=PRICE, time=time.time())
+
+    path = os.path.join(tempfile.mkdtemp(prefix="gateway_benchmark_"), "bench.db")
+    db = database_provider(path)
+    SqliteProfile.apply(DatabaseProvider())
+    await db.init_models()
+    portfolio = await PortfolioService().create(PortfolioSchema(name="gateway"))
+    await BalanceService().create_by_qty(
+        portfolio_id=portfolio.id, asset=Asset.USD, qty=1e12
+    )
+
+    http_port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app, host="127.0.0.1", port=http_port, lifespan="off", log_level="error"
+        )
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    gateway = OrderGateway()
+    await gateway.start()
+
+    body = {
+        "portfolio_id": portfolio.id,
+        "market": MARKET.value,
+        "price": PRICE,
+        "size": SIZE,
+        "side": OrderSide.BUY.value,
+        "type": OrderType.LIMIT.value,
+    }
+    async with AsyncClient(
+        base_url=f"http://127.0.0.1:{http_port}/{setting.API_PREFIX}/v1"
+    ) as http:
+
+        async def send_rest():
+            (await http.post("/order", json=body)).raise_for_status()
+
+        async def send_rest_rejected():
+            rejected = dict(body, market=INACTIVE_MARKET.value)
+            assert (await http.post("/order", json=rejected)).status_code == 400
+
+        report("rest POST /order", await measure(send_rest, args.orders))
+        report("rest rejected", await measure(send_rest_rejected, args.orders))
+
+    client = await OrderGatewayClient.connect(
+        host=setting.ORDER_GATEWAY_HOST, port=setting.ORDER_GATEWAY_PORT
+    )
+    order = NewOrder(
+        portfolio_id=portfolio.id,
+        market=MARKET,
+        side=OrderSide.BUY,
+        type=OrderType.LIMIT,
+        price=PRICE,
+        size=SIZE,
+    )
+
+    async def send_gateway():
+        await client.submit(order)
+
+    async def send_gateway_rejected():
+        with suppress(InvalidOrder):
+            await client.submit(order._replace(market=INACTIVE_MARKET))
+
+    report("gateway sequential", await measure(send_gateway, args.orders))
+    report("gateway rejected", await measure(send_gateway_rejected, args.orders))
+    await pipelined(client, order, args.orders, args.window)
+    await client.close()
+
+    await gateway.stop()
+    server.should_exit = True
+    await server_task
+    await db.shutdown()
+    board.close()
+    MatchingEngine().md_board.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+"""Benchmark of portfolio statistics aggregated in the database versus client-side.
+
+Seeds one portfolio with filled orders and closed positions among the rows of other
+portfolios, then computes volume, fees, realized pnl and win rate twice: from the
+database aggregates behind `GET /portfolio/{id}/stats`, and by loading every order
+and position of the portfolio the way a client downloading them would. Then fills
+`--fills` orders of the portfolio the way the matching engine writes them, with and
+without the covering index of the order statistics, to weigh its write cost.
+
+Requires the usual `.env` settings, e.g. `set -a; source .env.example; set +a`.
+
+Usage:
+    python -m benchmarks.portfolio_stats --orders 1000000 --others 4
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from sqlalchemy import insert, text
+
+from fifi import DatabaseProvider
+from fifi.enums import Market, OrderSide, OrderStatus, PositionSide, PositionStatus
+
+from src.common.sqlite_profile import SqliteProfile
+from src.models import Order, Position
+from src.schemas import OrderSchema, PortfolioSchema
+from src.services import OrderService, PortfolioService, PositionService
+from benchmarks.seed import database_provider
+
+BATCH = 50_000
+STATS_INDEX = "ix_orders_portfolio_status_market_side"
+
+
+async def seed(portfolio_ids, orders: int) -> None:
+    markets = [Market.BTCUSD, Market.ETHUSD, Market.BTCUSD_PERP]
+    now = time.time()
+    async with DatabaseProvider().get_new_seddion() as session:
+        for portfolio_id in portfolio_ids:
+            for start in range(0, orders, BATCH):
+                await session.execute(
+                    insert(Order),
+                    [
+                        {
+                            "id": str(uuid.uuid4()),
+                            "portfolio_id": portfolio_id,
+                            "market": random.choice(markets),
+                            "side": random.choice(list(OrderSide)),
+                            "status": OrderStatus.FILLED,
+                            "price": 50_000 + random.random(),
+                            "size": 0.001,
+                            "fee": 0.0002,
+                        }
+                        for _ in range(start, min(orders, start + BATCH))
+                    ],
+                )
+            await session.execute(
+                insert(Position),
+                [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "portfolio_id": portfolio_id,
+                        "market": Market.BTCUSD_PERP,
+                        "side": PositionSide.LONG,
+                        "status": PositionStatus.CLOSE,
+                        "entry_price": 50_000,
+                        "lqd_price": 40_000,
+                        "size": 0.01,
+                        "leverage": 5,
+                        "margin": 100,
+                        "pnl": random.uniform(-10, 10),
+                    }
+                    for _ in range(orders // 10)
+                ],
+            )
+            await session.commit()
+    print(f"seeded {len(portfolio_ids)} x {orders} orders in {time.time() - now:.1f}s")
+
+
+async def client_side(portfolio_id: str) -> None:
+    orders = await OrderService().read_orders_by_portfolio_id(portfolio_id=portfolio_id)
+    positions = await PositionService().get_positions(portfolio_id=portfolio_id)
+    filled = [order for order in orders if order.status == OrderStatus.FILLED]
+    sum(order.price * order.size for order in filled)
+    sum(order.fee for order in filled)
+    sum(position.pnl for position in positions)
+    closed = [p for p in positions if p.status != PositionStatus.OPEN]
+    sum(p.pnl > 0 for p in closed) / max(len(closed), 1)
+
+
+async def fill_orders(portfolio_id: str, count: int) -> float:
+    order_service = OrderService()
+    orders = [
+        await order_service.create(
+            OrderSchema(
+                portfolio_id=portfolio_id,
+                market=Market.BTCUSD_PERP,
+                side=OrderSide.BUY,
+                price=50_000,
+                size=0.001,
+                fee=0.0002,
+            )
+        )
+        for _ in range(count)
+    ]
+    started = time.perf_counter()
+    for order in orders:
+        order.status = OrderStatus.FILLED
+        await order_service.update_entity(order)
+    return count / (time.perf_counter() - started)
+
+
+async def measure(label: str, run: Callable[[], Awaitable[None]], repeat: int):
+    durations = list()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await run()
+        durations.append(time.perf_counter() - started)
+    print(f"{label:<24} median {statistics.median(durations) * 1e3:>9.1f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--others", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fills", type=int, default=2_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="stats_benchmark_"), "bench.db")
+    db = database_provider(path)
+    SqliteProfile.apply(DatabaseProvider())
+    await db.init_models()
+    portfolio_service = PortfolioService()
+    portfolios = [
+        await portfolio_service.create(PortfolioSchema(name=f"stats-{i}"))
+        for i in range(args.others + 1)
+    ]
+    await seed([portfolio.id for portfolio in portfolios], args.orders)
+    portfolio_id = portfolios[0].id
+
+    await measure(
+        "database aggregates",
+        lambda: portfolio_service.read_stats(portfolio_id=portfolio_id),
+        args.repeat,
+    )
+    await measure(
+        "client-side", lambda: client_side(portfolio_id=portfolio_id), args.repeat
+    )
+    fills = await fill_orders(portfolio_id=portfolio_id, count=args.fills)
+    print(f"{'fills with the index':<24} {fills:>9.0f} fills/s")
+
+    async with DatabaseProvider().get_new_seddion() as session:
+        await session.execute(text(f"DROP INDEX {STATS_INDEX}"))
+        await session.commit()
+    fills = await fill_orders(portfolio_id=portfolio_id, count=args.fills)
+    print(f"{'fills without the index':<24} {fills:>9.0f} fills/s")
+    await measure(
+        "aggregates, no index",
+        lambda: portfolio_service.read_stats(portfolio_id=portfolio_id),
+        args.repeat,
+    )
+    await db.shutdown()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
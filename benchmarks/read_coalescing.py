@@ -0,0 +1,112 @@
+"""Benchmark of a reconnection storm with and without read coalescing.
+
+Seeds one portfolio with positions, then fires bursts of concurrent identical
+`GET /position?portfolio_id=` requests in-process, as a fleet of bots reconnecting at
+once would. Each burst is timed with `ReadCoalescer` disabled, enabled, and enabled
+with a micro-TTL, along with the number of queries the burst ran.
+
+Requires the usual `.env` settings, e.g. `set -a; source .env.example; set +a`.
+
+Usage:
+    python -m benchmarks.read_coalescing --rows 1000 --concurrency 200 --bursts 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from fifi import DatabaseProvider
+from fifi.enums import Market, PositionSide, PositionStatus
+
+from src.api.v1.deps import route_reads_to_replica
+from src.api.v1.position_router import position_router
+from src.common.coalescer import ReadCoalescer
+from src.common.sqlite_profile import SqliteProfile
+from src.schemas import PositionSchema
+from src.services import PositionService
+from benchmarks.seed import database_provider
+
+PORTFOLIO_ID = "storm"
+
+app = FastAPI()
+app.include_router(position_router, dependencies=[Depends(route_reads_to_replica)])
+
+
+async def burst(client: AsyncClient, concurrency: int) -> float:
+    started = time.perf_counter()
+    responses = await asyncio.gather(
+        *(
+            client.get(f"/position?portfolio_id={PORTFOLIO_ID}")
+            for _ in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    for response in responses:
+        response.raise_for_status()
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--bursts", type=int, default=10)
+    parser.add_argument("--ttl", type=float, default=0.05)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="coalescing_benchmark_"), "bench.db")
+    db = database_provider(path)
+    SqliteProfile.apply(DatabaseProvider())
+    await db.init_models()
+    await PositionService().create_many(
+        data=[
+            PositionSchema(
+                portfolio_id=PORTFOLIO_ID,
+                market=Market.BTCUSD_PERP,
+                side=PositionSide.LONG,
+                entry_price=50_000 + i * 0.1,
+                status=PositionStatus.OPEN,
+                margin=10.0,
+                size=0.001,
+                leverage=5,
+                lqd_price=40_000.0,
+            )
+            for i in range(args.rows)
+        ]
+    )
+
+    coalescer = ReadCoalescer()
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        for label, enabled, ttl in (
+            ("uncoalesced", False, 0.0),
+            ("coalesced", True, 0.0),
+            (f"coalesced ttl {args.ttl}s", True, args.ttl),
+        ):
+            coalescer.enabled = enabled
+            coalescer.ttl = ttl
+            coalescer.results.ttl = ttl or None
+            coalescer.reset()
+            durations = [
+                await burst(client, args.concurrency) for _ in range(args.bursts)
+            ]
+            queries = coalescer.executed if enabled else args.concurrency * args.bursts
+            print(
+                f"{label:<24} burst of {args.concurrency}: "
+                f"median {statistics.median(durations) * 1e3:>8.1f} ms, "
+                f"{queries / args.bursts:>6.1f} queries"
+            )
+
+    await db.shutdown()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+"""Benchmark of replaying a month of 1m candles through the engines.
+
+Generates a random walk of 1m `BTCUSD_PERP` candles, places a grid of limit orders
+around the first price, and replays the month with `ReplayEngine`, which only runs
+the engines on the ticks reaching an order or a liquidation price. For comparison,
+the same grid is placed again and running the engines on every tick is measured on a
+sample of the ticks and projected to the month.
+
+Requires the usual `.env` settings, e.g. `set -a; source .env.example; set +a`.
+
+Usage:
+    python -m benchmarks.replay --days 30 --orders 20 --sample 2000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from fifi import DatabaseProvider
+from fifi.enums import Asset, Market, OrderSide, OrderType
+
+from src.common.settings import Setting
+from src.common.sqlite_profile import SqliteProfile
+from src.engines.replay_engine import ReplayEngine
+from src.repository import ReplayMarketDataRepository
+from src.schemas import PortfolioSchema
+from src.services import BalanceService, LeverageService, PortfolioService
+from benchmarks.seed import database_provider
+
+START_PRICE = 50_000.0
+
+
+def write_candles(path: str, count: int, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    close = START_PRICE * np.exp(np.cumsum(rng.normal(0, 0.001, count)))
+    open_ = np.concatenate(([START_PRICE], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.0005, count))
+    np.savez(
+        path,
+        time=1_700_000_000 + np.arange(count, dtype=np.float64) * 60,
+        open=open_,
+        high=np.maximum(open_, close) * (1 + wick),
+        low=np.minimum(open_, close) * (1 - wick),
+        close=close,
+    )
+
+
+async def place_orders(name: str, count: int) -> None:
+    engine = ReplayEngine()
+    portfolio = await PortfolioService().create(PortfolioSchema(name=name))
+    await BalanceService().create_by_qty(
+        portfolio_id=portfolio.id, asset=Asset.USD, qty=10_000_000
+    )
+    await LeverageService().create_or_update_leverage(
+        portfolio_id=portfolio.id, market=Market.BTCUSD_PERP, leverage=5
+    )
+    for i in range(count):
+        distance = 0.01 * (i // 2 + 1)
+        side = OrderSide.BUY if i % 2 == 0 else OrderSide.SELL
+        price = START_PRICE * (1 - distance if side == OrderSide.BUY else 1 + distance)
+        await engine.matching_engine.create_order(
+            market=Market.BTCUSD_PERP,
+            portfolio_id=portfolio.id,
+            price=round(price),
+            size=0.01,
+            side=side,
+            order_type=OrderType.LIMIT,
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--orders", type=int, default=20)
+    parser.add_argument("--sample", type=int, default=2_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="replay_benchmark_")
+    candles = os.path.join(directory, "btcusd_perp.npz")
+    write_candles(candles, count=args.days * 24 * 60)
+    setting = Setting()
+    setting.REPLAY_ENABLED = True
+    setting.REPLAY_FILES = {Market.BTCUSD_PERP: candles}
+
+    path = os.path.join(directory, "bench.db")
+    db = database_provider(path)
+    SqliteProfile.apply(DatabaseProvider())
+    await db.init_models()
+    await place_orders("event-driven", args.orders)
+
+    engine = ReplayEngine()
+    summary = await engine.run()
+    print(
+        f"event-driven: {summary.ticks} ticks, {summary.passes} passes: "
+        f"{summary.elapsed:>8.1f} s"
+    )
+
+    # the same grid again, on the same ticks
+    replay = ReplayMarketDataRepository()
+    replay.rewind()
+    await place_orders("every-tick", args.orders)
+    started = time.perf_counter()
+    for index in range(args.sample):
+        replay.advance_to(index)
+        await engine.run_passes()
+    every_tick = (time.perf_counter() - started) / args.sample * len(replay.times)
+    print(
+        f"every tick:   {len(replay.times)} ticks, projected from {args.sample}: "
+        f"{every_tick:>8.1f} s"
+    )
+
+    await db.shutdown()
+    os.remove(path)
+    os.remove(candles)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""Benchmark of seeding portfolios one call at a time versus the bulk seed.
+
+Per-row seeding goes through the same service calls as `POST /portfolio`,
+`PATCH /balance/deposit` and `POST /leverage`: one portfolio, two balances and one
+leverage per account. The bulk seed loads the same accounts with `SeedService`.
+Per-row seeding is measured on a sample and projected to the full account count.
+
+Requires the usual `.env` settings, e.g. `set -a; source .env.example; set +a`.
+
+Usage:
+    python -m benchmarks.seed --portfolios 10000 --sample 500
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from fifi import DatabaseProvider
+from fifi.enums import Asset, Market
+
+from src.schemas import PortfolioSchema
+from src.schemas.seed_schema import SeedSchema
+from src.services import BalanceService, LeverageService, PortfolioService, SeedService
+
+
+def database_provider(path: str) -> DatabaseProvider:
+    # the provider falls back to the environment for empty connection fields
+    for name in ("DATABASE_HOST", "DATABASE_USER", "DATABASE_PASS"):
+        os.environ[name] = ""
+    os.environ["DATABASE_PORT"] = "0"
+    return DatabaseProvider(db_name=path, db_tech="sqlite", db_lib="aiosqlite")
+
+
+async def seed_per_row(prefix: str, count: int) -> None:
+    portfolio_service = PortfolioService()
+    balance_service = BalanceService()
+    leverage_service = LeverageService()
+    for i in range(count):
+        portfolio = await portfolio_service.create(
+            PortfolioSchema(name=f"{prefix}-{i}")
+        )
+        for asset, qty in ((Asset.USD, 10_000), (Asset.BTC, 1)):
+            if not await balance_service.add_balance(
+                portfolio_id=portfolio.id, asset=asset, qty=qty
+            ):
+                await balance_service.create_by_qty(
+                    portfolio_id=portfolio.id, asset=asset, qty=qty
+                )
+        await leverage_service.create_or_update_leverage(
+            portfolio_id=portfolio.id, market=Market.BTCUSD_PERP, leverage=5
+        )
+
+
+async def seed_bulk(prefix: str, count: int) -> None:
+    await SeedService().seed(
+        SeedSchema(
+            portfolios=[
+                {
+                    "name": f"{prefix}-{i}",
+                    "balances": [
+                        {"asset": Asset.USD, "quantity": 10_000},
+                        {"asset": Asset.BTC, "quantity": 1},
+                    ],
+                    "leverages": [{"market": Market.BTCUSD_PERP, "leverage": 5}],
+                }
+                for i in range(count)
+            ]
+        )
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--portfolios", type=int, default=10_000)
+    parser.add_argument("--sample", type=int, default=500)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="seed_benchmark_"), "bench.db")
+    db = database_provider(path)
+    await db.init_models()
+
+    started = time.perf_counter()
+    await seed_per_row("row", args.sample)
+    per_account = (time.perf_counter() - started) / args.sample
+    print(
+        f"{'per-row calls':<16} {per_account * 1e3:>8.2f} ms/account, "
+        f"projected {per_account * args.portfolios:>8.1f} s "
+        f"for {args.portfolios} accounts"
+    )
+
+    started = time.perf_counter()
+    await seed_bulk("bulk", args.portfolios)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{'bulk seed':<16} {elapsed / args.portfolios * 1e3:>8.2f} ms/account, "
+        f"measured  {elapsed:>8.1f} s for {args.portfolios} accounts"
+    )
+
+    await db.shutdown()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+"""Benchmark of order create/fill throughput on SQLite with and without the profile.
+
+Spawns several writer processes, standing in for the API and the two engine
+processes, which all create orders and then mark them filled against the same SQLite
+file. Every fill also adds one to a shared counter row with a `SELECT ... FOR UPDATE`
+and an `UPDATE` in one transaction, like a balance read and written back. The run is
+repeated with the default driver settings, with `SqliteProfile` alone and with
+`SqliteProfile` and its `SQLITE_WRITE_FUNNEL`, reporting throughput, the number of
+`database is locked` failures and the counter updates lost to them.
+
+Requires the usual `.env` settings, e.g. `set -a; source .env.example; set +a`.
+
+Usage:
+    python -m benchmarks.sqlite_profile --processes 3 --orders 500
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import column, select, table, update
+
+COUNTER = table("fill_counter", column("id"), column("fills"))
+
+
+def database_provider(path: str):
+    from fifi import DatabaseProvider
+
+    # the provider falls back to the environment for empty connection fields
+    for name in ("DATABASE_HOST", "DATABASE_USER", "DATABASE_PASS"):
+        os.environ[name] = ""
+    os.environ["DATABASE_PORT"] = "0"
+    return DatabaseProvider(db_name=path, db_tech="sqlite", db_lib="aiosqlite")
+
+
+def writer(
+    path: str, profile: bool, funnel: bool, orders: int, barrier, results
+) -> None:
+    # every process builds its own singletons, like the engine processes do
+    os.environ["SQLITE_PROFILE_ENABLED"] = str(profile)
+    os.environ["SQLITE_WRITE_FUNNEL"] = str(funnel)
+    from fifi.enums import Market, OrderStatus
+
+    from src.common.sqlite_profile import SqliteProfile
+    from src.schemas.order_schema import OrderSchema
+    from src.services import OrderService
+
+    async def run() -> None:
+        db = database_provider(path)
+        SqliteProfile.apply(db)
+        order_service = OrderService()
+        portfolio_id = str(uuid.uuid4())
+        done = locked = 0
+        # process start-up is left out of the measurement
+        barrier.wait()
+        started = time.perf_counter()
+        for i in range(orders):
+            try:
+                order = await order_service.create(
+                    OrderSchema(
+                        portfolio_id=portfolio_id,
+                        market=Market.BTCUSD_PERP,
+                        fee=0.01,
+                        price=1000 + i % 100,
+                        size=0.01,
+                    )
+                )
+                order.status = OrderStatus.FILLED
+                await order_service.update_entity(order)
+                async with db.engine.begin() as conn:
+                    fills = await conn.scalar(
+                        select(COUNTER.c.fills)
+                        .where(COUNTER.c.id == 1)
+                        .with_for_update()
+                    )
+                    await conn.execute(
+                        update(COUNTER)
+                        .where(COUNTER.c.id == 1)
+                        .values(fills=fills + 1)
+                    )
+                done += 1
+            except Exception as ex:
+                # fifi wraps the driver error on create, so match on the message
+                if "database is locked" not in str(ex):
+                    results.put((done, locked, time.perf_counter() - started))
+                    raise
+                locked += 1
+        elapsed = time.perf_counter() - started
+        await db.shutdown()
+        results.put((done, locked, elapsed))
+
+    asyncio.run(run())
+
+
+def run_case(
+    label: str, profile: bool, funnel: bool, processes: int, orders: int
+) -> None:
+    from fifi import DatabaseProvider
+
+    # registers the tables on the metadata before they are created
+    import src.models  # noqa: F401
+
+    path = os.path.join(tempfile.mkdtemp(prefix="sqlite_benchmark_"), "bench.db")
+    db = database_provider(path)
+    asyncio.run(db.init_models())
+    DatabaseProvider.instance = None
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE fill_counter (id INTEGER PRIMARY KEY, fills INT)")
+        conn.execute("INSERT INTO fill_counter VALUES (1, 0)")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    barrier = ctx.Barrier(processes)
+    workers = [
+        ctx.Process(
+            target=writer, args=(path, profile, funnel, orders, barrier, results)
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    elapsed = max(outcome[2] for outcome in outcomes)
+
+    done = sum(outcome[0] for outcome in outcomes)
+    locked = sum(outcome[1] for outcome in outcomes)
+    with sqlite3.connect(path) as conn:
+        fills = conn.execute("SELECT fills FROM fill_counter").fetchone()[0]
+    print(
+        f"{label:<12} {done:>8} orders {elapsed:>8.2f} s "
+        f"{done / max(elapsed, 1e-9):>10.0f} orders/s {locked:>6} locked errors "
+        f"{processes * orders - fills:>6} lost fills"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=3)
+    parser.add_argument("--orders", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{args.processes} processes x {args.orders} create + fill each")
+    run_case("default", False, False, args.processes, args.orders)
+    run_case("profile", True, False, args.processes, args.orders)
+    run_case("funnel", True, True, args.processes, args.orders)
+
+
+if __name__ == "__main__":
+    main()
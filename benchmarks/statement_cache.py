@@ -0,0 +1,113 @@
+"""Micro-benchmark of per-call statement overhead for the hot balance lookup.
+
+Compares `BalanceRepository.get_portfolio_asset`'s query built as a plain
+`select(...).where(...)` on every call against the cached lambda statement it uses
+now. Both are measured twice: building the statement plus its cache key, which is the
+CPU cost paid before SQLAlchemy can look up the compiled form, and executing it on a
+single open connection of a SQLite database.
+
+Requires the usual `.env` settings, e.g. `set -a; source .env.example; set +a`.
+
+Usage:
+    python -m benchmarks.statement_cache --calls 20000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import and_, lambda_stmt, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from fifi import DecoratedBase
+from fifi.enums import Asset
+
+from src.common.statement_cache import StatementCacheStats
+from src.models import Balance
+
+
+def plain_statement(portfolio_id: str, asset: Asset):
+    return select(Balance).where(
+        and_(Balance.portfolio_id == portfolio_id, Balance.asset == asset)
+    )
+
+
+def lambda_statement(portfolio_id: str, asset: Asset):
+    stmt = lambda_stmt(lambda: select(Balance))
+    stmt += lambda s: s.where(
+        and_(Balance.portfolio_id == portfolio_id, Balance.asset == asset)
+    )
+    return stmt
+
+
+def report(label: str, calls: int, elapsed: float) -> None:
+    print(f"{label:<32} {elapsed / calls * 1e6:>10.1f} us/call")
+
+
+def bench_build(label: str, build, portfolio_ids, calls: int) -> None:
+    started = time.perf_counter()
+    for i in range(calls):
+        build(portfolio_ids[i % len(portfolio_ids)], Asset.USD)._generate_cache_key()
+    report(label, calls, time.perf_counter() - started)
+
+
+async def bench_execute(label: str, engine, build, portfolio_ids, calls: int) -> None:
+    stats = StatementCacheStats()
+    stats.reset()
+    async with engine.connect() as conn:
+        started = time.perf_counter()
+        for i in range(calls):
+            result = await conn.execute(
+                build(portfolio_ids[i % len(portfolio_ids)], Asset.USD)
+            )
+            result.all()
+        elapsed = time.perf_counter() - started
+    report(label, calls, elapsed)
+    print(f"{'':<32} {stats.to_dict()}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="statement_benchmark_"), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    portfolio_ids = [str(uuid.uuid4()) for _ in range(100)]
+    async with engine.begin() as conn:
+        await conn.run_sync(DecoratedBase.metadata.create_all)
+        await conn.execute(
+            Balance.__table__.insert(),
+            [
+                {
+                    "id": str(uuid.uuid4()),
+                    "portfolio_id": portfolio_id,
+                    "asset": Asset.USD,
+                    "quantity": 1000,
+                    "available": 1000,
+                    "frozen": 0,
+                    "burned": 0,
+                    "fee_paid": 0,
+                }
+                for portfolio_id in portfolio_ids
+            ],
+        )
+
+    print(f"{args.calls} calls of the portfolio asset lookup")
+    bench_build("build plain select", plain_statement, portfolio_ids, args.calls)
+    bench_build("build lambda statement", lambda_statement, portfolio_ids, args.calls)
+    await bench_execute(
+        "execute plain select", engine, plain_statement, portfolio_ids, args.calls
+    )
+    await bench_execute(
+        "execute lambda statement", engine, lambda_statement, portfolio_ids, args.calls
+    )
+    await engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
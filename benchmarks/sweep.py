@@ -0,0 +1,91 @@
+"""Benchmark of a fee sweep run with an increasing number of worker processes.
+
+Generates a month of 1m `BTCUSD_PERP` candles and sweeps a grid of 20 limit orders over
+`--scenarios` perpetual maker fees, each scenario replaying the whole month in its own
+process. The sweep is run with 1, 2, 4, ... workers up to the number of cores, and
+the speedup over a single worker is reported with the summary table.
+
+Requires the usual `.env` settings, e.g. `set -a; source .env.example; set +a`.
+
+Usage:
+    python -m benchmarks.sweep --days 30 --scenarios 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict
+
+from fifi.enums import Asset, Market, OrderSide, OrderType
+
+from src.engines.replay_engine import ReplayEngine
+from src.schemas.seed_schema import SeedPortfolioSchema
+from src.sweep import Scenario, ScenarioRunner
+from benchmarks.replay import START_PRICE, write_candles
+
+ORDERS = 20
+
+
+async def place_grid(engine: ReplayEngine, portfolio_ids: Dict[str, str]) -> None:
+    for i in range(ORDERS):
+        distance = 0.01 * (i // 2 + 1)
+        side = OrderSide.BUY if i % 2 == 0 else OrderSide.SELL
+        price = START_PRICE * (1 - distance if side == OrderSide.BUY else 1 + distance)
+        await engine.matching_engine.create_order(
+            market=Market.BTCUSD_PERP,
+            portfolio_id=portfolio_ids["grid"],
+            price=round(price),
+            size=0.01,
+            side=side,
+            order_type=OrderType.LIMIT,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--scenarios", type=int, default=8)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="sweep_benchmark_")
+    candles = os.path.join(directory, "btcusd_perp.npz")
+    write_candles(candles, count=args.days * 24 * 60)
+    scenarios = [
+        Scenario(
+            name=f"maker-{i}bp",
+            portfolios=[
+                SeedPortfolioSchema(
+                    name="grid",
+                    balances=[{"asset": Asset.USD, "quantity": 10_000_000}],
+                    leverages=[{"market": Market.BTCUSD_PERP, "leverage": 5}],
+                )
+            ],
+            strategy=place_grid,
+            settings={
+                "REPLAY_FILES": {Market.BTCUSD_PERP: candles},
+                "DEFAULT_PERP_MAKER_FEE": i / 10_000,
+            },
+        )
+        for i in range(args.scenarios)
+    ]
+
+    workers, serial = 1, None
+    while True:
+        started = time.perf_counter()
+        results = ScenarioRunner(max_workers=workers).run(scenarios)
+        elapsed = time.perf_counter() - started
+        serial = serial or elapsed
+        print(
+            f"{workers:>3} workers: {len(scenarios)} scenarios in {elapsed:>6.1f} s, "
+            f"speedup {serial / elapsed:.2f}"
+        )
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count() or 1)
+    print(ScenarioRunner.summary_table(results))
+    os.remove(candles)
+
+
+if __name__ == "__main__":
+    main()
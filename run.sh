@@ -1,13 +1,14 @@
 #!/bin/bash
 
 NAME=ExchangeSimulator
-WORKERS=1
 WORKER_CLASS=uvicorn.workers.UvicornWorker
 LOG_LEVEL=info
 BIND=0.0.0.0:1889
 ERROR_LOG=.gunicorn.log
 ACCESS_LOG=.gunicorn-access.log
 export $(grep -v '^#' .env | xargs)
+# one worker owns the engines, the others only serve the api
+WORKERS=${WORKERS:-1}
 
 mkdir .tmp || true
 mkdir logs || true
@@ -25,6 +26,7 @@ exec gunicorn main:app \
   --keep-alive 30 \
   --name $NAME \
   --workers $WORKERS \
+  --preload \
   --worker-class $WORKER_CLASS \
   --bind $BIND \
   --log-level=$LOG_LEVEL \
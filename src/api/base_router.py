@@ -1,27 +1,104 @@
+import asyncio
 from fastapi import APIRouter, FastAPI
 from contextlib import asynccontextmanager
 
 from fifi import DatabaseProvider
 
+from ..engines.market_data_feeder_engine import MarketDataFeederEngine
 from ..engines.matching_engine import MatchingEngine
 from ..engines.positions_orchestration_engine import PositionsOrchestrationEngine
+from ..engines.replay_engine import ReplayEngine
+from ..common.cache import LeverageCache
+from ..common.engine_owner import EngineOwner
 from ..common.settings import Setting
+from ..common.read_replica import ReadReplica
+from ..common.sqlite_profile import SqliteProfile
+from ..common.throttle import OrderThrottle
+from ..gateway import OrderGateway
+from ..journal import PushStream
+from ..repository import BalanceLedgerRepository, InMemoryStorage
 from .v1.router import router as router_v1
 
 
 setting = Setting()
+# created at import, so with `gunicorn --preload` every worker and engine process
+# inherits the same invalidation counter, throttle buckets and push stream queue
+LeverageCache()
+OrderThrottle()
+PushStream()
+
+
+async def start_engines() -> None:
+    if setting.REPLAY_ENABLED:
+        # the replay drives the matching and positions engines itself
+        ReplayEngine().start()
+    else:
+        if setting.LAST_TRADE_BOARD_ENABLED:
+            # creates the board before the engines attach to it
+            MarketDataFeederEngine().start()
+        MatchingEngine().start()
+        PositionsOrchestrationEngine().start()
+    if setting.ORDER_GATEWAY_ENABLED:
+        await OrderGateway().start()
+    if setting.PUSH_STREAM_ENABLED:
+        # from now on the engines publish, whether anybody subscribed or not
+        PushStream().start_dispatcher()
+
+
+async def stop_engines() -> None:
+    if setting.PUSH_STREAM_ENABLED:
+        PushStream().stop_dispatcher()
+    if setting.ORDER_GATEWAY_ENABLED:
+        await OrderGateway().stop()
+    if setting.REPLAY_ENABLED:
+        ReplayEngine().stop()
+        return
+    MatchingEngine().stop()
+    PositionsOrchestrationEngine().stop()
+    if setting.LAST_TRADE_BOARD_ENABLED:
+        MarketDataFeederEngine().stop()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # initialize
+    SqliteProfile.apply(DatabaseProvider())
     await DatabaseProvider().init_models()
-    MatchingEngine().start()
-    PositionsOrchestrationEngine().start()
+    replica_lag_task = None
+    if setting.READ_REPLICA_ENABLED:
+        ReadReplica().apply(DatabaseProvider())
+        replica_lag_task = asyncio.create_task(ReadReplica().run_lag_monitor())
+    engine_owner = EngineOwner()
+    ledger_flush_task = None
+    if setting.IN_MEMORY_STORAGE_ENABLED:
+        # the storage holds every table in the memory of the engines' worker
+        if not engine_owner.try_acquire():
+            raise RuntimeError("IN_MEMORY_STORAGE_ENABLED requires a single API worker")
+    elif setting.BALANCE_LEDGER_ENABLED:
+        # the ledger holds the balances in the memory of the engines' worker
+        if not engine_owner.try_acquire():
+            raise RuntimeError("BALANCE_LEDGER_ENABLED requires a single API worker")
+        await BalanceLedgerRepository().recover()
+        ledger_flush_task = asyncio.create_task(
+            BalanceLedgerRepository().run_periodic_flush()
+        )
+    election_task = asyncio.create_task(
+        engine_owner.run_election(on_elected=start_engines)
+    )
     yield
     # cleanup
-    MatchingEngine().stop()
-    PositionsOrchestrationEngine().stop()
+    election_task.cancel()
+    if engine_owner.is_owner:
+        await stop_engines()
+        engine_owner.release()
+    if setting.IN_MEMORY_STORAGE_ENABLED and setting.IN_MEMORY_STORAGE_DUMP_ON_SHUTDOWN:
+        await InMemoryStorage().dump()
+    if ledger_flush_task:
+        ledger_flush_task.cancel()
+        await BalanceLedgerRepository().close()
+    if replica_lag_task:
+        replica_lag_task.cancel()
+        await ReadReplica().shutdown()
 
 
 base_router = APIRouter(tags=["ExchangeAPIs"], lifespan=lifespan)
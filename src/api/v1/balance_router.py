@@ -1,9 +1,11 @@
 from typing import List, Union
 from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
 from fifi.enums import Asset
 
+from ...common.exceptions import VersionConflict
 from .deps import get_balance_service, get_portfolio_service
 from ...services import BalanceService, PortfolioService
 from ...schemas.balance_schema import (
@@ -19,6 +21,9 @@ async def lifespan(app: FastAPI):
     # cleanup
 
 
+# list responses are serialized from column values, skipping response validation
+BALANCE_COLUMNS = tuple(BalanceResponseSchema.model_fields)
+
 balance_router = APIRouter(prefix="/balance", tags=["Balance"], lifespan=lifespan)
 
 
@@ -42,11 +47,11 @@ async def get_balance(
             )
             if balance:
                 return balance
-        balances = await balance_service.read_many_by_portfolio_id(
-            portfolio_id=portfolio_id
+        balances = await balance_service.read_rows_by_portfolio_id(
+            portfolio_id=portfolio_id, columns=BALANCE_COLUMNS
         )
         if balances:
-            return balances
+            return ORJSONResponse(balances)
     raise HTTPException(status_code=404, detail="balance not found")
 
 
@@ -56,11 +61,14 @@ async def deposit_balance(
     balance_service: BalanceService = Depends(get_balance_service),
     portfolio_service: PortfolioService = Depends(get_portfolio_service),
 ):
-    is_successful = await balance_service.add_balance(
-        portfolio_id=balance_dposit.portfolio_id,
-        asset=balance_dposit.asset,
-        qty=balance_dposit.quantity,
-    )
+    try:
+        is_successful = await balance_service.add_balance(
+            portfolio_id=balance_dposit.portfolio_id,
+            asset=balance_dposit.asset,
+            qty=balance_dposit.quantity,
+        )
+    except VersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     if is_successful:
         return await balance_service.read_by_asset(
             portfolio_id=balance_dposit.portfolio_id, asset=balance_dposit.asset
@@ -1,10 +1,16 @@
+from starlette.requests import HTTPConnection
+
+from ...common.read_replica import mark_read_only
+from ...common.throttle import OrderThrottle
 from ...engines.matching_engine import MatchingEngine
+from ...journal import PushStream
 from ...services import (
     PortfolioService,
     BalanceService,
     OrderService,
     LeverageService,
     PositionService,
+    SeedService,
 )
 
 
@@ -30,3 +36,21 @@ def get_matching_engine() -> MatchingEngine:
 
 def get_position_service() -> PositionService:
     return PositionService()
+
+
+def get_seed_service() -> SeedService:
+    return SeedService()
+
+
+def get_push_stream() -> PushStream:
+    return PushStream()
+
+
+def get_order_throttle() -> OrderThrottle:
+    return OrderThrottle()
+
+
+async def route_reads_to_replica(connection: HTTPConnection) -> None:
+    # async so that it runs in the request's context rather than a worker thread
+    if connection.scope["type"] == "http" and connection.scope["method"] == "GET":
+        mark_read_only()
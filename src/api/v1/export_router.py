@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+
+from fifi.enums import OrderStatus, PositionStatus
+
+from .deps import get_order_service, get_position_service
+from ...helpers.export_helper import ExportHelper
+from ...schemas.export_schema import ExportFormat
+from ...services import OrderService, PositionService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # initialize
+    yield
+    # cleanup
+
+
+export_router = APIRouter(prefix="/export", tags=["Export"], lifespan=lifespan)
+
+
+def stream_export(rows, export_format: ExportFormat, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        ExportHelper.encode(rows=rows, export_format=export_format),
+        media_type=ExportHelper.get_media_type(export_format),
+        headers={
+            "Content-Disposition": f"attachment; filename={name}.{export_format.value}"
+        },
+    )
+
+
+@export_router.get("/orders")
+async def export_orders(
+    portfolio_id: str,
+    status: OrderStatus | None = None,
+    format: ExportFormat = ExportFormat.NDJSON,
+    order_service: OrderService = Depends(get_order_service),
+):
+    rows = order_service.stream_orders_by_portfolio_id(
+        portfolio_id=portfolio_id, status=status
+    )
+    return stream_export(rows=rows, export_format=format, name="orders")
+
+
+@export_router.get("/fills")
+async def export_fills(
+    portfolio_id: str,
+    format: ExportFormat = ExportFormat.NDJSON,
+    order_service: OrderService = Depends(get_order_service),
+):
+    rows = order_service.stream_orders_by_portfolio_id(
+        portfolio_id=portfolio_id, status=OrderStatus.FILLED
+    )
+    return stream_export(rows=rows, export_format=format, name="fills")
+
+
+@export_router.get("/positions")
+async def export_positions(
+    portfolio_id: str,
+    status: PositionStatus | None = None,
+    format: ExportFormat = ExportFormat.NDJSON,
+    position_service: PositionService = Depends(get_position_service),
+):
+    rows = position_service.stream_positions_by_portfolio_id(
+        portfolio_id=portfolio_id, status=status
+    )
+    return stream_export(rows=rows, export_format=format, name="positions")
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, FastAPI
+from contextlib import asynccontextmanager
+
+from ...common.cache import LeverageCache, PortfolioFeeCache
+from ...common.coalescer import ReadCoalescer
+from ...common.statement_cache import StatementCacheStats
+from ...common.throttle import OrderThrottle
+from ...schemas.metrics_schema import MetricsResponseSchema
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # initialize
+    StatementCacheStats()
+    yield
+    # cleanup
+
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"], lifespan=lifespan)
+
+
+@metrics_router.get("", response_model=MetricsResponseSchema)
+async def get_metrics():
+    # counters of the API process; the engine processes keep their own, and the
+    # throttle's are shared by every API worker
+    return MetricsResponseSchema(
+        statement_cache=StatementCacheStats().to_dict(),
+        portfolio_fee_cache=PortfolioFeeCache().to_dict(),
+        leverage_cache=LeverageCache().to_dict(),
+        order_throttle=OrderThrottle().to_dict(),
+        read_coalescing=ReadCoalescer().to_dict(),
+    )
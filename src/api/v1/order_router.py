@@ -1,14 +1,17 @@
-from typing import List, Union
-from fastapi import APIRouter, Depends, FastAPI, HTTPException
+import math
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
-from ...common.exceptions import InvalidOrder
+from ...common.exceptions import InvalidOrder, VersionConflict
+from ...common.throttle import OrderThrottle
 from ...engines.matching_engine import MatchingEngine
 from ...schemas.order_schema import (
     OrderCreateSchema,
     OrderResponseSchema,
 )
-from .deps import get_order_service, get_matching_engine
+from .deps import get_order_service, get_matching_engine, get_order_throttle
 from ...services import OrderService
 
 
@@ -19,6 +22,24 @@ async def lifespan(app: FastAPI):
     # cleanup
 
 
+# list responses are serialized from column values, skipping response validation
+ORDER_COLUMNS = tuple(OrderResponseSchema.model_fields)
+
+
+def raise_if_throttled(
+    order_throttle: OrderThrottle,
+    portfolio_id: Optional[str] = None,
+    client: Optional[str] = None,
+) -> None:
+    retry_after = order_throttle.acquire(portfolio_id=portfolio_id, client=client)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail=f"order rate limit exceeded, retry after {retry_after:.3f}s",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
 # TODO: implement modify order put method
 order_router = APIRouter(prefix="/order", tags=["Order"], lifespan=lifespan)
 
@@ -35,9 +56,11 @@ async def get_order(
     if order_id:
         order = await order_service.read_by_id(id_=order_id)
     elif portfolio_id:
-        order = await order_service.read_orders_by_portfolio_id(
-            portfolio_id=portfolio_id
+        orders = await order_service.read_order_rows_by_portfolio_id(
+            portfolio_id=portfolio_id, columns=ORDER_COLUMNS
         )
+        if orders:
+            return ORJSONResponse(orders)
     else:
         raise HTTPException(
             status_code=400, detail="one of portfolio_id or order_id must be given!!"
@@ -51,7 +74,9 @@ async def get_order(
 async def create_order(
     order_create_schema: OrderCreateSchema,
     matching_engine: MatchingEngine = Depends(get_matching_engine),
+    order_throttle: OrderThrottle = Depends(get_order_throttle),
 ):
+    raise_if_throttled(order_throttle, portfolio_id=order_create_schema.portfolio_id)
     try:
         return await matching_engine.create_order(
             portfolio_id=order_create_schema.portfolio_id,
@@ -63,16 +88,27 @@ async def create_order(
         )
     except InvalidOrder as exc:
         raise HTTPException(status_code=400, detail=str(exc))
+    except VersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
 
 
 @order_router.patch("/cancel", response_model=OrderResponseSchema)
 async def cancel_order(
     order_id: str,
+    request: Request,
     matching_engine: MatchingEngine = Depends(get_matching_engine),
+    order_throttle: OrderThrottle = Depends(get_order_throttle),
 ):
+    # the portfolio of the order is unknown until it is read, the cancel is charged
+    # to the client instead
+    raise_if_throttled(
+        order_throttle, client=request.client.host if request.client else None
+    )
     try:
         return await matching_engine.cancel_order(order_id=order_id)
     except InvalidOrder as exc:
         raise HTTPException(status_code=400, detail=str(exc))
+    except VersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
@@ -1,3 +1,4 @@
+from datetime import datetime
 from fastapi import APIRouter, Depends, FastAPI, HTTPException
 from contextlib import asynccontextmanager
 
@@ -6,6 +7,8 @@ from ...services import PortfolioService
 from ...schemas.portfolio_schema import (
     PortfolioResponseSchema,
     PortfolioSchema,
+    PortfolioStateResponseSchema,
+    PortfolioStatsResponseSchema,
 )
 
 
@@ -36,6 +39,32 @@ async def get_portfolio(
     raise HTTPException(status_code=404, detail="portfolio not found")
 
 
+@portfolio_router.get("/{id}/state", response_model=PortfolioStateResponseSchema)
+async def get_portfolio_state(
+    id: str,
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+):
+    state = await portfolio_service.read_state(portfolio_id=id)
+    if not state:
+        raise HTTPException(status_code=404, detail="portfolio not found")
+    return state
+
+
+@portfolio_router.get("/{id}/stats", response_model=PortfolioStatsResponseSchema)
+async def get_portfolio_stats(
+    id: str,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+):
+    stats = await portfolio_service.read_stats(
+        portfolio_id=id, since=since, until=until
+    )
+    if not stats:
+        raise HTTPException(status_code=404, detail="portfolio not found")
+    return stats
+
+
 @portfolio_router.post("", response_model=PortfolioResponseSchema)
 async def create_portfolio(
     portfolio: PortfolioSchema,
@@ -1,5 +1,6 @@
 from typing import List, Union
 from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
 from fifi.enums import PositionSide, PositionStatus, Market
@@ -16,6 +17,9 @@ async def lifespan(app: FastAPI):
     # cleanup
 
 
+# list responses are serialized from column values, skipping response validation
+POSITION_COLUMNS = tuple(PositionResponseSchema.model_fields)
+
 position_router = APIRouter(prefix="/position", tags=["Position"], lifespan=lifespan)
 
 
@@ -34,12 +38,15 @@ async def get_position(
     if position_id:
         position = await position_service.read_by_id(id_=position_id)
     elif portfolio_id:
-        position = await position_service.get_positions(
+        positions = await position_service.get_position_rows(
             portfolio_id=portfolio_id,
+            columns=POSITION_COLUMNS,
             market=market,
             status=status,
             side=side,
         )
+        if positions:
+            return ORJSONResponse(positions)
     else:
         raise HTTPException(
             status_code=400, detail="one of portfolio_id or position_id must be given!!"
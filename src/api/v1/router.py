@@ -1,10 +1,15 @@
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, Depends, FastAPI
 from contextlib import asynccontextmanager
+from .deps import route_reads_to_replica
 from .portfolio_router import portfolio_router
 from .balance_router import balance_router
 from .leverage_router import leverage_router
 from .order_router import order_router
 from .position_router import position_router
+from .export_router import export_router
+from .metrics_router import metrics_router
+from .seed_router import seed_router
+from .stream_router import stream_router
 
 
 @asynccontextmanager
@@ -14,7 +19,12 @@ async def lifespan(app: FastAPI):
     # cleanup
 
 
-router = APIRouter(prefix="/v1", tags=["v1"], lifespan=lifespan)
+router = APIRouter(
+    prefix="/v1",
+    tags=["v1"],
+    lifespan=lifespan,
+    dependencies=[Depends(route_reads_to_replica)],
+)
 
 
 router.include_router(portfolio_router)
@@ -22,3 +32,7 @@ router.include_router(balance_router)
 router.include_router(leverage_router)
 router.include_router(order_router)
 router.include_router(position_router)
+router.include_router(export_router)
+router.include_router(metrics_router)
+router.include_router(seed_router)
+router.include_router(stream_router)
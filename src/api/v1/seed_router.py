@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from contextlib import asynccontextmanager
+
+from fifi.exceptions import IntegrityConflictException
+
+from .deps import get_seed_service
+from ...schemas.seed_schema import SeedResponseSchema, SeedSchema
+from ...services import SeedService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # initialize
+    yield
+    # cleanup
+
+
+seed_router = APIRouter(prefix="/seed", tags=["Seed"], lifespan=lifespan)
+
+
+@seed_router.post("", response_model=SeedResponseSchema)
+async def seed(
+    seed_schema: SeedSchema,
+    seed_service: SeedService = Depends(get_seed_service),
+):
+    try:
+        return await seed_service.seed(data=seed_schema)
+    except (IntegrityConflictException, ValueError) as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=str(ex))
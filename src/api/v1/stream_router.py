@@ -0,0 +1,89 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, Depends, FastAPI, WebSocket, WebSocketDisconnect
+from fifi.helpers.get_logger import LoggerFactory
+
+from .deps import get_push_stream
+from ...journal import PushStream
+from ...journal.push_stream import Subscription
+
+LOGGER = LoggerFactory().get(__name__)
+
+# close code telling the client it was too slow and has to reconnect and resync
+OVERFLOW_CLOSE_CODE = 1013
+# close code telling the client this worker does not serve the stream, reconnecting
+# may land it on the worker owning the engines
+NOT_DISPATCHING_CLOSE_CODE = 1013
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # initialize
+    yield
+    # cleanup
+
+
+stream_router = APIRouter(prefix="/stream", tags=["Stream"], lifespan=lifespan)
+
+
+async def send_events(websocket: WebSocket, subscription: Subscription) -> None:
+    while True:
+        message = await subscription.buffer.get()
+        if subscription.overflowed:
+            await websocket.close(
+                code=OVERFLOW_CLOSE_CODE, reason="outbound buffer overflowed"
+            )
+            return
+        # awaiting the send is the per connection backpressure
+        await websocket.send_text(orjson.dumps(message).decode())
+
+
+async def wait_for_disconnect(websocket: WebSocket) -> None:
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        return
+
+
+@stream_router.websocket("/ws")
+async def stream(
+    websocket: WebSocket,
+    portfolio_id: str,
+    channels: Optional[str] = None,
+    push_stream: PushStream = Depends(get_push_stream),
+):
+    """Pushes the orders, fills, positions and balances events of a portfolio.
+
+    `channels` is a comma separated subset of `orders,fills,positions,balances`,
+    all of them by default.
+    """
+    await websocket.accept()
+    if not push_stream.is_dispatching:
+        # only the worker owning the engines receives their events
+        await websocket.close(
+            code=NOT_DISPATCHING_CLOSE_CODE,
+            reason="the push stream is served by the worker owning the engines",
+        )
+        return
+    try:
+        subscription = push_stream.subscribe(
+            portfolio_id=portfolio_id,
+            channels=channels.split(",") if channels else None,
+        )
+    except ValueError as ex:
+        await websocket.close(code=1008, reason=str(ex))
+        return
+    tasks = [
+        asyncio.create_task(send_events(websocket, subscription)),
+        asyncio.create_task(wait_for_disconnect(websocket)),
+    ]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        push_stream.unsubscribe(subscription)
@@ -0,0 +1,160 @@
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from fifi import singleton
+
+from .settings import Setting
+
+# returned by `TTLCache.get` for absent or expired keys, so `None` can be cached
+MISSING = object()
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries also expire after a fixed time to live.
+
+    Reads and writes are guarded by a lock because the engines may run as threads of
+    the API process and share the cache with it.
+
+    Attributes:
+        maxsize (int): The number of entries kept before the least recently used one
+            is evicted.
+        ttl (Optional[float]): Seconds an entry stays valid, `None` to never expire.
+        hits (int): Lookups served from the cache.
+        misses (int): Lookups of absent or expired keys.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached value of a key, or `MISSING` if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[0] and entry[0] < time.monotonic()):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def reset(self) -> None:
+        """Drops every entry and zeroes the hit and miss counters."""
+        self.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
+@singleton
+class PortfolioFeeCache(TTLCache):
+    """
+    Portfolios keyed by id, read on every order placement for their fee schedule.
+
+    Entries are invalidated when a portfolio is updated or re-seeded; the time to live
+    bounds staleness for changes made outside of this process.
+    """
+
+    def __init__(self):
+        setting = Setting()
+        super().__init__(
+            maxsize=setting.PORTFOLIO_FEE_CACHE_SIZE,
+            ttl=setting.PORTFOLIO_FEE_CACHE_TTL,
+        )
+
+
+@singleton
+class LeverageCache(TTLCache):
+    """
+    Leverage values keyed by `(portfolio_id, market)`, shared by the leverage service
+    and both engines of a process. A portfolio without leverage is cached as `None`.
+
+    `publish` writes a changed leverage through to the cache and bumps a generation
+    counter in shared memory; every other process drops its entries on the next lookup
+    once it sees the counter moved. The counter is inherited by the engine processes,
+    so the cache has to be created before they are started.
+    """
+
+    def __init__(self):
+        setting = Setting()
+        super().__init__(
+            maxsize=setting.LEVERAGE_CACHE_SIZE, ttl=setting.LEVERAGE_CACHE_TTL
+        )
+        self._generation = multiprocessing.Value("Q", 0)
+        self._seen_generation = 0
+
+    def get(self, key: Hashable) -> Any:
+        self._sync()
+        return super().get(key)
+
+    @property
+    def generation(self) -> int:
+        return self._generation.value
+
+    def fill(self, key: Hashable, value: Any, generation: int) -> None:
+        """Caches a value read from the database unless the leverages were changed
+        since `generation` was taken, in which case the value may be stale."""
+        with self._generation.get_lock():
+            if self._generation.value == generation:
+                self.set(key, value)
+
+    def publish(self, key: Hashable, value: Any) -> None:
+        """Stores a new value of a key and invalidates it in the other processes."""
+        self._bump_generation()
+        self.set(key, value)
+
+    def invalidate_everywhere(self) -> None:
+        """Drops every entry in this process and in the other processes."""
+        self._bump_generation()
+        self.clear()
+
+    def _bump_generation(self) -> None:
+        with self._generation.get_lock():
+            if self._generation.value != self._seen_generation:
+                # apply the invalidations of the other processes before skipping them
+                self.clear()
+            self._generation.value += 1
+            self._seen_generation = self._generation.value
+
+    def _sync(self) -> None:
+        generation = self._generation.value
+        if generation != self._seen_generation:
+            self.clear()
+            self._seen_generation = generation
@@ -0,0 +1,56 @@
+import time
+from datetime import UTC, datetime
+from typing import Callable, Optional
+
+from fifi import singleton
+
+
+class SimulatedClock:
+    """
+    Time which only moves when the simulation moves it, e.g. to the next replayed
+    event, instead of passing by itself.
+
+    Attributes:
+        current (float): The current epoch seconds.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.current = start
+
+    def __call__(self) -> float:
+        return self.current
+
+    def advance_to(self, moment: float) -> None:
+        """Moves the clock forward to `moment`, it never goes back."""
+        self.current = max(self.current, moment)
+
+
+@singleton
+class SimulationClock:
+    """
+    The clock of the simulation, read by the engines, services and models instead
+    of the wall clock: the order, position and balance timestamps, the journal, the
+    positions engine's fills cursor and the market data staleness all run on it.
+
+    It reads the wall clock unless a simulation installs its own source, as a replay
+    does with its `SimulatedClock`. Operational timers, such as throttling, caches and
+    flushes, stay on the wall clock.
+
+    Attributes:
+        source (Callable[[], float]): Returns the current epoch seconds.
+    """
+
+    def __init__(self) -> None:
+        self.source: Callable[[], float] = time.time
+
+    def use(self, source: Optional[Callable[[], float]]) -> None:
+        """Installs a source of time, `None` to go back to the wall clock."""
+        self.source = source or time.time
+
+    def time(self) -> float:
+        """The current epoch seconds."""
+        return self.source()
+
+    def now(self) -> datetime:
+        """The current time as a naive UTC datetime, like the stored timestamps."""
+        return datetime.fromtimestamp(self.source(), UTC).replace(tzinfo=None)
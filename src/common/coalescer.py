@@ -0,0 +1,114 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from fifi import singleton
+
+from .cache import MISSING, TTLCache
+from .read_replica import is_read_only
+from .settings import Setting
+
+Read = TypeVar("Read", bound=Callable[..., Awaitable[Any]])
+
+
+@singleton
+class ReadCoalescer:
+    """
+    Singleflight of identical reads: while a read is in flight, the same read with
+    the same arguments waits for it and shares its result instead of running its own
+    query. With `READ_COALESCING_TTL`, a result also keeps serving the same read for
+    that many seconds after it landed.
+
+    A read joining a flight may get a result that does not include a write committed
+    after the flight took off, as if it had been made a moment earlier. Only results
+    of successful reads are shared past their flight; failures reach the callers in
+    flight only.
+
+    Attributes:
+        enabled (bool): Whether reads are coalesced at all.
+        ttl (float): Seconds a result is reused after its read, 0 to only share it
+            with the reads in flight.
+        results (TTLCache): The recent results kept for `ttl` seconds.
+        executed (int): Reads which ran their own query.
+        shared (int): Reads served by another read's query.
+    """
+
+    def __init__(self):
+        setting = Setting()
+        self.enabled = setting.READ_COALESCING_ENABLED
+        self.ttl = setting.READ_COALESCING_TTL
+        self.results = TTLCache(
+            maxsize=setting.READ_COALESCING_CACHE_SIZE, ttl=self.ttl or None
+        )
+        # keyed by event loop too, a flight can only be awaited on its own loop
+        self._flights: Dict[Hashable, asyncio.Future] = dict()
+        self.executed = 0
+        self.shared = 0
+
+    async def run(self, key: Hashable, read: Callable[[], Awaitable[Any]]) -> Any:
+        """Runs a read, or joins the identical one in flight.
+
+        Args:
+            key (Hashable): Identifies the read and its arguments.
+            read (Callable[[], Awaitable[Any]]): Starts the read when no flight of
+                the key is under way.
+
+        Returns:
+            Any: The result of the read.
+        """
+        if self.ttl:
+            result = self.results.get(key)
+            if result is not MISSING:
+                self.shared += 1
+                return result
+        flight_key = (asyncio.get_running_loop(), key)
+        flight = self._flights.get(flight_key)
+        if flight is None:
+            flight = asyncio.ensure_future(read())
+            self._flights[flight_key] = flight
+            flight.add_done_callback(functools.partial(self._land, flight_key))
+            self.executed += 1
+        else:
+            self.shared += 1
+        # a caller giving up must not cancel the read the others are waiting for
+        return await asyncio.shield(flight)
+
+    def reset(self) -> None:
+        """Drops the kept results and zeroes the counters."""
+        self.results.clear()
+        self.executed = 0
+        self.shared = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"executed": self.executed, "shared": self.shared}
+
+    def _land(self, flight_key: Hashable, flight: asyncio.Future) -> None:
+        self._flights.pop(flight_key, None)
+        # retrieving the exception also keeps a flight nobody awaits anymore quiet
+        if flight.cancelled() or flight.exception() is not None:
+            return
+        if self.ttl:
+            self.results.set(flight_key[1], flight.result())
+
+
+def coalesced(read: Read) -> Read:
+    """Coalesces the calls of a service read made while serving a GET request.
+
+    Other callers, notably the engines which mutate what they read, always run their
+    own query. Calls are identified by the read and its arguments, which must be
+    hashable for the call to be coalesced.
+    """
+
+    @functools.wraps(read)
+    async def wrapper(self, *args, **kwargs):
+        coalescer = ReadCoalescer()
+        if not (coalescer.enabled and is_read_only()):
+            return await read(self, *args, **kwargs)
+        key = (read.__qualname__, args, frozenset(kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return await read(self, *args, **kwargs)
+        return await coalescer.run(key, lambda: read(self, *args, **kwargs))
+
+    return wrapper  # type: ignore
@@ -0,0 +1,88 @@
+import asyncio
+import fcntl
+import os
+from typing import Awaitable, Callable, Optional
+
+from fifi import singleton
+from fifi.helpers.get_logger import LoggerFactory
+
+from .settings import Setting
+
+LOGGER = LoggerFactory().get(__name__)
+
+
+@singleton
+class EngineOwner:
+    """
+    Election of the one API worker which runs the engines.
+
+    Every gunicorn worker serves HTTP, but only the worker holding an exclusive lock on
+    `ENGINE_OWNER_LOCK_PATH` starts the matching, positions and market data feeder
+    engines and the order gateway; running the engines in more than one worker would
+    fill every order twice. The other workers keep trying to take the lock, so one of
+    them starts the engines if the owner exits.
+
+    The lock is an `flock` on a local file rather than a database advisory lock, which
+    SQLite does not have. The kernel drops it when the last process holding the file
+    open exits, and the engine processes forked by the owner inherit it, so ownership
+    only moves once both the owner and its engines are gone.
+
+    Every worker publishes the push stream events it records, e.g. the orders it
+    accepts, onto the queue created at import, but only the owner dispatches them:
+    the other workers close their WebSocket connections so the client reconnects.
+
+    Attributes:
+        path (str): Path of the lock file.
+        retry_interval (float): Seconds between two attempts to take the lock.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.setting = Setting()
+        self.path = path or self.setting.ENGINE_OWNER_LOCK_PATH
+        self.retry_interval = self.setting.ENGINE_OWNER_RETRY_INTERVAL
+        self._fd: Optional[int] = None
+
+    @property
+    def is_owner(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Takes the engine ownership if no other worker holds it.
+
+        Returns:
+            bool: Whether this worker owns the engines.
+        """
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # the owner's pid is only informative, the lock is what counts
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        LOGGER.info(f"worker {os.getpid()} owns the engines")
+        return True
+
+    async def run_election(self, on_elected: Callable[[], Awaitable[None]]) -> None:
+        """Tries to take the engine ownership every `ENGINE_OWNER_RETRY_INTERVAL`
+        seconds and runs `on_elected` once it is taken.
+
+        Args:
+            on_elected (Callable[[], Awaitable[None]]): Starts the engines and
+                the order gateway.
+        """
+        while not self.try_acquire():
+            await asyncio.sleep(self.retry_interval)
+        await on_elected()
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
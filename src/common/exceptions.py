@@ -12,3 +12,7 @@ class NotFoundOrder(InvalidOrder):
 
 class APIError(Exception):
     pass
+
+
+class VersionConflict(Exception):
+    pass
@@ -0,0 +1,99 @@
+from typing import Callable, Dict, NamedTuple, Optional, Set
+
+from fifi import MarketDataRepository
+from fifi.enums import Market
+from fifi.helpers.get_logger import LoggerFactory
+
+from .clock import SimulationClock
+from .settings import Setting
+
+LOGGER = LoggerFactory().get(__name__)
+
+# market data times above this are epoch milliseconds rather than seconds
+MILLISECONDS_THRESHOLD = 1e11
+
+
+class MarketTick(NamedTuple):
+    last_trade: float
+    time: float
+
+
+class MarketDataSnapshot:
+    """
+    Market data of every active market, read once per engine tick.
+
+    The engines refresh the snapshot at the start of each loop iteration and compare
+    all orders and positions of that iteration against the same prices, instead of
+    reading the shared market data once or twice per order.
+
+    A market whose last trade is missing, or whose data is older than
+    `MARKET_DATA_MAX_STALENESS` seconds, is stale: the engines skip it until the
+    market monitoring service publishes again, and market orders on it are rejected.
+    The monitoring feed carries candles and last trades only, so there is no best bid
+    or ask to snapshot.
+
+    Attributes:
+        md_repos (Dict[Market, MarketDataRepository]): The market data repositories,
+            shared with the engine.
+        max_staleness (float): Maximum age of market data in seconds.
+        clock (Callable[[], float]): Current epoch seconds the data age is measured
+            against, the simulation clock by default.
+        ticks (Dict[Market, MarketTick]): The market data read by the last refresh.
+        stale_markets (Set[Market]): The markets which are stale since the last refresh.
+    """
+
+    def __init__(
+        self,
+        md_repos: Dict[Market, MarketDataRepository],
+        max_staleness: Optional[float] = None,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        self.md_repos = md_repos
+        self.max_staleness = (
+            Setting().MARKET_DATA_MAX_STALENESS
+            if max_staleness is None
+            else max_staleness
+        )
+        self.clock = clock or SimulationClock().time
+        self.ticks: Dict[Market, MarketTick] = dict()
+        self.stale_markets: Set[Market] = set()
+
+    def refresh(self) -> None:
+        now = self.clock()
+        for market in self.md_repos:
+            self.refresh_market(market, now=now)
+
+    def refresh_market(self, market: Market, now: Optional[float] = None) -> None:
+        """Reads the market data of one market, e.g. to price a market order."""
+        if now is None:
+            now = self.clock()
+        repo = self.md_repos[market]
+        read_tick = getattr(repo, "read_tick", None)
+        if read_tick:
+            # the last trade and its time of one consistent read
+            last_trade, time = read_tick()
+        else:
+            last_trade, time = repo.get_last_trade(), repo.get_time()
+        tick = MarketTick(
+            last_trade=float(last_trade), time=self._to_seconds(float(time))
+        )
+        self.ticks[market] = tick
+        stale = tick.last_trade <= 0 or now - tick.time > self.max_staleness
+        if stale and market not in self.stale_markets:
+            LOGGER.warning(f"{market=} data is stale, pausing it: {tick=}")
+            self.stale_markets.add(market)
+        elif not stale and market in self.stale_markets:
+            LOGGER.info(f"{market=} data is fresh again, resuming it")
+            self.stale_markets.discard(market)
+
+    def is_fresh(self, market: Market) -> bool:
+        return market in self.ticks and market not in self.stale_markets
+
+    def last_trade(self, market: Market) -> float:
+        return self.ticks[market].last_trade
+
+    @staticmethod
+    def _to_seconds(timestamp: float) -> float:
+        if timestamp > MILLISECONDS_THRESHOLD:
+            return timestamp / 1000
+        return timestamp
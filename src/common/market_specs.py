@@ -0,0 +1,92 @@
+from enum import Enum
+from typing import Dict, FrozenSet, NamedTuple
+
+from fifi import singleton
+from fifi.enums import Asset, Market
+
+from .settings import Setting
+
+PERPETUAL_SUFFIX = "_perp"
+# relative tolerance when checking a float against a step grid
+STEP_TOLERANCE = 1e-9
+
+
+class FeeClass(Enum):
+    SPOT = "spot"
+    PERP = "perp"
+
+
+class MarketSpec(NamedTuple):
+    market: Market
+    base: Asset
+    quote: Asset
+    is_perpetual: bool
+    tick_size: float
+    lot_size: float
+    contract_multiplier: float
+    fee_class: FeeClass
+
+    def is_on_tick(self, price: float) -> bool:
+        return self._is_on_step(price, self.tick_size)
+
+    def is_on_lot(self, size: float) -> bool:
+        return self._is_on_step(size, self.lot_size)
+
+    @staticmethod
+    def _is_on_step(value: float, step: float) -> bool:
+        steps = value / step
+        return abs(steps - round(steps)) <= STEP_TOLERANCE * max(1.0, abs(steps))
+
+
+@singleton
+class MarketSpecRegistry:
+    """
+    Specifications of every market, parsed once from the market names.
+
+    Perpetual markets settle in their quote asset; spot markets exchange their base
+    asset, e.g. BTC in `btcusd`, against their quote asset. Tick size, lot size and
+    contract multiplier come from `MARKET_STEPS`, or the `DEFAULT_*` settings for a
+    market it leaves out. Only the markets in `ACTIVE_MARKETS` accept new orders.
+
+    Attributes:
+        specs (Dict[Market, MarketSpec]): The specification of each market.
+        active_markets (FrozenSet[Market]): The markets open for trading.
+    """
+
+    def __init__(self):
+        setting = Setting()
+        default_steps = (
+            setting.DEFAULT_TICK_SIZE,
+            setting.DEFAULT_LOT_SIZE,
+            setting.DEFAULT_CONTRACT_MULTIPLIER,
+        )
+        self.specs: Dict[Market, MarketSpec] = {
+            market: self._build_spec(
+                market, *setting.MARKET_STEPS.get(market, default_steps)
+            )
+            for market in Market
+        }
+        self.active_markets: FrozenSet[Market] = frozenset(setting.ACTIVE_MARKETS)
+
+    def get(self, market: Market) -> MarketSpec:
+        return self.specs[market]
+
+    def is_active(self, market: Market) -> bool:
+        return market in self.active_markets
+
+    @staticmethod
+    def _build_spec(
+        market: Market, tick_size: float, lot_size: float, contract_multiplier: float
+    ) -> MarketSpec:
+        is_perpetual = market.value.endswith(PERPETUAL_SUFFIX)
+        symbol = market.value.removesuffix(PERPETUAL_SUFFIX)
+        return MarketSpec(
+            market=market,
+            base=Asset[symbol[:3].upper()],
+            quote=Asset[symbol[3:].upper()],
+            is_perpetual=is_perpetual,
+            tick_size=tick_size,
+            lot_size=lot_size,
+            contract_multiplier=contract_multiplier,
+            fee_class=FeeClass.PERP if is_perpetual else FeeClass.SPOT,
+        )
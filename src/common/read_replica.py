@@ -0,0 +1,147 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from fifi import DatabaseProvider, singleton
+from fifi.helpers.get_logger import LoggerFactory
+
+from .settings import Setting
+from ..models import Balance, Order, Position
+
+LOGGER = LoggerFactory().get(__name__)
+
+READ_REPLICA_INFO_KEY = "read_replica"
+# tables whose latest `updated_at` tells how far behind the replica is
+LAG_PROBE_MODELS = (Order, Balance, Position)
+
+_read_only: ContextVar[bool] = ContextVar("read_only", default=False)
+
+
+@contextmanager
+def read_only() -> Iterator[None]:
+    """Marks the database reads made inside the block as allowed on the replica."""
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+def mark_read_only() -> None:
+    """Marks the rest of the current context, e.g. one request, as read-only."""
+    _read_only.set(True)
+
+
+def is_read_only() -> bool:
+    return _read_only.get()
+
+
+class ReplicaRoutingSession(Session):
+    """
+    Session sending reads to the read replica while in a `read_only` context.
+
+    Flushes and DML statements always go to the primary, and so does everything else
+    while the replica is further behind than `READ_REPLICA_MAX_STALENESS`.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replica: Optional[ReadReplica] = self.info.get(READ_REPLICA_INFO_KEY)
+        if (
+            replica is not None
+            and is_read_only()
+            and not self._flushing
+            and not getattr(clause, "is_dml", False)
+            and replica.is_fresh()
+        ):
+            replica.routed_reads += 1
+            return replica.engine.sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@singleton
+class ReadReplica:
+    """
+    Optional read-only database serving the GET endpoints and reporting queries.
+
+    The replica is only used while its measured lag stays within
+    `READ_REPLICA_MAX_STALENESS` seconds. The lag is the largest gap between the latest
+    `updated_at` of the orders, balances and positions on the primary and on the
+    replica; it is unknown, hence the primary is used, until the first check.
+
+    Attributes:
+        engine (AsyncEngine): Engine of the replica database.
+        max_staleness (float): Tolerated replica lag in seconds.
+        lag (Optional[float]): The last measured lag in seconds.
+        routed_reads (int): Number of statements sent to the replica.
+    """
+
+    def __init__(self, url: Optional[str] = None):
+        self.setting = Setting()
+        self.url = url or self.setting.READ_REPLICA_URL
+        if not self.url:
+            raise ValueError("READ_REPLICA_URL is not set")
+        self.engine = create_async_engine(
+            self.url, echo=False, pool_pre_ping=True, poolclass=NullPool
+        )
+        self.max_staleness = self.setting.READ_REPLICA_MAX_STALENESS
+        self.lag: Optional[float] = None
+        self.routed_reads = 0
+
+    def apply(self, provider: DatabaseProvider) -> None:
+        """Makes the sessions of a database provider route reads to the replica.
+
+        Args:
+            provider (DatabaseProvider): The provider of the primary database.
+        """
+        provider.session_maker = async_sessionmaker(
+            provider.engine,
+            expire_on_commit=False,
+            sync_session_class=ReplicaRoutingSession,
+            info={READ_REPLICA_INFO_KEY: self},
+        )
+        LOGGER.info(f"read replica {self.engine.url} is serving read-only sessions")
+
+    def is_fresh(self) -> bool:
+        return self.lag is not None and self.lag <= self.max_staleness
+
+    async def check_lag(self) -> float:
+        """Measures how far the replica is behind the primary.
+
+        Returns:
+            float: The replica lag in seconds.
+        """
+        lag = 0.0
+        primary = DatabaseProvider().engine
+        for model in LAG_PROBE_MODELS:
+            stmt = select(func.max(model.updated_at))
+            async with primary.connect() as conn:
+                primary_latest = await conn.scalar(stmt)
+            async with self.engine.connect() as conn:
+                replica_latest = await conn.scalar(stmt)
+            if primary_latest is None:
+                continue
+            if replica_latest is None:
+                lag = float("inf")
+                break
+            lag = max(lag, (primary_latest - replica_latest).total_seconds())
+        self.lag = lag
+        return lag
+
+    async def run_lag_monitor(self) -> None:
+        """Checks the replica lag every `READ_REPLICA_LAG_CHECK_INTERVAL` seconds until
+        cancelled. A failed check takes the replica out of rotation."""
+        while True:
+            try:
+                await self.check_lag()
+            except Exception as ex:
+                self.lag = None
+                LOGGER.error(f"read replica lag check failed: {ex}")
+            await asyncio.sleep(self.setting.READ_REPLICA_LAG_CHECK_INTERVAL)
+
+    async def shutdown(self) -> None:
+        await self.engine.dispose()
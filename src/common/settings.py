@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Dict, Optional, Tuple
 from dotenv import load_dotenv
 from fifi import singleton
 from fifi.enums import Market, Exchange
@@ -24,14 +24,144 @@ class Setting(BaseSettings):
     DEFAULT_PERP_MAKER_FEE: float
     DEFAULT_PERP_TAKER_FEE: float
 
+    # Market Spec Settings
+    # (tick size, lot size, contract multiplier) of each market
+    MARKET_STEPS: Annotated[Dict[Market, Tuple[float, float, float]], NoDecode] = {
+        Market.BTCUSD: (0.1, 0.0001, 1.0),
+        Market.ETHUSD: (0.01, 0.0001, 1.0),
+        Market.BTCUSD_PERP: (0.1, 0.0001, 1.0),
+        Market.ETHUSD_PERP: (0.01, 0.0001, 1.0),
+    }
+    DEFAULT_TICK_SIZE: float = 0.01
+    DEFAULT_LOT_SIZE: float = 0.0001
+    DEFAULT_CONTRACT_MULTIPLIER: float = 1.0
+    ORDER_STEP_VALIDATION_ENABLED: bool = False
+
+    @field_validator("MARKET_STEPS", mode="before")
+    @classmethod
+    def decode_market_steps(
+        cls, v: str | Dict[Market, Tuple[float, float, float]]
+    ) -> Dict[Market, Tuple[float, float, float]]:
+        # e.g. "BTCUSD=0.1:0.0001:1,BTCUSD_PERP=0.5:0.001:1"
+        if not isinstance(v, str):
+            return v
+        pairs = (x.split("=", 1) for x in v.split(",") if x)
+        return {
+            Market[market]: tuple(float(step) for step in steps.split(":"))
+            for market, steps in pairs
+        }
+
     # API Endpoints Settings
     API_PREFIX: str = "exapi"
     API_VERSION: str = "v1"
 
+    # Export Settings
+    EXPORT_YIELD_PER: int = 1000
+
+    # Balance Ledger Settings
+    BALANCE_LEDGER_ENABLED: bool = False
+    BALANCE_LEDGER_WAL_PATH: str = "./.tmp/balance_ledger.wal"
+    BALANCE_LEDGER_WAL_FSYNC: bool = False
+    BALANCE_LEDGER_FLUSH_BATCH_SIZE: int = 500
+    BALANCE_LEDGER_FLUSH_INTERVAL: float = 1.0
+
+    # In-Memory Storage Settings
+    IN_MEMORY_STORAGE_ENABLED: bool = False
+    IN_MEMORY_STORAGE_DUMP_ON_SHUTDOWN: bool = True
+
+    # Event Journal Settings
+    JOURNAL_ENABLED: bool = False
+    JOURNAL_PATH: str = "./.tmp/journal"
+    JOURNAL_SNAPSHOT_INTERVAL: int = 100000
+    JOURNAL_FSYNC: bool = False
+
+    # Push Stream Settings
+    PUSH_STREAM_ENABLED: bool = False
+    PUSH_STREAM_QUEUE_SIZE: int = 10000
+    PUSH_STREAM_BUFFER_SIZE: int = 1000
+
+    # Optimistic Concurrency Settings
+    OPTIMISTIC_LOCK_MAX_RETRIES: int = 5
+    OPTIMISTIC_LOCK_RETRY_BACKOFF: float = 0.002
+
+    # SQLite Profile Settings
+    SQLITE_PROFILE_ENABLED: bool = False
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_CACHE_SIZE: int = -65536
+    SQLITE_BUSY_TIMEOUT: int = 5000
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_WRITE_FUNNEL: bool = True
+    SQLITE_POOL_SIZE: int = 5
+    SQLITE_POOL_MAX_OVERFLOW: int = 10
+
+    # Read Replica Settings
+    READ_REPLICA_ENABLED: bool = False
+    READ_REPLICA_URL: Optional[str] = None
+    READ_REPLICA_MAX_STALENESS: float = 2.0
+    READ_REPLICA_LAG_CHECK_INTERVAL: float = 1.0
+
+    # Engine Owner Settings
+    ENGINE_OWNER_LOCK_PATH: str = "./.tmp/engine_owner.lock"
+    ENGINE_OWNER_RETRY_INTERVAL: float = 1.0
+
+    # Order Gateway Settings
+    ORDER_GATEWAY_ENABLED: bool = False
+    ORDER_GATEWAY_HOST: str = "127.0.0.1"
+    ORDER_GATEWAY_PORT: Optional[int] = 1890
+    ORDER_GATEWAY_UNIX_PATH: Optional[str] = None
+
+    # Order Throttle Settings
+    ORDER_THROTTLE_ENABLED: bool = False
+    ORDER_THROTTLE_PORTFOLIO_RATE: float = 50.0
+    ORDER_THROTTLE_PORTFOLIO_BURST: float = 100.0
+    ORDER_THROTTLE_GLOBAL_RATE: float = 2000.0
+    ORDER_THROTTLE_GLOBAL_BURST: float = 4000.0
+    ORDER_THROTTLE_CANCEL_RATE: float = 1000.0
+    ORDER_THROTTLE_CANCEL_BURST: float = 2000.0
+    ORDER_THROTTLE_CLIENT_RATE: float = 50.0
+    ORDER_THROTTLE_CLIENT_BURST: float = 100.0
+    ORDER_THROTTLE_SLOTS: int = 4096
+
+    # Cache Settings
+    PORTFOLIO_FEE_CACHE_SIZE: int = 10000
+    PORTFOLIO_FEE_CACHE_TTL: float = 60.0
+    LEVERAGE_CACHE_SIZE: int = 10000
+    LEVERAGE_CACHE_TTL: float = 300.0
+
+    # Read Coalescing Settings
+    READ_COALESCING_ENABLED: bool = False
+    READ_COALESCING_TTL: float = 0.0
+    READ_COALESCING_CACHE_SIZE: int = 10000
+
     # Market Monitoring Settings
     MM_API_PATH: str = "http://localhost:3456/"
     MM_SUBSCRIPTION_PATH: str = "subscribe/market"
     MM_EXCHANGE: Exchange = Exchange.HYPERLIQUID
+    MARKET_DATA_MAX_STALENESS: float = 90.0
+
+    # Last Trade Board Settings
+    LAST_TRADE_BOARD_ENABLED: bool = False
+    LAST_TRADE_BOARD_NAME: str = "exchange_simulator_last_trade_board"
+    LAST_TRADE_BOARD_FEED_INTERVAL: float = 0.005
+
+    # Replay Settings
+    REPLAY_ENABLED: bool = False
+    REPLAY_FILES: Annotated[Dict[Market, str], NoDecode] = dict()
+    REPLAY_CANDLE_INTERVAL: float = 60.0
+    # the replayed window in epoch seconds, start inclusive and end exclusive
+    REPLAY_START: Optional[float] = None
+    REPLAY_END: Optional[float] = None
+
+    @field_validator("REPLAY_FILES", mode="before")
+    @classmethod
+    def decode_replay_files(cls, v: str | Dict[Market, str]) -> Dict[Market, str]:
+        # e.g. "BTCUSD_PERP=data/btcusd_perp.csv,BTCUSD=data/btcusd.npz"
+        if not isinstance(v, str):
+            return v
+        pairs = (x.split("=", 1) for x in v.split(",") if x)
+        return {Market[market]: path for market, path in pairs}
 
     # Logs Path
     LOG_LEVEL: str = "INFO"
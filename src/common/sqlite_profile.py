@@ -0,0 +1,261 @@
+import asyncio
+import fcntl
+import os
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, URL
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.util import await_only
+from fifi import DatabaseProvider
+from fifi.helpers.get_logger import LoggerFactory
+
+from .settings import Setting
+
+LOGGER = LoggerFactory().get(__name__)
+
+# statements which make SQLite take the database write lock
+WRITE_STATEMENT_PREFIXES = (
+    "INSERT",
+    "UPDATE",
+    "DELETE",
+    "REPLACE",
+    "CREATE",
+    "DROP",
+    "ALTER",
+)
+PENDING_BEGIN_KEY = "sqlite_pending_begin"
+FUNNEL_FD_KEY = "sqlite_funnel_fd"
+FUNNEL_HELD_KEY = "sqlite_funnel_held"
+FUNNEL_LOCK_SUFFIX = ".write.lock"
+# polling interval bounds of a writer waiting for the funnel, in seconds
+FUNNEL_MIN_DELAY = 0.0005
+FUNNEL_MAX_DELAY = 0.005
+PROFILED_PID_ATTR = "sqlite_profile_pid"
+
+
+class SqliteProfile:
+    """
+    Throughput profile for SQLite deployments, applied to the `DatabaseProvider`.
+
+    Connections are pooled per process and every new connection gets the PRAGMAs from
+    the `SQLITE_*` settings: WAL journal mode, `synchronous`, memory-mapped I/O, page
+    cache size, busy timeout and in-memory temp storage.
+
+    Transactions are begun by the profile rather than the driver, lazily on their first
+    statement, so reads run in a transaction too and see one snapshot.
+
+    With `SQLITE_WRITE_FUNNEL` enabled, write transactions of every process queue on
+    one writer at a time. Before its first write, a transaction takes an exclusive
+    `flock` on the `<database>.write.lock` file, and it releases it when it commits or
+    rolls back. Waiting writers poll the lock with asyncio sleeps, so the transaction
+    holding it keeps running in the same event loop. A transaction which opens with
+    the write, or with a `SELECT ... FOR UPDATE`, then starts with `BEGIN IMMEDIATE`
+    and gets the SQLite write lock right away, instead of failing with
+    `database is locked` when a deferred transaction tries to upgrade its lock. A
+    writer which waited longer than the busy timeout goes ahead without the funnel and
+    falls back on the busy timeout of SQLite. Read transactions keep a plain deferred
+    `BEGIN` and never block on writers in WAL mode.
+    """
+
+    @classmethod
+    def apply(cls, provider: DatabaseProvider) -> bool:
+        """Switches a database provider to the profile, once, if it is backed by SQLite.
+
+        The provider's `NullPool` engine is replaced by a pooled one, so connections
+        keep their PRAGMAs, page cache and memory map between sessions. Calling it again
+        from a forked process drops the pooled connections inherited from the parent.
+
+        Args:
+            provider (DatabaseProvider): The database provider to configure.
+
+        Returns:
+            bool: True if the provider runs with the profile, False otherwise.
+        """
+        setting = Setting()
+        if (
+            not setting.SQLITE_PROFILE_ENABLED
+            or provider.engine.dialect.name != "sqlite"
+        ):
+            return False
+        profiled_pid = getattr(provider, PROFILED_PID_ATTR, None)
+        if profiled_pid is not None:
+            if profiled_pid != os.getpid():
+                provider.engine.sync_engine.dispose(close=False)
+                setattr(provider, PROFILED_PID_ATTR, os.getpid())
+            return True
+
+        engine = create_async_engine(
+            provider.engine.url,
+            echo=False,
+            pool_size=setting.SQLITE_POOL_SIZE,
+            max_overflow=setting.SQLITE_POOL_MAX_OVERFLOW,
+        )
+        sync_engine = engine.sync_engine
+        lock_path = (
+            cls.write_lock_path(engine.url) if setting.SQLITE_WRITE_FUNNEL else None
+        )
+
+        def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+            cls._on_connect(dbapi_connection, connection_record, lock_path)
+
+        event.listen(sync_engine, "connect", on_connect)
+        event.listen(sync_engine, "begin", cls._on_begin)
+        event.listen(sync_engine, "before_cursor_execute", cls._on_before_execute)
+        event.listen(sync_engine, "commit", cls._on_end)
+        event.listen(sync_engine, "rollback", cls._on_end)
+        # a connection returned mid-transaction must not keep the funnel
+        event.listen(sync_engine.pool, "checkin", cls._on_checkin)
+        event.listen(sync_engine.pool, "close", cls._on_close)
+        provider.engine = engine
+        provider.session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        setattr(provider, PROFILED_PID_ATTR, os.getpid())
+        LOGGER.info(f"sqlite profile applied to {engine.url}")
+        return True
+
+    @staticmethod
+    def pragmas() -> Dict[str, Any]:
+        """Returns the PRAGMAs executed on every new connection.
+
+        Returns:
+            Dict[str, Any]: PRAGMA values keyed by PRAGMA name.
+        """
+        setting = Setting()
+        return {
+            "journal_mode": setting.SQLITE_JOURNAL_MODE,
+            "synchronous": setting.SQLITE_SYNCHRONOUS,
+            "mmap_size": setting.SQLITE_MMAP_SIZE,
+            "cache_size": setting.SQLITE_CACHE_SIZE,
+            "busy_timeout": setting.SQLITE_BUSY_TIMEOUT,
+            "temp_store": setting.SQLITE_TEMP_STORE,
+        }
+
+    @staticmethod
+    def write_lock_path(url: URL) -> Optional[str]:
+        """Returns the lock file of the write funnel of a database.
+
+        Args:
+            url (URL): The URL of the SQLite database.
+
+        Returns:
+            Optional[str]: The lock file, None for an in-memory database.
+        """
+        if not url.database or url.database == ":memory:":
+            return None
+        return f"{url.database}{FUNNEL_LOCK_SUFFIX}"
+
+    @staticmethod
+    def begins_transaction(connection: Any) -> bool:
+        """Returns whether the profile begins the transaction of a connection, on its
+        next statement; the driver only begins one before a write otherwise.
+
+        Args:
+            connection (Any): A connection with a transaction begun, sync or async.
+
+        Returns:
+            bool: True if the transaction is begun by the profile, False otherwise.
+        """
+        return PENDING_BEGIN_KEY in connection.info
+
+    @staticmethod
+    def _on_connect(
+        dbapi_connection: Any, connection_record: Any, lock_path: Optional[str]
+    ) -> None:
+        # transactions are begun by the profile instead of the driver
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in SqliteProfile.pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+        if lock_path:
+            # a descriptor per connection, flock excludes the other connections of
+            # this process as well as the other processes
+            connection_record.info[FUNNEL_FD_KEY] = os.open(
+                lock_path, os.O_RDWR | os.O_CREAT, 0o644
+            )
+
+    @staticmethod
+    def _on_begin(conn: Connection) -> None:
+        conn.info[PENDING_BEGIN_KEY] = True
+
+    @staticmethod
+    def _on_before_execute(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        info = conn.info
+        is_begin = info.pop(PENDING_BEGIN_KEY, False)
+        funnel_fd = info.get(FUNNEL_FD_KEY)
+        # tried once per transaction, a writer which timed out goes on without it
+        needs_funnel = funnel_fd is not None and FUNNEL_HELD_KEY not in info
+        if not is_begin and not needs_funnel:
+            return
+        is_write = SqliteProfile._is_write(statement, context)
+        if needs_funnel and is_write:
+            info[FUNNEL_HELD_KEY] = SqliteProfile._acquire_funnel(funnel_fd)
+        if is_begin:
+            cursor.execute(
+                "BEGIN IMMEDIATE" if is_write and funnel_fd is not None else "BEGIN"
+            )
+
+    @staticmethod
+    def _is_write(statement: str, context: Any) -> bool:
+        compiled = getattr(context, "compiled", None)
+        # SQLite has no SELECT ... FOR UPDATE, so it is honoured as a write intent
+        if (
+            compiled is not None
+            and getattr(compiled.statement, "_for_update_arg", None) is not None
+        ):
+            return True
+        return statement.lstrip().upper().startswith(WRITE_STATEMENT_PREFIXES)
+
+    @staticmethod
+    def _acquire_funnel(funnel_fd: int) -> bool:
+        """Takes the write funnel, yielding to the event loop while another writer
+        holds it.
+
+        Returns:
+            bool: True if the funnel is held, False if the wait ran past the busy
+                timeout.
+        """
+        deadline = time.monotonic() + Setting().SQLITE_BUSY_TIMEOUT / 1000
+        delay = FUNNEL_MIN_DELAY
+        while True:
+            try:
+                fcntl.flock(funnel_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    LOGGER.warning("sqlite write funnel timed out, writing without it")
+                    return False
+            # the hooks run in the greenlet of an async session
+            await_only(asyncio.sleep(delay))
+            delay = min(delay * 2, FUNNEL_MAX_DELAY)
+
+    @staticmethod
+    def _release_funnel(info: Dict[str, Any]) -> None:
+        if info.pop(FUNNEL_HELD_KEY, False):
+            fcntl.flock(info[FUNNEL_FD_KEY], fcntl.LOCK_UN)
+
+    @staticmethod
+    def _on_end(conn: Connection) -> None:
+        conn.info.pop(PENDING_BEGIN_KEY, None)
+        # released just before the COMMIT, the next writer covers the overlap with
+        # the busy timeout
+        SqliteProfile._release_funnel(conn.info)
+
+    @staticmethod
+    def _on_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        SqliteProfile._release_funnel(connection_record.info)
+
+    @staticmethod
+    def _on_close(dbapi_connection: Any, connection_record: Any) -> None:
+        SqliteProfile._release_funnel(connection_record.info)
+        funnel_fd = connection_record.info.pop(FUNNEL_FD_KEY, None)
+        if funnel_fd is not None:
+            os.close(funnel_fd)
@@ -0,0 +1,61 @@
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CacheStats
+from fifi import singleton
+
+
+@singleton
+class StatementCacheStats:
+    """
+    Process-wide counters of SQLAlchemy's compiled statement cache.
+
+    Every statement executed by any engine of the process is classified from its
+    execution context: a hit reused an already compiled statement, a miss had to be
+    compiled, and uncached statements (DDL, raw driver SQL) have no cache key at all.
+
+    Attributes:
+        hits (int): Statements served from the compiled cache.
+        misses (int): Statements compiled because they were not cached yet.
+        uncached (int): Statements which can not be cached.
+    """
+
+    def __init__(self):
+        self.reset()
+        event.listen(Engine, "before_cursor_execute", self._on_execute)
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    @property
+    def hit_rate(self) -> float:
+        cached = self.hits + self.misses
+        return self.hits / cached if cached else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "hit_rate": self.hit_rate,
+        }
+
+    def _on_execute(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        cache_hit = getattr(context, "cache_hit", None)
+        if cache_hit is CacheStats.CACHE_HIT:
+            self.hits += 1
+        elif cache_hit is CacheStats.CACHE_MISS:
+            self.misses += 1
+        else:
+            self.uncached += 1
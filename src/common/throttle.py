@@ -0,0 +1,140 @@
+import multiprocessing
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from fifi import singleton
+
+from .settings import Setting
+
+# each bucket is a pair of cells: its tokens and the time they were counted at
+TOKENS = 0
+UPDATED_AT = 1
+BUCKET_SIZE = 2
+
+
+@singleton
+class OrderThrottle:
+    """
+    Token buckets limiting order entry and cancels per portfolio and in total.
+
+    An order takes one token from the global bucket and one from its portfolio's
+    bucket, or is refused with the seconds until both have a token again. Requests
+    naming only an order id, cancels and amends, can not be charged to a portfolio
+    before the order is read: they take a token from the smaller global cancel
+    bucket and one from the bucket of their client instead, so no client can spend
+    the order entry budget of everyone else by cancelling. Buckets refill at their
+    rate up to their burst size, and start full.
+
+    The buckets live in shared memory guarded by one lock, created at import with
+    `gunicorn --preload`, so every API worker draws from the same buckets.
+    Portfolios and clients are each hashed onto `ORDER_THROTTLE_SLOTS` buckets; keys
+    sharing a slot share a limit, which only errs on the strict side.
+
+    Attributes:
+        enabled (bool): Whether requests are throttled at all.
+        slots (int): The number of portfolio buckets, and of client buckets.
+    """
+
+    def __init__(self):
+        self.setting = Setting()
+        self.enabled = self.setting.ORDER_THROTTLE_ENABLED
+        self.slots = self.setting.ORDER_THROTTLE_SLOTS
+        self.global_slot = 2 * self.slots
+        self.cancel_slot = self.global_slot + 1
+        # the portfolio buckets, the client buckets, then the global order and cancel
+        # ones, zeroed cells read as full
+        self._buckets = multiprocessing.Array(
+            "d", BUCKET_SIZE * (2 * self.slots + 2), lock=False
+        )
+        self._counters = multiprocessing.Array("Q", 2, lock=False)
+        self._lock = multiprocessing.Lock()
+
+    def acquire(
+        self, portfolio_id: Optional[str] = None, client: Optional[str] = None
+    ) -> float:
+        """Takes a token for one request.
+
+        Args:
+            portfolio_id (Optional[str]): The portfolio of an order, `None` for a
+                request naming only an order id, e.g. a cancel.
+            client (Optional[str]): Who sent a request naming only an order id, e.g.
+                its IP address, `None` to only draw from the global cancel bucket.
+
+        Returns:
+            float: 0 if the request is admitted, otherwise the seconds to wait before
+                retrying.
+        """
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        setting = self.setting
+        if portfolio_id is not None:
+            buckets = [
+                (
+                    self.global_slot,
+                    setting.ORDER_THROTTLE_GLOBAL_RATE,
+                    setting.ORDER_THROTTLE_GLOBAL_BURST,
+                ),
+                (
+                    self._slot(portfolio_id),
+                    setting.ORDER_THROTTLE_PORTFOLIO_RATE,
+                    setting.ORDER_THROTTLE_PORTFOLIO_BURST,
+                ),
+            ]
+        else:
+            buckets = [
+                (
+                    self.cancel_slot,
+                    setting.ORDER_THROTTLE_CANCEL_RATE,
+                    setting.ORDER_THROTTLE_CANCEL_BURST,
+                )
+            ]
+            if client is not None:
+                buckets.append(
+                    (
+                        self.slots + self._slot(client),
+                        setting.ORDER_THROTTLE_CLIENT_RATE,
+                        setting.ORDER_THROTTLE_CLIENT_BURST,
+                    )
+                )
+        with self._lock:
+            wait = max(
+                self._wait(slot, rate, burst, now) for slot, rate, burst in buckets
+            )
+            if wait:
+                self._counters[1] += 1
+                return wait
+            for slot, _, _ in buckets:
+                self._buckets[BUCKET_SIZE * slot + TOKENS] -= 1
+            self._counters[0] += 1
+        return 0.0
+
+    def reset(self) -> None:
+        """Refills every bucket and zeroes the counters."""
+        with self._lock:
+            for i in range(len(self._buckets)):
+                self._buckets[i] = 0.0
+            self._counters[0] = self._counters[1] = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"admitted": self._counters[0], "throttled": self._counters[1]}
+
+    def _slot(self, key: str) -> int:
+        # crc32 rather than `hash`, which is salted differently in every process
+        return zlib.crc32(key.encode()) % self.slots
+
+    def _wait(self, slot: int, rate: float, burst: float, now: float) -> float:
+        """Refills a bucket up to `now` and returns the seconds until it holds a
+        token."""
+        base = BUCKET_SIZE * slot
+        updated_at = self._buckets[base + UPDATED_AT]
+        if updated_at:
+            tokens = min(
+                burst, self._buckets[base + TOKENS] + (now - updated_at) * rate
+            )
+        else:
+            tokens = burst
+        self._buckets[base + TOKENS] = tokens
+        self._buckets[base + UPDATED_AT] = now
+        return 0.0 if tokens >= 1 else (1 - tokens) / rate
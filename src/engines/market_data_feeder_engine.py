@@ -0,0 +1,57 @@
+import asyncio
+from typing import Dict, Tuple
+
+from fifi import MarketDataRepository, log_exception, singleton, BaseEngine
+from fifi.enums import Market
+from fifi.helpers.get_logger import LoggerFactory
+
+from ..common.settings import Setting
+from ..repository.last_trade_board_repository import LastTradeBoardRepository
+
+
+LOGGER = LoggerFactory().get(__name__)
+
+
+@singleton
+class MarketDataFeederEngine(BaseEngine):
+    """
+    Single process copying the last trade of every active market from the market
+    monitoring data onto the shared last trade board.
+
+    The board is created when the feeder is constructed, so the engines and API
+    workers constructed after it can attach to the board before the feeder starts.
+    """
+
+    name: str = "market_data_feeder_engine"
+    md_repos: Dict[Market, MarketDataRepository]
+
+    def __init__(self):
+        self.setting = Setting()
+        super().__init__(run_in_process=True)
+        self.board = LastTradeBoardRepository(create=True)
+        self.md_repos = dict()
+        self.last_fed: Dict[Market, Tuple[float, float]] = dict()
+
+    async def prepare(self):
+        for market in self.setting.ACTIVE_MARKETS:
+            self.md_repos[market] = MarketDataRepository(market=market, interval="1m")
+
+    async def postpare(self):
+        for market, repo in self.md_repos.items():
+            repo.close()
+        self.board.close()
+
+    @log_exception()
+    async def execute(self):
+        LOGGER.info(f"{self.name} processing is started....")
+        while True:
+            self.feed()
+            await asyncio.sleep(self.setting.LAST_TRADE_BOARD_FEED_INTERVAL)
+
+    def feed(self) -> None:
+        """Writes the markets whose last trade or time changed since the last feed."""
+        for market, repo in self.md_repos.items():
+            tick = (float(repo.get_last_trade()), float(repo.get_time()))
+            if self.last_fed.get(market) != tick:
+                self.board.write(market=market, last_trade=tick[0], time=tick[1])
+                self.last_fed[market] = tick
@@ -1,15 +1,30 @@
 from typing import Dict, List
 
-from fifi import MarketDataRepository, log_exception, singleton, BaseEngine
+from fifi import (
+    DatabaseProvider,
+    MarketDataRepository,
+    log_exception,
+    singleton,
+    BaseEngine,
+)
 from fifi.enums import Market, PositionStatus, OrderSide, OrderStatus, OrderType
 from fifi.helpers.get_logger import LoggerFactory
 
-from ..common.exceptions import InvalidOrder, NotEnoughBalance, NotFoundOrder
+from ..common.exceptions import (
+    InvalidOrder,
+    NotEnoughBalance,
+    NotFoundOrder,
+    VersionConflict,
+)
 from ..schemas.order_schema import OrderSchema
 from ..helpers.order_helper import OrderHelper
 from ..helpers.position_helpers import PositionHelpers
 from ..models.order import Order
+from ..common.market_snapshot import MarketDataSnapshot
+from ..common.market_specs import MarketSpecRegistry
 from ..common.settings import Setting
+from ..common.sqlite_profile import SqliteProfile
+from ..journal import EventJournal, JournalEventType
 from ..services import *
 from ..repository import *
 
@@ -24,54 +39,101 @@ class MatchingEngine(BaseEngine):
     md_repos: Dict[Market, MarketDataRepository]
 
     def __init__(self):
-        super().__init__(run_in_process=True)
         self.settings = Setting()
+        # the in-memory ledger and storage are only authoritative inside one process
+        super().__init__(
+            run_in_process=not (
+                self.settings.BALANCE_LEDGER_ENABLED
+                or self.settings.IN_MEMORY_STORAGE_ENABLED
+            )
+        )
         self.portfolio_service = PortfolioService()
         self.balance_service = BalanceService()
         self.order_service = OrderService()
         self.position_service = PositionService()
         self.leverage_service = LeverageService()
+        self.journal = EventJournal()
+        self.market_specs = MarketSpecRegistry()
+        # orders created or canceled, for a replay to notice new work
+        self.order_entries = 0
         self.md_repos = dict()
+        self.md_board = None
+        self.replay = None
+        if self.settings.REPLAY_ENABLED:
+            self.replay = ReplayMarketDataRepository()
+        elif self.settings.LAST_TRADE_BOARD_ENABLED:
+            # attached on first read, the feeder may not have created it yet
+            self.md_board = LastTradeBoardReader()
         for market in self.settings.ACTIVE_MARKETS:
-            self.md_repos[market] = MarketDataRepository(market=market, interval="1m")
+            if self.replay:
+                self.md_repos[market] = self.replay.market_view(market)
+            elif self.md_board:
+                self.md_repos[market] = self.md_board.market_view(market)
+            else:
+                self.md_repos[market] = MarketDataRepository(
+                    market=market, interval="1m"
+                )
+        self.market_snapshot = MarketDataSnapshot(self.md_repos)
 
     async def prepare(self):
-        pass
+        SqliteProfile.apply(DatabaseProvider())
 
     async def postpare(self):
         for market, repo in self.md_repos.items():
             repo.close()
+        if self.md_board:
+            self.md_board.close()
 
     @log_exception()
     async def execute(self):
         LOGGER.info(f"{self.name} processing is started....")
         while True:
-            # get open orders from db
-            open_orders = await self.order_service.get_open_orders()
+            await self.run_once()
 
-            # check open orders not empty
-            if not open_orders:
-                continue
+    async def run_once(self) -> List[Order]:
+        """Matches the open orders once against the current market data.
+
+        Returns:
+            List[Order]: The open orders of the pass.
+        """
+        # get open orders from db
+        open_orders = await self.order_service.get_open_orders()
 
-            await self.match_open_orders(open_orders=open_orders)
+        # check open orders not empty
+        if not open_orders:
+            return open_orders
+
+        await self.match_open_orders(open_orders=open_orders)
+        return open_orders
 
     async def match_open_orders(self, open_orders: List[Order]):
+        self.market_snapshot.refresh()
         for order in open_orders:
             if order.type == OrderType.MARKET:
                 continue
+            elif not self.market_snapshot.is_fresh(order.market):
+                continue
             elif (
                 order.side == OrderSide.BUY
-                and order.price >= self.md_repos[order.market].get_last_trade()
+                and order.price >= self.market_snapshot.last_trade(order.market)
             ):
-                await self.fill_order(order)
+                await self.try_fill_order(order)
             elif (
                 order.side == OrderSide.SELL
-                and order.price <= self.md_repos[order.market].get_last_trade()
+                and order.price <= self.market_snapshot.last_trade(order.market)
             ):
-                await self.fill_order(order)
+                await self.try_fill_order(order)
             else:
                 continue
 
+    async def try_fill_order(self, order: Order) -> None:
+        try:
+            await self.fill_order(order)
+        except VersionConflict as ex:
+            # not written as filled, the next pass reads it again and retries the fill
+            order.status = OrderStatus.ACTIVE
+            LOGGER.warning(f"leaving {order.id=} for the next pass: {ex}")
+
     async def cancel_order(self, order_id: str) -> Order:
         order = await self.order_service.read_by_id(id_=order_id)
         if not order:
@@ -83,7 +145,7 @@ class MatchingEngine(BaseEngine):
 
         is_close_order = False
         leverage = 1
-        if order.market.is_perptual():
+        if self.market_specs.get(order.market).is_perpetual:
             is_close_order = await self.perpetual_open_position_check(
                 market=order.market,
                 portfolio_id=order.portfolio_id,
@@ -114,6 +176,8 @@ class MatchingEngine(BaseEngine):
             )
 
         await self.order_service.update_entity(order)
+        self.order_entries += 1
+        self.journal.record(JournalEventType.ORDER_CANCELED, order)
         return order
 
     async def fill_order(self, order: Order) -> Order:
@@ -125,7 +189,7 @@ class MatchingEngine(BaseEngine):
         recieved_asset = OrderHelper.get_recieved_asset(
             market=order.market, side=order.side
         )
-        if not order.market.is_perptual():
+        if not self.market_specs.get(order.market).is_perpetual:
             payment_asset = OrderHelper.get_payment_asset(
                 market=order.market, side=order.side
             )
@@ -161,6 +225,7 @@ class MatchingEngine(BaseEngine):
             paid_qty=order.fee,
         )
         await self.order_service.update_entity(order)
+        self.journal.record(JournalEventType.ORDER_FILLED, order)
         return order
 
     async def perpetual_open_position_check(
@@ -187,6 +252,19 @@ class MatchingEngine(BaseEngine):
                     raise InvalidOrder(er_msg)
         return False
 
+    def validate_order_steps(
+        self, market: Market, price: float, size: float, order_type: OrderType
+    ) -> None:
+        spec = self.market_specs.get(market)
+        if not self.market_specs.is_active(market):
+            raise InvalidOrder(f"{market=} is not active")
+        if size <= 0 or not spec.is_on_lot(size):
+            raise InvalidOrder(f"{size=} is not a multiple of {spec.lot_size=}")
+        if order_type == OrderType.LIMIT and (
+            price <= 0 or not spec.is_on_tick(price)
+        ):
+            raise InvalidOrder(f"{price=} is not a multiple of {spec.tick_size=}")
+
     async def create_order(
         self,
         market: Market,
@@ -196,7 +274,13 @@ class MatchingEngine(BaseEngine):
         side: OrderSide,
         order_type: OrderType,
     ) -> Order:
-        portfolio = await self.portfolio_service.read_by_id(id_=portfolio_id)
+        spec = self.market_specs.get(market)
+        if self.settings.ORDER_STEP_VALIDATION_ENABLED:
+            self.validate_order_steps(
+                market=market, price=price, size=size, order_type=order_type
+            )
+
+        portfolio = await self.portfolio_service.read_fee_schedule(portfolio_id)
         if not portfolio:
             LOGGER.error(f"{portfolio_id=} is invalid")
             raise InvalidOrder(f"{portfolio_id=} is invalid")
@@ -213,12 +297,15 @@ class MatchingEngine(BaseEngine):
 
         # fill market order with incoming price
         if order_type == OrderType.MARKET:
-            order_schema.price = self.md_repos[market].get_last_trade()
+            self.market_snapshot.refresh_market(market)
+            if not self.market_snapshot.is_fresh(market):
+                raise InvalidOrder(f"{market=} data is stale, market orders are paused")
+            order_schema.price = self.market_snapshot.last_trade(market)
 
         payment_asset = OrderHelper.get_payment_asset(market=market, side=side)
         checked_open_position = False
         leverage = 1
-        if market.is_perptual():
+        if spec.is_perpetual:
             leverage = (
                 await self.leverage_service.get_portfolio_market_leverage_value(
                     portfolio_id=order_schema.portfolio_id, market=order_schema.market
@@ -273,6 +360,8 @@ class MatchingEngine(BaseEngine):
             raise InvalidOrder(
                 f"There is Problem with creating new order {order_schema.model_dump()}"
             )
+        self.order_entries += 1
+        self.journal.record(JournalEventType.ORDER_ACCEPTED, order)
 
         if order.type == OrderType.MARKET:
             return await self.fill_order(order)
@@ -1,15 +1,26 @@
 from typing import Dict
-from fifi import MarketDataRepository, log_exception, singleton, BaseEngine
-from fifi.helpers.get_current_time import GetCurrentTime
+from fifi import (
+    DatabaseProvider,
+    MarketDataRepository,
+    log_exception,
+    singleton,
+    BaseEngine,
+)
 from fifi.enums import Asset, Market, PositionSide, PositionStatus
 from fifi.helpers.get_logger import LoggerFactory
 
+from ..common.exceptions import VersionConflict
 from ..helpers.position_helpers import PositionHelpers
 from ..models.order import Order
 from ..models.position import Position
 from ..schemas.position_schema import PositionSchema
 from ..services.leverage_service import LeverageService
+from ..common.clock import SimulationClock
+from ..common.market_snapshot import MarketDataSnapshot
 from ..common.settings import Setting
+from ..common.sqlite_profile import SqliteProfile
+from ..journal import EventJournal, JournalEventType
+from ..repository import LastTradeBoardReader, ReplayMarketDataRepository
 from ..services import (
     OrderService,
     BalanceService,
@@ -26,62 +37,135 @@ class PositionsOrchestrationEngine(BaseEngine):
     md_repos: Dict[Market, MarketDataRepository]
 
     def __init__(self):
-        super().__init__(run_in_process=True)
         self.setting = Setting()
+        # the in-memory ledger and storage are only authoritative inside one process
+        super().__init__(
+            run_in_process=not (
+                self.setting.BALANCE_LEDGER_ENABLED
+                or self.setting.IN_MEMORY_STORAGE_ENABLED
+            )
+        )
         self.order_service = OrderService()
         self.balance_service = BalanceService()
         self.position_service = PositionService()
         self.leverage_service = LeverageService()
+        self.journal = EventJournal()
         self.processed_orders = set()
+        self.last_update = SimulationClock().now()
         self.md_repos = dict()
+        self.md_board = None
+        self.replay = None
+        if self.setting.REPLAY_ENABLED:
+            self.replay = ReplayMarketDataRepository()
+        elif self.setting.LAST_TRADE_BOARD_ENABLED:
+            # attached on first read, the feeder may not have created it yet
+            self.md_board = LastTradeBoardReader()
         for market in self.setting.ACTIVE_MARKETS:
-            self.md_repos[market] = MarketDataRepository(market, "1m")
+            if self.replay:
+                self.md_repos[market] = self.replay.market_view(market)
+            elif self.md_board:
+                self.md_repos[market] = self.md_board.market_view(market)
+            else:
+                self.md_repos[market] = MarketDataRepository(market, "1m")
+        self.market_snapshot = MarketDataSnapshot(self.md_repos)
 
     async def prepare(self):
-        pass
+        SqliteProfile.apply(DatabaseProvider())
+        if self.journal.enabled:
+            await self.recover_pending_perp_fills()
 
     async def postpare(self):
         for market, repo in self.md_repos.items():
             repo.close()
+        if self.md_board:
+            self.md_board.close()
 
     @log_exception()
     async def execute(self):
         LOGGER.info(f"{self.name} processing is started....")
-        last_update = GetCurrentTime().get()
+        self.last_update = SimulationClock().now()
         while True:
-            check_time = GetCurrentTime().get()
-            filled_perp_orders = await self.order_service.get_filled_perp_orders(
-                from_update_time=last_update
-            )
-            if len(filled_perp_orders) > 0:
-                last_update = check_time
-                LOGGER.info("new filled orders are arrived...")
-
-            open_positions = await self.position_service.get_open_positions_hashmap()
-
-            LOGGER.debug(f"{len(filled_perp_orders)=}, {len(open_positions)=}")
-            for order in filled_perp_orders:
-                if order.id not in self.processed_orders:
-                    position_key = f"{order.market}_{order.portfolio_id}"
-                    if position_key in open_positions:
-                        await self.apply_order_to_position(
-                            order=order, position=open_positions[position_key]
-                        )
-                    else:
-                        await self.create_position_by_order(order=order)
-                    self.processed_orders.add(order.id)
-
-            for key, position in open_positions.items():
-                market_last_trade = self.md_repos[position.market].get_last_trade()
-                if position.side == PositionSide.LONG:
-                    if position.lqd_price < market_last_trade:
-                        continue
-
-                if position.side == PositionSide.SHORT:
-                    if position.lqd_price > market_last_trade:
-                        continue
+            await self.run_once()
+
+    async def run_once(self) -> None:
+        """Turns the perpetual fills since the previous pass into positions, then
+        liquidates the open positions reached by the current market data."""
+        check_time = SimulationClock().now()
+        filled_perp_orders = await self.order_service.get_filled_perp_orders(
+            from_update_time=self.last_update
+        )
+        if len(filled_perp_orders) > 0:
+            self.last_update = check_time
+            LOGGER.info("new filled orders are arrived...")
+
+        open_positions = await self.position_service.get_open_positions_hashmap()
+
+        LOGGER.debug(f"{len(filled_perp_orders)=}, {len(open_positions)=}")
+        for order in filled_perp_orders:
+            try:
+                await self.process_filled_order(
+                    order=order, open_positions=open_positions
+                )
+            except VersionConflict as ex:
+                # read again by the next pass, the processed orders are skipped there
+                self.last_update = min(self.last_update, order.updated_at)
+                LOGGER.warning(f"leaving {order.id=} for the next pass: {ex}")
 
+        self.market_snapshot.refresh()
+        for key, position in open_positions.items():
+            if not self.market_snapshot.is_fresh(position.market):
+                continue
+            market_last_trade = self.market_snapshot.last_trade(position.market)
+            if position.side == PositionSide.LONG:
+                if position.lqd_price < market_last_trade:
+                    continue
+
+            if position.side == PositionSide.SHORT:
+                if position.lqd_price > market_last_trade:
+                    continue
+
+            try:
                 await self.liquid_position(position=position)
+            except VersionConflict as ex:
+                # still open, the next pass reads it again
+                LOGGER.warning(f"leaving {position.id=} for the next pass: {ex}")
+
+    async def process_filled_order(
+        self, order: Order, open_positions: Dict[str, Position]
+    ) -> None:
+        """Applies a filled perpetual order to its position unless it is already processed.
+
+        Args:
+            order (Order): The filled perpetual order.
+            open_positions (Dict[str, Position]): Open positions keyed by "{market}_{portfolio_id}".
+        """
+        if order.id in self.processed_orders:
+            return
+        position_key = f"{order.market}_{order.portfolio_id}"
+        if position_key in open_positions:
+            await self.apply_order_to_position(
+                order=order, position=open_positions[position_key]
+            )
+        else:
+            await self.create_position_by_order(order=order)
+        self.processed_orders.add(order.id)
+
+    async def recover_pending_perp_fills(self) -> None:
+        """Applies the perpetual fills which the journal shows were never turned into
+        positions, e.g. because the engine crashed between the fill and its position."""
+        state, _ = self.journal.recover()
+        if not state.pending_perp_fills:
+            return
+        LOGGER.info(f"recovering {len(state.pending_perp_fills)} pending perp fills")
+        orders = await self.order_service.read_many_by_ids(
+            ids=list(state.pending_perp_fills.keys())
+        )
+        open_positions = await self.position_service.get_open_positions_hashmap()
+        for order in orders:
+            if order.position_id:
+                # applied already, only the journal event was lost
+                continue
+            await self.process_filled_order(order=order, open_positions=open_positions)
 
     async def apply_order_to_position(self, order: Order, position: Position) -> None:
         """Applies an order to an existing position, either merging or closing it.
@@ -108,23 +192,29 @@ class PositionsOrchestrationEngine(BaseEngine):
         LOGGER.info(
             f"merging order with id: {order.id} into position with id: {position.id}"
         )
-        position.entry_price = PositionHelpers.weighted_average_entry_price(
-            position=position, order=order
-        )
-        position.lqd_price = PositionHelpers.lqd_price_calc(
-            entry_price=position.entry_price,
-            leverage=position.leverage,
-            side=position.side,
-        )
-        position.size += order.size
-        position.margin = PositionHelpers.margin_calc(
-            size=position.size, leverage=position.leverage, price=position.entry_price
-        )
+
+        def merge(position: Position) -> None:
+            position.entry_price = PositionHelpers.weighted_average_entry_price(
+                position=position, order=order
+            )
+            position.lqd_price = PositionHelpers.lqd_price_calc(
+                entry_price=position.entry_price,
+                leverage=position.leverage,
+                side=position.side,
+            )
+            position.size += order.size
+            position.margin = PositionHelpers.margin_calc(
+                size=position.size,
+                leverage=position.leverage,
+                price=position.entry_price,
+            )
+
+        position = await self.position_service.apply_mutation(position, merge)
         LOGGER.debug(
             f"order:{order.to_dict()} is merged with position: {position.to_dict()}"
         )
-        await self.position_service.update_entity(position)
         await self.order_service.set_position_id(order, position.id)
+        self.journal.record(JournalEventType.POSITION_MERGED, position, order.id)
 
     async def close_partially_position(self, order: Order, position: Position) -> None:
         """Closes a position partially based on the order size.
@@ -136,29 +226,40 @@ class PositionsOrchestrationEngine(BaseEngine):
         LOGGER.info(
             f"closing partially position with id: {position.id} by order with id: {order.id}"
         )
-        position.close_price = order.price
-        position.pnl += PositionHelpers.pnl_value(
-            entry_price=position.entry_price,
-            close_price=order.price,
-            size=order.size,
-            side=position.side,
+        released_margin = 0.0
+
+        def close_partially(position: Position) -> None:
+            nonlocal released_margin
+            position.close_price = order.price
+            position.pnl += PositionHelpers.pnl_value(
+                entry_price=position.entry_price,
+                close_price=order.price,
+                size=order.size,
+                side=position.side,
+            )
+            last_position_margin = position.margin
+            position.closed_size += order.size
+            position.margin = PositionHelpers.margin_calc(
+                size=position.size - position.closed_size,
+                leverage=position.leverage,
+                price=position.entry_price,
+            )
+            released_margin = last_position_margin - position.margin
+
+        # the position is written first so its balance effects are only applied once;
+        # a retry needs a copy the order still closes only partially
+        position = await self.position_service.apply_mutation(
+            position,
+            close_partially,
+            is_applicable=lambda fresh: order.size < fresh.size,
         )
+        LOGGER.debug(f"{position.id=} released {released_margin=}")
 
         # unlock margin
-        last_position_margin = position.margin
-        position.closed_size += order.size
-        position.margin = PositionHelpers.margin_calc(
-            size=position.size - position.closed_size,
-            leverage=position.leverage,
-            price=position.entry_price,
-        )
-        LOGGER.debug(
-            f"{position.id=} margin was {last_position_margin=} and it's now {position.margin=}"
-        )
         is_unlocked = await self.balance_service.unlock_balance(
             portfolio_id=position.portfolio_id,
             asset=Asset.USD,
-            unlocked_qty=last_position_margin - position.margin,
+            unlocked_qty=released_margin,
         )
 
         # add pnl value
@@ -169,8 +270,10 @@ class PositionsOrchestrationEngine(BaseEngine):
             LOGGER.debug(
                 f"closing partially position: {position.to_dict()} by order: {order.to_dict()}"
             )
-            await self.position_service.update_entity(position)
             await self.order_service.set_position_id(order, position.id)
+            self.journal.record(
+                JournalEventType.POSITION_PARTIALLY_CLOSED, position, order.id
+            )
 
     async def close_position(self, order: Order, position: Position) -> None:
         """Fully closes a position based on the order.
@@ -182,15 +285,20 @@ class PositionsOrchestrationEngine(BaseEngine):
         LOGGER.info(
             f"closing position with id: {position.id} by order with id: {order.id}"
         )
-        position.close_price = order.price
-        position.pnl += PositionHelpers.pnl_value(
-            entry_price=position.entry_price,
-            close_price=order.price,
-            size=order.size,
-            side=position.side,
-        )
-        position.status = PositionStatus.CLOSE
-        position.closed_size = position.size
+
+        def close(position: Position) -> None:
+            position.close_price = order.price
+            position.pnl += PositionHelpers.pnl_value(
+                entry_price=position.entry_price,
+                close_price=order.price,
+                size=order.size,
+                side=position.side,
+            )
+            position.status = PositionStatus.CLOSE
+            position.closed_size = position.size
+
+        # the position is written first so its balance effects are only applied once
+        position = await self.position_service.apply_mutation(position, close)
 
         # unlock margin
         is_unlocked = await self.balance_service.unlock_balance(
@@ -207,8 +315,8 @@ class PositionsOrchestrationEngine(BaseEngine):
             LOGGER.debug(
                 f"closing partially position: {position.to_dict()} by order: {order.to_dict()}"
             )
-            await self.position_service.update_entity(position)
             await self.order_service.set_position_id(order, position.id)
+            self.journal.record(JournalEventType.POSITION_CLOSED, position, order.id)
 
     async def create_position_by_order(self, order: Order) -> Position:
         """Creates a new trading position from a given order.
@@ -247,6 +355,7 @@ class PositionsOrchestrationEngine(BaseEngine):
             f"created new position:{position.to_dict()} by order:{order.to_dict()}"
         )
         await self.order_service.set_position_id(order, position.id)
+        self.journal.record(JournalEventType.POSITION_OPENED, position, order.id)
         return position
 
     async def liquid_position(self, position: Position) -> None:
@@ -256,12 +365,17 @@ class PositionsOrchestrationEngine(BaseEngine):
             position (Position): The position to liquidate.
         """
         LOGGER.info(f"liquiding a position by id:{position.id}")
+
+        def liquidate(position: Position) -> None:
+            position.pnl = (-1) * position.margin
+            position.status = PositionStatus.LIQUID
+
+        # the position is written first so its margin is only burned once
+        position = await self.position_service.apply_mutation(position, liquidate)
         is_sucessful = await self.balance_service.burn_balance(
             portfolio_id=position.portfolio_id,
             asset=Asset.USD,
             burned_qty=position.margin,
         )
         if is_sucessful:
-            position.pnl = (-1) * position.margin
-            position.status = PositionStatus.LIQUID
-            await self.position_service.update_entity(position)
+            self.journal.record(JournalEventType.POSITION_LIQUIDATED, position)
@@ -0,0 +1,158 @@
+import asyncio
+import time
+from typing import Dict, List, NamedTuple
+
+from fifi import DatabaseProvider, log_exception, singleton, BaseEngine
+from fifi.enums import Market, OrderSide, OrderType, PositionSide
+from fifi.helpers.get_logger import LoggerFactory
+
+from ..common.clock import SimulationClock
+from ..common.sqlite_profile import SqliteProfile
+from ..models import Order, Position
+from ..repository.replay_market_data_repository import (
+    ReplayMarketDataRepository,
+    ReplayTrigger,
+)
+from .matching_engine import MatchingEngine
+from .positions_orchestration_engine import PositionsOrchestrationEngine
+
+LOGGER = LoggerFactory().get(__name__)
+
+
+class ReplaySummary(NamedTuple):
+    """The outcome of a replay: ticks replayed and engine passes run, the replayed
+    span in epoch seconds and the wall time in seconds it took."""
+
+    ticks: int
+    passes: int
+    started_at: float
+    ended_at: float
+    elapsed: float
+
+
+@singleton
+class ReplayEngine(BaseEngine):
+    """
+    Drives the matching and positions engines through recorded market data instead
+    of letting them poll live prices, for backtests.
+
+    The engines are not started: the replay publishes ticks on
+    `ReplayMarketDataRepository` and runs one pass of each engine whenever a tick can
+    matter. After every pass it collects the prices at which the open limit orders
+    would fill and the open positions would be liquidated, and jumps straight to the
+    next tick reaching one of them, so ticks nothing reacts to cost a vectorized scan
+    rather than a pass. Orders created or canceled meanwhile, e.g. through the API,
+    make the replay run a pass on the very next tick instead.
+
+    Creating the replay installs its clock as the simulation clock, so the orders,
+    positions and balances are stamped with the replayed time, which jumps from one
+    replayed tick to the next rather than passing.
+
+    The replay runs in a thread of the API process, so the API keeps serving the
+    engines' state while it runs, as fast as the passes allow.
+
+    Attributes:
+        replay (ReplayMarketDataRepository): The recorded market data.
+        passes (int): Engine passes run by the replay.
+    """
+
+    name: str = "replay_engine"
+
+    def __init__(self):
+        super().__init__(run_in_process=False)
+        self.replay = ReplayMarketDataRepository()
+        # everything stamped from now on, orders placed before the first tick
+        # included, happens in replayed time
+        SimulationClock().use(self.replay.clock)
+        self.matching_engine = MatchingEngine()
+        self.positions_engine = PositionsOrchestrationEngine()
+        self.positions_engine.last_update = SimulationClock().now()
+        self.passes = 0
+        self._planned_entries = -1
+        self._triggers: Dict[Market, ReplayTrigger] = dict()
+
+    async def prepare(self):
+        SqliteProfile.apply(DatabaseProvider())
+
+    async def postpare(self):
+        pass
+
+    @log_exception()
+    async def execute(self):
+        LOGGER.info(f"{self.name} processing is started....")
+        summary = await self.run()
+        LOGGER.info(f"replay finished: {summary}")
+
+    async def run(self) -> ReplaySummary:
+        """Replays every remaining tick.
+
+        Returns:
+            ReplaySummary: The replayed ticks, the engine passes run, the replayed
+                time span and the wall time it took.
+        """
+        replay = self.replay
+        started = time.perf_counter()
+        first_tick = replay.cursor
+        started_at = replay.now if replay.exhausted else float(replay.times[first_tick])
+        while not replay.exhausted:
+            if self.matching_engine.order_entries != self._planned_entries:
+                index = replay.cursor
+            else:
+                index = replay.next_trigger(self._triggers)
+                if index is None:
+                    replay.advance_to(len(replay.times) - 1)
+                    break
+            replay.advance_to(index)
+            await self.run_passes()
+            # lets the API serve requests between passes
+            await asyncio.sleep(0)
+        return ReplaySummary(
+            ticks=replay.cursor - first_tick,
+            passes=self.passes,
+            started_at=started_at,
+            ended_at=replay.now,
+            elapsed=time.perf_counter() - started,
+        )
+
+    async def run_passes(self) -> None:
+        """Runs one pass of each engine on the current tick and plans the next."""
+        entries = self.matching_engine.order_entries
+        await self.matching_engine.run_once()
+        await self.positions_engine.run_once()
+        self.passes += 1
+        self._triggers = self.triggers(
+            open_orders=await self.matching_engine.order_service.get_open_orders(),
+            open_positions=(
+                await self.positions_engine.position_service.get_open_positions()
+            ),
+        )
+        self._planned_entries = entries
+
+    @staticmethod
+    def triggers(
+        open_orders: List[Order], open_positions: List[Position]
+    ) -> Dict[Market, ReplayTrigger]:
+        """Collects the prices of every market at which an engine pass would fill an
+        open limit order or liquidate an open position."""
+        triggers: Dict[Market, ReplayTrigger] = dict()
+
+        def widen(market: Market, low: float = None, high: float = None) -> None:
+            trigger = triggers.get(market, ReplayTrigger())
+            triggers[market] = ReplayTrigger(
+                low=trigger.low if low is None else max(trigger.low, low),
+                high=trigger.high if high is None else min(trigger.high, high),
+            )
+
+        for order in open_orders:
+            if order.type != OrderType.LIMIT:
+                continue
+            if order.side == OrderSide.BUY:
+                widen(order.market, low=order.price)
+            else:
+                widen(order.market, high=order.price)
+        for position in open_positions:
+            if position.side == PositionSide.LONG:
+                widen(position.market, low=position.lqd_price)
+            else:
+                widen(position.market, high=position.lqd_price)
+        return triggers
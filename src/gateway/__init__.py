@@ -0,0 +1,5 @@
+__all__ = ["OrderGateway", "OrderGatewayClient", "ExecutionReport", "ProtocolError"]
+
+from .client import OrderGatewayClient
+from .order_gateway import OrderGateway
+from .protocol import ExecutionReport, ProtocolError
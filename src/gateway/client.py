@@ -0,0 +1,140 @@
+import asyncio
+import itertools
+from typing import Dict, Optional
+
+from fifi.enums import Market, OrderSide, OrderType
+
+from ..common.exceptions import InvalidOrder
+from .protocol import (
+    AmendOrder,
+    CancelOrder,
+    ExecutionReport,
+    Message,
+    NewOrder,
+    ProtocolError,
+    Reject,
+    UNSOLICITED_REQUEST_ID,
+    pack_frame,
+    read_frame,
+)
+
+# request ids are unsigned 32 bit integers on the wire
+MAX_REQUEST_ID = 2**32 - 1
+
+
+class OrderGatewayClient:
+    """
+    Client of one order gateway session.
+
+    Requests are written as soon as they are made, without waiting for the previous
+    responses, and a background task hands every response to the request with the
+    same id. Rejected requests raise `InvalidOrder`, like the order router answers
+    them with a 400. The execution reports the gateway pushes on its own, when a
+    resting order of the session is filled or canceled, are put on `reports`.
+
+    Usage:
+        client = await OrderGatewayClient.connect(host="127.0.0.1", port=1890)
+        report = await client.new_order(
+            portfolio_id, Market.BTCUSD, OrderSide.BUY, OrderType.LIMIT, 100.0, 0.01
+        )
+        await client.close()
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self._request_ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = dict()
+        self.reports: asyncio.Queue[ExecutionReport] = asyncio.Queue()
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(
+        cls,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        unix_path: Optional[str] = None,
+    ) -> "OrderGatewayClient":
+        """Opens a session on a TCP address, or on a Unix socket if `unix_path` is
+        given."""
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(path=unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host=host, port=port)
+        return cls(reader=reader, writer=writer)
+
+    async def close(self) -> None:
+        self._receiver.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._fail_pending(ConnectionError("order gateway session closed"))
+
+    def submit(self, message: Message) -> asyncio.Future:
+        """Sends a request without waiting for its response.
+
+        Args:
+            message (Message): A new order, cancel or amend request.
+
+        Returns:
+            asyncio.Future: Resolves to the `ExecutionReport` of the request.
+        """
+        # the unsolicited request id is never used by a request
+        request_id = (next(self._request_ids) - 1) % MAX_REQUEST_ID + 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.writer.write(pack_frame(request_id, message))
+        return future
+
+    async def new_order(
+        self,
+        portfolio_id: str,
+        market: Market,
+        side: OrderSide,
+        order_type: OrderType,
+        price: float,
+        size: float,
+    ) -> ExecutionReport:
+        return await self.submit(
+            NewOrder(
+                portfolio_id=portfolio_id,
+                market=market,
+                side=side,
+                type=order_type,
+                price=price,
+                size=size,
+            )
+        )
+
+    async def cancel_order(self, order_id: str) -> ExecutionReport:
+        return await self.submit(CancelOrder(order_id=order_id))
+
+    async def amend_order(
+        self, order_id: str, price: float, size: float
+    ) -> ExecutionReport:
+        return await self.submit(AmendOrder(order_id=order_id, price=price, size=size))
+
+    async def _receive(self) -> None:
+        try:
+            while True:
+                request_id, message = await read_frame(self.reader)
+                if request_id == UNSOLICITED_REQUEST_ID:
+                    self.reports.put_nowait(message)
+                    continue
+                future = self._pending.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if isinstance(message, Reject):
+                    future.set_exception(InvalidOrder(message.reason))
+                else:
+                    future.set_result(message)
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError) as ex:
+            self._fail_pending(ConnectionError(f"order gateway session lost: {ex}"))
+
+    def _fail_pending(self, ex: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ex)
+        self._pending.clear()
@@ -0,0 +1,269 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+from fifi import singleton
+from fifi.enums import Market, OrderSide, OrderStatus, OrderType
+from fifi.helpers.get_logger import LoggerFactory
+
+from ..common.exceptions import InvalidOrder
+from ..common.settings import Setting
+from ..common.throttle import OrderThrottle
+from ..engines.matching_engine import MatchingEngine
+from ..journal import PushStream
+from ..journal.push_stream import ORDERS, Subscription
+from ..models import Order
+from .protocol import (
+    AmendOrder,
+    CancelOrder,
+    ExecutionReport,
+    Message,
+    NewOrder,
+    ProtocolError,
+    Reject,
+    UNSOLICITED_REQUEST_ID,
+    pack_frame,
+    read_frame,
+)
+
+LOGGER = LoggerFactory().get(__name__)
+
+
+def execution_report(order: Order) -> ExecutionReport:
+    return ExecutionReport(
+        order_id=order.id,
+        portfolio_id=order.portfolio_id,
+        market=order.market,
+        side=order.side,
+        type=order.type,
+        status=order.status,
+        price=order.price,
+        size=order.size,
+        fee=order.fee,
+        position_id=order.position_id,
+    )
+
+
+def execution_report_of(data: Dict[str, Any]) -> ExecutionReport:
+    """Builds the execution report of an order published on the push stream."""
+    return ExecutionReport(
+        order_id=data["id"],
+        portfolio_id=data["portfolio_id"],
+        market=Market(data["market"]),
+        side=OrderSide(data["side"]),
+        type=OrderType(data["type"]),
+        status=OrderStatus(data["status"]),
+        price=data["price"],
+        size=data["size"],
+        fee=data["fee"],
+        position_id=data.get("position_id"),
+    )
+
+
+class SessionReports:
+    """
+    Pushes unsolicited execution reports of the resting orders of one session.
+
+    Every order the session placed and left active is followed through the
+    `orders` channel of the push stream, one subscription per portfolio. When the
+    engines fill or cancel it, its report is written with the unsolicited request id;
+    a change the session caused itself is already in the response to its request and
+    is not pushed again. A session whose subscription overflowed missed reports, so
+    it is closed and the client has to resynchronise its orders.
+
+    Attributes:
+        statuses (Dict[str, OrderStatus]): Last status reported of each followed order.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.push_stream = PushStream()
+        self.statuses: Dict[str, OrderStatus] = dict()
+        self._subscriptions: Dict[str, Subscription] = dict()
+        self._forwarders: List[asyncio.Task] = list()
+
+    def track(self, report: ExecutionReport) -> None:
+        """Follows an order reported to the session while it stays active."""
+        if report.status != OrderStatus.ACTIVE:
+            self.statuses.pop(report.order_id, None)
+            return
+        self.statuses[report.order_id] = report.status
+        if (
+            not self.push_stream.enabled
+            or report.portfolio_id in self._subscriptions
+        ):
+            return
+        subscription = self.push_stream.subscribe(
+            portfolio_id=report.portfolio_id, channels=[ORDERS]
+        )
+        self._subscriptions[report.portfolio_id] = subscription
+        self._forwarders.append(asyncio.create_task(self._forward(subscription)))
+
+    def close(self) -> None:
+        for forwarder in self._forwarders:
+            forwarder.cancel()
+        for subscription in self._subscriptions.values():
+            self.push_stream.unsubscribe(subscription)
+        self._subscriptions.clear()
+
+    async def _forward(self, subscription: Subscription) -> None:
+        while True:
+            message = await subscription.buffer.get()
+            if subscription.overflowed:
+                LOGGER.warning("closing order gateway session, its reports overflowed")
+                self.writer.close()
+                return
+            report = execution_report_of(message["data"])
+            if self.statuses.get(report.order_id, report.status) == report.status:
+                continue
+            self.track(report)
+            self.writer.write(pack_frame(UNSOLICITED_REQUEST_ID, report))
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                return
+
+
+@singleton
+class OrderGateway:
+    """
+    Order entry over persistent TCP or Unix socket sessions with a length-prefixed
+    binary protocol, for clients which can not afford an HTTP request per order.
+
+    Orders go through the same `MatchingEngine` entry points as the order router.
+    A session may pipeline requests: they are handled one after the other in the
+    order they were sent, and every response carries the id of its request. An
+    amend cancels the order and places a new one with the same portfolio, market,
+    side and type, so it is not atomic: a rejected replacement leaves the order
+    canceled, and its reject names the canceled order. Requests draw from the same
+    `OrderThrottle` as the order router; cancels and amends are charged to the peer
+    address of a TCP session, or to the session itself on a Unix socket. With the
+    push stream enabled, a session also receives the fills and cancels of its
+    resting orders as unsolicited execution reports, see `SessionReports`.
+
+    Attributes:
+        servers (List[asyncio.AbstractServer]): The listening servers.
+        sessions (int): The number of open sessions.
+    """
+
+    def __init__(self):
+        self.setting = Setting()
+        self.servers: List[asyncio.AbstractServer] = list()
+        self.sessions = 0
+
+    async def start(self) -> None:
+        if self.setting.ORDER_GATEWAY_PORT:
+            self.servers.append(
+                await asyncio.start_server(
+                    self.handle_session,
+                    host=self.setting.ORDER_GATEWAY_HOST,
+                    port=self.setting.ORDER_GATEWAY_PORT,
+                )
+            )
+        if self.setting.ORDER_GATEWAY_UNIX_PATH:
+            # a socket file left behind by a previous run blocks binding
+            if os.path.exists(self.setting.ORDER_GATEWAY_UNIX_PATH):
+                os.remove(self.setting.ORDER_GATEWAY_UNIX_PATH)
+            self.servers.append(
+                await asyncio.start_unix_server(
+                    self.handle_session, path=self.setting.ORDER_GATEWAY_UNIX_PATH
+                )
+            )
+        for server in self.servers:
+            LOGGER.info(f"order gateway listening on {server.sockets[0].getsockname()}")
+
+    async def stop(self) -> None:
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        self.servers.clear()
+        if self.setting.ORDER_GATEWAY_UNIX_PATH and os.path.exists(
+            self.setting.ORDER_GATEWAY_UNIX_PATH
+        ):
+            os.remove(self.setting.ORDER_GATEWAY_UNIX_PATH)
+
+    async def handle_session(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        peer = writer.get_extra_info("peername")
+        # TCP clients are throttled per address, Unix socket clients per session
+        client = peer[0] if isinstance(peer, tuple) else f"session-{id(writer)}"
+        reports = SessionReports(writer)
+        self.sessions += 1
+        try:
+            while True:
+                request_id, message = await read_frame(reader)
+                response = await self.handle(message, client=client)
+                if isinstance(response, ExecutionReport):
+                    # followed before an event of the order can reach the session
+                    reports.track(response)
+                writer.write(pack_frame(request_id, response))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        except ProtocolError as ex:
+            # the stream can not be resynchronized after a bad frame
+            LOGGER.warning(f"closing order gateway session of {peer=}: {ex}")
+        except ConnectionError:
+            pass
+        finally:
+            reports.close()
+            self.sessions -= 1
+            writer.close()
+
+    async def handle(self, message: Message, client: Optional[str] = None) -> Message:
+        """Runs one request and builds its response.
+
+        Args:
+            message (Message): A new order, cancel or amend request.
+            client (Optional[str]): Who sent the request, cancels and amends are
+                throttled per client.
+
+        Returns:
+            Message: The execution report of the order, or a reject.
+        """
+        if isinstance(message, NewOrder):
+            retry_after = OrderThrottle().acquire(portfolio_id=message.portfolio_id)
+        else:
+            retry_after = OrderThrottle().acquire(client=client)
+        if retry_after:
+            return Reject(
+                reason=f"order rate limit exceeded, retry after {retry_after:.3f}s"
+            )
+        matching_engine = MatchingEngine()
+        try:
+            if isinstance(message, NewOrder):
+                order = await matching_engine.create_order(
+                    portfolio_id=message.portfolio_id,
+                    market=message.market,
+                    price=message.price,
+                    size=message.size,
+                    side=message.side,
+                    order_type=message.type,
+                )
+            elif isinstance(message, CancelOrder):
+                order = await matching_engine.cancel_order(order_id=message.order_id)
+            elif isinstance(message, AmendOrder):
+                canceled = await matching_engine.cancel_order(order_id=message.order_id)
+                try:
+                    order = await matching_engine.create_order(
+                        portfolio_id=canceled.portfolio_id,
+                        market=canceled.market,
+                        price=message.price,
+                        size=message.size,
+                        side=canceled.side,
+                        order_type=canceled.type,
+                    )
+                except InvalidOrder as ex:
+                    return Reject(
+                        reason=f"{canceled.id=} is canceled, its replacement is "
+                        f"rejected: {ex}"
+                    )
+            else:
+                return Reject(reason=f"{type(message).__name__} is not a request")
+        except InvalidOrder as ex:
+            return Reject(reason=str(ex))
+        except Exception as ex:
+            LOGGER.error(f"order gateway failed on {message=}: {ex}")
+            return Reject(reason=f"internal error: {ex}")
+        return execution_report(order)
@@ -0,0 +1,225 @@
+import asyncio
+import struct
+from enum import IntEnum
+from typing import Dict, NamedTuple, Optional, Tuple, Type, Union
+
+from fifi.enums import Market, OrderSide, OrderStatus, OrderType
+
+# every frame starts with the size of the rest of the frame
+FRAME_SIZE = struct.Struct(">I")
+# message type and the request id the client chose, echoed back in the response
+FRAME_HEADER = struct.Struct(">BI")
+# request id of the execution reports the gateway pushes without a request
+UNSOLICITED_REQUEST_ID = 0
+# a frame bigger than this is a corrupt or hostile stream rather than an order
+MAX_FRAME_SIZE = 64 * 1024
+STRING_SIZE = struct.Struct(">H")
+PRICE_SIZE = struct.Struct(">dd")
+REPORT_NUMBERS = struct.Struct(">ddd")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class MessageType(IntEnum):
+    NEW_ORDER = 1
+    CANCEL_ORDER = 2
+    AMEND_ORDER = 3
+    EXECUTION_REPORT = 101
+    REJECT = 102
+
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode()
+    return STRING_SIZE.pack(len(data)) + data
+
+
+def _unpack_str(payload: bytes, offset: int) -> Tuple[str, int]:
+    (size,) = STRING_SIZE.unpack_from(payload, offset)
+    offset += STRING_SIZE.size
+    if offset + size > len(payload):
+        raise ProtocolError("string runs past the end of the frame")
+    return payload[offset : offset + size].decode(), offset + size
+
+
+class NewOrder(NamedTuple):
+    portfolio_id: str
+    market: Market
+    side: OrderSide
+    type: OrderType
+    price: float
+    size: float
+
+    def encode(self) -> bytes:
+        return (
+            _pack_str(self.portfolio_id)
+            + _pack_str(self.market.value)
+            + _pack_str(self.side.value)
+            + _pack_str(self.type.value)
+            + PRICE_SIZE.pack(self.price, self.size)
+        )
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "NewOrder":
+        portfolio_id, offset = _unpack_str(payload, 0)
+        market, offset = _unpack_str(payload, offset)
+        side, offset = _unpack_str(payload, offset)
+        order_type, offset = _unpack_str(payload, offset)
+        price, size = PRICE_SIZE.unpack_from(payload, offset)
+        return cls(
+            portfolio_id=portfolio_id,
+            market=Market(market),
+            side=OrderSide(side),
+            type=OrderType(order_type),
+            price=price,
+            size=size,
+        )
+
+
+class CancelOrder(NamedTuple):
+    order_id: str
+
+    def encode(self) -> bytes:
+        return _pack_str(self.order_id)
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "CancelOrder":
+        return cls(order_id=_unpack_str(payload, 0)[0])
+
+
+class AmendOrder(NamedTuple):
+    order_id: str
+    price: float
+    size: float
+
+    def encode(self) -> bytes:
+        return _pack_str(self.order_id) + PRICE_SIZE.pack(self.price, self.size)
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "AmendOrder":
+        order_id, offset = _unpack_str(payload, 0)
+        price, size = PRICE_SIZE.unpack_from(payload, offset)
+        return cls(order_id=order_id, price=price, size=size)
+
+
+class ExecutionReport(NamedTuple):
+    order_id: str
+    portfolio_id: str
+    market: Market
+    side: OrderSide
+    type: OrderType
+    status: OrderStatus
+    price: float
+    size: float
+    fee: float
+    position_id: Optional[str]
+
+    def encode(self) -> bytes:
+        return (
+            _pack_str(self.order_id)
+            + _pack_str(self.portfolio_id)
+            + _pack_str(self.market.value)
+            + _pack_str(self.side.value)
+            + _pack_str(self.type.value)
+            + _pack_str(self.status.value)
+            + REPORT_NUMBERS.pack(self.price, self.size, self.fee)
+            + _pack_str(self.position_id or "")
+        )
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "ExecutionReport":
+        order_id, offset = _unpack_str(payload, 0)
+        portfolio_id, offset = _unpack_str(payload, offset)
+        market, offset = _unpack_str(payload, offset)
+        side, offset = _unpack_str(payload, offset)
+        order_type, offset = _unpack_str(payload, offset)
+        status, offset = _unpack_str(payload, offset)
+        price, size, fee = REPORT_NUMBERS.unpack_from(payload, offset)
+        position_id, _ = _unpack_str(payload, offset + REPORT_NUMBERS.size)
+        return cls(
+            order_id=order_id,
+            portfolio_id=portfolio_id,
+            market=Market(market),
+            side=OrderSide(side),
+            type=OrderType(order_type),
+            status=OrderStatus(status),
+            price=price,
+            size=size,
+            fee=fee,
+            position_id=position_id or None,
+        )
+
+
+class Reject(NamedTuple):
+    reason: str
+
+    def encode(self) -> bytes:
+        return _pack_str(self.reason)
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "Reject":
+        return cls(reason=_unpack_str(payload, 0)[0])
+
+
+Message = Union[NewOrder, CancelOrder, AmendOrder, ExecutionReport, Reject]
+
+MESSAGE_TYPES: Dict[MessageType, Type[Message]] = {
+    MessageType.NEW_ORDER: NewOrder,
+    MessageType.CANCEL_ORDER: CancelOrder,
+    MessageType.AMEND_ORDER: AmendOrder,
+    MessageType.EXECUTION_REPORT: ExecutionReport,
+    MessageType.REJECT: Reject,
+}
+MESSAGE_TYPE_OF: Dict[Type[Message], MessageType] = {
+    message_class: message_type for message_type, message_class in MESSAGE_TYPES.items()
+}
+
+
+def pack_frame(request_id: int, message: Message) -> bytes:
+    """Encodes a message into one length-prefixed frame.
+
+    Args:
+        request_id (int): Id matching a response to its request, an unsigned 32 bit
+            integer.
+        message (Message): The message.
+
+    Returns:
+        bytes: The frame.
+    """
+    payload = message.encode()
+    header = FRAME_HEADER.pack(MESSAGE_TYPE_OF[type(message)], request_id)
+    return FRAME_SIZE.pack(len(header) + len(payload)) + header + payload
+
+
+def unpack_frame(frame: bytes) -> Tuple[int, Message]:
+    """Decodes a frame without its size prefix.
+
+    Args:
+        frame (bytes): The message type, the request id and the payload.
+
+    Returns:
+        Tuple[int, Message]: The request id and the message.
+
+    Raises:
+        ProtocolError: If the frame is not a valid message.
+    """
+    try:
+        message_type, request_id = FRAME_HEADER.unpack_from(frame)
+        message_class = MESSAGE_TYPES[MessageType(message_type)]
+        return request_id, message_class.decode(frame[FRAME_HEADER.size :])
+    except (struct.error, ValueError, UnicodeDecodeError) as ex:
+        raise ProtocolError(f"invalid frame: {ex}") from ex
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, Message]:
+    """Reads the next frame of a stream.
+
+    Raises:
+        asyncio.IncompleteReadError: If the stream ends, at a frame boundary or not.
+        ProtocolError: If the frame is too big or not a valid message.
+    """
+    (size,) = FRAME_SIZE.unpack(await reader.readexactly(FRAME_SIZE.size))
+    if size > MAX_FRAME_SIZE:
+        raise ProtocolError(f"{size=} exceeds {MAX_FRAME_SIZE=}")
+    return unpack_frame(await reader.readexactly(size))
@@ -0,0 +1,98 @@
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List
+
+import orjson
+
+from ..schemas.export_schema import ExportFormat
+
+
+class ExportHelper:
+    """A collection of static helpers turning streamed rows into export payloads."""
+
+    MEDIA_TYPES = {
+        ExportFormat.NDJSON: "application/x-ndjson",
+        ExportFormat.CSV: "text/csv",
+    }
+
+    @staticmethod
+    def get_media_type(export_format: ExportFormat) -> str:
+        """Returns the HTTP media type of an export format.
+
+        Args:
+            export_format (ExportFormat): The requested export format.
+
+        Returns:
+            str: The media type to send in the response header.
+        """
+        return ExportHelper.MEDIA_TYPES[export_format]
+
+    @staticmethod
+    def encode(
+        rows: AsyncIterator[Dict[str, Any]], export_format: ExportFormat
+    ) -> AsyncIterator[bytes]:
+        """Encodes streamed rows with the requested export format.
+
+        Args:
+            rows (AsyncIterator[Dict[str, Any]]): The rows to encode.
+            export_format (ExportFormat): The requested export format.
+
+        Returns:
+            AsyncIterator[bytes]: The encoded payload, one chunk per row.
+        """
+        if export_format == ExportFormat.CSV:
+            return ExportHelper.to_csv(rows)
+        return ExportHelper.to_ndjson(rows)
+
+    @staticmethod
+    async def to_ndjson(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+        """Encodes each row as one JSON document followed by a newline.
+
+        Args:
+            rows (AsyncIterator[Dict[str, Any]]): The rows to encode.
+
+        Yields:
+            bytes: A single NDJSON line.
+        """
+        async for row in rows:
+            yield orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+
+    @staticmethod
+    async def to_csv(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+        """Encodes rows as CSV, writing the header from the first row's columns.
+
+        Args:
+            rows (AsyncIterator[Dict[str, Any]]): The rows to encode.
+
+        Yields:
+            bytes: The header line first, then a single CSV line per row.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        columns: List[str] = list()
+        async for row in rows:
+            if not columns:
+                columns = list(row.keys())
+                writer.writerow(columns)
+            writer.writerow([ExportHelper.csv_value(row[column]) for column in columns])
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    @staticmethod
+    def csv_value(value: Any) -> Any:
+        """Converts enums and datetimes to their plain text representation.
+
+        Args:
+            value (Any): A single column value.
+
+        Returns:
+            Any: A value the csv writer can write as is.
+        """
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
@@ -1,32 +1,29 @@
 from fifi.enums import OrderType, OrderSide, Asset, Market
 
+from ..common.market_specs import FeeClass, MarketSpecRegistry
 from ..models import Portfolio
 
 
 class OrderHelper:
     @staticmethod
     def get_recieved_asset(market: Market, side: OrderSide) -> Asset:
-        if market.is_perptual():
-            return Asset.USD
-        market_coins = market.value.replace("_prep", "")
-        second_coin = market_coins[:3]
-        first_coin = market_coins[3:]
+        spec = MarketSpecRegistry().get(market)
+        if spec.is_perpetual:
+            return spec.quote
         if side == OrderSide.BUY:
-            return Asset[second_coin.upper()]
+            return spec.base
         else:
-            return Asset[first_coin.upper()]
+            return spec.quote
 
     @staticmethod
     def get_payment_asset(market: Market, side: OrderSide) -> Asset:
-        if market.is_perptual():
-            return Asset.USD
-        market_coins = market.value.replace("_prep", "")
-        second_coin = market_coins[:3]
-        first_coin = market_coins[3:]
+        spec = MarketSpecRegistry().get(market)
+        if spec.is_perpetual:
+            return spec.quote
         if side == OrderSide.BUY:
-            return Asset[first_coin.upper()]
+            return spec.quote
         else:
-            return Asset[second_coin.upper()]
+            return spec.base
 
     @staticmethod
     def fee_calc(
@@ -40,8 +37,10 @@ class OrderHelper:
         """Calculates and applies trading fees to one or more orders based on
         order type, side, and whether the market is perpetual or spot.
         """
+        spec = MarketSpecRegistry().get(market)
         order_total = size * price
-        if market.is_perptual():
+        if spec.fee_class == FeeClass.PERP:
+            order_total *= spec.contract_multiplier
             if order_type == OrderType.LIMIT:
                 fee = portfolio.perp_maker_fee * order_total
             elif order_type == OrderType.MARKET:
@@ -72,7 +71,9 @@ class OrderHelper:
         leverage: float = 1,
     ) -> float:
         order_total = size * price
-        if market.is_perptual():
+        spec = MarketSpecRegistry().get(market)
+        if spec.is_perpetual:
+            order_total *= spec.contract_multiplier
             if leverage:
                 return order_total / leverage
         if side == OrderSide.BUY:
@@ -88,8 +89,9 @@ class OrderHelper:
         side: OrderSide,
     ) -> float:
         order_total = size * price
-        if market.is_perptual():
-            return order_total
+        spec = MarketSpecRegistry().get(market)
+        if spec.is_perpetual:
+            return order_total * spec.contract_multiplier
         if side == OrderSide.BUY:
             return size
         else:
@@ -0,0 +1,6 @@
+__all__ = ["EventJournal", "JournalEventType", "JournalState", "PushStream"]
+
+from .event_journal import EventJournal
+from .journal_event import JournalEventType
+from .journal_state import JournalState
+from .push_stream import PushStream
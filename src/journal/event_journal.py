@@ -0,0 +1,212 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+from fifi import DecoratedBase, singleton
+from fifi.helpers.get_logger import LoggerFactory
+
+from ..common.clock import SimulationClock
+from ..common.settings import Setting
+from .journal_event import JournalEventType
+from .journal_state import JournalState
+from .push_stream import PushStream
+
+
+LOGGER = LoggerFactory().get(__name__)
+
+EVENTS_FILE = "events.log"
+SNAPSHOT_FILE = "snapshot.json"
+
+
+@singleton
+class EventJournal:
+    """
+    Append-only journal of domain events with periodic compact snapshots.
+
+    Each event is one JSON array line `[type, time, data, cause_id]` appended to
+    `events.log`, where `data` is the full state of the touched entity. The engine
+    processes share the same log; every line goes out in a single `O_APPEND` write.
+
+    Every `snapshot_interval` events recorded by a process, the journal folds the log
+    into a `JournalState` and writes it to `snapshot.json` together with the byte offset
+    it covers. Recovery loads that snapshot and only replays the tail after the offset.
+    The fold runs on a background thread so the engine loop is not held up, and a due
+    snapshot is skipped while the previous one is still running. Every process writes
+    its own temporary file and swaps it in with `os.replace`, so concurrent snapshots
+    never interleave.
+
+    Recorded events are also published on the `PushStream`, even when the journal
+    itself is disabled.
+
+    Attributes:
+        path (str): Directory holding the events log and the snapshot.
+        enabled (bool): Whether events are written at all.
+        snapshot_interval (int): Number of recorded events between two snapshots.
+        fsync (bool): Whether every append is fsynced.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        enabled: Optional[bool] = None,
+        snapshot_interval: Optional[int] = None,
+        fsync: Optional[bool] = None,
+    ) -> None:
+        if path is None or enabled is None or snapshot_interval is None or fsync is None:
+            setting = Setting()
+            path = setting.JOURNAL_PATH if path is None else path
+            enabled = setting.JOURNAL_ENABLED if enabled is None else enabled
+            snapshot_interval = (
+                setting.JOURNAL_SNAPSHOT_INTERVAL
+                if snapshot_interval is None
+                else snapshot_interval
+            )
+            fsync = setting.JOURNAL_FSYNC if fsync is None else fsync
+        self.path = path
+        self.enabled = enabled
+        self.snapshot_interval = snapshot_interval
+        self.fsync = fsync
+        self.events_path = os.path.join(self.path, EVENTS_FILE)
+        self.snapshot_path = os.path.join(self.path, SNAPSHOT_FILE)
+        self._fd: Optional[int] = None
+        self._recorded = 0
+        self._snapshotter: Optional[ThreadPoolExecutor] = None
+        self._pending_snapshot: Optional[Future] = None
+        self.push_stream = PushStream()
+
+    def record(
+        self,
+        event_type: JournalEventType,
+        entity: DecoratedBase,
+        cause_id: Optional[str] = None,
+    ) -> None:
+        """Appends an event carrying the current state of an entity.
+
+        Args:
+            event_type (JournalEventType): The type of the event.
+            entity (DecoratedBase): The order, position or balance after the change.
+            cause_id (Optional[str]): The ID of the order which caused a position event.
+        """
+        if not self.enabled and not self.push_stream.enabled:
+            return
+        data = entity.to_dict()
+        self.push_stream.publish(event_type=event_type, data=data, cause_id=cause_id)
+        if self.enabled:
+            self.append(event_type=event_type, data=data, cause_id=cause_id)
+
+    def append(
+        self,
+        event_type: JournalEventType,
+        data: Dict[str, Any],
+        cause_id: Optional[str] = None,
+    ) -> None:
+        """Appends a raw event to the log, taking a snapshot when one is due.
+
+        Args:
+            event_type (JournalEventType): The type of the event.
+            data (Dict[str, Any]): The state of the entity after the event.
+            cause_id (Optional[str]): The ID of the order which caused a position event.
+        """
+        if self._fd is None:
+            os.makedirs(self.path, exist_ok=True)
+            self._fd = os.open(
+                self.events_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND
+            )
+        os.write(
+            self._fd,
+            orjson.dumps(
+                [event_type.value, SimulationClock().now(), data, cause_id],
+                option=orjson.OPT_APPEND_NEWLINE,
+            ),
+        )
+        if self.fsync:
+            os.fsync(self._fd)
+        self._recorded += 1
+        if self.snapshot_interval and self._recorded % self.snapshot_interval == 0:
+            self.snapshot_in_background()
+
+    def snapshot_in_background(self) -> Optional[Future]:
+        """Takes a snapshot on the background thread of the journal.
+
+        Returns:
+            Optional[Future]: The future of the snapshot, None if the previous one is
+                still running.
+        """
+        if self._pending_snapshot is not None and not self._pending_snapshot.done():
+            return None
+        if self._snapshotter is None:
+            self._snapshotter = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="journal-snapshot"
+            )
+        self._pending_snapshot = self._snapshotter.submit(self._snapshot_or_log)
+        return self._pending_snapshot
+
+    def _snapshot_or_log(self) -> Optional[JournalState]:
+        try:
+            return self.snapshot()
+        except Exception as ex:
+            # the log stays complete, recovery only replays a longer tail
+            LOGGER.error(f"journal snapshot failed: {ex}")
+            return None
+
+    def recover(self) -> Tuple[JournalState, int]:
+        """Rebuilds the engine state from the latest snapshot plus the log tail.
+
+        Returns:
+            Tuple[JournalState, int]: The rebuilt state and the byte offset of the log
+                it covers.
+        """
+        state = JournalState()
+        offset = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "rb") as snapshot_file:
+                snapshot = orjson.loads(snapshot_file.read())
+            state = JournalState.from_dict(snapshot["state"])
+            offset = snapshot["offset"]
+
+        if not os.path.exists(self.events_path):
+            return state, offset
+
+        apply = state.apply
+        event_types = {event_type.value: event_type for event_type in JournalEventType}
+        with open(self.events_path, "rb") as events_file:
+            events_file.seek(offset)
+            for line in events_file:
+                if not line.endswith(b"\n"):
+                    # a write still in flight or torn by a crash
+                    break
+                event_type, _, data, cause_id = orjson.loads(line)
+                apply(event_types[event_type], data, cause_id)
+                offset += len(line)
+        return state, offset
+
+    def snapshot(self) -> JournalState:
+        """Folds the log into a compact snapshot so recovery only replays the tail.
+
+        Returns:
+            JournalState: The state written to the snapshot.
+        """
+        state, offset = self.recover()
+        temp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as snapshot_file:
+            snapshot_file.write(
+                orjson.dumps({"offset": offset, "state": state.to_dict()})
+            )
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        LOGGER.info(
+            f"journal snapshot taken at {offset=} after {state.events_applied} events"
+        )
+        return state
+
+    def close(self) -> None:
+        if self._snapshotter is not None:
+            self._snapshotter.shutdown(wait=True)
+            self._snapshotter = None
+            self._pending_snapshot = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,19 @@
+from enum import Enum
+
+
+class JournalEventType(Enum):
+    ORDER_ACCEPTED = "order_accepted"
+    ORDER_FILLED = "order_filled"
+    ORDER_CANCELED = "order_canceled"
+    POSITION_OPENED = "position_opened"
+    POSITION_MERGED = "position_merged"
+    POSITION_PARTIALLY_CLOSED = "position_partially_closed"
+    POSITION_CLOSED = "position_closed"
+    POSITION_LIQUIDATED = "position_liquidated"
+    BALANCE_CHANGED = "balance_changed"
+
+    def is_order_event(self) -> bool:
+        return self.value.startswith("order")
+
+    def is_position_event(self) -> bool:
+        return self.value.startswith("position")
@@ -0,0 +1,90 @@
+from typing import Any, Dict, Optional
+
+from fifi.enums import Market
+
+from ..common.market_specs import MarketSpecRegistry
+from .journal_event import JournalEventType
+
+
+CLOSING_ORDER_EVENTS = {JournalEventType.ORDER_FILLED, JournalEventType.ORDER_CANCELED}
+CLOSING_POSITION_EVENTS = {
+    JournalEventType.POSITION_CLOSED,
+    JournalEventType.POSITION_LIQUIDATED,
+}
+
+
+class JournalState:
+    """Compact in-memory engine state rebuilt from journal events.
+
+    Every event carries the full state of the entity it touches, so applying an
+    event is a plain upsert or removal and replaying the same event twice is harmless.
+
+    Attributes:
+        active_orders (Dict[str, Dict[str, Any]]): Active orders keyed by order ID.
+        open_positions (Dict[str, Dict[str, Any]]): Open positions keyed by position ID.
+        balances (Dict[str, Dict[str, Any]]): Latest balance states keyed by balance ID.
+        pending_perp_fills (Dict[str, Dict[str, Any]]): Filled perpetual orders which
+            have not been applied to a position yet, keyed by order ID.
+        events_applied (int): The number of events folded into this state.
+    """
+
+    def __init__(self) -> None:
+        self.active_orders: Dict[str, Dict[str, Any]] = dict()
+        self.open_positions: Dict[str, Dict[str, Any]] = dict()
+        self.balances: Dict[str, Dict[str, Any]] = dict()
+        self.pending_perp_fills: Dict[str, Dict[str, Any]] = dict()
+        self.events_applied = 0
+
+    def apply(
+        self,
+        event_type: JournalEventType,
+        data: Dict[str, Any],
+        cause_id: Optional[str] = None,
+    ) -> None:
+        """Folds a single journal event into the state.
+
+        Args:
+            event_type (JournalEventType): The type of the event.
+            data (Dict[str, Any]): The state of the entity after the event.
+            cause_id (Optional[str]): The ID of the order which caused a position event.
+        """
+        self.events_applied += 1
+        entity_id = data["id"]
+        if event_type == JournalEventType.BALANCE_CHANGED:
+            self.balances[entity_id] = data
+        elif event_type.is_order_event():
+            if event_type in CLOSING_ORDER_EVENTS:
+                self.active_orders.pop(entity_id, None)
+            else:
+                self.active_orders[entity_id] = data
+            if (
+                event_type == JournalEventType.ORDER_FILLED
+                and MarketSpecRegistry().get(Market(data["market"])).is_perpetual
+            ):
+                self.pending_perp_fills[entity_id] = data
+        else:
+            if event_type in CLOSING_POSITION_EVENTS:
+                self.open_positions.pop(entity_id, None)
+            else:
+                self.open_positions[entity_id] = data
+            if cause_id:
+                self.pending_perp_fills.pop(cause_id, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "active_orders": self.active_orders,
+            "open_positions": self.open_positions,
+            "balances": self.balances,
+            "pending_perp_fills": self.pending_perp_fills,
+            "events_applied": self.events_applied,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "JournalState":
+        state = cls()
+        state.active_orders = data["active_orders"]
+        state.open_positions = data["open_positions"]
+        state.balances = data["balances"]
+        state.pending_perp_fills = data["pending_perp_fills"]
+        state.events_applied = data["events_applied"]
+        return state
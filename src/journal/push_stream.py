@@ -0,0 +1,203 @@
+import asyncio
+import multiprocessing
+import queue
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from fifi import singleton
+from fifi.helpers.get_logger import LoggerFactory
+
+from ..common.settings import Setting
+from .journal_event import JournalEventType
+
+LOGGER = LoggerFactory().get(__name__)
+
+ORDERS = "orders"
+FILLS = "fills"
+POSITIONS = "positions"
+BALANCES = "balances"
+CHANNELS = frozenset((ORDERS, FILLS, POSITIONS, BALANCES))
+
+
+def event_channels(event_type: JournalEventType) -> Tuple[str, ...]:
+    if event_type == JournalEventType.ORDER_FILLED:
+        return (ORDERS, FILLS)
+    if event_type.is_order_event():
+        return (ORDERS,)
+    if event_type.is_position_event():
+        return (POSITIONS,)
+    return (BALANCES,)
+
+
+class Subscription:
+    """
+    One client's interest in some channels of a portfolio, with a bounded buffer of
+    the events not yet sent to it.
+
+    When the client reads slower than its events arrive the buffer fills up; the
+    subscription is then marked overflowed and the connection closed, because the
+    client missed events and has to resynchronise from the REST endpoints.
+
+    A subscription belongs to the event loop it was made on, which is the only one
+    touching its buffer.
+    """
+
+    def __init__(self, portfolio_id: str, channels: FrozenSet[str], buffer_size: int):
+        self.portfolio_id = portfolio_id
+        self.channels = channels
+        self.buffer: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=buffer_size)
+        self.loop = asyncio.get_running_loop()
+        self.overflowed = False
+
+    def offer(self, message: Dict[str, Any]) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.buffer.put_nowait(message)
+        except asyncio.QueueFull:
+            LOGGER.warning(f"push stream buffer of {self.portfolio_id=} overflowed")
+            self.overflowed = True
+
+
+@singleton
+class PushStream:
+    """
+    Pushes the order, fill, position and balance changes of the engines to the
+    WebSocket subscribers of the API process.
+
+    Every state transition recorded through the event journal is published on a
+    multiprocessing queue, whichever process records it: an engine process or any
+    API worker. The queue has to be created before the engines are started and the
+    workers are forked, at the import of the API with `gunicorn --preload`. The
+    worker owning the engines runs a dispatcher thread from the moment they start,
+    which takes the events off the queue and hands each one to the event loop of
+    every subscription of its portfolio and channel; events nobody subscribed to are
+    dropped right away, so the queue never backs up. Publishing never blocks an
+    engine: events are dropped while the queue is full.
+
+    Attributes:
+        enabled (bool): Whether state transitions are published at all.
+        buffer_size (int): Size of the outbound buffer of each subscription.
+        dropped (int): Events of this process dropped on a full queue.
+    """
+
+    def __init__(self):
+        setting = Setting()
+        self.enabled = setting.PUSH_STREAM_ENABLED
+        self.buffer_size = setting.PUSH_STREAM_BUFFER_SIZE
+        self._queue = multiprocessing.Queue(maxsize=setting.PUSH_STREAM_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, Set[Subscription]] = dict()
+        self._dispatcher: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    @property
+    def is_dispatching(self) -> bool:
+        return self._dispatcher is not None
+
+    def publish(
+        self,
+        event_type: JournalEventType,
+        data: Dict[str, Any],
+        cause_id: Optional[str] = None,
+    ) -> None:
+        """Publishes a state transition to the subscribers of its portfolio.
+
+        Args:
+            event_type (JournalEventType): The type of the transition.
+            data (Dict[str, Any]): The state of the entity after the transition.
+            cause_id (Optional[str]): The ID of the order which caused the transition.
+        """
+        if not self.enabled:
+            return
+        try:
+            self._queue.put_nowait((event_type.value, data, cause_id))
+        except queue.Full:
+            self.dropped += 1
+            LOGGER.warning(f"push stream queue is full, dropped {event_type=}")
+
+    def subscribe(
+        self, portfolio_id: str, channels: Optional[Iterable[str]] = None
+    ) -> Subscription:
+        """Subscribes to the events of a portfolio from the running event loop.
+
+        Args:
+            portfolio_id (str): The portfolio to follow.
+            channels (Optional[Iterable[str]]): The channels to follow, all if None.
+
+        Returns:
+            Subscription: The subscription to read the events from.
+
+        Raises:
+            ValueError: If a channel is unknown.
+        """
+        channels = frozenset(channels) if channels else CHANNELS
+        if not channels <= CHANNELS:
+            raise ValueError(f"unknown channels {set(channels - CHANNELS)}")
+        subscription = Subscription(
+            portfolio_id=portfolio_id, channels=channels, buffer_size=self.buffer_size
+        )
+        with self._lock:
+            self._subscriptions.setdefault(portfolio_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.portfolio_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.portfolio_id, None)
+
+    def dispatch(
+        self, event_type_value: str, data: Dict[str, Any], cause_id: Optional[str]
+    ) -> None:
+        """Fans one event out to the subscriptions of its portfolio and channels,
+        each on its own event loop."""
+        with self._lock:
+            subscriptions = tuple(self._subscriptions.get(data.get("portfolio_id"), ()))
+        if not subscriptions:
+            return
+        event_type = JournalEventType(event_type_value)
+        for channel in event_channels(event_type):
+            message = {
+                "channel": channel,
+                "event": event_type_value,
+                "cause_id": cause_id,
+                "data": data,
+            }
+            for subscription in subscriptions:
+                if channel not in subscription.channels:
+                    continue
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.offer, message)
+                except RuntimeError:
+                    # its loop is closed, the subscription is on its way out
+                    continue
+
+    def start_dispatcher(self) -> None:
+        """Starts taking the published events off the queue, in the worker owning
+        the engines only, as the events of a queue go to a single reader."""
+        if self._dispatcher is not None:
+            return
+        self._dispatcher = threading.Thread(
+            target=self._run_dispatcher, name="push_stream_dispatcher", daemon=True
+        )
+        self._dispatcher.start()
+
+    def stop_dispatcher(self) -> None:
+        if self._dispatcher is None:
+            return
+        # the dispatcher keeps taking events off the queue, so there is room for it
+        self._queue.put(None)
+        self._dispatcher.join(timeout=5)
+        self._dispatcher = None
+
+    def _run_dispatcher(self) -> None:
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            try:
+                self.dispatch(*event)
+            except Exception as ex:
+                LOGGER.error(f"push stream failed to dispatch {event=}: {ex}")
@@ -1,11 +1,12 @@
-from fifi import DatetimeDecoratedBase
 from fifi.enums import Asset
 
 from sqlalchemy import CheckConstraint, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from .simulation_datetime_base import SimulationDatetimeBase
 
-class Balance(DatetimeDecoratedBase):
+
+class Balance(SimulationDatetimeBase):
     __tablename__ = "balances"
     # columns
     portfolio_id: Mapped[str] = mapped_column(
@@ -31,6 +32,7 @@ class Balance(DatetimeDecoratedBase):
         default=0,
         nullable=False,
     )
+    version: Mapped[int] = mapped_column(default=0, nullable=False)
 
     # constraints
     __table_args__ = (
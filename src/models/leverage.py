@@ -1,10 +1,11 @@
-from fifi import DatetimeDecoratedBase
 from fifi.enums import Market
 from sqlalchemy import ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from .simulation_datetime_base import SimulationDatetimeBase
 
-class Leverage(DatetimeDecoratedBase):
+
+class Leverage(SimulationDatetimeBase):
     __tablename__ = "leverages"
     # columns
     portfolio_id: Mapped[str] = mapped_column(
@@ -1,11 +1,12 @@
-from fifi import DatetimeDecoratedBase
 from fifi.enums import OrderSide, OrderStatus, OrderType, Market
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from .simulation_datetime_base import SimulationDatetimeBase
 
-class Order(DatetimeDecoratedBase):
+
+class Order(SimulationDatetimeBase):
     __tablename__ = "orders"
     # columns
     portfolio_id: Mapped[str] = mapped_column(
@@ -22,5 +23,20 @@ class Order(DatetimeDecoratedBase):
     side: Mapped[OrderSide] = mapped_column(nullable=False)
     position_id: Mapped[str] = mapped_column(nullable=True)
 
+    # constraints
+    __table_args__ = (
+        # covers the portfolio statistics, its prefix the reads by portfolio and status
+        Index(
+            "ix_orders_portfolio_status_market_side",
+            "portfolio_id",
+            "status",
+            "market",
+            "side",
+            "updated_at",
+            "price",
+            "size",
+            "fee",
+        ),
+    )
     # relationships
     portfolio: Mapped["Portfolio"] = relationship("Portfolio", back_populates="orders")
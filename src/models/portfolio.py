@@ -1,11 +1,12 @@
 from typing import List
-from fifi import DatetimeDecoratedBase
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.common.settings import Setting
 
+from .simulation_datetime_base import SimulationDatetimeBase
 
-class Portfolio(DatetimeDecoratedBase):
+
+class Portfolio(SimulationDatetimeBase):
     __tablename__ = "portfolios"
     # columns
     name: Mapped[str] = mapped_column(unique=True, nullable=False)
@@ -1,11 +1,12 @@
-from fifi import DatetimeDecoratedBase
 from fifi.enums import PositionSide, PositionStatus, Market
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from .simulation_datetime_base import SimulationDatetimeBase
 
-class Position(DatetimeDecoratedBase):
+
+class Position(SimulationDatetimeBase):
     __tablename__ = "positions"
     # columns
     portfolio_id: Mapped[str] = mapped_column(
@@ -24,7 +25,19 @@ class Position(DatetimeDecoratedBase):
         default=PositionStatus.OPEN, nullable=False
     )
     side: Mapped[PositionSide] = mapped_column(nullable=False)
+    version: Mapped[int] = mapped_column(default=0, nullable=False)
 
+    # constraints
+    __table_args__ = (
+        # covers the portfolio statistics, its prefix the reads by portfolio and status
+        Index(
+            "ix_positions_portfolio_status",
+            "portfolio_id",
+            "status",
+            "updated_at",
+            "pnl",
+        ),
+    )
     # relationships
     portfolio: Mapped["Portfolio"] = relationship(
         "Portfolio", back_populates="positions"
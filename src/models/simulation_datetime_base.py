@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from fifi import DatetimeDecoratedBase
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..common.clock import SimulationClock
+
+
+def _now() -> datetime:
+    return SimulationClock().now()
+
+
+class SimulationDatetimeBase(DatetimeDecoratedBase):
+    """`DatetimeDecoratedBase` whose timestamps come from the simulation clock."""
+
+    __abstract__ = True
+    updated_at: Mapped[datetime] = mapped_column(
+        index=True,
+        doc="Last Update Time",
+        default=_now,
+        onupdate=_now,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        index=True, doc="Creation Time", default=_now
+    )
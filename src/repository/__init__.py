@@ -1,9 +1,21 @@
 __all__ = [
     "BalanceRepository",
+    "BalanceLedgerRepository",
     "OrderRepository",
     "PortfolioRepository",
     "PositionRepository",
     "LeverageRepository",
+    "SeedRepository",
+    "LastTradeBoardRepository",
+    "LastTradeBoardReader",
+    "ReplayMarketDataRepository",
+    "InMemoryOrderRepository",
+    "InMemoryPositionRepository",
+    "InMemoryBalanceRepository",
+    "InMemoryLeverageRepository",
+    "InMemoryPortfolioRepository",
+    "InMemorySeedRepository",
+    "InMemoryStorage",
 ]
 
 from .order_repository import OrderRepository
@@ -11,3 +23,16 @@ from .portfolio_repository import PortfolioRepository
 from .balance_repository import BalanceRepository
 from .position_repository import PositionRepository
 from .leverage_repository import LeverageRepository
+from .balance_ledger_repository import BalanceLedgerRepository
+from .seed_repository import SeedRepository
+from .last_trade_board_repository import LastTradeBoardReader, LastTradeBoardRepository
+from .replay_market_data_repository import ReplayMarketDataRepository
+from .in_memory_repository import (
+    InMemoryOrderRepository,
+    InMemoryPositionRepository,
+    InMemoryBalanceRepository,
+    InMemoryLeverageRepository,
+    InMemoryPortfolioRepository,
+    InMemorySeedRepository,
+    InMemoryStorage,
+)
@@ -0,0 +1,337 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import orjson
+from sqlalchemy import update
+
+from fifi import DatabaseProvider, singleton
+from fifi.enums import Asset
+from fifi.helpers.get_logger import LoggerFactory
+
+from ..common.settings import Setting
+from ..models.balance import Balance
+from ..schemas.balance_schema import BalanceSchema
+from .balance_repository import BalanceRepository
+
+
+LOGGER = LoggerFactory().get(__name__)
+
+BALANCE_STATE_COLUMNS = ("quantity", "available", "frozen", "burned", "fee_paid")
+
+
+@singleton
+class BalanceLedgerRepository(BalanceRepository):
+    """
+    Write-behind repository keeping the authoritative balances in memory.
+
+    Every mutation updates the in-memory balance and appends its new state to a local
+    write-ahead log (WAL) file. Dirty balances are flushed to the `balances` table in
+    batches, once `BALANCE_LEDGER_FLUSH_BATCH_SIZE` balances are dirty or
+    `BALANCE_LEDGER_FLUSH_INTERVAL` seconds have passed since the last flush. Each WAL
+    record holds the full state of one balance, so replaying it is idempotent.
+
+    The WAL is rotated at the start of every flush and the rotated file is removed once
+    the batch is committed. `recover` rebuilds the ledger from the last DB snapshot plus
+    the replay of any WAL files left behind by a crash.
+
+    The ledger is only authoritative inside the process that owns it, so the engines run
+    as threads of the API process while it is enabled.
+
+    Attributes:
+        wal_path (str): Path of the active WAL file.
+        flushing_wal_path (str): Path of the WAL file rotated out by an in-flight flush.
+        is_recovered (bool): Whether the ledger has been loaded from the database.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.setting = Setting()
+        self.wal_path = self.setting.BALANCE_LEDGER_WAL_PATH
+        self.flushing_wal_path = f"{self.wal_path}.flushing"
+        self.is_recovered = False
+        self._lock = threading.RLock()
+        self._balances: Dict[str, Balance] = dict()
+        self._index: Dict[Tuple[str, Asset], str] = dict()
+        self._dirty: Set[str] = set()
+        self._wal_fd: Optional[int] = None
+        self._is_flushing = False
+        self._last_flush = time.monotonic()
+
+    async def recover(self) -> None:
+        """
+        Load the balances snapshot from the database and replay the WAL on top of it.
+
+        Replayed balances are compacted into a fresh WAL before the old files are
+        dropped, then flushed to the database.
+        """
+        balances = await super().get_all_balances()
+        with self._lock:
+            self._close_wal()
+            self._balances.clear()
+            self._index.clear()
+            self._dirty.clear()
+            for balance in balances:
+                self._store(balance)
+
+            replayed = 0
+            for path in (self.flushing_wal_path, self.wal_path):
+                replayed += self._replay(path)
+            self._compact_wal()
+            self._open_wal()
+            self.is_recovered = True
+        LOGGER.info(
+            f"balance ledger recovered {len(self._balances)} balances, {replayed=}"
+        )
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write every dirty balance to the database in a single batch.
+
+        Returns:
+            int: The number of balances written.
+        """
+        with self._lock:
+            if self._is_flushing or not self._dirty:
+                return 0
+            self._is_flushing = True
+            rows = [self._state(self._balances[id_]) for id_ in self._dirty]
+            self._dirty.clear()
+            self._rotate_wal()
+
+        try:
+            async with DatabaseProvider().get_new_seddion() as session:
+                await session.execute(update(Balance), rows)
+                await session.commit()
+        except Exception:
+            with self._lock:
+                # the rotated WAL is about to be dropped, so the latest state of the
+                # unflushed balances goes back into the active one
+                for row in rows:
+                    self._dirty.add(row["id"])
+                    self._append_wal(self._balances[row["id"]])
+                self._remove_flushing_wal()
+                self._is_flushing = False
+            raise
+
+        with self._lock:
+            self._remove_flushing_wal()
+            self._is_flushing = False
+            self._last_flush = time.monotonic()
+        LOGGER.debug(f"balance ledger flushed {len(rows)} balances")
+        return len(rows)
+
+    async def run_periodic_flush(self) -> None:
+        """Flush the ledger every `BALANCE_LEDGER_FLUSH_INTERVAL` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.setting.BALANCE_LEDGER_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as ex:
+                LOGGER.error(f"balance ledger flush failed: {ex}")
+
+    async def close(self) -> None:
+        """Flush the remaining dirty balances and close the WAL file."""
+        await self.flush()
+        with self._lock:
+            self._close_wal()
+
+    async def apply_mutation(
+        self,
+        portfolio_id: str,
+        asset: Asset,
+        mutation: Callable[[Balance], None],
+    ) -> Optional[Balance]:
+        await self._ensure_recovered()
+        with self._lock:
+            balance = self._get_by_asset(portfolio_id=portfolio_id, asset=asset)
+            if not balance:
+                return None
+            mutation(balance)
+            self._mark_dirty(balance)
+        await self._flush_if_due()
+        return balance
+
+    async def update_entity(self, entity: Balance) -> None:
+        await self._ensure_recovered()
+        with self._lock:
+            balance = self._balances.get(entity.id)
+            if balance is None:
+                self._store(entity)
+                balance = entity
+            elif balance is not entity:
+                for column in BALANCE_STATE_COLUMNS:
+                    setattr(balance, column, getattr(entity, column))
+            self._mark_dirty(balance)
+        await self._flush_if_due()
+
+    async def get_portfolio_asset(
+        self, portfolio_id: str, asset: Asset, with_for_update: bool = False
+    ) -> Optional[Balance]:
+        await self._ensure_recovered()
+        return self._get_by_asset(portfolio_id=portfolio_id, asset=asset)
+
+    async def get_one_by_id(
+        self, id_: str, column: str = "id", with_for_update: bool = False
+    ) -> Optional[Balance]:
+        if column != "id":
+            return await super().get_one_by_id(
+                id_=id_, column=column, with_for_update=with_for_update
+            )
+        await self._ensure_recovered()
+        return self._balances.get(id_)
+
+    async def get_entities_by_portfolio_id(
+        self, portfolio_id: str, with_for_update: bool = False
+    ) -> List[Balance]:
+        await self._ensure_recovered()
+        balances = list()
+        for asset in Asset:
+            balance = self._get_by_asset(portfolio_id=portfolio_id, asset=asset)
+            if balance:
+                balances.append(balance)
+        return balances
+
+    async def get_rows_by_portfolio_id(
+        self,
+        portfolio_id: str,
+        columns: Sequence[str],
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        # the ledger, not the database, holds the latest balances
+        balances = await self.get_entities_by_portfolio_id(portfolio_id=portfolio_id)
+        return [
+            {column: getattr(balance, column) for column in columns}
+            for balance in balances
+            if all(
+                value is None or getattr(balance, column) == value
+                for column, value in (filters or {}).items()
+            )
+        ]
+
+    async def get_all_balances(self, with_for_update: bool = False) -> List[Balance]:
+        await self._ensure_recovered()
+        return list(self._balances.values())
+
+    async def create(self, data: BalanceSchema) -> Balance:
+        # new rows are written through so that every WAL record has a row to land on
+        await self._ensure_recovered()
+        balance = await super().create(data=data)
+        with self._lock:
+            self._store(balance)
+        return balance
+
+    async def create_many(self, data: List[BalanceSchema]) -> List[Balance]:
+        await self._ensure_recovered()
+        balances = await super().create_many(data=data)
+        with self._lock:
+            for balance in balances:
+                self._store(balance)
+        return balances
+
+    async def _ensure_recovered(self) -> None:
+        if not self.is_recovered:
+            await self.recover()
+
+    async def _flush_if_due(self) -> None:
+        if (
+            len(self._dirty) >= self.setting.BALANCE_LEDGER_FLUSH_BATCH_SIZE
+            or time.monotonic() - self._last_flush
+            >= self.setting.BALANCE_LEDGER_FLUSH_INTERVAL
+        ):
+            await self.flush()
+
+    def _get_by_asset(self, portfolio_id: str, asset: Asset) -> Optional[Balance]:
+        balance_id = self._index.get((portfolio_id, asset))
+        if balance_id:
+            return self._balances.get(balance_id)
+        return None
+
+    def _store(self, balance: Balance) -> None:
+        self._balances[balance.id] = balance
+        self._index[(balance.portfolio_id, balance.asset)] = balance.id
+
+    def _mark_dirty(self, balance: Balance) -> None:
+        self._append_wal(balance)
+        self._dirty.add(balance.id)
+
+    @staticmethod
+    def _state(balance: Balance) -> Dict[str, Any]:
+        state: Dict[str, Any] = {"id": balance.id}
+        for column in BALANCE_STATE_COLUMNS:
+            state[column] = getattr(balance, column)
+        return state
+
+    def _append_wal(self, balance: Balance) -> None:
+        if self._wal_fd is None:
+            self._open_wal()
+        os.write(
+            self._wal_fd,  # type: ignore
+            orjson.dumps(self._state(balance), option=orjson.OPT_APPEND_NEWLINE),
+        )
+        if self.setting.BALANCE_LEDGER_WAL_FSYNC:
+            os.fsync(self._wal_fd)  # type: ignore
+
+    def _replay(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        replayed = 0
+        with open(path, "rb") as wal:
+            for line in wal:
+                try:
+                    state = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # a torn write at the tail of the log, nothing after it is valid
+                    LOGGER.warning(f"skipping corrupted tail of {path}")
+                    break
+                balance = self._balances.get(state["id"])
+                if balance is None:
+                    LOGGER.warning(f"WAL record for unknown balance {state['id']}")
+                    continue
+                for column in BALANCE_STATE_COLUMNS:
+                    setattr(balance, column, state[column])
+                self._dirty.add(balance.id)
+                replayed += 1
+        return replayed
+
+    def _open_wal(self) -> None:
+        directory = os.path.dirname(self.wal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._wal_fd = os.open(self.wal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+
+    def _close_wal(self) -> None:
+        if self._wal_fd is not None:
+            os.close(self._wal_fd)
+            self._wal_fd = None
+
+    def _rotate_wal(self) -> None:
+        self._close_wal()
+        if os.path.exists(self.wal_path):
+            os.replace(self.wal_path, self.flushing_wal_path)
+        self._open_wal()
+
+    def _remove_flushing_wal(self) -> None:
+        if os.path.exists(self.flushing_wal_path):
+            os.remove(self.flushing_wal_path)
+
+    def _compact_wal(self) -> None:
+        compacted_path = f"{self.wal_path}.compacted"
+        directory = os.path.dirname(self.wal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(compacted_path, "wb") as wal:
+            for id_ in self._dirty:
+                wal.write(
+                    orjson.dumps(
+                        self._state(self._balances[id_]),
+                        option=orjson.OPT_APPEND_NEWLINE,
+                    )
+                )
+            wal.flush()
+            os.fsync(wal.fileno())
+        os.replace(compacted_path, self.wal_path)
+        self._remove_flushing_wal()
@@ -1,5 +1,5 @@
-from typing import List, Optional
-from sqlalchemy import and_, select
+from typing import Callable, List, Optional
+from sqlalchemy import and_, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fifi.enums import Asset
@@ -47,10 +47,10 @@ class BalanceRepository(SimulatorBaseRepository):
         """
         if not session:
             raise NotExistedSessionException("session is not existed")
-        stmt = select(self.model)
+        stmt = lambda_stmt(lambda: select(Balance))
 
         if with_for_update:
-            stmt = stmt.with_for_update()
+            stmt += lambda s: s.with_for_update()
 
         results = await session.execute(stmt)
         return list(results.scalars().all())
@@ -86,12 +86,37 @@ class BalanceRepository(SimulatorBaseRepository):
         """
         if not session:
             raise NotExistedSessionException("session is not existed")
-        stmt = select(self.model).where(
+        stmt = lambda_stmt(lambda: select(Balance))
+        stmt += lambda s: s.where(
             and_(Balance.portfolio_id == portfolio_id, Balance.asset == asset)
         )
 
         if with_for_update:
-            stmt = stmt.with_for_update()
+            stmt += lambda s: s.with_for_update()
 
         result = await session.execute(stmt)
         return result.unique().scalar_one_or_none()
+
+    async def apply_mutation(
+        self,
+        portfolio_id: str,
+        asset: Asset,
+        mutation: Callable[[Balance], None],
+    ) -> Optional[Balance]:
+        """
+        Apply an in-place mutation to a portfolio asset balance and persist it.
+
+        Args:
+            portfolio_id (str): The ID of the portfolio that owns the balance.
+            asset (Asset): The asset of the balance to mutate.
+            mutation (Callable[[Balance], None]): Function changing the balance fields in place.
+
+        Returns:
+            Optional[Balance]: The mutated `Balance` if found, otherwise `None`.
+        """
+        balance = await self.get_portfolio_asset(portfolio_id=portfolio_id, asset=asset)
+        if not balance:
+            return None
+        mutation(balance)
+        await self.update_entity(balance)
+        return balance
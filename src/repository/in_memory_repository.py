@@ -0,0 +1,749 @@
+import threading
+from datetime import datetime
+from enum import Enum
+from operator import attrgetter
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from pydantic import BaseModel
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import MultipleResultsFound
+
+from fifi import DatabaseProvider, DecoratedBase, singleton
+from fifi.enums import Asset, Market, OrderStatus, PositionSide, PositionStatus
+from fifi.exceptions import (
+    EntityException,
+    IntegrityConflictException,
+    NotFoundException,
+)
+from fifi.helpers.get_logger import LoggerFactory
+
+from ..common.clock import SimulationClock
+from ..common.exceptions import VersionConflict
+from ..common.market_specs import MarketSpecRegistry
+from ..models import Balance, Leverage, Order, Position
+from ..schemas import LeverageSchema, PortfolioSchema
+from ..schemas.balance_schema import BalanceSchema
+from ..schemas.seed_schema import SeedPortfolioSchema, SeedResponseSchema
+from .balance_repository import BalanceRepository
+from .leverage_repository import LeverageRepository
+from .order_repository import OrderRepository
+from .portfolio_repository import PortfolioRepository, PortfolioState, PortfolioStats
+from .position_repository import PositionRepository
+from .seed_repository import PORTFOLIO_FEE_COLUMNS, SeedRepository
+from .simulator_base_repository import SimulatorBaseRepository
+
+LOGGER = LoggerFactory().get(__name__)
+
+EntityModel = TypeVar("EntityModel", bound=DecoratedBase)
+
+# rows written to the database per statement by a dump
+DUMP_BATCH_SIZE = 5000
+
+
+class InMemoryRepository(SimulatorBaseRepository[EntityModel]):
+    """
+    Repository keeping its table in process memory instead of the database, for
+    backtests where the storage round trips dominate.
+
+    Rows live in a dict keyed by id, which keeps them in creation order, with an index
+    per portfolio, per unique constraint and per column of `indexed_columns`, plus
+    their order of last write for the reads by update time. Column defaults and
+    unique constraints are applied as the database would, check and foreign key
+    constraints are not.
+
+    Like in the balance ledger, the entities handed out are the stored ones rather than
+    copies, so a change is visible to every reader as soon as it is made; writing it
+    with `update_entity` stamps it and reindexes it. An entity written from another
+    copy is checked against its version like a compare-and-swap.
+
+    The engines run as threads of the API process with event loops of their own, so
+    every table is guarded by one lock shared by all of them, which also makes a read
+    across tables see a single state.
+
+    Attributes:
+        indexed_columns (Tuple[str, ...]): Columns indexed by value for filtering.
+        columns (Tuple[str, ...]): The names of the table columns.
+    """
+
+    indexed_columns: Tuple[str, ...] = ()
+    _lock = threading.RLock()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        table = self.model.__table__
+        self.columns = tuple(column.name for column in table.columns)
+        self._defaults = [
+            (column.name, column.default)
+            for column in table.columns
+            if column.default is not None
+        ]
+        # a unique column may also be listed as a constraint
+        self._unique_keys = list(
+            dict.fromkeys(
+                [(column.name,) for column in table.columns if column.unique]
+                + [
+                    tuple(column.name for column in constraint.columns)
+                    for constraint in table.constraints
+                    if isinstance(constraint, UniqueConstraint)
+                ]
+            )
+        )
+        self._is_versioned = "version" in self.columns
+        self._has_portfolio = "portfolio_id" in self.columns
+        # the columns of every index, their stored values tell where a row is indexed
+        self._tracked_columns = tuple(
+            dict.fromkeys(
+                (("portfolio_id",) if self._has_portfolio else ())
+                + tuple(column for key in self._unique_keys for column in key)
+                + self.indexed_columns
+            )
+        )
+        # read in one call, as a write reads them every time
+        getter = attrgetter(*self._tracked_columns)
+        if len(self._tracked_columns) == 1:
+            self._tracked_values = lambda entity: (getter(entity),)
+        else:
+            self._tracked_values = getter
+        self._positions: Dict[Any, Any] = {
+            column: self._tracked_columns.index(column)
+            for column in self.indexed_columns
+        }
+        for key in self._unique_keys:
+            self._positions[key] = tuple(
+                self._tracked_columns.index(column) for column in key
+            )
+        self._rows: Dict[str, EntityModel] = dict()
+        self._by_write: Dict[str, EntityModel] = dict()
+        self._tracked: Dict[str, Tuple[Any, ...]] = dict()
+        self._by_portfolio: Dict[str, Dict[str, EntityModel]] = dict()
+        self._unique: Dict[Tuple[str, ...], Dict[Tuple[Any, ...], EntityModel]] = {
+            key: dict() for key in self._unique_keys
+        }
+        self._index: Dict[str, Dict[Any, Dict[str, EntityModel]]] = {
+            column: dict() for column in self.indexed_columns
+        }
+
+    def clear(self) -> None:
+        """Drops every row."""
+        with self._lock:
+            self._rows.clear()
+            self._by_write.clear()
+            self._tracked.clear()
+            self._by_portfolio.clear()
+            for rows in self._unique.values():
+                rows.clear()
+            for index in self._index.values():
+                index.clear()
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Returns the column values of every row, e.g. to dump them."""
+        with self._lock:
+            return [
+                {column: getattr(entity, column) for column in self.columns}
+                for entity in self._rows.values()
+            ]
+
+    async def create(self, data: BaseModel) -> EntityModel:
+        entity = self._build(data)
+        with self._lock:
+            self._insert(entity)
+        return entity
+
+    async def create_many(self, data: List[BaseModel]) -> List[EntityModel]:
+        entities = [self._build(d) for d in data]
+        inserted: List[EntityModel] = list()
+        with self._lock:
+            try:
+                for entity in entities:
+                    self._insert(entity)
+                    inserted.append(entity)
+            except IntegrityConflictException:
+                # all or nothing, as the single transaction of the database
+                for entity in inserted:
+                    self._delete(entity)
+                raise
+        return entities
+
+    async def get_one_by_id(
+        self, id_: str, column: str = "id", with_for_update: bool = False
+    ) -> Optional[EntityModel]:
+        with self._lock:
+            entities = self._find(column, id_)
+        if len(entities) > 1:
+            raise MultipleResultsFound(f"{len(entities)} rows have {column}={id_}")
+        return entities[0] if entities else None
+
+    async def get_many_by_ids(
+        self,
+        ids: Optional[List[str]],
+        column: str = "id",
+        with_for_update: bool = False,
+    ) -> List[EntityModel]:
+        with self._lock:
+            if not ids:
+                return list(self._rows.values())
+            return [entity for id_ in ids for entity in self._find(column, id_)]
+
+    async def update_entity(self, entity: EntityModel) -> None:
+        with self._lock:
+            stored = self._rows.get(entity.id)
+            if stored is None:
+                if self._is_versioned:
+                    raise VersionConflict(
+                        f"{self.model.__tablename__} {entity.id} changed since version "
+                        f"{entity.version}"
+                    )
+                # not stored yet, keep the insert-or-update semantics of merge
+                self._insert(entity)
+                return
+            if stored is not entity:
+                if self._is_versioned and stored.version != entity.version:
+                    raise VersionConflict(
+                        f"{self.model.__tablename__} {entity.id} changed since version "
+                        f"{entity.version}"
+                    )
+                for column in self.columns:
+                    if column not in ("id", "created_at"):
+                        setattr(stored, column, getattr(entity, column))
+                if self._is_versioned:
+                    entity.version += 1
+            self._write(stored)
+
+    async def update_by_id(
+        self, data: BaseModel, id_: str, column: str = "id"
+    ) -> EntityModel:
+        with self._lock:
+            entity = await self.get_one_by_id(id_=id_, column=column)
+            if not entity:
+                raise NotFoundException(
+                    f"{self.model.__tablename__} {column}={id_} not found.",
+                )
+            self._assign(entity, data.model_dump(exclude_unset=True))
+        return entity
+
+    async def update_many_by_ids(
+        self, updates: Dict[str, BaseModel], column: str = "id"
+    ) -> List[EntityModel]:
+        entities = list()
+        with self._lock:
+            for id_, update in updates.items():
+                if not update:
+                    continue
+                for entity in self._find(column, str(id_)):
+                    self._assign(entity, update.model_dump(exclude_unset=True))
+                    entities.append(entity)
+        return entities
+
+    async def remove_by_id(self, id_: str, column: str = "id") -> int:
+        with self._lock:
+            entities = self._find(column, id_)
+            for entity in entities:
+                self._delete(entity)
+        return len(entities)
+
+    async def remove_many_by_ids(self, ids: List[str], column: str = "id") -> int:
+        if not ids:
+            raise EntityException("No ids provided.")
+        with self._lock:
+            return sum([await self.remove_by_id(id_=id_, column=column) for id_ in ids])
+
+    async def get_entities_by_portfolio_id(
+        self, portfolio_id: str, with_for_update: bool = False
+    ) -> List[EntityModel]:
+        with self._lock:
+            return list(self._by_portfolio.get(portfolio_id, {}).values())
+
+    async def get_rows_by_portfolio_id(
+        self,
+        portfolio_id: str,
+        columns: Sequence[str],
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        filters = {
+            column: value
+            for column, value in (filters or {}).items()
+            if value is not None
+        }
+        with self._lock:
+            return [
+                {column: getattr(entity, column) for column in columns}
+                for entity in self._by_portfolio.get(portfolio_id, {}).values()
+                if all(
+                    getattr(entity, column) == value
+                    for column, value in filters.items()
+                )
+            ]
+
+    async def stream_rows_by_portfolio_id(
+        self,
+        portfolio_id: str,
+        status: Optional[Enum] = None,
+        yield_per: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # copied first, the rows may change while the stream is consumed; the lock is
+        # never held across a yield, which would hand it to the consumer
+        with self._lock:
+            entities = list(self._by_portfolio.get(portfolio_id, {}).values())
+        for entity in entities:
+            with self._lock:
+                if status is not None and entity.status != status:
+                    continue
+                row = {column: getattr(entity, column) for column in self.columns}
+            yield row
+
+    def _build(self, data: BaseModel) -> EntityModel:
+        entity = self.model(**data.model_dump())
+        for column, default in self._defaults:
+            if getattr(entity, column) is None:
+                setattr(
+                    entity,
+                    column,
+                    default.arg(None) if default.is_callable else default.arg,
+                )
+        return entity
+
+    def _assign(self, entity: EntityModel, values: Dict[str, Any]) -> None:
+        for column, value in values.items():
+            setattr(entity, column, value)
+        self._write(entity)
+
+    def _where(self, column: str, value: Any) -> List[EntityModel]:
+        """Rows with an indexed column value, rechecked as entities are shared and
+        may have been changed without being written yet."""
+        return [
+            entity
+            for entity in self._index[column].get(value, {}).values()
+            if getattr(entity, column) == value
+        ]
+
+    def _find(self, column: str, value: Any) -> List[EntityModel]:
+        if column == "id":
+            entity = self._rows.get(value)
+            return [entity] if entity is not None else []
+        if (column,) in self._unique:
+            entity = self._unique[(column,)].get((value,))
+            return [entity] if entity is not None else []
+        if column in self._index:
+            return self._where(column, value)
+        if column not in self.columns:
+            raise EntityException(
+                f"Column {column} not found on {self.model.__tablename__}.",
+            )
+        return [
+            entity for entity in self._rows.values() if getattr(entity, column) == value
+        ]
+
+    def _updated_since(self, moment: datetime) -> List[EntityModel]:
+        """Rows last written at or after a moment, as long as the simulation clock
+        never went back."""
+        entities = list()
+        for entity in reversed(self._by_write.values()):
+            if entity.updated_at < moment:
+                break
+            entities.append(entity)
+        entities.reverse()
+        return entities
+
+    def _insert(self, entity: EntityModel) -> None:
+        if entity.id in self._rows:
+            raise IntegrityConflictException(
+                f"{self.model.__tablename__} conflicts with existing data.",
+            )
+        self._check_unique(entity)
+        self._rows[entity.id] = entity
+        self._by_write[entity.id] = entity
+        self._track(entity, self._tracked_values(entity))
+
+    def _write(self, entity: EntityModel) -> None:
+        entity.updated_at = SimulationClock().now()
+        if self._is_versioned:
+            entity.version += 1
+        # moved to the end, the rows stay in their order of last write
+        self._by_write.pop(entity.id, None)
+        self._by_write[entity.id] = entity
+        tracked = self._tracked_values(entity)
+        if tracked != self._tracked.get(entity.id):
+            self._untrack(entity)
+            try:
+                self._check_unique(entity)
+            finally:
+                self._track(entity, tracked)
+
+    def _delete(self, entity: EntityModel) -> None:
+        self._untrack(entity)
+        self._rows.pop(entity.id, None)
+        self._by_write.pop(entity.id, None)
+
+    def _check_unique(self, entity: EntityModel) -> None:
+        for key, rows in self._unique.items():
+            other = rows.get(tuple(getattr(entity, column) for column in key))
+            if other is not None and other.id != entity.id:
+                raise IntegrityConflictException(
+                    f"{self.model.__tablename__} conflicts with existing data.",
+                )
+
+    def _track(self, entity: EntityModel, tracked: Tuple[Any, ...]) -> None:
+        self._tracked[entity.id] = tracked
+        if self._has_portfolio:
+            self._by_portfolio.setdefault(tracked[0], {})[entity.id] = entity
+        for key, rows in self._unique.items():
+            rows.setdefault(tuple(tracked[i] for i in self._positions[key]), entity)
+        for column, index in self._index.items():
+            index.setdefault(tracked[self._positions[column]], {})[entity.id] = entity
+
+    def _untrack(self, entity: EntityModel) -> None:
+        tracked = self._tracked.pop(entity.id, None)
+        if tracked is None:
+            return
+        if self._has_portfolio:
+            self._by_portfolio.get(tracked[0], {}).pop(entity.id, None)
+        for key, rows in self._unique.items():
+            values = tuple(tracked[i] for i in self._positions[key])
+            if rows.get(values) is entity:
+                del rows[values]
+        for column, index in self._index.items():
+            index.get(tracked[self._positions[column]], {}).pop(entity.id, None)
+
+
+@singleton
+class InMemoryOrderRepository(InMemoryRepository, OrderRepository):
+    indexed_columns = ("status",)
+
+    async def get_all_order(
+        self, status: Optional[OrderStatus] = None, with_for_update: bool = False
+    ) -> List[Order]:
+        with self._lock:
+            if status:
+                return self._where("status", status)
+            return list(self._rows.values())
+
+    async def get_filled_perp_orders(
+        self,
+        from_update_time: Optional[datetime] = None,
+        with_for_update: bool = False,
+    ) -> List[Order]:
+        with self._lock:
+            if from_update_time:
+                orders: Iterable[Order] = self._updated_since(from_update_time)
+            else:
+                orders = self._where("status", OrderStatus.FILLED)
+            market_specs = MarketSpecRegistry()
+            return [
+                order
+                for order in orders
+                if order.status == OrderStatus.FILLED
+                and market_specs.get(order.market).is_perpetual
+            ]
+
+
+@singleton
+class InMemoryPositionRepository(InMemoryRepository, PositionRepository):
+    indexed_columns = ("status",)
+
+    async def get_all_positions(
+        self,
+        portfolio_id: Optional[str] = None,
+        market: Optional[Market] = None,
+        status: Optional[PositionStatus] = None,
+        side: Optional[PositionSide] = None,
+        with_for_update: bool = False,
+    ) -> List[Position]:
+        with self._lock:
+            if portfolio_id:
+                positions: Iterable[Position] = self._by_portfolio.get(
+                    portfolio_id, {}
+                ).values()
+            elif status:
+                positions = self._where("status", status)
+            else:
+                positions = self._rows.values()
+            return [
+                position
+                for position in positions
+                if (not status or position.status == status)
+                and (not side or position.side == side)
+                and (not market or position.market == market)
+            ]
+
+    async def get_by_portfolio_and_market(
+        self, portfolio_id: str, market: Market, with_for_update: bool = False
+    ) -> Optional[Position]:
+        positions = await self.get_all_positions(
+            portfolio_id=portfolio_id, market=market
+        )
+        if len(positions) > 1:
+            raise MultipleResultsFound(f"{len(positions)} positions of {market=}")
+        return positions[0] if positions else None
+
+
+@singleton
+class InMemoryBalanceRepository(InMemoryRepository, BalanceRepository):
+    async def get_all_balances(self, with_for_update: bool = False) -> List[Balance]:
+        with self._lock:
+            return list(self._rows.values())
+
+    async def get_portfolio_asset(
+        self, portfolio_id: str, asset: Asset, with_for_update: bool = False
+    ) -> Optional[Balance]:
+        with self._lock:
+            return self._unique[("portfolio_id", "asset")].get((portfolio_id, asset))
+
+    async def apply_mutation(
+        self,
+        portfolio_id: str,
+        asset: Asset,
+        mutation: Callable[[Balance], None],
+    ) -> Optional[Balance]:
+        with self._lock:
+            balance = self._unique[("portfolio_id", "asset")].get((portfolio_id, asset))
+            if not balance:
+                return None
+            mutation(balance)
+            self._write(balance)
+        return balance
+
+
+@singleton
+class InMemoryLeverageRepository(InMemoryRepository, LeverageRepository):
+    async def get_all_leverages(self, with_for_update: bool = False) -> List[Leverage]:
+        with self._lock:
+            return list(self._rows.values())
+
+    async def get_leverage_by_portfolio_id_and_market(
+        self, portfolio_id: str, market: Market, with_for_update: bool = False
+    ) -> Optional[Leverage]:
+        with self._lock:
+            return self._unique[("portfolio_id", "market")].get((portfolio_id, market))
+
+
+@singleton
+class InMemoryPortfolioRepository(InMemoryRepository, PortfolioRepository):
+    async def get_state(self, portfolio_id: str) -> Optional[PortfolioState]:
+        # the tables share the lock, which the reads below take again without waiting
+        with self._lock:
+            portfolio = self._rows.get(portfolio_id)
+            if portfolio is None:
+                return None
+            positions = await InMemoryPositionRepository().get_all_positions(
+                portfolio_id=portfolio_id, status=PositionStatus.OPEN
+            )
+            orders = await InMemoryOrderRepository().get_entities_by_portfolio_id(
+                portfolio_id=portfolio_id
+            )
+            balances = await InMemoryBalanceRepository().get_entities_by_portfolio_id(
+                portfolio_id=portfolio_id
+            )
+            leverages = await InMemoryLeverageRepository().get_entities_by_portfolio_id(
+                portfolio_id=portfolio_id
+            )
+            return PortfolioState(
+                portfolio=portfolio,
+                balances=balances,
+                positions=positions,
+                orders=[o for o in orders if o.status == OrderStatus.ACTIVE],
+                leverages=leverages,
+            )
+
+    async def get_stats(
+        self,
+        portfolio_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Optional[PortfolioStats]:
+        with self._lock:
+            if portfolio_id not in self._rows:
+                return None
+
+            def in_window(entity: Any) -> bool:
+                return (not since or entity.updated_at >= since) and (
+                    not until or entity.updated_at < until
+                )
+
+            orders: Dict[Tuple[Market, Any], Dict[str, Any]] = dict()
+            for order in await InMemoryOrderRepository().get_entities_by_portfolio_id(
+                portfolio_id=portfolio_id
+            ):
+                if order.status != OrderStatus.FILLED or not in_window(order):
+                    continue
+                group = orders.setdefault(
+                    (order.market, order.side),
+                    {
+                        "market": order.market,
+                        "side": order.side,
+                        "orders": 0,
+                        "volume": 0.0,
+                        "fees": 0.0,
+                    },
+                )
+                group["orders"] += 1
+                group["volume"] += order.price * order.size
+                group["fees"] += order.fee
+
+            positions: Dict[PositionStatus, Dict[str, Any]] = dict()
+            for (
+                position
+            ) in await InMemoryPositionRepository().get_entities_by_portfolio_id(
+                portfolio_id=portfolio_id
+            ):
+                if not in_window(position):
+                    continue
+                group = positions.setdefault(
+                    position.status,
+                    {"status": position.status, "positions": 0, "pnl": 0.0, "wins": 0},
+                )
+                group["positions"] += 1
+                group["pnl"] += position.pnl
+                group["wins"] += position.pnl > 0
+            return PortfolioStats(
+                orders=list(orders.values()), positions=list(positions.values())
+            )
+
+
+@singleton
+class InMemorySeedRepository(SeedRepository):
+    """`SeedRepository` loading the portfolios into the in-memory storage."""
+
+    async def seed(self, portfolios: List[SeedPortfolioSchema]) -> SeedResponseSchema:
+        portfolio_repo = InMemoryPortfolioRepository()
+        balance_repo = InMemoryBalanceRepository()
+        leverage_repo = InMemoryLeverageRepository()
+        # one seed at a time, and never seen half done by the engines
+        with InMemoryRepository._lock:
+            balances = leverages = 0
+            for seeded in portfolios:
+                portfolio = await portfolio_repo.get_by_name(name=seeded.name)
+                if portfolio:
+                    await portfolio_repo.update_by_id(
+                        data=PortfolioSchema(
+                            **seeded.model_dump(
+                                include={"name", *PORTFOLIO_FEE_COLUMNS}
+                            )
+                        ),
+                        id_=portfolio.id,
+                    )
+                else:
+                    portfolio = await portfolio_repo.create(
+                        data=PortfolioSchema(
+                            **seeded.model_dump(
+                                include={"name", *PORTFOLIO_FEE_COLUMNS}
+                            )
+                        )
+                    )
+                for seeded_balance in seeded.balances:
+                    quantity = seeded_balance.quantity
+
+                    def deposit(balance: Balance) -> None:
+                        balance.quantity += quantity
+                        balance.available += quantity
+
+                    if not await balance_repo.apply_mutation(
+                        portfolio_id=portfolio.id,
+                        asset=seeded_balance.asset,
+                        mutation=deposit,
+                    ):
+                        await balance_repo.create(
+                            data=BalanceSchema(
+                                portfolio_id=portfolio.id,
+                                asset=seeded_balance.asset,
+                                quantity=quantity,
+                                available=quantity,
+                                frozen=0,
+                            )
+                        )
+                    balances += 1
+                for seeded_leverage in seeded.leverages:
+                    leverage = (
+                        await leverage_repo.get_leverage_by_portfolio_id_and_market(
+                            portfolio_id=portfolio.id, market=seeded_leverage.market
+                        )
+                    )
+                    if leverage:
+                        leverage.leverage = seeded_leverage.leverage
+                        await leverage_repo.update_entity(leverage)
+                    else:
+                        await leverage_repo.create(
+                            data=LeverageSchema(
+                                portfolio_id=portfolio.id,
+                                market=seeded_leverage.market,
+                                leverage=seeded_leverage.leverage,
+                            )
+                        )
+                    leverages += 1
+        return SeedResponseSchema(
+            portfolios=len(portfolios), balances=balances, leverages=leverages
+        )
+
+
+@singleton
+class InMemoryStorage:
+    """
+    The in-memory tables, which the services use instead of the database while
+    `IN_MEMORY_STORAGE_ENABLED` is set.
+
+    Attributes:
+        repositories (Tuple[InMemoryRepository, ...]): The tables, in the order their
+            foreign keys need them written.
+    """
+
+    def __init__(self):
+        self.repositories: Tuple[InMemoryRepository, ...] = (
+            InMemoryPortfolioRepository(),
+            InMemoryBalanceRepository(),
+            InMemoryLeverageRepository(),
+            InMemoryPositionRepository(),
+            InMemoryOrderRepository(),
+        )
+
+    def clear(self) -> None:
+        """Drops every row of every table."""
+        with InMemoryRepository._lock:
+            for repository in self.repositories:
+                repository.clear()
+
+    async def dump(self) -> Dict[str, int]:
+        """Writes every table to the database in one transaction.
+
+        Rows are upserted by id, so dumping again only updates the rows dumped before.
+
+        Returns:
+            Dict[str, int]: The number of rows written per table.
+        """
+        # a consistent copy of every table, as the lock cannot be held across the writes
+        with InMemoryRepository._lock:
+            tables = [
+                (repository, repository.rows()) for repository in self.repositories
+            ]
+        dumped: Dict[str, int] = dict()
+        async with DatabaseProvider().get_new_seddion() as session:
+            for repository, rows in tables:
+                model = repository.model
+                if session.bind.dialect.name == "postgresql":
+                    stmt = postgresql.insert(model)
+                else:
+                    stmt = sqlite.insert(model)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[model.id],
+                    set_={
+                        column: stmt.excluded[column]
+                        for column in repository.columns
+                        if column != "id"
+                    },
+                )
+                for start in range(0, len(rows), DUMP_BATCH_SIZE):
+                    await session.execute(stmt, rows[start : start + DUMP_BATCH_SIZE])
+                dumped[model.__tablename__] = len(rows)
+            await session.commit()
+        LOGGER.info(f"dumped the in-memory storage: {dumped}")
+        return dumped
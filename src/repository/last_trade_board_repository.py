@@ -0,0 +1,185 @@
+from enum import Enum
+from typing import Dict, Optional, Tuple, Union
+
+from fifi import MarketDataRepository
+from fifi.enums import Market
+from fifi.helpers.get_logger import LoggerFactory
+from fifi.repository.shm.shm_base_repository import SHMBaseRepository, check_reader
+
+from ..common.settings import Setting
+
+LOGGER = LoggerFactory().get(__name__)
+
+# every market has a fixed row, so the board layout never depends on ACTIVE_MARKETS
+MARKET_ROWS = {market: row for row, market in enumerate(Market)}
+# a reader gives up after this many torn reads, e.g. when the writer died mid-update
+SEQLOCK_MAX_SPINS = 10000
+
+
+class LastTradeBoard(Enum):
+    SEQ = 0
+    LAST_TRADE = 1
+    TIME = 2
+
+
+SEQ = LastTradeBoard.SEQ.value
+LAST_TRADE = LastTradeBoard.LAST_TRADE.value
+TIME = LastTradeBoard.TIME.value
+ROW_SIZE = len(LastTradeBoard)
+
+
+class LastTradeBoardRepository(SHMBaseRepository):
+    """
+    Shared-memory board of the last trade and its time for every market.
+
+    One market data feeder process writes the board and every engine and API process
+    reads it, so they all see the same prices. Each market row is guarded by a
+    seqlock: the writer makes the row's sequence odd, writes the values and makes it
+    even again, and a reader retries until it reads the same even sequence before and
+    after the values. Reads are plain memory accesses without locks or syscalls.
+
+    A row which can not be read consistently reads as a zero last trade, which the
+    market data snapshot treats as stale.
+    """
+
+    def __init__(self, name: Optional[str] = None, create: bool = False) -> None:
+        super().__init__(
+            name=name or Setting().LAST_TRADE_BOARD_NAME,
+            rows=len(MARKET_ROWS),
+            columns=ROW_SIZE,
+            create=create,
+        )
+        # flat view of the same buffer, indexing it is much cheaper than numpy's
+        self._cells = self._sm.buf.cast("d")
+
+    @check_reader
+    def write(self, market: Market, last_trade: float, time: float) -> None:
+        cells = self._cells
+        base = MARKET_ROWS[market] * ROW_SIZE
+        cells[base + SEQ] += 1
+        cells[base + LAST_TRADE] = last_trade
+        cells[base + TIME] = time
+        cells[base + SEQ] += 1
+
+    def read(self, market: Market) -> Tuple[float, float]:
+        """Reads the last trade and its time of a market.
+
+        Args:
+            market (Market): The market.
+
+        Returns:
+            Tuple[float, float]: The last trade and its time, zeros if the row is
+                being written for too long.
+        """
+        cells = self._cells
+        base = MARKET_ROWS[market] * ROW_SIZE
+        for _ in range(SEQLOCK_MAX_SPINS):
+            seq = cells[base + SEQ]
+            if seq % 2:
+                continue
+            last_trade = cells[base + LAST_TRADE]
+            time = cells[base + TIME]
+            if cells[base + SEQ] == seq:
+                return last_trade, time
+        self.LOGGER.warning(f"torn read of {market=} on the last trade board")
+        return 0.0, 0.0
+
+    def market_view(self, market: Market) -> "LastTradeBoardMarketView":
+        return LastTradeBoardMarketView(board=self, market=market)
+
+    def close(self) -> None:
+        # the views have to release the shared buffer before it can be closed
+        cells = self.__dict__.pop("_cells", None)
+        if cells is not None:
+            cells.release()
+        self.__dict__.pop("_data", None)
+        super().close()
+
+
+class LastTradeBoardReader:
+    """
+    The last trade board as read by an engine or API worker, attached on first read.
+
+    The board is created by the market data feeder of the worker owning the engines,
+    which may come up after this reader is made, e.g. in a worker which does not own
+    them. Until the board exists every read tries to attach to it and falls back to
+    the market monitoring data, as without the board.
+
+    Attributes:
+        name (str): Name of the board's shared memory.
+        board (Optional[LastTradeBoardRepository]): The board, once attached.
+    """
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        self.name = name or Setting().LAST_TRADE_BOARD_NAME
+        self.board: Optional[LastTradeBoardRepository] = None
+        self._fallbacks: Dict[Market, MarketDataRepository] = dict()
+
+    def read(self, market: Market) -> Tuple[float, float]:
+        """Reads the last trade and its time of a market, from the board if it exists.
+
+        Args:
+            market (Market): The market.
+
+        Returns:
+            Tuple[float, float]: The last trade and its time.
+        """
+        if self.board or self._attach():
+            return self.board.read(market)
+        repo = self._fallbacks.get(market)
+        if repo is None:
+            repo = MarketDataRepository(market=market, interval="1m")
+            self._fallbacks[market] = repo
+        return float(repo.get_last_trade()), float(repo.get_time())
+
+    def market_view(self, market: Market) -> "LastTradeBoardMarketView":
+        return LastTradeBoardMarketView(board=self, market=market)
+
+    def close(self) -> None:
+        self._close_fallbacks()
+        if self.board:
+            self.board.close()
+            self.board = None
+
+    def _attach(self) -> bool:
+        try:
+            self.board = LastTradeBoardRepository(name=self.name)
+        except FileNotFoundError:
+            return False
+        LOGGER.info(f"attached to the last trade board {self.name}")
+        self._close_fallbacks()
+        return True
+
+    def _close_fallbacks(self) -> None:
+        for repo in self._fallbacks.values():
+            repo.close()
+        self._fallbacks.clear()
+
+
+class LastTradeBoardMarketView:
+    """
+    One market of the last trade board, read through the same methods as
+    `MarketDataRepository`, so the engines can use either as their market data.
+    `read_tick` reads the last trade and its time together, from one consistent read.
+    """
+
+    def __init__(
+        self,
+        board: Union[LastTradeBoardRepository, LastTradeBoardReader],
+        market: Market,
+    ) -> None:
+        self.board = board
+        self.market = market
+
+    def read_tick(self) -> Tuple[float, float]:
+        return self.board.read(self.market)
+
+    def get_last_trade(self) -> float:
+        return self.board.read(self.market)[0]
+
+    def get_time(self) -> float:
+        return self.board.read(self.market)[1]
+
+    def close(self) -> None:
+        # the board is shared by every market and closed by its owner
+        pass
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from sqlalchemy import and_, select
+from sqlalchemy import and_, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fifi import db_async_session
@@ -22,10 +22,10 @@ class LeverageRepository(SimulatorBaseRepository):
     ) -> List[Leverage]:
         if not session:
             raise NotExistedSessionException("session is not existed")
-        stmt = select(self.model)
+        stmt = lambda_stmt(lambda: select(Leverage))
 
         if with_for_update:
-            stmt = stmt.with_for_update()
+            stmt += lambda s: s.with_for_update()
 
         results = await session.execute(stmt)
         return list(results.scalars().all())
@@ -40,12 +40,13 @@ class LeverageRepository(SimulatorBaseRepository):
     ) -> Optional[Leverage]:
         if not session:
             raise NotExistedSessionException("session is not existed")
-        stmt = select(self.model).where(
+        stmt = lambda_stmt(lambda: select(Leverage))
+        stmt += lambda s: s.where(
             and_(Leverage.portfolio_id == portfolio_id, Leverage.market == market)
         )
 
         if with_for_update:
-            stmt = stmt.with_for_update()
+            stmt += lambda s: s.with_for_update()
 
         result = await session.execute(stmt)
         return result.unique().scalar_one_or_none()
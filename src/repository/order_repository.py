@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import Text, and_, cast, select
+from sqlalchemy import Text, and_, cast, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fifi.enums import OrderStatus
@@ -48,12 +48,12 @@ class OrderRepository(SimulatorBaseRepository):
         """
         if not session:
             raise NotExistedSessionException("session is not existed")
-        stmt = select(self.model)
+        stmt = lambda_stmt(lambda: select(Order))
         if status:
-            stmt = stmt.where(Order.status == status)
+            stmt += lambda s: s.where(Order.status == status)
 
         if with_for_update:
-            stmt = stmt.with_for_update()
+            stmt += lambda s: s.with_for_update()
 
         results = await session.execute(stmt)
         return list(results.scalars().all())
@@ -85,17 +85,18 @@ class OrderRepository(SimulatorBaseRepository):
         """
         if not session:
             raise NotExistedSessionException("session is not existed")
-        stmt = select(self.model).where(
+        stmt = lambda_stmt(lambda: select(Order))
+        stmt += lambda s: s.where(
             and_(
                 Order.status == OrderStatus.FILLED,
                 cast(Order.market, Text).ilike("%perp%"),
             )
         )
         if from_update_time:
-            stmt = stmt.where(Order.updated_at >= from_update_time)
+            stmt += lambda s: s.where(Order.updated_at >= from_update_time)
 
         if with_for_update:
-            stmt = stmt.with_for_update()
+            stmt += lambda s: s.with_for_update()
 
         results = await session.execute(stmt)
         return list(results.scalars().all())
@@ -1,7 +1,36 @@
-from typing import Optional
-from fifi import Repository
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fifi import Repository, db_async_session
+from fifi.enums import OrderStatus, PositionStatus
+from fifi.exceptions import NotExistedSessionException
+
+from ..common.sqlite_profile import SqliteProfile
+
+from ..models.balance import Balance
+from ..models.leverage import Leverage
+from ..models.order import Order
 from ..models.portfolio import Portfolio
+from ..models.position import Position
+
+
+class PortfolioState(NamedTuple):
+    """Everything a strategy needs to resume trading a portfolio."""
+
+    portfolio: Portfolio
+    balances: List[Balance]
+    positions: List[Position]
+    orders: List[Order]
+    leverages: List[Leverage]
+
+
+class PortfolioStats(NamedTuple):
+    """Aggregates of a portfolio's trading, grouped as the database computed them."""
+
+    orders: List[Dict[str, Any]]
+    positions: List[Dict[str, Any]]
 
 
 class PortfolioRepository(Repository):
@@ -44,3 +73,152 @@ class PortfolioRepository(Repository):
             int: The number of records deleted (typically 1 if successful, 0 otherwise).
         """
         return await self.remove_by_id(id_=name, column="name")
+
+    @db_async_session
+    async def get_state(
+        self, portfolio_id: str, session: Optional[AsyncSession] = None
+    ) -> Optional[PortfolioState]:
+        """
+        Retrieve a portfolio with its balances, open positions, active orders and
+        leverages as of one point in time.
+
+        Every query runs in the same read transaction, so the state is a consistent
+        snapshot even while the engines keep writing. On SQLite the transaction is
+        begun explicitly before the first query, unless `SqliteProfile` begins it,
+        because the driver only begins one before a write; other databases are asked
+        for repeatable read. All the queries go to the same database, which is the
+        read replica when it serves the request.
+
+        Args:
+            portfolio_id (str): The ID of the portfolio.
+            session (Optional[AsyncSession]): SQLAlchemy asynchronous session. If not provided, an exception is raised.
+
+        Returns:
+            Optional[PortfolioState]: The portfolio state, or None if the portfolio does not exist.
+
+        Raises:
+            NotExistedSessionException: If the session is not provided.
+        """
+        if not session:
+            raise NotExistedSessionException("session is not existed")
+        # resolved once, a read replica turning stale halfway must not split the reads
+        bind_arguments = {"bind": session.get_bind(mapper=Portfolio)}
+        if bind_arguments["bind"].dialect.name != "sqlite":
+            await session.connection(
+                bind_arguments=bind_arguments,
+                execution_options={"isolation_level": "REPEATABLE READ"},
+            )
+        else:
+            connection = await session.connection(bind_arguments=bind_arguments)
+            if not SqliteProfile.begins_transaction(connection):
+                # the driver would run each SELECT in a transaction of its own
+                await connection.exec_driver_sql("BEGIN")
+        portfolio = await session.scalar(
+            select(Portfolio).where(Portfolio.id == portfolio_id),
+            bind_arguments=bind_arguments,
+        )
+        if portfolio is None:
+            return None
+        balances = await session.scalars(
+            select(Balance).where(Balance.portfolio_id == portfolio_id),
+            bind_arguments=bind_arguments,
+        )
+        positions = await session.scalars(
+            select(Position).where(
+                Position.portfolio_id == portfolio_id,
+                Position.status == PositionStatus.OPEN,
+            ),
+            bind_arguments=bind_arguments,
+        )
+        orders = await session.scalars(
+            select(Order).where(
+                Order.portfolio_id == portfolio_id,
+                Order.status == OrderStatus.ACTIVE,
+            ),
+            bind_arguments=bind_arguments,
+        )
+        leverages = await session.scalars(
+            select(Leverage).where(Leverage.portfolio_id == portfolio_id),
+            bind_arguments=bind_arguments,
+        )
+        return PortfolioState(
+            portfolio=portfolio,
+            balances=list(balances.all()),
+            positions=list(positions.all()),
+            orders=list(orders.all()),
+            leverages=list(leverages.all()),
+        )
+
+    @db_async_session
+    async def get_stats(
+        self,
+        portfolio_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> Optional[PortfolioStats]:
+        """
+        Aggregate the filled orders of a portfolio by market and side, and its
+        positions by status, without loading any of them.
+
+        Orders are counted with their volume (price times size) and fees; positions
+        with their realized pnl and how many of them have a positive one. The time
+        window applies to `updated_at`, i.e. when an order was filled or a position
+        last realized pnl.
+
+        Args:
+            portfolio_id (str): The ID of the portfolio.
+            since (Optional[datetime]): Only count rows updated at or after this time.
+            until (Optional[datetime]): Only count rows updated before this time.
+            session (Optional[AsyncSession]): SQLAlchemy asynchronous session. If not provided, an exception is raised.
+
+        Returns:
+            Optional[PortfolioStats]: The aggregates, or None if the portfolio does not exist.
+
+        Raises:
+            NotExistedSessionException: If the session is not provided.
+        """
+        if not session:
+            raise NotExistedSessionException("session is not existed")
+        if await session.get(Portfolio, portfolio_id) is None:
+            return None
+
+        orders_stmt = (
+            select(
+                Order.market,
+                Order.side,
+                func.count().label("orders"),
+                func.coalesce(func.sum(Order.price * Order.size), 0.0).label("volume"),
+                func.coalesce(func.sum(Order.fee), 0.0).label("fees"),
+            )
+            .where(
+                Order.portfolio_id == portfolio_id,
+                Order.status == OrderStatus.FILLED,
+            )
+            .group_by(Order.market, Order.side)
+        )
+        positions_stmt = (
+            select(
+                Position.status,
+                func.count().label("positions"),
+                func.coalesce(func.sum(Position.pnl), 0.0).label("pnl"),
+                func.coalesce(func.sum(case((Position.pnl > 0, 1), else_=0)), 0).label(
+                    "wins"
+                ),
+            )
+            .where(Position.portfolio_id == portfolio_id)
+            .group_by(Position.status)
+        )
+        if since:
+            orders_stmt = orders_stmt.where(Order.updated_at >= since)
+            positions_stmt = positions_stmt.where(Position.updated_at >= since)
+        if until:
+            orders_stmt = orders_stmt.where(Order.updated_at < until)
+            positions_stmt = positions_stmt.where(Position.updated_at < until)
+
+        orders = await session.execute(orders_stmt)
+        positions = await session.execute(positions_stmt)
+        return PortfolioStats(
+            orders=[dict(row) for row in orders.mappings()],
+            positions=[dict(row) for row in positions.mappings()],
+        )
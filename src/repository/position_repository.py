@@ -1,5 +1,5 @@
 from typing import List, Optional
-from sqlalchemy import and_, select
+from sqlalchemy import and_, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fifi import db_async_session
@@ -51,18 +51,18 @@ class PositionRepository(SimulatorBaseRepository):
         """
         if not session:
             raise NotExistedSessionException("session is not existed")
-        stmt = select(self.model)
+        stmt = lambda_stmt(lambda: select(Position))
         if portfolio_id:
-            stmt = stmt.where(Position.portfolio_id == portfolio_id)
+            stmt += lambda s: s.where(Position.portfolio_id == portfolio_id)
         if status:
-            stmt = stmt.where(Position.status == status)
+            stmt += lambda s: s.where(Position.status == status)
         if side:
-            stmt = stmt.where(Position.side == side)
+            stmt += lambda s: s.where(Position.side == side)
         if market:
-            stmt = stmt.where(Position.market == market)
+            stmt += lambda s: s.where(Position.market == market)
 
         if with_for_update:
-            stmt = stmt.with_for_update()
+            stmt += lambda s: s.with_for_update()
 
         results = await session.execute(stmt)
         return list(results.scalars().all())
@@ -77,11 +77,12 @@ class PositionRepository(SimulatorBaseRepository):
     ) -> Optional[Position]:
         if not session:
             raise NotExistedSessionException("session is not existed")
-        stmt = select(self.model).where(
+        stmt = lambda_stmt(lambda: select(Position))
+        stmt += lambda s: s.where(
             and_(Position.market == market, Position.portfolio_id == portfolio_id)
         )
         if with_for_update:
-            stmt = stmt.with_for_update()
+            stmt += lambda s: s.with_for_update()
 
         results = await session.execute(stmt)
         return results.unique().scalar_one_or_none()
@@ -0,0 +1,264 @@
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from fifi import singleton
+from fifi.enums import Market
+from fifi.helpers.get_logger import LoggerFactory
+
+from ..common.clock import SimulatedClock
+from ..common.market_snapshot import MILLISECONDS_THRESHOLD
+from ..common.settings import Setting
+
+LOGGER = LoggerFactory().get(__name__)
+
+# first window of ticks scanned for the next trigger, doubled while none is found
+TRIGGER_SEARCH_WINDOW = 4096
+CANDLE_COLUMNS = ("open", "high", "low", "close")
+PRICE_COLUMNS = ("price", "last_trade")
+
+
+class ReplayTrigger(NamedTuple):
+    """Prices of one market at which an engine pass has something to do: a tick at
+    or below `low` fills a buy or liquidates a long, one at or above `high` fills a
+    sell or liquidates a short."""
+
+    low: float = -np.inf
+    high: float = np.inf
+
+
+def read_columns(path: str) -> Dict[str, np.ndarray]:
+    """Reads the columns of a recorded market data file.
+
+    CSV files need a header row. NumPy files hold a structured array (`.npy`) or one
+    array per column (`.npz`). Parquet files need `pyarrow`.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        Dict[str, np.ndarray]: The columns by lower-cased name.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        table = np.genfromtxt(path, delimiter=",", names=True, dtype=np.float64)
+        columns = {name: table[name] for name in table.dtype.names}
+    elif extension == ".npy":
+        table = np.load(path)
+        columns = {name: table[name] for name in table.dtype.names}
+    elif extension == ".npz":
+        with np.load(path) as arrays:
+            columns = {name: arrays[name] for name in arrays.files}
+    elif extension == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as ex:
+            raise ImportError("replaying parquet files requires pyarrow") from ex
+        table = pq.read_table(path)
+        columns = {name: table.column(name).to_numpy() for name in table.column_names}
+    else:
+        raise ValueError(f"can not replay {path=}, expected csv, npy, npz or parquet")
+    return {
+        name.lower(): np.asarray(values, dtype=np.float64)
+        for name, values in columns.items()
+    }
+
+
+def load_ticks(path: str, candle_interval: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Loads the ticks of one market from recorded trades or candles.
+
+    Trades are replayed as they are. A candle is replayed as four ticks spread over
+    its interval: its open, its low and high in the order a bullish (low first) or
+    bearish (high first) candle most likely traded them, and its close, so resting
+    orders see the candle's extremes.
+
+    Args:
+        path (str): A file with a `time` column and either a `price` (or
+            `last_trade`) column, or `open`, `high`, `low` and `close` columns.
+        candle_interval (float): Seconds covered by one candle.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The tick times in epoch seconds and prices,
+            sorted by time.
+    """
+    columns = read_columns(path)
+    if "time" not in columns:
+        raise ValueError(f"{path=} has no time column")
+    times = columns["time"]
+    if times.size and times.max() > MILLISECONDS_THRESHOLD:
+        times = times / 1000
+    price_column = next((name for name in PRICE_COLUMNS if name in columns), None)
+    if price_column:
+        prices = columns[price_column]
+    elif all(name in columns for name in CANDLE_COLUMNS):
+        open_, high, low, close = (columns[name] for name in CANDLE_COLUMNS)
+        bullish = close >= open_
+        prices = np.column_stack(
+            (open_, np.where(bullish, low, high), np.where(bullish, high, low), close)
+        ).ravel()
+        times = (times[:, np.newaxis] + np.arange(4) * (candle_interval / 4)).ravel()
+    else:
+        raise ValueError(f"{path=} has neither a price nor open/high/low/close columns")
+    order = np.argsort(times, kind="stable")
+    return times[order], prices[order]
+
+
+@singleton
+class ReplayMarketDataRepository:
+    """
+    Recorded market data of several markets, replayed tick by tick on demand.
+
+    The ticks of every market are merged into one timeline, and the replay moves a
+    cursor along it: the ticks up to the cursor are published, the last one of each
+    market being its current last trade and time. Nothing advances with wall time, so
+    a replay runs as fast as its driver moves the cursor, and its clock jumps from one
+    published tick to the next.
+
+    The engines read a market through `market_view`, which has the same methods as
+    `MarketDataRepository`.
+
+    Attributes:
+        times (np.ndarray): Tick times in epoch seconds, merged across markets.
+        prices (np.ndarray): Tick prices.
+        market_ids (np.ndarray): Index into `markets` of every tick's market.
+        markets (List[Market]): The replayed markets.
+        cursor (int): The number of published ticks.
+        clock (SimulatedClock): The replayed time, at the first tick until it is
+            published.
+    """
+
+    def __init__(self, files: Optional[Dict[Market, str]] = None):
+        setting = Setting()
+        files = setting.REPLAY_FILES if files is None else files
+        self.markets: List[Market] = list(files)
+        loaded = [
+            load_ticks(path, candle_interval=setting.REPLAY_CANDLE_INTERVAL)
+            for path in files.values()
+        ]
+        times = np.concatenate([ticks[0] for ticks in loaded] or [np.empty(0)])
+        prices = np.concatenate([ticks[1] for ticks in loaded] or [np.empty(0)])
+        market_ids = np.concatenate(
+            [
+                np.full(len(ticks[0]), i, dtype=np.int16)
+                for i, ticks in enumerate(loaded)
+            ]
+            or [np.empty(0, dtype=np.int16)]
+        )
+        in_window = np.ones(len(times), dtype=bool)
+        if setting.REPLAY_START is not None:
+            in_window &= times >= setting.REPLAY_START
+        if setting.REPLAY_END is not None:
+            in_window &= times < setting.REPLAY_END
+        times, prices, market_ids = (
+            times[in_window],
+            prices[in_window],
+            market_ids[in_window],
+        )
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        self.prices = prices[order]
+        self.market_ids = market_ids[order]
+        # the timeline positions of each market's ticks, to find its latest one
+        self._market_ticks = {
+            market: np.flatnonzero(self.market_ids == i)
+            for i, market in enumerate(self.markets)
+        }
+        self.cursor = 0
+        self._latest: Dict[Market, Tuple[float, float]] = dict()
+        self.clock = SimulatedClock(start=self.start)
+        LOGGER.info(
+            f"loaded {len(self.times)} ticks of {len(self.markets)} markets to replay"
+        )
+
+    @property
+    def exhausted(self) -> bool:
+        return self.cursor >= len(self.times)
+
+    @property
+    def start(self) -> float:
+        """The time of the first tick, 0 without ticks."""
+        return float(self.times[0]) if len(self.times) else 0.0
+
+    @property
+    def now(self) -> float:
+        """The time of the last published tick, 0 before the first one."""
+        return float(self.times[self.cursor - 1]) if self.cursor else 0.0
+
+    def advance_to(self, index: int) -> None:
+        """Publishes the ticks up to and including `index`."""
+        self.cursor = min(index + 1, len(self.times))
+        for market, ticks in self._market_ticks.items():
+            position = np.searchsorted(ticks, self.cursor, side="left") - 1
+            if position >= 0:
+                tick = ticks[position]
+                self._latest[market] = (
+                    float(self.prices[tick]),
+                    float(self.times[tick]),
+                )
+        self.clock.advance_to(self.now)
+
+    def next_trigger(self, triggers: Dict[Market, ReplayTrigger]) -> Optional[int]:
+        """Finds the first unpublished tick reaching one of the trigger prices.
+
+        Args:
+            triggers (Dict[Market, ReplayTrigger]): The trigger prices by market.
+
+        Returns:
+            Optional[int]: The index of the tick, or None if no remaining tick
+                reaches a trigger.
+        """
+        lows = np.full(len(self.markets), -np.inf)
+        highs = np.full(len(self.markets), np.inf)
+        for i, market in enumerate(self.markets):
+            if market in triggers:
+                lows[i], highs[i] = triggers[market]
+        if np.isneginf(lows).all() and np.isposinf(highs).all():
+            return None
+        start, window = self.cursor, TRIGGER_SEARCH_WINDOW
+        while start < len(self.times):
+            end = min(start + window, len(self.times))
+            ids = self.market_ids[start:end]
+            prices = self.prices[start:end]
+            hits = np.flatnonzero((prices <= lows[ids]) | (prices >= highs[ids]))
+            if hits.size:
+                return start + int(hits[0])
+            start, window = end, window * 2
+        return None
+
+    def read(self, market: Market) -> Tuple[float, float]:
+        """Reads the current last trade and its time of a market, zeros before its
+        first tick."""
+        return self._latest.get(market, (0.0, 0.0))
+
+    def rewind(self) -> None:
+        self.cursor = 0
+        self._latest.clear()
+        self.clock.current = self.start
+
+    def market_view(self, market: Market) -> "ReplayMarketView":
+        return ReplayMarketView(replay=self, market=market)
+
+
+class ReplayMarketView:
+    """
+    One market of the replay, read through the same methods as
+    `MarketDataRepository`, so the engines can use it as their market data.
+    """
+
+    def __init__(self, replay: ReplayMarketDataRepository, market: Market) -> None:
+        self.replay = replay
+        self.market = market
+
+    def read_tick(self) -> Tuple[float, float]:
+        return self.replay.read(self.market)
+
+    def get_last_trade(self) -> float:
+        return self.replay.read(self.market)[0]
+
+    def get_time(self) -> float:
+        return self.replay.read(self.market)[1]
+
+    def close(self) -> None:
+        # the replay is shared by every market
+        pass
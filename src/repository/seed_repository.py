@@ -0,0 +1,136 @@
+from typing import Any, Dict, List, Optional, Union
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fifi import Repository, db_async_session
+from fifi.exceptions import NotExistedSessionException
+
+from ..common.clock import SimulationClock
+from ..models import Balance, Leverage, Portfolio
+from ..schemas.seed_schema import SeedPortfolioSchema, SeedResponseSchema
+
+PORTFOLIO_FEE_COLUMNS = (
+    "spot_taker_fee",
+    "spot_maker_fee",
+    "perp_taker_fee",
+    "perp_maker_fee",
+)
+
+
+class SeedRepository(Repository):
+    """
+    Repository loading whole portfolios, with their balances and leverages, in bulk.
+
+    Each table is written with a single multi-row upsert and the three of them share
+    one transaction, so a seed is either fully loaded or not at all.
+
+    Attributes:
+        model (Type[Portfolio]): The SQLAlchemy model associated with this repository.
+    """
+
+    def __init__(self):
+        super().__init__(model=Portfolio)
+
+    @db_async_session
+    async def seed(
+        self,
+        portfolios: List[SeedPortfolioSchema],
+        session: Optional[AsyncSession] = None,
+    ) -> SeedResponseSchema:
+        """
+        Upsert portfolios, their balances and their leverages in one transaction.
+
+        Portfolios are matched by name and get their fees overwritten. Seeded balance
+        quantities are deposited, i.e. added to an existing balance of the same asset,
+        and seeded leverages replace the existing ones.
+
+        Args:
+            portfolios (List[SeedPortfolioSchema]): The portfolios to load.
+            session (Optional[AsyncSession], optional): SQLAlchemy async session.
+
+        Returns:
+            SeedResponseSchema: The number of upserted rows per table.
+
+        Raises:
+            NotExistedSessionException: If no session is provided.
+        """
+        if not session:
+            raise NotExistedSessionException("session is not existed")
+        if not portfolios:
+            return SeedResponseSchema(portfolios=0, balances=0, leverages=0)
+        now = SimulationClock().now()
+
+        portfolio_rows = [
+            portfolio.model_dump(exclude={"balances", "leverages"})
+            for portfolio in portfolios
+        ]
+        stmt = self._insert(session, Portfolio)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Portfolio.name],
+            set_={
+                **{column: stmt.excluded[column] for column in PORTFOLIO_FEE_COLUMNS},
+                "updated_at": now,
+            },
+        ).returning(Portfolio.id, Portfolio.name)
+        result = await session.execute(stmt, portfolio_rows)
+        portfolio_ids = {name: id_ for id_, name in result.all()}
+
+        balance_rows: List[Dict[str, Any]] = list()
+        leverage_rows: List[Dict[str, Any]] = list()
+        for portfolio in portfolios:
+            portfolio_id = portfolio_ids[portfolio.name]
+            for balance in portfolio.balances:
+                balance_rows.append(
+                    {
+                        "portfolio_id": portfolio_id,
+                        "asset": balance.asset,
+                        "quantity": balance.quantity,
+                        "available": balance.quantity,
+                        "frozen": 0,
+                    }
+                )
+            for leverage in portfolio.leverages:
+                leverage_rows.append(
+                    {
+                        "portfolio_id": portfolio_id,
+                        "market": leverage.market,
+                        "leverage": leverage.leverage,
+                    }
+                )
+
+        if balance_rows:
+            stmt = self._insert(session, Balance)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Balance.portfolio_id, Balance.asset],
+                set_={
+                    "quantity": Balance.quantity + stmt.excluded.quantity,
+                    "available": Balance.available + stmt.excluded.available,
+                    "version": Balance.version + 1,
+                    "updated_at": now,
+                },
+            )
+            await session.execute(stmt, balance_rows)
+
+        if leverage_rows:
+            stmt = self._insert(session, Leverage)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Leverage.portfolio_id, Leverage.market],
+                set_={"leverage": stmt.excluded.leverage, "updated_at": now},
+            )
+            await session.execute(stmt, leverage_rows)
+
+        await session.commit()
+        return SeedResponseSchema(
+            portfolios=len(portfolio_rows),
+            balances=len(balance_rows),
+            leverages=len(leverage_rows),
+        )
+
+    @staticmethod
+    def _insert(
+        session: AsyncSession, model: Any
+    ) -> Union[postgresql.Insert, sqlite.Insert]:
+        # ON CONFLICT upserts are dialect specific constructs
+        if session.bind.dialect.name == "postgresql":
+            return postgresql.insert(model)
+        return sqlite.insert(model)
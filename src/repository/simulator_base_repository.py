@@ -1,12 +1,18 @@
-from typing import Generic, List, Optional, TypeVar
-from sqlalchemy import select
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Generic, List, Optional, Sequence, TypeVar
+from sqlalchemy import lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fifi import DecoratedBase, Repository, db_async_session
+from fifi import DatabaseProvider, DecoratedBase, Repository, db_async_session
 from fifi.exceptions import NotExistedSessionException
 
+from ..common.exceptions import VersionConflict
+
 EntityModel = TypeVar("EntityModel", bound=DecoratedBase)
 
+# columns a compare-and-swap update never writes from the entity
+CAS_SKIPPED_COLUMNS = {"id", "version", "created_at", "updated_at"}
+
 
 class SimulatorBaseRepository(Repository, Generic[EntityModel]):
     @db_async_session
@@ -18,10 +24,143 @@ class SimulatorBaseRepository(Repository, Generic[EntityModel]):
     ) -> List[EntityModel]:
         if not session:
             raise NotExistedSessionException("session is not existed")
-        stmt = select(self.model).where(self.model.portfolio_id == portfolio_id)
+        model = self.model
+        stmt = lambda_stmt(lambda: select(model))
+        # oldest first, rather than whichever index the database happens to scan
+        stmt += lambda s: s.where(model.portfolio_id == portfolio_id).order_by(
+            model.created_at
+        )
 
         if with_for_update:
-            stmt = stmt.with_for_update()
+            stmt += lambda s: s.with_for_update()
 
         results = await session.execute(stmt)
         return list(results.scalars().all())
+
+    @db_async_session
+    async def get_rows_by_portfolio_id(
+        self,
+        portfolio_id: str,
+        columns: Sequence[str],
+        filters: Optional[Dict[str, Any]] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Read some columns of a portfolio's records as plain dicts, without building
+        ORM entities, e.g. to serialize them straight into a response.
+
+        Args:
+            portfolio_id (str): The ID of the portfolio.
+            columns (Sequence[str]): The names of the columns to read.
+            filters (Optional[Dict[str, Any]]): Column values the records must have;
+                None values are ignored.
+            session (Optional[AsyncSession], optional): SQLAlchemy async session.
+
+        Returns:
+            List[Dict[str, Any]]: The column values of each record, oldest first.
+
+        Raises:
+            NotExistedSessionException: If no session is provided.
+        """
+        if not session:
+            raise NotExistedSessionException("session is not existed")
+        table_columns = self.model.__table__.columns
+        stmt = (
+            select(*(table_columns[column] for column in columns))
+            .where(self.model.portfolio_id == portfolio_id)
+            .order_by(self.model.created_at)
+        )
+        for column, value in (filters or {}).items():
+            if value is not None:
+                stmt = stmt.where(table_columns[column] == value)
+
+        results = await session.execute(stmt)
+        return [dict(zip(columns, row)) for row in results]
+
+    @db_async_session
+    async def update_entity(
+        self,
+        entity: EntityModel,
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """
+        Update a model which is bound to a record in the database.
+
+        The row is written with a single UPDATE statement, without loading it first.
+        Models with a `version` column are written with a compare-and-swap: the UPDATE
+        only matches the row if its version is still the one the entity was read with,
+        and bumps it by one. No row lock is taken.
+
+        Args:
+            entity (EntityModel): The updated SQLAlchemy model.
+            session (Optional[AsyncSession], optional): SQLAlchemy async session.
+
+        Raises:
+            NotExistedSessionException: If no session is provided.
+            VersionConflict: If the row was changed by another writer since it was read.
+        """
+        if not session:
+            raise NotExistedSessionException("session is not existed")
+        is_versioned = "version" in self.model.__table__.columns
+        values = {
+            column.name: getattr(entity, column.name)
+            for column in self.model.__table__.columns
+            if column.name not in CAS_SKIPPED_COLUMNS
+        }
+        stmt = update(self.model).where(self.model.id == entity.id)
+        if is_versioned:
+            stmt = stmt.where(self.model.version == entity.version).values(
+                version=entity.version + 1
+            )
+        stmt = stmt.values(**values).execution_options(synchronize_session=False)
+
+        result = await session.execute(stmt)
+        if result.rowcount != 1:
+            if not is_versioned:
+                # not persisted yet, keep the insert-or-update semantics of merge
+                await session.merge(entity)
+                await session.commit()
+                return
+            await session.rollback()
+            raise VersionConflict(
+                f"{self.model.__tablename__} {entity.id} changed since version "
+                f"{entity.version}"
+            )
+        await session.commit()
+        if is_versioned:
+            entity.version += 1
+
+    async def stream_rows_by_portfolio_id(
+        self,
+        portfolio_id: str,
+        status: Optional[Enum] = None,
+        yield_per: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the raw column values of a portfolio's records one row at a time.
+
+        Rows are fetched through a server-side cursor in chunks of `yield_per`, so
+        memory usage stays constant regardless of how many records the portfolio has.
+        No ORM entities are built; each row is yielded as a plain column-name mapping.
+
+        Args:
+            portfolio_id (str): The ID of the portfolio to export.
+            status (Optional[Enum]): If provided, only rows with this status are streamed.
+            yield_per (int, optional): Number of rows fetched per round trip. Defaults to 1000.
+
+        Yields:
+            Dict[str, Any]: The column values of a single record.
+        """
+        stmt = select(*self.model.__table__.columns).where(
+            self.model.portfolio_id == portfolio_id
+        )
+        if status:
+            stmt = stmt.where(self.model.status == status)
+        stmt = stmt.order_by(self.model.created_at).execution_options(
+            yield_per=yield_per
+        )
+
+        async with DatabaseProvider().get_new_seddion() as session:
+            results = await session.stream(stmt)
+            async for row in results.mappings():
+                yield dict(row)
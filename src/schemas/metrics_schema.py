@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+
+
+class CacheMetricsSchema(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+
+
+class StatementCacheMetricsSchema(CacheMetricsSchema):
+    uncached: int
+
+
+class ThrottleMetricsSchema(BaseModel):
+    admitted: int
+    throttled: int
+
+
+class CoalescingMetricsSchema(BaseModel):
+    executed: int
+    shared: int
+
+
+class MetricsResponseSchema(BaseModel):
+    statement_cache: StatementCacheMetricsSchema
+    portfolio_fee_cache: CacheMetricsSchema
+    leverage_cache: CacheMetricsSchema
+    order_throttle: ThrottleMetricsSchema
+    read_coalescing: CoalescingMetricsSchema
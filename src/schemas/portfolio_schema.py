@@ -1,5 +1,14 @@
+from datetime import datetime
+from typing import Dict, List, Optional
 from pydantic import BaseModel
+
+from fifi.enums import Asset, Market, OrderSide, PositionStatus
+
 from ..common.settings import Setting
+from .balance_schema import BalanceResponseSchema
+from .leverage_schema import LeverageSchema
+from .order_schema import OrderResponseSchema
+from .position_schema import PositionResponseSchema
 
 
 class PortfolioSchema(BaseModel):
@@ -17,3 +26,41 @@ class PortfolioResponseSchema(BaseModel):
     spot_maker_fee: float = Setting().DEFAULT_SPOT_MAKER_FEE
     perp_taker_fee: float = Setting().DEFAULT_PERP_TAKER_FEE
     perp_maker_fee: float = Setting().DEFAULT_PERP_MAKER_FEE
+
+
+class PortfolioStateResponseSchema(BaseModel):
+    portfolio: PortfolioResponseSchema
+    balances: List[BalanceResponseSchema]
+    positions: List[PositionResponseSchema]
+    orders: List[OrderResponseSchema]
+    leverages: List[LeverageSchema]
+
+
+class OrderStatsSchema(BaseModel):
+    market: Market
+    side: OrderSide
+    orders: int
+    volume: float
+    fees: float
+    fee_asset: Asset
+
+
+class PositionStatsSchema(BaseModel):
+    status: PositionStatus
+    positions: int
+    pnl: float
+    wins: int
+
+
+class PortfolioStatsResponseSchema(BaseModel):
+    portfolio_id: str
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    volume: float
+    # per fee asset, e.g. spot buys pay in the base asset they receive
+    fees_paid: Dict[Asset, float]
+    realized_pnl: float
+    # None while no position has been closed in the window
+    win_rate: Optional[float]
+    orders: List[OrderStatsSchema]
+    positions: List[PositionStatsSchema]
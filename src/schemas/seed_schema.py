@@ -0,0 +1,54 @@
+from collections import Counter
+from typing import List
+from pydantic import BaseModel, field_validator, model_validator
+
+from fifi.enums import Asset, Market
+
+from .portfolio_schema import PortfolioSchema
+
+
+class SeedBalanceSchema(BaseModel):
+    asset: Asset
+    quantity: float
+
+
+class SeedLeverageSchema(BaseModel):
+    market: Market
+    leverage: float
+
+
+class SeedPortfolioSchema(PortfolioSchema):
+    balances: List[SeedBalanceSchema] = []
+    leverages: List[SeedLeverageSchema] = []
+
+    # an upsert cannot write the same row twice in one statement
+    @model_validator(mode="after")
+    def check_unique_assets_and_markets(self) -> "SeedPortfolioSchema":
+        assets = [balance.asset for balance in self.balances]
+        if len(set(assets)) != len(assets):
+            raise ValueError(f"portfolio {self.name} seeds an asset more than once")
+        markets = [leverage.market for leverage in self.leverages]
+        if len(set(markets)) != len(markets):
+            raise ValueError(f"portfolio {self.name} seeds a market more than once")
+        return self
+
+
+class SeedSchema(BaseModel):
+    portfolios: List[SeedPortfolioSchema]
+
+    @field_validator("portfolios")
+    @classmethod
+    def check_unique_names(
+        cls, portfolios: List[SeedPortfolioSchema]
+    ) -> List[SeedPortfolioSchema]:
+        names = Counter(portfolio.name for portfolio in portfolios)
+        duplicates = sorted(name for name, count in names.items() if count > 1)
+        if duplicates:
+            raise ValueError(f"portfolios seeded more than once: {duplicates}")
+        return portfolios
+
+
+class SeedResponseSchema(BaseModel):
+    portfolios: int
+    balances: int
+    leverages: int
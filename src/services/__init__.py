@@ -4,6 +4,7 @@ __all__ = [
     "PortfolioService",
     "PositionService",
     "LeverageService",
+    "SeedService",
 ]
 
 from .balance_service import BalanceService
@@ -11,3 +12,4 @@ from .order_service import OrderService
 from .portfolio_service import PortfolioService
 from .position_service import PositionService
 from .leverage_service import LeverageService
+from .seed_service import SeedService
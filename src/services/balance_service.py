@@ -1,4 +1,5 @@
-from typing import List, Optional
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 from fifi.helpers.get_logger import LoggerFactory
 from fifi import BaseService
@@ -7,7 +8,15 @@ from fifi.enums import Asset
 from src.models.balance import Balance
 from src.schemas.balance_schema import BalanceSchema
 
-from ..repository import BalanceRepository
+from ..common.coalescer import coalesced
+from ..common.exceptions import VersionConflict
+from ..common.settings import Setting
+from ..journal import EventJournal, JournalEventType
+from ..repository import (
+    BalanceRepository,
+    BalanceLedgerRepository,
+    InMemoryBalanceRepository,
+)
 
 
 LOGGER = LoggerFactory().get(__name__)
@@ -19,13 +28,63 @@ class BalanceService(BaseService):
     related to trading activity."""
 
     def __init__(self):
-        """Initializes the BalanceService with its associated repository."""
-        self._repo = BalanceRepository()
+        """Initializes the BalanceService with its associated repository, the
+        in-memory storage when `IN_MEMORY_STORAGE_ENABLED` is set, otherwise the
+        in-memory balance ledger when `BALANCE_LEDGER_ENABLED` is set."""
+        setting = Setting()
+        if setting.IN_MEMORY_STORAGE_ENABLED:
+            self._repo = InMemoryBalanceRepository()
+        elif setting.BALANCE_LEDGER_ENABLED:
+            self._repo = BalanceLedgerRepository()
+        else:
+            self._repo = BalanceRepository()
+        self.journal = EventJournal()
 
     @property
     def repo(self) -> BalanceRepository:
         return self._repo
 
+    async def apply_mutation(
+        self, portfolio_id: str, asset: Asset, mutation: Callable[[Balance], None]
+    ) -> bool:
+        """Applies an in-place mutation to a portfolio asset balance and persists it.
+
+        The balance is written with a compare-and-swap on its version. When another
+        writer got there first, the balance is read again and the mutation re-applied,
+        up to `OPTIMISTIC_LOCK_MAX_RETRIES` times.
+
+        Args:
+            portfolio_id (str): The ID of the portfolio.
+            asset (Asset): The asset to modify.
+            mutation (Callable[[Balance], None]): Function changing the balance fields.
+
+        Returns:
+            bool: True if the operation was successful, False otherwise.
+
+        Raises:
+            VersionConflict: If every retry lost the race against another writer.
+        """
+        setting = Setting()
+        for attempt in range(setting.OPTIMISTIC_LOCK_MAX_RETRIES + 1):
+            try:
+                asset_balance = await self.repo.apply_mutation(
+                    portfolio_id=portfolio_id, asset=asset, mutation=mutation
+                )
+                break
+            except VersionConflict:
+                if attempt == setting.OPTIMISTIC_LOCK_MAX_RETRIES:
+                    LOGGER.error(f"gave up updating {portfolio_id=} {asset=}")
+                    raise
+                LOGGER.debug(f"retrying {portfolio_id=} {asset=} after conflict")
+                await asyncio.sleep(
+                    setting.OPTIMISTIC_LOCK_RETRY_BACKOFF * (attempt + 1)
+                )
+        if asset_balance:
+            self.journal.record(JournalEventType.BALANCE_CHANGED, asset_balance)
+            return True
+        LOGGER.warning(f"No balance found for {portfolio_id=} {asset=}")
+        return False
+
     async def burn_balance(
         self, portfolio_id: str, asset: Asset, burned_qty: float
     ) -> bool:
@@ -39,15 +98,13 @@ class BalanceService(BaseService):
         Returns:
             bool: True if the operation was successful, False otherwise.
         """
-        asset_balance = await self.read_by_asset(portfolio_id=portfolio_id, asset=asset)
-        if asset_balance:
+
+        def burn(asset_balance: Balance) -> None:
             asset_balance.frozen -= burned_qty
             asset_balance.quantity -= burned_qty
             asset_balance.burned += burned_qty
-            await self.repo.update_entity(asset_balance)
-            return True
-        LOGGER.warning(f"No balance found for {portfolio_id=} {asset=}")
-        return False
+
+        return await self.apply_mutation(portfolio_id, asset, burn)
 
     async def unlock_balance(
         self, portfolio_id: str, asset: Asset, unlocked_qty: float
@@ -62,16 +119,14 @@ class BalanceService(BaseService):
         Returns:
             bool: True if the operation was successful, False otherwise.
         """
-        asset_balance = await self.read_by_asset(portfolio_id, asset)
-        if asset_balance:
+
+        def unlock(asset_balance: Balance) -> None:
             asset_balance.frozen -= unlocked_qty
             if asset_balance.frozen < 0:
                 asset_balance.frozen = 0
             asset_balance.available += unlocked_qty
-            await self.repo.update_entity(asset_balance)
-            return True
-        LOGGER.warning(f"No balance found for {portfolio_id=} {asset=}")
-        return False
+
+        return await self.apply_mutation(portfolio_id, asset, unlock)
 
     async def lock_balance(
         self, portfolio_id: str, asset: Asset, locked_qty: float
@@ -86,14 +141,12 @@ class BalanceService(BaseService):
         Returns:
             bool: True if the operation was successful, False otherwise.
         """
-        asset_balance = await self.read_by_asset(portfolio_id, asset)
-        if asset_balance:
+
+        def lock(asset_balance: Balance) -> None:
             asset_balance.frozen += locked_qty
             asset_balance.available -= locked_qty
-            await self.repo.update_entity(asset_balance)
-            return True
-        LOGGER.warning(f"No balance found for {portfolio_id=} {asset=}")
-        return False
+
+        return await self.apply_mutation(portfolio_id, asset, lock)
 
     async def add_balance(self, portfolio_id: str, asset: Asset, qty: float) -> bool:
         """Adds balance to a portfolio asset, typically as realized PnL.
@@ -106,18 +159,29 @@ class BalanceService(BaseService):
         Returns:
             bool: True if the operation was successful, False otherwise.
         """
-        asset_balance = await self.read_by_asset(portfolio_id, asset)
-        if asset_balance:
+
+        def add(asset_balance: Balance) -> None:
             asset_balance.quantity += qty
             asset_balance.available += qty
-            await self.repo.update_entity(asset_balance)
-            return True
-        LOGGER.warning(f"No balance found for {portfolio_id=} {asset=}")
-        return False
 
+        return await self.apply_mutation(portfolio_id, asset, add)
+
+    @coalesced
+    async def read_by_id(self, id_: str) -> Optional[Balance]:
+        return await super().read_by_id(id_=id_)
+
+    @coalesced
     async def read_many_by_portfolio_id(self, portfolio_id: str) -> List[Balance]:
         return await self.repo.get_entities_by_portfolio_id(portfolio_id=portfolio_id)
 
+    @coalesced
+    async def read_rows_by_portfolio_id(
+        self, portfolio_id: str, columns: Sequence[str]
+    ) -> List[Dict[str, Any]]:
+        return await self.repo.get_rows_by_portfolio_id(
+            portfolio_id=portfolio_id, columns=columns
+        )
+
     async def read_by_asset(self, portfolio_id: str, asset: Asset) -> Optional[Balance]:
         return await self.repo.get_portfolio_asset(
             portfolio_id=portfolio_id, asset=asset
@@ -137,7 +201,9 @@ class BalanceService(BaseService):
         LOGGER.info(
             f"creating new balance for {portfolio_id=}, {asset.value=} with {qty=}"
         )
-        return await self.create(data=balance_schema)
+        balance = await self.create(data=balance_schema)
+        self.journal.record(JournalEventType.BALANCE_CHANGED, balance)
+        return balance
 
     async def check_available_qty(
         self, portfolio_id: str, asset: Asset, qty: float
@@ -151,22 +217,16 @@ class BalanceService(BaseService):
     async def pay_balance(
         self, portfolio_id: str, asset: Asset, paid_qty: float
     ) -> bool:
-        asset_balance = await self.read_by_asset(portfolio_id, asset)
-        if asset_balance:
+        def pay(asset_balance: Balance) -> None:
             asset_balance.available -= paid_qty
             asset_balance.quantity -= paid_qty
-            await self.repo.update_entity(asset_balance)
-            return True
-        LOGGER.warning(f"No balance found for {portfolio_id=} {asset=}")
-        return False
+
+        return await self.apply_mutation(portfolio_id, asset, pay)
 
     async def pay_fee(self, portfolio_id: str, asset: Asset, paid_qty: float) -> bool:
-        asset_balance = await self.read_by_asset(portfolio_id, asset)
-        if asset_balance:
+        def pay(asset_balance: Balance) -> None:
             asset_balance.fee_paid += paid_qty
             asset_balance.available -= paid_qty
             asset_balance.quantity -= paid_qty
-            await self.repo.update_entity(asset_balance)
-            return True
-        LOGGER.warning(f"No balance found for {portfolio_id=} {asset=}")
-        return False
+
+        return await self.apply_mutation(portfolio_id, asset, pay)
@@ -4,8 +4,10 @@ from fifi import BaseService
 from fifi.helpers.get_logger import LoggerFactory
 from fifi.enums import Market
 
+from ..common.cache import MISSING, LeverageCache
+from ..common.settings import Setting
 from ..models import Leverage
-from ..repository import LeverageRepository
+from ..repository import InMemoryLeverageRepository, LeverageRepository
 from ..schemas import LeverageSchema
 
 LOGGER = LoggerFactory().get(__name__)
@@ -13,7 +15,11 @@ LOGGER = LoggerFactory().get(__name__)
 
 class LeverageService(BaseService):
     def __init__(self):
-        self._repo = LeverageRepository()
+        if Setting().IN_MEMORY_STORAGE_ENABLED:
+            self._repo = InMemoryLeverageRepository()
+        else:
+            self._repo = LeverageRepository()
+        self.cache = LeverageCache()
 
     @property
     def repo(self) -> LeverageRepository:
@@ -29,11 +35,15 @@ class LeverageService(BaseService):
     async def get_portfolio_market_leverage_value(
         self, portfolio_id: str, market: Market
     ) -> Optional[float]:
-        leverage = await self.repo.get_leverage_by_portfolio_id_and_market(
-            portfolio_id=portfolio_id, market=market
-        )
-        if leverage:
-            return leverage.leverage
+        value = self.cache.get((portfolio_id, market))
+        if value is MISSING:
+            generation = self.cache.generation
+            leverage = await self.repo.get_leverage_by_portfolio_id_and_market(
+                portfolio_id=portfolio_id, market=market
+            )
+            value = leverage.leverage if leverage else None
+            self.cache.fill((portfolio_id, market), value, generation)
+        return value
 
     async def create_or_update_leverage(
         self, portfolio_id: str, market: Market, leverage: float
@@ -52,4 +62,6 @@ class LeverageService(BaseService):
             LOGGER.info(f"creating {portfolio_id=} {market=} {leverage=}")
 
             leverage_model = await self.create(data=leverage_schema)
+        if leverage_model:
+            self.cache.publish((portfolio_id, market), leverage_model.leverage)
         return leverage_model
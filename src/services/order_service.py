@@ -1,10 +1,12 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 
 from fifi import BaseService
 from fifi.enums import OrderStatus
 
-from ..repository import OrderRepository
+from ..common.coalescer import coalesced
+from ..common.settings import Setting
+from ..repository import InMemoryOrderRepository, OrderRepository
 from ..models import Order
 
 
@@ -15,8 +17,12 @@ class OrderService(BaseService):
     associating orders with positions."""
 
     def __init__(self):
-        """Initializes the OrderService with its order repository."""
-        self._repo = OrderRepository()
+        """Initializes the OrderService with its order repository, kept in memory
+        when `IN_MEMORY_STORAGE_ENABLED` is set."""
+        if Setting().IN_MEMORY_STORAGE_ENABLED:
+            self._repo = InMemoryOrderRepository()
+        else:
+            self._repo = OrderRepository()
 
     @property
     def repo(self) -> OrderRepository:
@@ -53,5 +59,36 @@ class OrderService(BaseService):
         order.position_id = position_id
         await self.update_entity(order)
 
+    @coalesced
+    async def read_by_id(self, id_: str) -> Optional[Order]:
+        return await super().read_by_id(id_=id_)
+
+    @coalesced
     async def read_orders_by_portfolio_id(self, portfolio_id: str) -> List[Order]:
         return await self.repo.get_entities_by_portfolio_id(portfolio_id=portfolio_id)
+
+    @coalesced
+    async def read_order_rows_by_portfolio_id(
+        self, portfolio_id: str, columns: Sequence[str]
+    ) -> List[Dict[str, Any]]:
+        return await self.repo.get_rows_by_portfolio_id(
+            portfolio_id=portfolio_id, columns=columns
+        )
+
+    def stream_orders_by_portfolio_id(
+        self, portfolio_id: str, status: Optional[OrderStatus] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streams a portfolio's orders row by row, oldest first.
+
+        Args:
+            portfolio_id (str): The ID of the portfolio.
+            status (Optional[OrderStatus]): Only stream orders with this status.
+
+        Returns:
+            AsyncIterator[Dict[str, Any]]: The column values of each order.
+        """
+        return self.repo.stream_rows_by_portfolio_id(
+            portfolio_id=portfolio_id,
+            status=status,
+            yield_per=Setting().EXPORT_YIELD_PER,
+        )
@@ -1,21 +1,150 @@
-from typing import Optional
+from datetime import UTC, datetime
+from typing import Any, Dict, Optional
 from fifi import BaseService
+from fifi.enums import Asset, PositionStatus
 
+from ..common.cache import MISSING, PortfolioFeeCache
+from ..common.coalescer import coalesced
+from ..common.settings import Setting
+from ..helpers.order_helper import OrderHelper
 from ..schemas.portfolio_schema import PortfolioSchema
 from ..models import Portfolio
-from ..repository import PortfolioRepository
+from ..repository import InMemoryPortfolioRepository, PortfolioRepository
+from ..repository.portfolio_repository import PortfolioState
+from .balance_service import BalanceService
 
 
 class PortfolioService(BaseService):
     def __init__(self) -> None:
-        self._repo = PortfolioRepository()
+        if Setting().IN_MEMORY_STORAGE_ENABLED:
+            self._repo = InMemoryPortfolioRepository()
+        else:
+            self._repo = PortfolioRepository()
+        self.fee_cache = PortfolioFeeCache()
 
     @property
     def repo(self) -> PortfolioRepository:
         return self._repo
 
+    @coalesced
+    async def read_by_id(self, id_: str) -> Optional[Portfolio]:
+        return await super().read_by_id(id_=id_)
+
     async def read_by_name(self, name: str) -> Optional[Portfolio]:
         return await self.repo.get_by_name(name=name)
 
+    async def read_fee_schedule(self, portfolio_id: str) -> Optional[Portfolio]:
+        """Returns the portfolio whose fees apply to a new order, from the fee cache
+        when possible.
+
+        Args:
+            portfolio_id (str): The portfolio id.
+
+        Returns:
+            Optional[Portfolio]: The portfolio, or None if it does not exist.
+        """
+        portfolio = self.fee_cache.get(portfolio_id)
+        if portfolio is MISSING:
+            portfolio = await self.read_by_id(id_=portfolio_id)
+            if portfolio:
+                self.fee_cache.set(portfolio_id, portfolio)
+        return portfolio
+
+    @coalesced
+    async def read_state(self, portfolio_id: str) -> Optional[PortfolioState]:
+        """Returns the balances, open positions, active orders and leverages of a
+        portfolio as one consistent snapshot.
+
+        With `BALANCE_LEDGER_ENABLED` the database balances lag behind the ledger
+        until its next flush, so the balances are taken from the ledger instead.
+
+        Args:
+            portfolio_id (str): The portfolio id.
+
+        Returns:
+            Optional[PortfolioState]: The state, or None if the portfolio does not
+                exist.
+        """
+        state = await self.repo.get_state(portfolio_id=portfolio_id)
+        setting = Setting()
+        if (
+            state
+            and setting.BALANCE_LEDGER_ENABLED
+            and not setting.IN_MEMORY_STORAGE_ENABLED
+        ):
+            state = state._replace(
+                balances=await BalanceService().read_many_by_portfolio_id(
+                    portfolio_id=portfolio_id
+                )
+            )
+        return state
+
+    @coalesced
+    async def read_stats(
+        self,
+        portfolio_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Computes the volume, fees paid, realized pnl and win rate of a portfolio
+        from the database aggregates.
+
+        Fees are paid in the asset an order receives, e.g. the base asset of a spot
+        buy, so they are summed per fee asset. The win rate is the share of closed or
+        liquidated positions with a positive pnl. Timezone aware bounds are converted
+        to the naive UTC the rows are stored in.
+
+        Args:
+            portfolio_id (str): The portfolio id.
+            since (Optional[datetime]): Start of the time window, inclusive.
+            until (Optional[datetime]): End of the time window, exclusive.
+
+        Returns:
+            Optional[Dict[str, Any]]: The statistics, or None if the portfolio does not
+                exist.
+        """
+        since, until = self._as_utc(since), self._as_utc(until)
+        stats = await self.repo.get_stats(
+            portfolio_id=portfolio_id, since=since, until=until
+        )
+        if stats is None:
+            return None
+        ended = [
+            group for group in stats.positions if group["status"] != PositionStatus.OPEN
+        ]
+        ended_count = sum(group["positions"] for group in ended)
+        fees_paid: Dict[Asset, float] = dict()
+        for group in stats.orders:
+            group["fee_asset"] = OrderHelper.get_recieved_asset(
+                market=group["market"], side=group["side"]
+            )
+            fees_paid[group["fee_asset"]] = (
+                fees_paid.get(group["fee_asset"], 0.0) + group["fees"]
+            )
+        return {
+            "portfolio_id": portfolio_id,
+            "since": since,
+            "until": until,
+            "volume": sum(group["volume"] for group in stats.orders),
+            "fees_paid": fees_paid,
+            # open positions carry the pnl realized by their partial closes
+            "realized_pnl": sum(group["pnl"] for group in stats.positions),
+            "win_rate": (
+                sum(group["wins"] for group in ended) / ended_count
+                if ended_count
+                else None
+            ),
+            "orders": stats.orders,
+            "positions": stats.positions,
+        }
+
+    @staticmethod
+    def _as_utc(moment: Optional[datetime]) -> Optional[datetime]:
+        if moment is None or moment.tzinfo is None:
+            return moment
+        return moment.astimezone(UTC).replace(tzinfo=None)
+
     async def update_by_name(self, name: str, data: PortfolioSchema) -> Portfolio:
-        return await self.repo.update_by_id(data=data, id_=name, column="name")
+        portfolio = await self.repo.update_by_id(data=data, id_=name, column="name")
+        self.fee_cache.invalidate(portfolio.id)
+        return portfolio
@@ -1,11 +1,15 @@
-from typing import Dict, List, Optional
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
 
 from fifi import BaseService
 from fifi.enums import PositionSide, PositionStatus, Market
 from fifi.helpers.get_logger import LoggerFactory
 
+from ..common.coalescer import coalesced
+from ..common.exceptions import VersionConflict
+from ..common.settings import Setting
 from ..models import Position
-from ..repository import PositionRepository
+from ..repository import InMemoryPositionRepository, PositionRepository
 
 
 LOGGER = LoggerFactory().get(__name__)
@@ -19,12 +23,74 @@ class PositionService(BaseService):
     def __init__(self) -> None:
         """Initializes the PositionService with repository and dependent services."""
 
-        self._repo = PositionRepository()
+        if Setting().IN_MEMORY_STORAGE_ENABLED:
+            self._repo = InMemoryPositionRepository()
+        else:
+            self._repo = PositionRepository()
 
     @property
     def repo(self) -> PositionRepository:
         return self._repo
 
+    async def apply_mutation(
+        self,
+        position: Position,
+        mutation: Callable[[Position], None],
+        is_applicable: Optional[Callable[[Position], bool]] = None,
+    ) -> Position:
+        """Applies an in-place mutation to an open position and persists it.
+
+        The position is written with a compare-and-swap on its version. When another
+        writer got there first, the position is read again and the mutation re-applied
+        to the fresh copy, up to `OPTIMISTIC_LOCK_MAX_RETRIES` times, as long as the
+        fresh copy is still open and `is_applicable` to it.
+
+        Args:
+            position (Position): The position to mutate.
+            mutation (Callable[[Position], None]): Function changing the position fields.
+            is_applicable (Optional[Callable[[Position], bool]]): Whether the mutation
+                still makes sense on a fresh copy of the position.
+
+        Returns:
+            Position: The persisted position, which is a fresh copy after a retry.
+
+        Raises:
+            VersionConflict: If every retry lost the race, or the position disappeared
+                or changed so that the mutation no longer applies to it.
+        """
+        setting = Setting()
+        for attempt in range(setting.OPTIMISTIC_LOCK_MAX_RETRIES + 1):
+            mutation(position)
+            try:
+                await self.repo.update_entity(position)
+                return position
+            except VersionConflict:
+                if attempt == setting.OPTIMISTIC_LOCK_MAX_RETRIES:
+                    LOGGER.error(f"gave up updating position {position.id}")
+                    raise
+                fresh_position = await self.read_by_id(id_=position.id)
+                if not fresh_position:
+                    raise
+                if fresh_position.status != PositionStatus.OPEN or (
+                    is_applicable and not is_applicable(fresh_position)
+                ):
+                    LOGGER.warning(
+                        f"position {position.id} changed under the mutation, "
+                        f"it is {fresh_position.status} now"
+                    )
+                    raise
+                LOGGER.debug(f"retrying position {position.id} after conflict")
+                position = fresh_position
+                await asyncio.sleep(
+                    setting.OPTIMISTIC_LOCK_RETRY_BACKOFF * (attempt + 1)
+                )
+        return position
+
+    @coalesced
+    async def read_by_id(self, id_: str) -> Optional[Position]:
+        return await super().read_by_id(id_=id_)
+
+    @coalesced
     async def get_positions(
         self,
         portfolio_id: Optional[str] = None,
@@ -36,6 +102,21 @@ class PositionService(BaseService):
             portfolio_id=portfolio_id, market=market, status=status, side=side
         )
 
+    @coalesced
+    async def get_position_rows(
+        self,
+        portfolio_id: str,
+        columns: Sequence[str],
+        market: Optional[Market] = None,
+        status: Optional[PositionStatus] = None,
+        side: Optional[PositionSide] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self.repo.get_rows_by_portfolio_id(
+            portfolio_id=portfolio_id,
+            columns=columns,
+            filters={"market": market, "status": status, "side": side},
+        )
+
     async def get_open_positions(self) -> List[Position]:
         """Fetches all currently open trading positions.
 
@@ -57,3 +138,21 @@ class PositionService(BaseService):
         for position in open_positions:
             positions[f"{position.market}_{position.portfolio_id}"] = position
         return positions
+
+    def stream_positions_by_portfolio_id(
+        self, portfolio_id: str, status: Optional[PositionStatus] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streams a portfolio's positions row by row, oldest first.
+
+        Args:
+            portfolio_id (str): The ID of the portfolio.
+            status (Optional[PositionStatus]): Only stream positions with this status.
+
+        Returns:
+            AsyncIterator[Dict[str, Any]]: The column values of each position.
+        """
+        return self.repo.stream_rows_by_portfolio_id(
+            portfolio_id=portfolio_id,
+            status=status,
+            yield_per=Setting().EXPORT_YIELD_PER,
+        )
@@ -0,0 +1,105 @@
+from typing import Callable, List
+
+from fifi import BaseService
+from fifi.helpers.get_logger import LoggerFactory
+
+from ..common.cache import LeverageCache, PortfolioFeeCache
+from ..common.settings import Setting
+from ..models import Balance
+from ..repository import (
+    BalanceLedgerRepository,
+    InMemorySeedRepository,
+    PortfolioRepository,
+    SeedRepository,
+)
+from ..schemas.balance_schema import BalanceSchema
+from ..schemas.seed_schema import (
+    SeedPortfolioSchema,
+    SeedResponseSchema,
+    SeedSchema,
+)
+
+LOGGER = LoggerFactory().get(__name__)
+
+
+class SeedService(BaseService):
+    def __init__(self):
+        self.setting = Setting()
+        if self.setting.IN_MEMORY_STORAGE_ENABLED:
+            self._repo = InMemorySeedRepository()
+        else:
+            self._repo = SeedRepository()
+
+    @property
+    def repo(self) -> SeedRepository:
+        return self._repo
+
+    async def seed(self, data: SeedSchema) -> SeedResponseSchema:
+        """Loads portfolios with their balances and leverages in one transaction.
+
+        While the balance ledger is enabled, the ledger rather than the database holds
+        the balances, so the seeded ones are deposited through it like any other
+        balance change, after the portfolios and leverages are committed.
+
+        Args:
+            data (SeedSchema): The portfolios to load.
+
+        Returns:
+            SeedResponseSchema: The number of upserted rows per table.
+        """
+        uses_ledger = (
+            self.setting.BALANCE_LEDGER_ENABLED
+            and not self.setting.IN_MEMORY_STORAGE_ENABLED
+        )
+        if uses_ledger:
+            seeded = await self.repo.seed(
+                portfolios=[
+                    portfolio.model_copy(update={"balances": []})
+                    for portfolio in data.portfolios
+                ]
+            )
+            seeded.balances = await self._deposit_into_ledger(data.portfolios)
+        else:
+            seeded = await self.repo.seed(portfolios=data.portfolios)
+        # seeding may overwrite the fees and leverages of existing portfolios
+        PortfolioFeeCache().clear()
+        LeverageCache().invalidate_everywhere()
+        LOGGER.info(f"seeded {seeded}")
+        return seeded
+
+    async def _deposit_into_ledger(self, portfolios: List[SeedPortfolioSchema]) -> int:
+        ledger = BalanceLedgerRepository()
+        portfolio_ids = {
+            portfolio.name: portfolio.id
+            for portfolio in await PortfolioRepository().get_many_by_ids(
+                ids=[portfolio.name for portfolio in portfolios], column="name"
+            )
+        }
+        new_balances = list()
+        for portfolio in portfolios:
+            for balance in portfolio.balances:
+                if not await ledger.apply_mutation(
+                    portfolio_id=portfolio_ids[portfolio.name],
+                    asset=balance.asset,
+                    mutation=self._deposit(balance.quantity),
+                ):
+                    new_balances.append(
+                        BalanceSchema(
+                            portfolio_id=portfolio_ids[portfolio.name],
+                            asset=balance.asset,
+                            quantity=balance.quantity,
+                            available=balance.quantity,
+                            frozen=0,
+                        )
+                    )
+        if new_balances:
+            await ledger.create_many(data=new_balances)
+        return sum(len(portfolio.balances) for portfolio in portfolios)
+
+    @staticmethod
+    def _deposit(quantity: float) -> Callable[[Balance], None]:
+        def deposit(balance: Balance) -> None:
+            balance.quantity += quantity
+            balance.available += quantity
+
+        return deposit
@@ -0,0 +1,3 @@
+__all__ = ["Scenario", "ScenarioResult", "ScenarioRunner", "Strategy"]
+
+from .scenario_runner import Scenario, ScenarioResult, ScenarioRunner, Strategy
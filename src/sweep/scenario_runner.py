@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from fifi.helpers.get_logger import LoggerFactory
+
+from ..common.settings import Setting
+from ..engines.replay_engine import ReplayEngine, ReplaySummary
+from ..schemas.seed_schema import SeedPortfolioSchema, SeedSchema
+from ..services import BalanceService, PortfolioService, SeedService
+
+LOGGER = LoggerFactory().get(__name__)
+
+# A strategy gets the replay before it starts and the seeded portfolio ids by name.
+# It may place orders right away or start tasks of its own, which run between the
+# replay's engine passes.
+Strategy = Callable[[ReplayEngine, Dict[str, str]], Awaitable[None]]
+
+# what makes a scenario a self-contained backtest, whatever else it overrides
+ISOLATED_SETTINGS: Dict[str, Any] = {
+    "REPLAY_ENABLED": True,
+    "IN_MEMORY_STORAGE_ENABLED": True,
+    "BALANCE_LEDGER_ENABLED": False,
+    "LAST_TRADE_BOARD_ENABLED": False,
+    "ORDER_GATEWAY_ENABLED": False,
+    "JOURNAL_ENABLED": False,
+    "PUSH_STREAM_ENABLED": False,
+}
+
+# seeded portfolio fees left unset take these defaults of the scenario
+FEE_DEFAULTS = {
+    "spot_taker_fee": "DEFAULT_SPOT_TAKER_FEE",
+    "spot_maker_fee": "DEFAULT_SPOT_MAKER_FEE",
+    "perp_taker_fee": "DEFAULT_PERP_TAKER_FEE",
+    "perp_maker_fee": "DEFAULT_PERP_MAKER_FEE",
+}
+
+SUMMARY_COLUMNS = (
+    "scenario",
+    "portfolio",
+    "ticks",
+    "passes",
+    "elapsed",
+    "volume",
+    "fees_paid",
+    "realized_pnl",
+    "win_rate",
+    "balances",
+    "error",
+)
+
+
+class Scenario(NamedTuple):
+    """
+    One backtest of a sweep: the portfolios to seed, the strategy trading them and
+    the settings it runs under, e.g. `DEFAULT_PERP_TAKER_FEE`, `REPLAY_FILES` or the
+    `REPLAY_START` and `REPLAY_END` of its market-data window. Leverages are seeded
+    with the portfolios.
+
+    The strategy must be importable by name, e.g. a module level coroutine function,
+    to reach the worker process.
+    """
+
+    name: str
+    portfolios: List[SeedPortfolioSchema]
+    strategy: Optional[Strategy] = None
+    settings: Optional[Dict[str, Any]] = None
+
+
+class ScenarioResult(NamedTuple):
+    """The outcome of a scenario: the replay summary and the statistics and final
+    balances of every portfolio, or the traceback if it failed."""
+
+    name: str
+    summary: Optional[ReplaySummary] = None
+    portfolios: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+
+
+class ScenarioRunner:
+    """
+    Runs the scenarios of a parameter sweep in parallel, each in a fresh process.
+
+    Every scenario gets a process of its own, spawned rather than forked and not
+    reused, so its settings, engines, in-memory storage and replay are singletons
+    nobody else touches. The scenarios share nothing and report back only their
+    results, so a sweep scales with the cores as long as a scenario runs longer than a
+    process takes to start.
+
+    The scenarios run on the in-memory storage and replay their own market data; the
+    database is never touched. As with any spawned process, the script starting a
+    sweep must guard it with `if __name__ == "__main__"`.
+
+    Attributes:
+        max_workers (Optional[int]): Scenarios run at once, the number of cores if
+            None.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+
+    def run(self, scenarios: List[Scenario]) -> List[ScenarioResult]:
+        """Runs every scenario.
+
+        A failing scenario does not stop the others, its result carries the error.
+
+        Args:
+            scenarios (List[Scenario]): The scenarios to run.
+
+        Returns:
+            List[ScenarioResult]: The results, in the order of the scenarios.
+        """
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=1,
+        ) as executor:
+            futures = [
+                executor.submit(run_scenario, scenario) for scenario in scenarios
+            ]
+            results = list()
+            for scenario, future in zip(scenarios, futures):
+                try:
+                    results.append(future.result())
+                except Exception:
+                    LOGGER.error(f"scenario {scenario.name} failed")
+                    results.append(
+                        ScenarioResult(name=scenario.name, error=traceback.format_exc())
+                    )
+        return results
+
+    @staticmethod
+    def summary_rows(results: List[ScenarioResult]) -> List[Dict[str, Any]]:
+        """Flattens results into one row per scenario and portfolio.
+
+        Args:
+            results (List[ScenarioResult]): The results of a sweep.
+
+        Returns:
+            List[Dict[str, Any]]: The rows, keyed by `SUMMARY_COLUMNS`.
+        """
+        rows = list()
+        for result in results:
+            scenario = {
+                "scenario": result.name,
+                "ticks": result.summary.ticks if result.summary else None,
+                "passes": result.summary.passes if result.summary else None,
+                "elapsed": result.summary.elapsed if result.summary else None,
+                "error": (
+                    result.error.strip().splitlines()[-1] if result.error else None
+                ),
+            }
+            for portfolio in result.portfolios or [{}]:
+                row = dict.fromkeys(SUMMARY_COLUMNS)
+                row.update(scenario)
+                row.update(portfolio)
+                rows.append(row)
+        return rows
+
+    @classmethod
+    def summary_table(cls, results: List[ScenarioResult]) -> str:
+        """Renders the summary rows as a plain text table."""
+        rows = [
+            [cls._format(row[column]) for column in SUMMARY_COLUMNS]
+            for row in cls.summary_rows(results)
+        ]
+        widths = [
+            max(len(cell) for cell in column) for column in zip(SUMMARY_COLUMNS, *rows)
+        ]
+        lines = [
+            "  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+            for line in [list(SUMMARY_COLUMNS), *rows]
+        ]
+        lines.insert(1, "  ".join("-" * width for width in widths))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format(value: Any) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, float):
+            return f"{value:.6g}"
+        if isinstance(value, dict):
+            return " ".join(f"{key}={amount:.6g}" for key, amount in value.items())
+        return str(value)
+
+
+def run_scenario(scenario: Scenario) -> ScenarioResult:
+    """Runs a scenario in the current process, which it configures for good.
+
+    Args:
+        scenario (Scenario): The scenario.
+
+    Returns:
+        ScenarioResult: Its result.
+    """
+    setting = Setting()
+    for name, value in {**(scenario.settings or {}), **ISOLATED_SETTINGS}.items():
+        setattr(setting, name, value)
+    logging.getLogger().setLevel(setting.LOG_LEVEL)
+    return asyncio.run(_run_scenario(scenario))
+
+
+async def _run_scenario(scenario: Scenario) -> ScenarioResult:
+    setting = Setting()
+    # created first, so the seeded portfolios already live in replayed time
+    engine = ReplayEngine()
+    portfolios = [
+        portfolio.model_copy(
+            update={
+                fee: getattr(setting, default)
+                for fee, default in FEE_DEFAULTS.items()
+                if fee not in portfolio.model_fields_set
+            }
+        )
+        for portfolio in scenario.portfolios
+    ]
+    await SeedService().seed(data=SeedSchema(portfolios=portfolios))
+
+    portfolio_service = PortfolioService()
+    portfolio_ids = dict()
+    for portfolio in portfolios:
+        seeded = await portfolio_service.read_by_name(name=portfolio.name)
+        portfolio_ids[portfolio.name] = seeded.id
+    if scenario.strategy:
+        await scenario.strategy(engine, portfolio_ids)
+    summary = await engine.run()
+    LOGGER.info(f"scenario {scenario.name} finished: {summary}")
+
+    results = list()
+    for name, portfolio_id in portfolio_ids.items():
+        stats = await portfolio_service.read_stats(portfolio_id=portfolio_id)
+        balances = await BalanceService().read_many_by_portfolio_id(
+            portfolio_id=portfolio_id
+        )
+        results.append(
+            {
+                "portfolio": name,
+                "volume": stats["volume"],
+                "fees_paid": {
+                    asset.name: fees for asset, fees in stats["fees_paid"].items()
+                },
+                "realized_pnl": stats["realized_pnl"],
+                "win_rate": stats["win_rate"],
+                "balances": {
+                    balance.asset.name: balance.quantity for balance in balances
+                },
+            }
+        )
+    return ScenarioResult(name=scenario.name, summary=summary, portfolios=results)
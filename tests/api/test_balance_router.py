@@ -6,6 +6,7 @@ from httpx import ASGITransport, AsyncClient
 from main import app
 from fastapi.encoders import jsonable_encoder
 
+from src.api.v1.balance_router import BALANCE_COLUMNS
 from src.services import BalanceService
 from src.schemas.balance_schema import BalanceDepositSchema, BalanceResponseSchema
 from src.services.portfolio_service import PortfolioService
@@ -15,6 +16,10 @@ from tests.materials import *
 LOGGER = LoggerFactory().get(__name__)
 
 
+def balance_row(balance):
+    return {column: getattr(balance, column) for column in BALANCE_COLUMNS}
+
+
 @pytest.mark.asyncio
 class TestBalanceRouter:
     balance_service = BalanceService()
@@ -63,8 +68,9 @@ class TestBalanceRouter:
     ):
         balances = await self.create_balance(balance_factory_for_portfolios)
         balance = balances[-1]
+        rows = [balance_row(_balance) for _balance in balances]
         with patch.object(
-            BalanceService, "read_many_by_portfolio_id", return_value=balances
+            BalanceService, "read_rows_by_portfolio_id", return_value=rows
         ) as mock_method:
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
@@ -79,12 +85,12 @@ class TestBalanceRouter:
                     )
                 assert response.json() == expected_list
                 mock_method.assert_awaited_once_with(
-                    portfolio_id=balance.portfolio_id,
+                    portfolio_id=balance.portfolio_id, columns=BALANCE_COLUMNS
                 )
 
     async def test_balance_read_by_portfolio_id_failed(self, database_provider_test):
         with patch.object(
-            BalanceService, "read_many_by_portfolio_id", return_value=[]
+            BalanceService, "read_rows_by_portfolio_id", return_value=[]
         ) as mock_method:
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
@@ -93,7 +99,7 @@ class TestBalanceRouter:
                 assert response.status_code == 404
                 LOGGER.info(f"balance response: {response.json()}")
                 mock_method.assert_awaited_once_with(
-                    portfolio_id="sdf",
+                    portfolio_id="sdf", columns=BALANCE_COLUMNS
                 )
 
     async def test_balance_read_by_asset(
@@ -121,7 +127,7 @@ class TestBalanceRouter:
 
     async def test_balance_read_by_asset_failed(self, database_provider_test):
         with patch.object(
-            BalanceService, "read_many_by_portfolio_id", return_value=None
+            BalanceService, "read_rows_by_portfolio_id", return_value=None
         ) as mock_method_portfolio:
             with patch.object(
                 BalanceService, "read_by_asset", return_value=None
@@ -0,0 +1,75 @@
+import csv
+import io
+import orjson
+import pytest
+
+from httpx import ASGITransport, AsyncClient
+from main import app
+from fifi import LoggerFactory
+
+from src.services import OrderService, PositionService
+from tests.materials import *
+
+LOGGER = LoggerFactory().get(__name__)
+
+
+@pytest.mark.asyncio
+class TestExportRouter:
+    order_service = OrderService()
+    position_service = PositionService()
+
+    async def test_export_orders_ndjson(self, database_provider_test, order_factory):
+        orders = await self.order_service.create_many(
+            data=order_factory(portfolio_id="iamrich", count=30)
+        )
+        await self.order_service.create_many(data=order_factory(portfolio_id="poor"))
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+        ) as ac:
+            response = await ac.get("/export/orders?portfolio_id=iamrich")
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/x-ndjson"
+            lines = response.text.strip().split("\n")
+            rows = [orjson.loads(line) for line in lines]
+            LOGGER.info(f"first exported order: {rows[0]}")
+            assert {row["id"] for row in rows} == {order.id for order in orders}
+            assert all(row["portfolio_id"] == "iamrich" for row in rows)
+
+    async def test_export_fills_csv(self, database_provider_test, order_factory):
+        orders = await self.order_service.create_many(
+            data=order_factory(portfolio_id="iamrich", count=30)
+        )
+        filled_ids = {
+            order.id for order in orders if order.status == OrderStatus.FILLED
+        }
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+        ) as ac:
+            response = await ac.get("/export/fills?portfolio_id=iamrich&format=csv")
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/csv")
+            rows = list(csv.DictReader(io.StringIO(response.text)))
+            assert {row["id"] for row in rows} == filled_ids
+            assert all(row["status"] == OrderStatus.FILLED.value for row in rows)
+
+    async def test_export_positions(self, database_provider_test, position_factory):
+        positions = await self.position_service.create_many(
+            data=position_factory(portfolio_id="iamrich", count=10)
+        )
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+        ) as ac:
+            response = await ac.get("/export/positions?portfolio_id=iamrich")
+            assert response.status_code == 200
+            rows = [orjson.loads(line) for line in response.text.strip().split("\n")]
+            assert {row["id"] for row in rows} == {
+                position.id for position in positions
+            }
+
+    async def test_export_empty(self, database_provider_test):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+        ) as ac:
+            response = await ac.get("/export/orders?portfolio_id=nobody&format=csv")
+            assert response.status_code == 200
+            assert response.text == ""
@@ -0,0 +1,41 @@
+import pytest
+
+from httpx import ASGITransport, AsyncClient
+from main import app
+
+from src.common.statement_cache import StatementCacheStats
+from src.services import PortfolioService
+from tests.materials import *
+
+
+@pytest.mark.asyncio
+class TestMetricsRouter:
+    portfolio_service = PortfolioService()
+
+    async def test_get_metrics(self, database_provider_test):
+        StatementCacheStats().reset()
+        await self.portfolio_service.read_by_name("iamrich")
+        await self.portfolio_service.read_by_name("iamrich")
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+        ) as ac:
+            response = await ac.get("/metrics")
+            assert response.status_code == 200
+            statement_cache = response.json()["statement_cache"]
+            assert statement_cache["hits"] >= 1
+            assert 0 < statement_cache["hit_rate"] <= 1
+
+    async def test_get_portfolio_fee_cache_metrics(
+        self, database_provider_test, portfolio_factory
+    ):
+        portfolio = await self.portfolio_service.create(data=portfolio_factory())
+        for _ in range(3):
+            await self.portfolio_service.read_fee_schedule(portfolio.id)
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+        ) as ac:
+            response = await ac.get("/metrics")
+            assert response.status_code == 200
+            fee_cache = response.json()["portfolio_fee_cache"]
+            assert fee_cache["hits"] == 2
+            assert fee_cache["misses"] == 1
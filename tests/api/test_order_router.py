@@ -1,12 +1,13 @@
 import pytest
 
 from fifi import LoggerFactory
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 from httpx import ASGITransport, AsyncClient
 from main import app
 from fastapi.encoders import jsonable_encoder
 
-from src.common.exceptions import InvalidOrder
+from src.api.v1.order_router import ORDER_COLUMNS
+from src.common.exceptions import InvalidOrder, VersionConflict
 from src.services import OrderService
 from src.engines.matching_engine import MatchingEngine
 from src.schemas.order_schema import OrderCreateSchema, OrderResponseSchema
@@ -16,6 +17,10 @@ from tests.materials import *
 LOGGER = LoggerFactory().get(__name__)
 
 
+def order_row(order):
+    return {column: getattr(order, column) for column in ORDER_COLUMNS}
+
+
 @pytest.mark.asyncio
 class TestOrderRouter:
     order_service = OrderService()
@@ -57,8 +62,9 @@ class TestOrderRouter:
     ):
         orders = await self.create_order(order_factory)
         order = orders[-1]
+        rows = [order_row(_order) for _order in orders]
         with patch.object(
-            OrderService, "read_orders_by_portfolio_id", return_value=orders
+            OrderService, "read_order_rows_by_portfolio_id", return_value=rows
         ) as mock_method:
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
@@ -73,14 +79,16 @@ class TestOrderRouter:
                     )
                 assert response.json() == expected_list
                 mock_method.assert_awaited_once_with(
-                    portfolio_id=order.portfolio_id,
+                    portfolio_id=order.portfolio_id, columns=ORDER_COLUMNS
                 )
 
     async def test_order_read_by_filters(self, database_provider_test, order_factory):
         orders = await self.create_order(order_factory)
         order = orders[-1]
         with patch.object(
-            OrderService, "read_orders_by_portfolio_id", return_value=order
+            OrderService,
+            "read_order_rows_by_portfolio_id",
+            return_value=[order_row(order)],
         ) as mock_method:
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
@@ -88,17 +96,17 @@ class TestOrderRouter:
                 response = await ac.get(f"""/order?portfolio_id={order.portfolio_id}""")
                 assert response.status_code == 200
                 LOGGER.info(f"order response: {response.json()}")
-                assert response.json() == jsonable_encoder(
-                    OrderResponseSchema(**order.to_dict())
-                )
+                assert response.json() == [
+                    jsonable_encoder(OrderResponseSchema(**order.to_dict()))
+                ]
 
                 mock_method.assert_awaited_once_with(
-                    portfolio_id=order.portfolio_id,
+                    portfolio_id=order.portfolio_id, columns=ORDER_COLUMNS
                 )
 
     async def test_order_read_by_filters_failed(self, database_provider_test):
         with patch.object(
-            OrderService, "read_orders_by_portfolio_id", return_value=[]
+            OrderService, "read_order_rows_by_portfolio_id", return_value=[]
         ) as mock_method:
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
@@ -108,7 +116,7 @@ class TestOrderRouter:
                 LOGGER.info(f"order response: {response.json()}")
 
                 mock_method.assert_awaited_once_with(
-                    portfolio_id="h1",
+                    portfolio_id="h1", columns=ORDER_COLUMNS
                 )
 
     async def test_order_read_failed(self, database_provider_test):
@@ -189,3 +197,58 @@ class TestOrderRouter:
                 )
                 assert response.status_code == 400
                 LOGGER.info(f"order response: {response.json()}")
+
+    async def test_create_order_throttled(
+        self, database_provider_test, order_factory, provide_order_throttle
+    ):
+        order = (await self.create_order(order_factory))[-1]
+        with patch("src.api.v1.deps.MatchingEngine") as engine_class:
+            engine_class.return_value.create_order = AsyncMock(return_value=order)
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+            ) as ac:
+                statuses = list()
+                for _ in range(5):
+                    response = await ac.post(
+                        f"/order",
+                        json=jsonable_encoder(OrderCreateSchema(**order.to_dict())),
+                    )
+                    statuses.append(response.status_code)
+                LOGGER.info(f"order response: {response.json()}")
+
+                # the portfolio burst is 3 orders
+                assert statuses == [200, 200, 200, 429, 429]
+                assert int(response.headers["Retry-After"]) >= 1
+                assert engine_class.return_value.create_order.await_count == 3
+
+    async def test_cancel_order_version_conflict(self):
+        with patch("src.api.v1.deps.MatchingEngine") as engine_class:
+            engine_class.return_value.cancel_order = AsyncMock(
+                side_effect=VersionConflict("lost the race")
+            )
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+            ) as ac:
+                response = await ac.patch(f"/order/cancel?order_id=o1")
+
+                assert response.status_code == 409
+                assert response.json()["detail"] == "lost the race"
+
+    async def test_cancel_order_throttled(self, provide_order_throttle):
+        with patch("src.api.v1.deps.MatchingEngine") as engine_class:
+            engine_class.return_value.cancel_order = AsyncMock(
+                side_effect=InvalidOrder
+            )
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+            ) as ac:
+                statuses = [
+                    (await ac.patch(f"/order/cancel?order_id=o{i}")).status_code
+                    for i in range(3)
+                ]
+
+                # cancels draw from the bucket of 2 of the client
+                assert statuses == [400, 400, 429]
+                assert engine_class.return_value.cancel_order.await_count == 2
+        # and leave the order entry budget alone
+        assert provide_order_throttle.acquire(portfolio_id="iamrich") == 0
@@ -1,11 +1,20 @@
 import pytest
 
+from datetime import datetime
 from unittest.mock import patch
 from httpx import ASGITransport, AsyncClient
 from main import app
 from fifi import LoggerFactory
+from fifi.enums import Asset, Market, OrderSide, PositionStatus
 
-from src.schemas.portfolio_schema import PortfolioResponseSchema, PortfolioSchema
+from src.models import Balance, Leverage
+from src.repository.portfolio_repository import PortfolioState
+from src.schemas.portfolio_schema import (
+    PortfolioResponseSchema,
+    PortfolioSchema,
+    PortfolioStateResponseSchema,
+    PortfolioStatsResponseSchema,
+)
 from src.services import PortfolioService
 
 
@@ -167,3 +176,98 @@ class TestPortfolioRouter:
                 mock_method_read.assert_awaited_once_with(
                     name=portfolio.name, data=portfolio_schema
                 )
+
+    async def test_get_portfolio_state(self, database_provider_test):
+        portfolio = await self.create_portfolio()
+        balance = Balance(
+            id="balance",
+            portfolio_id=portfolio.id,
+            asset=Asset.USD,
+            quantity=10.0,
+            available=8.0,
+            frozen=2.0,
+            burned=0.0,
+            fee_paid=0.0,
+        )
+        leverage = Leverage(portfolio_id=portfolio.id, market=Market.BTCUSD, leverage=3)
+        state = PortfolioState(
+            portfolio=portfolio,
+            balances=[balance],
+            positions=[],
+            orders=[],
+            leverages=[leverage],
+        )
+        with patch.object(
+            PortfolioService, "read_state", return_value=state
+        ) as mock_method:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+            ) as ac:
+                response = await ac.get(f"/portfolio/{portfolio.id}/state")
+                assert response.status_code == 200
+                assert response.json() == PortfolioStateResponseSchema.model_validate(
+                    state, from_attributes=True
+                ).model_dump(mode="json")
+                assert response.json()["balances"][0]["available"] == 8.0
+                assert response.json()["leverages"][0]["leverage"] == 3
+                mock_method.assert_awaited_once_with(portfolio_id=portfolio.id)
+
+    async def test_get_portfolio_state_failed(self, database_provider_test):
+        with patch.object(
+            PortfolioService, "read_state", return_value=None
+        ) as mock_method:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+            ) as ac:
+                response = await ac.get("/portfolio/missing/state")
+                assert response.status_code == 404
+                mock_method.assert_awaited_once_with(portfolio_id="missing")
+
+    async def test_get_portfolio_stats(self):
+        stats = {
+            "portfolio_id": "iamrich",
+            "since": datetime(2026, 1, 1),
+            "until": None,
+            "volume": 300.0,
+            "fees_paid": {Asset.BTC: 0.3},
+            "realized_pnl": -2.0,
+            "win_rate": 0.25,
+            "orders": [
+                {
+                    "market": Market.BTCUSD,
+                    "side": OrderSide.BUY,
+                    "orders": 3,
+                    "volume": 300.0,
+                    "fees": 0.3,
+                    "fee_asset": Asset.BTC,
+                }
+            ],
+            "positions": [
+                {"status": PositionStatus.CLOSE, "positions": 4, "pnl": -2.0, "wins": 1}
+            ],
+        }
+        with patch.object(
+            PortfolioService, "read_stats", return_value=stats
+        ) as mock_method:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+            ) as ac:
+                response = await ac.get(
+                    "/portfolio/iamrich/stats",
+                    params={"since": "2026-01-01T00:00:00"},
+                )
+                assert response.status_code == 200
+                assert response.json() == PortfolioStatsResponseSchema(
+                    **stats
+                ).model_dump(mode="json")
+                mock_method.assert_awaited_once_with(
+                    portfolio_id="iamrich", since=datetime(2026, 1, 1), until=None
+                )
+
+    async def test_get_portfolio_stats_failed(self):
+        with patch.object(PortfolioService, "read_stats", return_value=None):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+            ) as ac:
+                response = await ac.get("/portfolio/missing/stats")
+                assert response.status_code == 404
@@ -6,6 +6,7 @@ from main import app
 from fastapi.encoders import jsonable_encoder
 from fifi import LoggerFactory
 
+from src.api.v1.position_router import POSITION_COLUMNS
 from src.services import PositionService
 from src.schemas.position_schema import PositionResponseSchema
 from tests.materials import *
@@ -13,6 +14,10 @@ from tests.materials import *
 LOGGER = LoggerFactory().get(__name__)
 
 
+def position_row(position):
+    return {column: getattr(position, column) for column in POSITION_COLUMNS}
+
+
 @pytest.mark.asyncio
 class TestPositionRouter:
     position_service = PositionService()
@@ -58,8 +63,9 @@ class TestPositionRouter:
     ):
         positions = await self.create_position(position_factory)
         position = positions[-1]
+        rows = [position_row(_position) for _position in positions]
         with patch.object(
-            PositionService, "get_positions", return_value=positions
+            PositionService, "get_position_rows", return_value=rows
         ) as mock_method:
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
@@ -77,6 +83,7 @@ class TestPositionRouter:
                 assert response.json() == expected_list
                 mock_method.assert_awaited_once_with(
                     portfolio_id=position.portfolio_id,
+                    columns=POSITION_COLUMNS,
                     market=None,
                     status=None,
                     side=None,
@@ -88,7 +95,7 @@ class TestPositionRouter:
         positions = await self.create_position(position_factory)
         position = positions[-1]
         with patch.object(
-            PositionService, "get_positions", return_value=position
+            PositionService, "get_position_rows", return_value=[position_row(position)]
         ) as mock_method:
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
@@ -98,12 +105,13 @@ class TestPositionRouter:
                 )
                 assert response.status_code == 200
                 LOGGER.info(f"position response: {response.json()}")
-                assert response.json() == jsonable_encoder(
-                    PositionResponseSchema(**position.to_dict())
-                )
+                assert response.json() == [
+                    jsonable_encoder(PositionResponseSchema(**position.to_dict()))
+                ]
 
                 mock_method.assert_awaited_once_with(
                     portfolio_id=position.portfolio_id,
+                    columns=POSITION_COLUMNS,
                     market=position.market,
                     status=position.status,
                     side=position.side,
@@ -111,7 +119,7 @@ class TestPositionRouter:
 
     async def test_position_read_by_filters_failed(self, database_provider_test):
         with patch.object(
-            PositionService, "get_positions", return_value=[]
+            PositionService, "get_position_rows", return_value=[]
         ) as mock_method:
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
@@ -124,6 +132,7 @@ class TestPositionRouter:
 
                 mock_method.assert_awaited_once_with(
                     portfolio_id="h1",
+                    columns=POSITION_COLUMNS,
                     market=Market.BTCUSD,
                     status=PositionStatus.LIQUID,
                     side=PositionSide.SHORT,
@@ -0,0 +1,43 @@
+import pytest
+
+from httpx import ASGITransport, AsyncClient
+from main import app
+
+from src.services import PortfolioService
+
+
+@pytest.mark.asyncio
+class TestSeedRouter:
+    portfolio_service = PortfolioService()
+
+    async def test_seed(self, database_provider_test):
+        payload = {
+            "portfolios": [
+                {
+                    "name": f"bot-{i}",
+                    "balances": [{"asset": "usd", "quantity": 1000}],
+                    "leverages": [{"market": "btcusd_perp", "leverage": 3}],
+                }
+                for i in range(100)
+            ]
+        }
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+        ) as ac:
+            response = await ac.post("/seed", json=payload)
+            assert response.status_code == 200
+            assert response.json() == {
+                "portfolios": 100,
+                "balances": 100,
+                "leverages": 100,
+            }
+        assert await self.portfolio_service.read_by_name("bot-99") is not None
+
+    async def test_seed_rejects_duplicate_names(self, database_provider_test):
+        payload = {"portfolios": [{"name": "bot"}, {"name": "bot"}]}
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+        ) as ac:
+            response = await ac.post("/seed", json=payload)
+            assert response.status_code == 422
+        assert await self.portfolio_service.read_by_name("bot") is None
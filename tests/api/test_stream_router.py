@@ -0,0 +1,40 @@
+from starlette.testclient import TestClient
+from main import app
+
+from src.journal import JournalEventType
+from tests.materials import *
+
+
+class TestStreamRouter:
+    def test_stream_pushes_portfolio_events(self, provide_push_stream):
+        with TestClient(app).websocket_connect(
+            "/exapi/v1/stream/ws?portfolio_id=iamrich&channels=fills,balances"
+        ) as websocket:
+            for portfolio_id in ("poor", "iamrich"):
+                provide_push_stream.publish(
+                    JournalEventType.ORDER_FILLED,
+                    {"id": "order", "portfolio_id": portfolio_id},
+                )
+
+            message = websocket.receive_json()
+            assert message["channel"] == "fills"
+            assert message["event"] == JournalEventType.ORDER_FILLED.value
+            assert message["data"] == {"id": "order", "portfolio_id": "iamrich"}
+
+    def test_stream_rejects_unknown_channels(self, provide_push_stream):
+        with TestClient(app).websocket_connect(
+            "/exapi/v1/stream/ws?portfolio_id=iamrich&channels=trades"
+        ) as websocket:
+            message = websocket.receive()
+            assert message["type"] == "websocket.close"
+            assert message["code"] == 1008
+
+    def test_stream_rejected_without_dispatcher(self, provide_push_stream):
+        # e.g. a worker which does not own the engines
+        provide_push_stream.stop_dispatcher()
+        with TestClient(app).websocket_connect(
+            "/exapi/v1/stream/ws?portfolio_id=iamrich"
+        ) as websocket:
+            message = websocket.receive()
+            assert message["type"] == "websocket.close"
+            assert message["code"] == 1013
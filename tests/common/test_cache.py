@@ -0,0 +1,91 @@
+import multiprocessing
+
+from unittest.mock import patch
+
+from src.common.cache import MISSING, LeverageCache, TTLCache
+
+
+def publish_leverage(key, value):
+    LeverageCache().publish(key, value)
+
+
+class TestTTLCache:
+    def test_get_and_set(self):
+        cache = TTLCache(maxsize=2)
+        assert cache.get("a") is MISSING
+        cache.set("a", None)
+
+        assert cache.get("a") is None
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.hit_rate == 0.5
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.size == 2
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_entries_expire(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        with patch("src.common.cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("src.common.cache.time.monotonic", return_value=105.0):
+            assert cache.get("a") == 1
+        with patch("src.common.cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") is MISSING
+        assert cache.size == 0
+
+    def test_invalidate_and_reset(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.invalidate("a")
+        assert cache.get("a") is MISSING
+        assert cache.get("b") == 2
+
+        cache.reset()
+        assert cache.size == 0
+        assert cache.to_dict() == {"hits": 0, "misses": 0, "hit_rate": 0.0}
+
+
+class TestLeverageCache:
+    def teardown_method(self):
+        LeverageCache().reset()
+
+    def test_publish_invalidates_other_processes(self):
+        cache = LeverageCache()
+        cache.set(("iamrich", "btcusd_perp"), 5)
+        cache.set(("poor", "btcusd_perp"), None)
+
+        process = multiprocessing.get_context("fork").Process(
+            target=publish_leverage, args=(("iamrich", "btcusd_perp"), 10)
+        )
+        process.start()
+        process.join()
+
+        assert process.exitcode == 0
+        assert cache.get(("iamrich", "btcusd_perp")) is MISSING
+        assert cache.get(("poor", "btcusd_perp")) is MISSING
+
+    def test_publish_writes_through(self):
+        cache = LeverageCache()
+        cache.set(("poor", "btcusd_perp"), 3)
+        cache.publish(("iamrich", "btcusd_perp"), 10)
+
+        assert cache.get(("iamrich", "btcusd_perp")) == 10
+        assert cache.get(("poor", "btcusd_perp")) == 3
+
+    def test_fill_skips_values_read_before_a_change(self):
+        cache = LeverageCache()
+        generation = cache.generation
+        cache.publish(("iamrich", "btcusd_perp"), 10)
+        cache.fill(("iamrich", "btcusd_perp"), 5, generation)
+
+        assert cache.get(("iamrich", "btcusd_perp")) == 10
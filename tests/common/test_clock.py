@@ -0,0 +1,50 @@
+import time
+import pytest
+
+from datetime import datetime
+
+from src.common.clock import SimulatedClock, SimulationClock
+from src.services import PortfolioService
+from tests.materials import *
+
+
+@pytest.fixture
+def provide_simulated_clock():
+    clock = SimulatedClock(start=1_700_000_000)
+    SimulationClock().use(clock)
+    yield clock
+    SimulationClock().use(None)
+
+
+@pytest.mark.asyncio
+class TestSimulationClock:
+    async def test_wall_clock_by_default(self):
+        before = time.time()
+        assert before <= SimulationClock().time() <= time.time()
+
+    async def test_simulated_clock_only_moves_forward(self, provide_simulated_clock):
+        clock = SimulationClock()
+        assert clock.time() == 1_700_000_000
+        assert clock.now() == datetime(2023, 11, 14, 22, 13, 20)
+
+        provide_simulated_clock.advance_to(1_700_000_060)
+        assert clock.time() == 1_700_000_060
+        provide_simulated_clock.advance_to(1_700_000_000)
+        assert clock.time() == 1_700_000_060
+
+    async def test_timestamps_follow_the_clock(
+        self, database_provider_test, provide_simulated_clock
+    ):
+        portfolio_service = PortfolioService()
+        portfolio = await portfolio_service.create(
+            data=PortfolioSchema(name="TimeTraveler")
+        )
+        assert portfolio.created_at == datetime(2023, 11, 14, 22, 13, 20)
+
+        provide_simulated_clock.advance_to(1_700_000_060)
+        portfolio.name = "TimeTraveler2"
+        await portfolio_service.update_entity(portfolio)
+        portfolio = await portfolio_service.read_by_id(id_=portfolio.id)
+
+        assert portfolio.created_at == datetime(2023, 11, 14, 22, 13, 20)
+        assert portfolio.updated_at == datetime(2023, 11, 14, 22, 14, 20)
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+
+from unittest.mock import patch
+
+from src.common.coalescer import coalesced
+from src.common.read_replica import read_only
+from src.services import BalanceService
+from tests.materials import *
+
+
+class Reader:
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    @coalesced
+    async def read(self, key: str, fail: bool = False) -> dict:
+        self.calls += 1
+        await self.release.wait()
+        if fail:
+            raise ValueError(f"failed {key}")
+        return {"key": key, "call": self.calls}
+
+
+async def gather_reads(reader: Reader, *calls, **kwargs):
+    tasks = [asyncio.create_task(reader.read(*call, **kwargs)) for call in calls]
+    # let every read start before the first query returns
+    await asyncio.sleep(0)
+    reader.release.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+class TestReadCoalescer:
+    async def test_disabled_runs_every_read(self):
+        reader = Reader()
+        with read_only():
+            results = await gather_reads(reader, ("a",), ("a",))
+
+        assert reader.calls == 2
+        assert results[0] is not results[1]
+
+    async def test_outside_of_get_requests(self, provide_read_coalescer):
+        reader = Reader()
+        results = await gather_reads(reader, ("a",), ("a",))
+
+        assert reader.calls == 2
+        assert provide_read_coalescer.to_dict() == {"executed": 0, "shared": 0}
+
+    async def test_identical_reads_share_one_query(self, provide_read_coalescer):
+        reader = Reader()
+        with read_only():
+            results = await gather_reads(reader, ("a",), ("a",), ("b",), ("a",))
+
+        assert reader.calls == 2
+        assert results[0] is results[1] is results[3]
+        assert results[2]["key"] == "b"
+        assert provide_read_coalescer.to_dict() == {"executed": 2, "shared": 2}
+
+        # the flight landed, without a ttl the next read runs its own query
+        with read_only():
+            assert (await reader.read("a"))["call"] == 3
+
+    async def test_failure_reaches_the_reads_in_flight_only(
+        self, provide_read_coalescer
+    ):
+        provide_read_coalescer.ttl = 60.0
+        provide_read_coalescer.results.ttl = 60.0
+        reader = Reader()
+        with read_only():
+            results = await gather_reads(reader, ("a",), ("a",), fail=True)
+            assert all(isinstance(result, ValueError) for result in results)
+            assert reader.calls == 1
+
+            assert (await reader.read("a"))["call"] == 2
+
+    async def test_ttl_reuses_landed_results(self, provide_read_coalescer):
+        provide_read_coalescer.ttl = 60.0
+        provide_read_coalescer.results.ttl = 60.0
+        reader = Reader()
+        reader.release.set()
+        with read_only():
+            first = await reader.read("a")
+            assert await reader.read("a") is first
+            with patch("src.common.cache.time.monotonic", return_value=1e12):
+                assert (await reader.read("a"))["call"] == 2
+
+        assert reader.calls == 2
+
+    async def test_cancelled_caller_keeps_the_flight(self, provide_read_coalescer):
+        reader = Reader()
+        with read_only():
+            leader = asyncio.create_task(reader.read("a"))
+            follower = asyncio.create_task(reader.read("a"))
+            await asyncio.sleep(0)
+            leader.cancel()
+            await asyncio.sleep(0)
+            reader.release.set()
+
+            assert (await follower)["call"] == 1
+        assert leader.cancelled()
+
+    async def test_service_reads(
+        self,
+        database_provider_test,
+        provide_read_coalescer,
+        balance_factory_for_portfolios,
+    ):
+        balance_service = BalanceService()
+        await balance_service.create_many(
+            data=balance_factory_for_portfolios(portfolio_id="iamrich")
+        )
+        with read_only():
+            results = await asyncio.gather(
+                *(
+                    balance_service.read_rows_by_portfolio_id(
+                        portfolio_id="iamrich", columns=("id", "asset", "quantity")
+                    )
+                    for _ in range(5)
+                )
+            )
+
+        assert len(results[0]) == len(Asset)
+        assert all(result is results[0] for result in results)
+        assert provide_read_coalescer.to_dict() == {"executed": 1, "shared": 4}
@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+
+from unittest.mock import patch
+from fastapi import FastAPI
+
+from src.api.base_router import lifespan
+from src.common.engine_owner import EngineOwner
+from tests.materials import *
+
+
+def new_engine_owner(path: str) -> EngineOwner:
+    # every worker has its own instance, build one per simulated worker
+    EngineOwner.instance = None
+    owner = EngineOwner(path=path)
+    owner.retry_interval = 0.01
+    return owner
+
+
+@pytest.fixture
+def lock_path(tmp_path):
+    path = str(tmp_path / "engine_owner.lock")
+    yield path
+    EngineOwner.instance = None
+
+
+@pytest.mark.asyncio
+class TestEngineOwner:
+    async def test_only_one_worker_owns_the_engines(self, lock_path):
+        first = new_engine_owner(lock_path)
+        second = new_engine_owner(lock_path)
+
+        assert first.try_acquire()
+        assert first.try_acquire()
+        assert not second.try_acquire()
+        assert first.is_owner and not second.is_owner
+
+        first.release()
+        assert second.try_acquire()
+        second.release()
+
+    async def test_election_takes_over_after_the_owner_exits(self, lock_path):
+        owner = new_engine_owner(lock_path)
+        follower = new_engine_owner(lock_path)
+        assert owner.try_acquire()
+
+        elected = list()
+
+        async def on_elected():
+            elected.append(True)
+
+        election = asyncio.create_task(follower.run_election(on_elected=on_elected))
+        await asyncio.sleep(0.05)
+        assert not elected
+
+        owner.release()
+        await asyncio.wait_for(election, timeout=1)
+        assert elected == [True]
+        assert follower.is_owner
+        follower.release()
+
+    async def test_lifespan_starts_engines_only_in_the_owner(
+        self, database_provider_test, lock_path
+    ):
+        other_worker = new_engine_owner(lock_path)
+        assert other_worker.try_acquire()
+        new_engine_owner(lock_path)
+
+        # keeps the test database out of WAL mode
+        with patch("src.api.base_router.SqliteProfile"), patch(
+            "src.api.base_router.start_engines"
+        ) as start_engines, patch("src.api.base_router.stop_engines") as stop_engines:
+            async with lifespan(FastAPI()):
+                await asyncio.sleep(0.05)
+                start_engines.assert_not_called()
+
+                other_worker.release()
+                await asyncio.sleep(0.05)
+                start_engines.assert_called_once_with()
+            stop_engines.assert_called_once_with()
+        assert not EngineOwner().is_owner
@@ -0,0 +1,86 @@
+import time
+
+from fifi.enums import Market
+
+from src.common.market_snapshot import MarketDataSnapshot
+
+
+class MarketDataRepositoryStub:
+    def __init__(self, last_trade: float, time: float) -> None:
+        self.last_trade = last_trade
+        self.time = time
+        self.reads = 0
+
+    def get_last_trade(self):
+        self.reads += 1
+        return self.last_trade
+
+    def get_time(self):
+        return self.time
+
+
+class MarketViewStub(MarketDataRepositoryStub):
+    def read_tick(self):
+        self.reads += 1
+        return self.last_trade, self.time
+
+
+class TestMarketDataSnapshot:
+    def test_refresh_reads_each_market_once(self):
+        repo = MarketDataRepositoryStub(last_trade=1100, time=time.time())
+        snapshot = MarketDataSnapshot({Market.BTCUSD: repo}, max_staleness=10)
+
+        snapshot.refresh()
+        repo.last_trade = 1200
+        for _ in range(5):
+            assert snapshot.last_trade(Market.BTCUSD) == 1100
+
+        assert repo.reads == 1
+        assert snapshot.is_fresh(Market.BTCUSD)
+
+    def test_refresh_reads_a_tick_at_once(self):
+        view = MarketViewStub(last_trade=1100, time=time.time())
+        snapshot = MarketDataSnapshot({Market.BTCUSD: view}, max_staleness=10)
+
+        snapshot.refresh()
+        assert view.reads == 1
+        assert snapshot.last_trade(Market.BTCUSD) == 1100
+        assert snapshot.is_fresh(Market.BTCUSD)
+
+    def test_stale_markets_are_paused(self):
+        now = time.time()
+        stale = MarketDataRepositoryStub(last_trade=1100, time=now - 60)
+        empty = MarketDataRepositoryStub(last_trade=0, time=now)
+        fresh_in_ms = MarketDataRepositoryStub(last_trade=1100, time=now * 1000)
+        snapshot = MarketDataSnapshot(
+            {
+                Market.BTCUSD: stale,
+                Market.ETHUSD: empty,
+                Market.BTCUSD_PERP: fresh_in_ms,
+            },
+            max_staleness=10,
+        )
+
+        snapshot.refresh()
+        assert not snapshot.is_fresh(Market.BTCUSD)
+        assert not snapshot.is_fresh(Market.ETHUSD)
+        assert snapshot.is_fresh(Market.BTCUSD_PERP)
+        assert not snapshot.is_fresh(Market.ETHUSD_PERP)
+
+        stale.time = time.time()
+        snapshot.refresh()
+        assert snapshot.is_fresh(Market.BTCUSD)
+
+    def test_staleness_against_the_replayed_time(self):
+        repo = MarketDataRepositoryStub(last_trade=1100, time=1_000)
+        replayed_time = 1_005
+        snapshot = MarketDataSnapshot(
+            {Market.BTCUSD: repo}, max_staleness=10, clock=lambda: replayed_time
+        )
+
+        snapshot.refresh()
+        assert snapshot.is_fresh(Market.BTCUSD)
+
+        replayed_time = 1_020
+        snapshot.refresh()
+        assert not snapshot.is_fresh(Market.BTCUSD)
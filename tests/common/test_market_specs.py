@@ -0,0 +1,66 @@
+from fifi.enums import Asset, Market, OrderSide
+
+from src.common.market_specs import FeeClass, MarketSpecRegistry
+from src.common.settings import Setting
+from src.helpers.order_helper import OrderHelper
+
+
+class TestMarketSpecRegistry:
+    registry = MarketSpecRegistry()
+
+    def test_specs(self):
+        spot = self.registry.get(Market.ETHUSD)
+        assert spot.base == Asset.ETH
+        assert spot.quote == Asset.USD
+        assert not spot.is_perpetual
+        assert spot.fee_class == FeeClass.SPOT
+
+        perp = self.registry.get(Market.BTCUSD_PERP)
+        assert perp.base == Asset.BTC
+        assert perp.quote == Asset.USD
+        assert perp.is_perpetual
+        assert perp.fee_class == FeeClass.PERP
+
+        assert self.registry.is_active(Market.BTCUSD)
+        assert not self.registry.is_active(Market.ETHUSD)
+
+    def test_steps(self):
+        spec = self.registry.get(Market.BTCUSD)
+        assert spec.is_on_tick(1100.1)
+        assert not spec.is_on_tick(1100.15)
+        assert spec.is_on_lot(0.0025)
+        assert spec.is_on_lot(0.1 + 0.2)
+        assert not spec.is_on_lot(0.00025)
+
+    def test_steps_from_settings(self, monkeypatch):
+        monkeypatch.setattr(
+            Setting(), "MARKET_STEPS", {Market.BTCUSD_PERP: (0.5, 0.001, 2.0)}
+        )
+        MarketSpecRegistry.instance = None
+        try:
+            registry = MarketSpecRegistry()
+            perp = registry.get(Market.BTCUSD_PERP)
+            assert perp.tick_size == 0.5
+            assert perp.lot_size == 0.001
+            assert perp.contract_multiplier == 2
+            spot = registry.get(Market.BTCUSD)
+            assert spot.tick_size == Setting().DEFAULT_TICK_SIZE
+        finally:
+            MarketSpecRegistry.instance = None
+
+    def test_order_helper_assets(self):
+        assert (
+            OrderHelper.get_recieved_asset(Market.ETHUSD, OrderSide.BUY) == Asset.ETH
+        )
+        assert OrderHelper.get_payment_asset(Market.ETHUSD, OrderSide.BUY) == Asset.USD
+        assert (
+            OrderHelper.get_recieved_asset(Market.ETHUSD, OrderSide.SELL) == Asset.USD
+        )
+        assert (
+            OrderHelper.get_payment_asset(Market.ETHUSD, OrderSide.SELL) == Asset.ETH
+        )
+        for side in OrderSide:
+            assert (
+                OrderHelper.get_recieved_asset(Market.BTCUSD_PERP, side) == Asset.USD
+            )
+            assert OrderHelper.get_payment_asset(Market.BTCUSD_PERP, side) == Asset.USD
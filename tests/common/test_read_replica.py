@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+
+from datetime import timedelta
+from httpx import ASGITransport, AsyncClient
+from main import app
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from fifi import DecoratedBase
+
+from src.common.read_replica import ReadReplica, read_only
+from src.models import Order, Portfolio
+from src.services import OrderService, PortfolioService
+from tests.materials import *
+
+
+@pytest.fixture
+def read_replica(database_provider_test, tmp_path):
+    replica = ReadReplica(url=f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+
+    async def init_replica():
+        async with replica.engine.begin() as conn:
+            await conn.run_sync(DecoratedBase.metadata.create_all)
+
+    asyncio.new_event_loop().run_until_complete(init_replica())
+    replica.apply(database_provider_test)
+    yield replica
+    asyncio.new_event_loop().run_until_complete(replica.shutdown())
+    # remove singleton instance
+    ReadReplica.instance = None
+
+
+async def create_replica_only_portfolio(replica: ReadReplica) -> Portfolio:
+    async with async_sessionmaker(replica.engine, expire_on_commit=False)() as session:
+        portfolio = Portfolio(name="replicated")
+        session.add(portfolio)
+        await session.commit()
+    return portfolio
+
+
+@pytest.mark.asyncio
+class TestReadReplica:
+    order_service = OrderService()
+    portfolio_service = PortfolioService()
+
+    async def test_get_is_served_by_fresh_replica(self, read_replica):
+        portfolio = await create_replica_only_portfolio(read_replica)
+        assert await read_replica.check_lag() == 0
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+        ) as ac:
+            response = await ac.get(f"/portfolio?id={portfolio.id}")
+            assert response.status_code == 200
+            assert response.json()["name"] == "replicated"
+        assert read_replica.routed_reads > 0
+
+    async def test_get_falls_back_to_primary_when_stale(self, read_replica):
+        portfolio = await create_replica_only_portfolio(read_replica)
+        read_replica.lag = read_replica.max_staleness + 1
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test/exapi/v1"
+        ) as ac:
+            response = await ac.get(f"/portfolio?id={portfolio.id}")
+            assert response.status_code == 404
+        assert read_replica.routed_reads == 0
+
+    async def test_reads_outside_read_only_stay_on_primary(self, read_replica):
+        portfolio = await create_replica_only_portfolio(read_replica)
+        await read_replica.check_lag()
+
+        assert await self.portfolio_service.read_by_id(portfolio.id) is None
+        with read_only():
+            assert await self.portfolio_service.read_by_id(portfolio.id) is not None
+        assert await self.portfolio_service.read_by_id(portfolio.id) is None
+
+    async def test_check_lag(self, read_replica, order_factory):
+        orders = await self.order_service.create_many(data=order_factory(count=1))
+        assert await read_replica.check_lag() == float("inf")
+        assert not read_replica.is_fresh()
+
+        replica_order = Order(**orders[0].to_dict())
+        replica_order.updated_at = orders[0].updated_at - timedelta(seconds=5)
+        async with async_sessionmaker(read_replica.engine)() as session:
+            session.add(replica_order)
+            await session.commit()
+
+        assert await read_replica.check_lag() == pytest.approx(5)
+        assert not read_replica.is_fresh()
@@ -0,0 +1,145 @@
+import asyncio
+import fcntl
+import os
+import pytest
+import time
+
+from sqlalchemy import column, select, table, text, update
+from sqlalchemy.pool import NullPool
+
+from fifi import DatabaseProvider
+
+from src.common.settings import Setting
+from src.common.sqlite_profile import SqliteProfile
+
+
+@pytest.fixture
+def sqlite_provider(tmp_path, monkeypatch):
+    monkeypatch.setattr(Setting(), "SQLITE_PROFILE_ENABLED", True)
+    os.environ["DATABASE_HOST"] = ""
+    os.environ["DATABASE_PORT"] = "0"
+    os.environ["DATABASE_USER"] = ""
+    os.environ["DATABASE_PASS"] = ""
+    db = DatabaseProvider(
+        db_name=str(tmp_path / "profile.db"), db_tech="sqlite", db_lib="aiosqlite"
+    )
+    yield db
+    asyncio.new_event_loop().run_until_complete(db.shutdown())
+    # remove singleton instance
+    DatabaseProvider.instance = None
+
+
+@pytest.mark.asyncio
+class TestSqliteProfile:
+    async def test_apply_sets_pragmas(self, sqlite_provider):
+        assert SqliteProfile.apply(sqlite_provider)
+        engine = sqlite_provider.engine
+        assert not isinstance(engine.pool, NullPool)
+        # applying twice keeps the same engine
+        assert SqliteProfile.apply(sqlite_provider)
+        assert sqlite_provider.engine is engine
+
+        setting = Setting()
+        async with engine.connect() as conn:
+            journal_mode = await conn.scalar(text("PRAGMA journal_mode"))
+            synchronous = await conn.scalar(text("PRAGMA synchronous"))
+            busy_timeout = await conn.scalar(text("PRAGMA busy_timeout"))
+            cache_size = await conn.scalar(text("PRAGMA cache_size"))
+            temp_store = await conn.scalar(text("PRAGMA temp_store"))
+
+        assert journal_mode == setting.SQLITE_JOURNAL_MODE.lower()
+        # NORMAL
+        assert synchronous == 1
+        assert busy_timeout == setting.SQLITE_BUSY_TIMEOUT
+        assert cache_size == setting.SQLITE_CACHE_SIZE
+        # MEMORY
+        assert temp_store == 2
+
+    async def test_concurrent_writers_are_funneled(self, sqlite_provider):
+        SqliteProfile.apply(sqlite_provider)
+        sqlite_engine = sqlite_provider.engine
+        async with sqlite_engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE counter (id INTEGER, value INTEGER)"))
+            await conn.execute(text("INSERT INTO counter VALUES (1, 0)"))
+
+        counter = table("counter", column("id"), column("value"))
+
+        # read and written back in one transaction, no increment may get lost
+        async def increment(times: int) -> None:
+            for _ in range(times):
+                async with sqlite_engine.begin() as conn:
+                    value = await conn.scalar(
+                        select(counter.c.value)
+                        .where(counter.c.id == 1)
+                        .with_for_update()
+                    )
+                    await asyncio.sleep(0)
+                    await conn.execute(
+                        update(counter).where(counter.c.id == 1).values(value=value + 1)
+                    )
+
+        await asyncio.gather(*[increment(20) for _ in range(5)])
+
+        async with sqlite_engine.connect() as conn:
+            assert await conn.scalar(text("SELECT value FROM counter")) == 100
+
+    async def test_write_transactions_hold_the_funnel(self, sqlite_provider):
+        SqliteProfile.apply(sqlite_provider)
+        sqlite_engine = sqlite_provider.engine
+        lock_path = SqliteProfile.write_lock_path(sqlite_engine.url)
+        async with sqlite_engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE counter (id INTEGER, value INTEGER)"))
+
+        # another process, or connection, holding the funnel
+        other_fd = os.open(lock_path, os.O_RDWR)
+        try:
+            fcntl.flock(other_fd, fcntl.LOCK_EX)
+            asyncio.get_running_loop().call_later(
+                0.2, fcntl.flock, other_fd, fcntl.LOCK_UN
+            )
+            started = time.monotonic()
+            async with sqlite_engine.begin() as conn:
+                await conn.execute(text("INSERT INTO counter VALUES (1, 0)"))
+                assert time.monotonic() - started >= 0.2
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(other_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+            # released on commit, reads never take it
+            fcntl.flock(other_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            async with sqlite_engine.connect() as conn:
+                assert await conn.scalar(text("SELECT value FROM counter")) == 0
+        finally:
+            os.close(other_fd)
+
+    async def test_begins_transaction(self, sqlite_provider):
+        async with sqlite_provider.engine.connect() as conn:
+            await conn.begin()
+            assert not SqliteProfile.begins_transaction(conn)
+
+        SqliteProfile.apply(sqlite_provider)
+        async with sqlite_provider.engine.connect() as conn:
+            await conn.begin()
+            assert SqliteProfile.begins_transaction(conn)
+            assert await conn.scalar(text("SELECT 1")) == 1
+            assert not SqliteProfile.begins_transaction(conn)
+
+    async def test_apply_skips_when_disabled(self, sqlite_provider, monkeypatch):
+        monkeypatch.setattr(Setting(), "SQLITE_PROFILE_ENABLED", False)
+        engine = sqlite_provider.engine
+        assert not SqliteProfile.apply(sqlite_provider)
+        assert sqlite_provider.engine is engine
+
+    async def test_apply_skips_other_dialects(self):
+        db = DatabaseProvider(
+            user="user",
+            password="pass",
+            host="localhost",
+            port=5432,
+            db_name="db",
+            db_tech="postgresql",
+            db_lib="asyncpg",
+        )
+        engine = db.engine
+        assert not SqliteProfile.apply(db)
+        assert db.engine is engine
+        DatabaseProvider.instance = None
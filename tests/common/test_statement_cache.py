@@ -0,0 +1,33 @@
+import pytest
+
+from fifi.enums import Asset
+
+from src.common.statement_cache import StatementCacheStats
+from src.repository import BalanceRepository
+from tests.materials import *
+
+
+@pytest.mark.asyncio
+class TestStatementCacheStats:
+    balance_repo = BalanceRepository()
+
+    async def test_repeated_lookups_hit_the_cache(
+        self, database_provider_test, balance_factory_for_portfolios
+    ):
+        await self.balance_repo.create_many(
+            data=balance_factory_for_portfolios(portfolio_id="iamrich")
+        )
+        stats = StatementCacheStats()
+        await self.balance_repo.get_portfolio_asset(
+            portfolio_id="iamrich", asset=Asset.USD
+        )
+        stats.reset()
+
+        for portfolio_id in ("iamrich", "poor", "iamrich"):
+            await self.balance_repo.get_portfolio_asset(
+                portfolio_id=portfolio_id, asset=Asset.BTC
+            )
+
+        assert stats.hits == 3
+        assert stats.misses == 0
+        assert stats.hit_rate == 1.0
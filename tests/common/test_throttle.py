@@ -0,0 +1,80 @@
+import multiprocessing
+import pytest
+
+from unittest.mock import patch
+
+from src.common.throttle import OrderThrottle
+from tests.materials import *
+
+
+def drain_in_child(order_throttle: OrderThrottle, portfolio_id: str) -> None:
+    while not order_throttle.acquire(portfolio_id=portfolio_id):
+        pass
+
+
+class TestOrderThrottle:
+    def test_disabled_admits_everything(self):
+        order_throttle = OrderThrottle()
+        assert not order_throttle.enabled
+        for _ in range(10_000):
+            assert order_throttle.acquire(portfolio_id="iamrich") == 0
+
+    def test_portfolio_burst_and_refill(self, provide_order_throttle):
+        with patch("src.common.throttle.time.monotonic", return_value=1000.0):
+            for _ in range(3):
+                assert provide_order_throttle.acquire(portfolio_id="iamrich") == 0
+            retry_after = provide_order_throttle.acquire(portfolio_id="iamrich")
+        # the portfolio bucket refills 10 tokens per second
+        assert retry_after == pytest.approx(0.1)
+
+        with patch("src.common.throttle.time.monotonic", return_value=1000.1):
+            assert provide_order_throttle.acquire(portfolio_id="iamrich") == 0
+            assert provide_order_throttle.acquire(portfolio_id="iamrich") > 0
+        assert provide_order_throttle.to_dict() == {"admitted": 4, "throttled": 2}
+
+    def test_global_limit_across_portfolios(self, provide_order_throttle):
+        with patch("src.common.throttle.time.monotonic", return_value=1000.0):
+            for portfolio_id in ("a", "b", "c", "d", "e"):
+                assert provide_order_throttle.acquire(portfolio_id=portfolio_id) == 0
+            assert provide_order_throttle.acquire(portfolio_id="f") == pytest.approx(
+                0.01
+            )
+
+    def test_cancels_leave_the_order_budget_alone(self, provide_order_throttle):
+        with patch("src.common.throttle.time.monotonic", return_value=1000.0):
+            # a client gets 2 cancels, all clients together 4
+            for _ in range(2):
+                assert provide_order_throttle.acquire(client="10.0.0.1") == 0
+            assert provide_order_throttle.acquire(client="10.0.0.1") == pytest.approx(
+                0.1
+            )
+            for _ in range(2):
+                assert provide_order_throttle.acquire(client="10.0.0.2") == 0
+            assert provide_order_throttle.acquire(client="10.0.0.3") > 0
+            assert provide_order_throttle.acquire() > 0
+
+            # the global order bucket of 5 is still full
+            for portfolio_id in ("a", "b", "c", "d", "e"):
+                assert provide_order_throttle.acquire(portfolio_id=portfolio_id) == 0
+
+    def test_refused_request_takes_no_token(self, provide_order_throttle):
+        with patch("src.common.throttle.time.monotonic", return_value=1000.0):
+            for _ in range(3):
+                provide_order_throttle.acquire(portfolio_id="flooder")
+            for _ in range(100):
+                assert provide_order_throttle.acquire(portfolio_id="flooder") > 0
+            # the flooder's refused requests left the global tokens to the others
+            assert provide_order_throttle.acquire(portfolio_id="iamrich") == 0
+            assert provide_order_throttle.acquire(portfolio_id="iamrich") == 0
+
+    def test_buckets_are_shared_with_forked_processes(self, provide_order_throttle):
+        with patch("src.common.throttle.time.monotonic", return_value=1000.0):
+            process = multiprocessing.get_context("fork").Process(
+                target=drain_in_child, args=(provide_order_throttle, "iamrich")
+            )
+            process.start()
+            process.join(timeout=5)
+
+            assert process.exitcode == 0
+            assert provide_order_throttle.acquire(portfolio_id="iamrich") > 0
+        assert provide_order_throttle.to_dict()["throttled"] == 2
@@ -5,6 +5,8 @@ import pytest
 
 from fifi import DatabaseProvider
 
+from src.common.cache import LeverageCache, PortfolioFeeCache
+
 
 @pytest.fixture
 def database_provider_test():
@@ -27,5 +29,8 @@ def database_provider_test():
     yield db
     # remove singleton instance
     DatabaseProvider.instance = None
+    # drop entries cached from the removed database
+    PortfolioFeeCache().reset()
+    LeverageCache().reset()
     # remove sqlite instance file
     os.remove("./memory")
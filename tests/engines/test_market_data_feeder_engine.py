@@ -0,0 +1,49 @@
+import pytest
+
+from fifi.enums import Market
+
+from src.engines.market_data_feeder_engine import MarketDataFeederEngine
+from src.repository import LastTradeBoardRepository
+
+
+class MarketDataRepositoryMock:
+    def __init__(self, last_trade: float, time: float) -> None:
+        self.last_trade = last_trade
+        self.time = time
+
+    def get_last_trade(self):
+        return self.last_trade
+
+    def get_time(self):
+        return self.time
+
+
+@pytest.fixture
+def provide_market_data_feeder_engine():
+    engine = MarketDataFeederEngine()
+    engine.md_repos = {
+        Market.BTCUSD: MarketDataRepositoryMock(last_trade=1100, time=1),
+        Market.BTCUSD_PERP: MarketDataRepositoryMock(last_trade=1200, time=1),
+    }
+    engine.last_fed = dict()
+    yield engine
+    engine.board.close()
+    # remove singleton instance
+    MarketDataFeederEngine.instance = None
+
+
+class TestMarketDataFeederEngine:
+    def test_feed(self, provide_market_data_feeder_engine):
+        engine = provide_market_data_feeder_engine
+        reader = LastTradeBoardRepository()
+
+        engine.feed()
+        assert reader.read(Market.BTCUSD) == (1100, 1)
+        assert reader.read(Market.BTCUSD_PERP) == (1200, 1)
+
+        engine.md_repos[Market.BTCUSD].last_trade = 1150
+        engine.md_repos[Market.BTCUSD].time = 2
+        engine.feed()
+        assert reader.read(Market.BTCUSD) == (1150, 2)
+        assert reader.read(Market.BTCUSD_PERP) == (1200, 1)
+        reader.close()
@@ -1,10 +1,11 @@
+import time
 import pytest
 
 from unittest.mock import patch
 from fifi.helpers.get_logger import LoggerFactory
 from fifi.enums import OrderType
 
-from src.common.exceptions import InvalidOrder, NotFoundOrder
+from src.common.exceptions import InvalidOrder, NotFoundOrder, VersionConflict
 from src.engines.matching_engine import MatchingEngine
 from src.models.order import Order
 from src.models.portfolio import Portfolio
@@ -29,6 +30,9 @@ class MarketDataRepositoryMock:
     def get_last_trade(self):
         return 1100
 
+    def get_time(self):
+        return time.time()
+
 
 @pytest.fixture
 def provide_matching_engine(monkeypatch):
@@ -356,6 +360,53 @@ class TestMatchingEngine:
                 order_type=OrderType.LIMIT,
             )
 
+    @pytest.mark.parametrize(
+        "market,price,size",
+        [
+            (Market.ETHUSD, 1000, 0.25),
+            (Market.BTCUSD, 1000.05, 0.25),
+            (Market.BTCUSD, 1000, 0.00025),
+            (Market.BTCUSD_PERP, 1000, 0),
+        ],
+    )
+    async def test_create_order_against_market_spec(
+        self,
+        database_provider_test,
+        provide_matching_engine,
+        monkeypatch,
+        market,
+        price,
+        size,
+    ):
+        monkeypatch.setattr(Setting(), "ORDER_STEP_VALIDATION_ENABLED", True)
+        portfolio = await self.create_fake_portfolio()
+        await self.create_fake_balances(portfolio_id=portfolio.id)
+        with pytest.raises(InvalidOrder):
+            await provide_matching_engine.create_order(
+                market=market,
+                portfolio_id=portfolio.id,
+                price=price,
+                size=size,
+                side=OrderSide.BUY,
+                order_type=OrderType.LIMIT,
+            )
+
+    async def test_create_order_off_the_steps_without_validation(
+        self, database_provider_test, provide_matching_engine
+    ):
+        portfolio = await self.create_fake_portfolio()
+        await self.create_fake_balances(portfolio_id=portfolio.id)
+        order = await provide_matching_engine.create_order(
+            market=Market.BTCUSD,
+            portfolio_id=portfolio.id,
+            price=1000.05,
+            size=0.00025,
+            side=OrderSide.BUY,
+            order_type=OrderType.LIMIT,
+        )
+        assert order.price == 1000.05
+        assert order.size == 0.00025
+
     async def create_fake_portfolio(self) -> Portfolio:
         return await self.portfolio_service.create(
             data=PortfolioSchema(name="CrazyTrader")
@@ -392,6 +443,25 @@ class TestMatchingEngine:
         assert usd_balance is not None
         assert usd_balance.available == 2000 - order.price * order.size
 
+    async def test_create_market_order_on_stale_data(
+        self, database_provider_test, provide_matching_engine
+    ):
+        portfolio = await self.create_fake_portfolio()
+        await self.create_fake_balances(portfolio_id=portfolio.id)
+        md_repo = provide_matching_engine.md_repos[Market.BTCUSD]
+        with patch.object(md_repo, "get_time", return_value=0):
+            with pytest.raises(InvalidOrder, match="stale"):
+                await provide_matching_engine.create_order(
+                    portfolio_id=portfolio.id,
+                    market=Market.BTCUSD,
+                    price=1100,
+                    size=0.25,
+                    side=OrderSide.BUY,
+                    order_type=OrderType.MARKET,
+                )
+
+        assert await self.order_service.get_open_orders() == []
+
     async def test_create_perp_market_order(
         self, database_provider_test, provide_matching_engine
     ):
@@ -552,3 +622,56 @@ class TestMatchingEngine:
                 if order.side == OrderSide.SELL:
                     LOGGER.info(f"sell order={order.to_dict()}")
                     assert order.price == 1200
+
+    async def test_match_open_orders_pauses_on_stale_market_data(
+        self, database_provider_test, provide_matching_engine
+    ):
+        portfolio = await self.create_fake_portfolio()
+        await self.create_fake_balances(portfolio_id=portfolio.id)
+        order = await provide_matching_engine.create_order(
+            portfolio_id=portfolio.id,
+            market=Market.BTCUSD,
+            price=1200,
+            size=0.0025,
+            side=OrderSide.BUY,
+            order_type=OrderType.LIMIT,
+        )
+        with patch.object(
+            provide_matching_engine.md_repos[Market.BTCUSD],
+            "get_time",
+            return_value=time.time() - 3600,
+        ):
+            await provide_matching_engine.match_open_orders(open_orders=[order])
+
+        open_orders = await self.order_service.get_open_orders()
+        assert [open_order.id for open_order in open_orders] == [order.id]
+
+        await provide_matching_engine.match_open_orders(open_orders=[order])
+        assert await self.order_service.get_open_orders() == []
+
+    async def test_run_once_survives_version_conflicts(
+        self, database_provider_test, provide_matching_engine
+    ):
+        portfolio = await self.create_fake_portfolio()
+        await self.create_fake_balances(portfolio_id=portfolio.id)
+        order = await provide_matching_engine.create_order(
+            portfolio_id=portfolio.id,
+            market=Market.BTCUSD,
+            price=1200,
+            size=0.0025,
+            side=OrderSide.BUY,
+            order_type=OrderType.LIMIT,
+        )
+        with patch.object(
+            type(self.balance_service.repo),
+            "update_entity",
+            side_effect=VersionConflict("lost the race"),
+        ):
+            await provide_matching_engine.run_once()
+            await provide_matching_engine.run_once()
+
+        # left active for the next pass, which fills it once the writes go through
+        open_orders = await self.order_service.get_open_orders()
+        assert [open_order.id for open_order in open_orders] == [order.id]
+        await provide_matching_engine.run_once()
+        assert await self.order_service.get_open_orders() == []
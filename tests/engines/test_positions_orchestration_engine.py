@@ -1,3 +1,4 @@
+import time
 import pytest
 
 from typing import Tuple
@@ -12,12 +13,15 @@ from fifi.enums import (
     Market,
 )
 
+from src.common.exceptions import VersionConflict
 from src.helpers.position_helpers import PositionHelpers
 from src.models.leverage import Leverage
 from src.models.order import Order
 from src.schemas.order_schema import OrderSchema
 from src.services import *
 from src.engines.positions_orchestration_engine import PositionsOrchestrationEngine
+from src.journal import JournalEventType
+from tests.materials import provide_event_journal
 
 
 LOGGER = LoggerFactory().get(__name__)
@@ -30,6 +34,9 @@ class MarketDataRepositoryMock:
     def get_last_trade(self):
         return 1100
 
+    def get_time(self):
+        return time.time()
+
 
 @pytest.fixture
 def provide_positions_orchestration_engine(monkeypatch):
@@ -314,3 +321,71 @@ class TestPositionsOrchestrationEngine:
                 order, position
             )
             mock_method.assert_awaited_once()
+
+    async def test_recover_pending_perp_fills(
+        self,
+        database_provider_test,
+        provide_positions_orchestration_engine,
+        provide_event_journal,
+        monkeypatch,
+    ):
+        engine = provide_positions_orchestration_engine
+        monkeypatch.setattr(engine, "journal", provide_event_journal)
+        leverage, order = await self.create_order_and_leverage()
+        # the fill reached the journal but the engine died before opening a position
+        provide_event_journal.record(JournalEventType.ORDER_FILLED, order)
+
+        await engine.recover_pending_perp_fills()
+
+        positions = await self.position_service.get_positions(portfolio_id="iamrich")
+        assert len(positions) == 1
+        assert positions[0].size == order.size
+        updated_order = await self.order_service.read_by_id(order.id)
+        assert updated_order is not None
+        assert updated_order.position_id == positions[0].id
+
+        state, _ = provide_event_journal.recover()
+        assert state.pending_perp_fills == {}
+        assert positions[0].id in state.open_positions
+
+        # recovering again must not open a second position
+        engine.processed_orders.clear()
+        provide_event_journal.record(JournalEventType.ORDER_FILLED, updated_order)
+        await engine.recover_pending_perp_fills()
+        positions = await self.position_service.get_positions(portfolio_id="iamrich")
+        assert len(positions) == 1
+
+    async def test_run_once_survives_version_conflicts(
+        self, database_provider_test, provide_positions_orchestration_engine
+    ):
+        engine = provide_positions_orchestration_engine
+        leverage, order = await self.create_order_and_leverage()
+        position = await engine.create_position_by_order(order)
+        engine.processed_orders.add(order.id)
+        engine.last_update = order.updated_at
+
+        order = await self.order_service.create(
+            data=OrderSchema(
+                portfolio_id="iamrich",
+                market=Market.BTCUSD_PERP,
+                price=1100,
+                size=0.1,
+                fee=0.1,
+                side=OrderSide.BUY,
+                status=OrderStatus.FILLED,
+            )
+        )
+        with patch.object(
+            type(self.position_service.repo),
+            "update_entity",
+            side_effect=VersionConflict("lost the race"),
+        ):
+            await engine.run_once()
+            await engine.run_once()
+        assert order.id not in engine.processed_orders
+
+        # the next pass reads the order again and merges it
+        await engine.run_once()
+        assert order.id in engine.processed_orders
+        updated_position = await self.position_service.read_by_id(position.id)
+        assert updated_position.size == pytest.approx(0.6)
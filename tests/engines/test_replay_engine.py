@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from types import SimpleNamespace
+
+from fifi.enums import OrderType
+
+from src.common.clock import SimulationClock
+from src.common.market_snapshot import MarketDataSnapshot
+from src.engines.positions_orchestration_engine import PositionsOrchestrationEngine
+from src.engines.replay_engine import ReplayEngine
+from src.repository import ReplayMarketDataRepository
+from src.repository.replay_market_data_repository import ReplayTrigger
+from src.services import BalanceService, OrderService, PortfolioService
+from tests.materials import *
+
+
+class MarketDataRepositoryMock:
+    def __init__(self, market: Market, interval: str) -> None:
+        pass
+
+
+@pytest.fixture
+def provide_replay_engine(tmp_path, monkeypatch):
+    for module in ("matching_engine", "positions_orchestration_engine"):
+        monkeypatch.setattr(
+            f"src.engines.{module}.MarketDataRepository", MarketDataRepositoryMock
+        )
+    # a flat market at 1000 whose 600th candle dips to 880
+    candles = np.tile([1000.0, 1010, 990, 1005], (1_000, 1))
+    candles[600, 2] = 880
+    np.savez(
+        tmp_path / "btcusd.npz",
+        time=np.arange(1_000, dtype=np.float64) * 60,
+        open=candles[:, 0],
+        high=candles[:, 1],
+        low=candles[:, 2],
+        close=candles[:, 3],
+    )
+    ReplayMarketDataRepository.instance = None
+    ReplayEngine.instance = None
+    replay = ReplayMarketDataRepository(
+        files={Market.BTCUSD: str(tmp_path / "btcusd.npz")}
+    )
+    last_update = PositionsOrchestrationEngine().last_update
+    engine = ReplayEngine()
+    engines = (engine.matching_engine, engine.positions_engine)
+    saved = [(e.md_repos, e.market_snapshot) for e in engines]
+    for e in engines:
+        e.md_repos = {market: replay.market_view(market) for market in Market}
+        e.market_snapshot = MarketDataSnapshot(e.md_repos)
+    yield engine
+    for e, (md_repos, market_snapshot) in zip(engines, saved):
+        e.md_repos, e.market_snapshot = md_repos, market_snapshot
+    engine.positions_engine.last_update = last_update
+    SimulationClock().use(None)
+    ReplayMarketDataRepository.instance = None
+    ReplayEngine.instance = None
+
+
+@pytest.mark.asyncio
+class TestReplayEngine:
+    async def test_replay_fills_when_the_price_is_reached(
+        self, database_provider_test, provide_replay_engine
+    ):
+        engine = provide_replay_engine
+        portfolio = await PortfolioService().create(
+            data=PortfolioSchema(name="Backtester")
+        )
+        await BalanceService().create_by_qty(
+            portfolio_id=portfolio.id, asset=Asset.USD, qty=2000
+        )
+        order = await engine.matching_engine.create_order(
+            market=Market.BTCUSD,
+            portfolio_id=portfolio.id,
+            price=900,
+            size=0.25,
+            side=OrderSide.BUY,
+            order_type=OrderType.LIMIT,
+        )
+
+        summary = await engine.run()
+
+        order = await OrderService().read_by_id(id_=order.id)
+        assert order.status == OrderStatus.FILLED
+        # stamped in replayed time, the dip is the low of the 600th candle
+        assert order.created_at == datetime(1970, 1, 1)
+        assert order.updated_at == datetime(1970, 1, 1) + timedelta(
+            seconds=600 * 60 + 15
+        )
+        assert engine.replay.exhausted
+        assert summary.ticks == 4_000
+        assert (summary.started_at, summary.ended_at) == (0, 999 * 60 + 45)
+        # the first tick, then straight to the dip, then nothing to wait for
+        assert summary.passes == 2
+
+    async def test_triggers(self):
+        orders = [
+            SimpleNamespace(
+                market=Market.BTCUSD, type=OrderType.LIMIT, side=side, price=price
+            )
+            for side, price in (
+                (OrderSide.BUY, 900),
+                (OrderSide.BUY, 950),
+                (OrderSide.SELL, 1100),
+            )
+        ]
+        orders.append(
+            SimpleNamespace(
+                market=Market.ETHUSD,
+                type=OrderType.MARKET,
+                side=OrderSide.BUY,
+                price=0,
+            )
+        )
+        positions = [
+            SimpleNamespace(
+                market=Market.BTCUSD, side=PositionSide.SHORT, lqd_price=1050
+            ),
+            SimpleNamespace(
+                market=Market.BTCUSD_PERP, side=PositionSide.LONG, lqd_price=800
+            ),
+        ]
+
+        assert ReplayEngine.triggers(open_orders=orders, open_positions=positions) == {
+            Market.BTCUSD: ReplayTrigger(low=950, high=1050),
+            Market.BTCUSD_PERP: ReplayTrigger(low=800),
+        }
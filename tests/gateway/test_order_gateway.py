@@ -0,0 +1,262 @@
+import asyncio
+import pytest
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+
+from unittest.mock import AsyncMock, call, patch
+from fifi.enums import OrderType
+
+from src.common.exceptions import InvalidOrder, NotFoundOrder
+from src.gateway import OrderGateway, OrderGatewayClient
+from src.gateway.protocol import FRAME_SIZE, MAX_FRAME_SIZE, CancelOrder, NewOrder
+from src.journal import JournalEventType
+from src.models import Order
+from src.services import OrderService
+from tests.materials import *
+
+
+@pytest.fixture
+def matching_engine():
+    with patch("src.gateway.order_gateway.MatchingEngine") as engine_class:
+        engine = engine_class.return_value
+        engine.create_order = AsyncMock()
+        engine.cancel_order = AsyncMock()
+        yield engine
+
+
+@asynccontextmanager
+async def open_session(
+    tmp_path,
+) -> AsyncIterator[Tuple[OrderGateway, OrderGatewayClient]]:
+    gateway = OrderGateway()
+    gateway.setting = gateway.setting.model_copy(
+        update={
+            "ORDER_GATEWAY_PORT": None,
+            "ORDER_GATEWAY_UNIX_PATH": str(tmp_path / "gateway.sock"),
+        }
+    )
+    await gateway.start()
+    client = await OrderGatewayClient.connect(
+        unix_path=gateway.setting.ORDER_GATEWAY_UNIX_PATH
+    )
+    try:
+        yield gateway, client
+    finally:
+        await client.close()
+        await gateway.stop()
+        # remove singleton instance
+        OrderGateway.instance = None
+
+
+@pytest.mark.asyncio
+class TestOrderGateway:
+    order_service = OrderService()
+
+    async def create_orders(self, order_factory, count: int = 3) -> List[Order]:
+        return await self.order_service.create_many(data=order_factory(count=count))
+
+    async def test_new_order(
+        self, database_provider_test, order_factory, matching_engine, tmp_path
+    ):
+        order = (await self.create_orders(order_factory))[0]
+        matching_engine.create_order.return_value = order
+
+        async with open_session(tmp_path) as (_, client):
+            report = await client.new_order(
+                portfolio_id=order.portfolio_id,
+                market=order.market,
+                side=order.side,
+                order_type=order.type,
+                price=order.price,
+                size=order.size,
+            )
+
+        assert report.order_id == order.id
+        assert report.status == order.status
+        assert (report.price, report.size, report.fee) == (
+            order.price,
+            order.size,
+            order.fee,
+        )
+        matching_engine.create_order.assert_awaited_once_with(
+            portfolio_id=order.portfolio_id,
+            market=order.market,
+            price=order.price,
+            size=order.size,
+            side=order.side,
+            order_type=order.type,
+        )
+
+    async def test_pipelined_requests(
+        self, database_provider_test, order_factory, matching_engine, tmp_path
+    ):
+        orders = await self.create_orders(order_factory)
+        matching_engine.cancel_order.side_effect = [
+            orders[0],
+            NotFoundOrder("order_id='missing'"),
+            orders[2],
+        ]
+
+        async with open_session(tmp_path) as (_, client):
+            futures = [
+                client.submit(CancelOrder(order_id=order_id))
+                for order_id in (orders[0].id, "missing", orders[2].id)
+            ]
+            results = await asyncio.gather(*futures, return_exceptions=True)
+
+        assert results[0].order_id == orders[0].id
+        assert isinstance(results[1], InvalidOrder)
+        assert "missing" in str(results[1])
+        assert results[2].order_id == orders[2].id
+        assert matching_engine.cancel_order.await_args_list == [
+            call(order_id=orders[0].id),
+            call(order_id="missing"),
+            call(order_id=orders[2].id),
+        ]
+
+    async def test_amend_replaces_the_order(
+        self, database_provider_test, order_factory, matching_engine, tmp_path
+    ):
+        canceled, replacement = (await self.create_orders(order_factory))[:2]
+        matching_engine.cancel_order.return_value = canceled
+        matching_engine.create_order.return_value = replacement
+
+        async with open_session(tmp_path) as (_, client):
+            report = await client.amend_order(
+                order_id=canceled.id, price=12.5, size=3.0
+            )
+
+        assert report.order_id == replacement.id
+        matching_engine.cancel_order.assert_awaited_once_with(order_id=canceled.id)
+        matching_engine.create_order.assert_awaited_once_with(
+            portfolio_id=canceled.portfolio_id,
+            market=canceled.market,
+            price=12.5,
+            size=3.0,
+            side=canceled.side,
+            order_type=canceled.type,
+        )
+
+    async def test_rejected_amend_names_the_canceled_order(
+        self, database_provider_test, order_factory, matching_engine, tmp_path
+    ):
+        canceled = (await self.create_orders(order_factory))[0]
+        matching_engine.cancel_order.return_value = canceled
+        matching_engine.create_order.side_effect = InvalidOrder("not enough balance")
+
+        async with open_session(tmp_path) as (_, client):
+            with pytest.raises(InvalidOrder) as ex:
+                await client.amend_order(order_id=canceled.id, price=12.5, size=3.0)
+
+        assert canceled.id in str(ex.value)
+        assert "not enough balance" in str(ex.value)
+
+    async def test_unsolicited_reports(
+        self,
+        database_provider_test,
+        order_factory,
+        matching_engine,
+        provide_push_stream,
+        tmp_path,
+    ):
+        resting, other = await self.create_orders(order_factory, count=2)
+        for order in (resting, other):
+            order.status = OrderStatus.ACTIVE
+        matching_engine.create_order.return_value = resting
+
+        async with open_session(tmp_path) as (_, client):
+            await client.new_order(
+                portfolio_id=resting.portfolio_id,
+                market=resting.market,
+                side=resting.side,
+                order_type=resting.type,
+                price=resting.price,
+                size=resting.size,
+            )
+            # not a change, and not an order of the session
+            provide_push_stream.publish(
+                JournalEventType.ORDER_ACCEPTED, resting.to_dict()
+            )
+            provide_push_stream.publish(
+                JournalEventType.ORDER_FILLED,
+                {**other.to_dict(), "status": OrderStatus.FILLED},
+            )
+            provide_push_stream.publish(
+                JournalEventType.ORDER_FILLED,
+                {**resting.to_dict(), "status": OrderStatus.FILLED},
+            )
+            report = await asyncio.wait_for(client.reports.get(), timeout=1)
+
+            assert report.order_id == resting.id
+            assert report.status == OrderStatus.FILLED
+            assert client.reports.empty()
+
+    async def test_rejected_order(self, matching_engine, tmp_path):
+        matching_engine.create_order.side_effect = InvalidOrder("market is not active")
+
+        async with open_session(tmp_path) as (_, client):
+            with pytest.raises(InvalidOrder, match="market is not active"):
+                await client.new_order(
+                    portfolio_id="iamrich",
+                    market=Market.ETHUSD,
+                    side=OrderSide.BUY,
+                    order_type=OrderType.LIMIT,
+                    price=1.0,
+                    size=1.0,
+                )
+
+    async def test_bad_frame_closes_the_session(self, tmp_path):
+        async with open_session(tmp_path) as (gateway, _):
+            reader, writer = await asyncio.open_unix_connection(
+                path=gateway.setting.ORDER_GATEWAY_UNIX_PATH
+            )
+            writer.write(FRAME_SIZE.pack(MAX_FRAME_SIZE + 1))
+
+            assert await asyncio.wait_for(reader.read(), timeout=1) == b""
+            writer.close()
+
+    async def test_throttled_order(
+        self, matching_engine, provide_order_throttle, tmp_path
+    ):
+        matching_engine.create_order.side_effect = InvalidOrder("market is not active")
+        order = NewOrder(
+            portfolio_id="iamrich",
+            market=Market.ETHUSD,
+            side=OrderSide.BUY,
+            type=OrderType.LIMIT,
+            price=1.0,
+            size=1.0,
+        )
+
+        async with open_session(tmp_path) as (_, client):
+            results = await asyncio.gather(
+                *(client.submit(order) for _ in range(4)), return_exceptions=True
+            )
+
+        assert "rate limit" in str(results[3])
+        assert matching_engine.create_order.await_count == 3
+
+    async def test_throttled_cancels_per_session(
+        self, matching_engine, provide_order_throttle, tmp_path
+    ):
+        matching_engine.cancel_order.side_effect = InvalidOrder("order is not active")
+
+        async with open_session(tmp_path) as (gateway, client):
+            results = await asyncio.gather(
+                *(client.cancel_order(f"o{i}") for i in range(3)),
+                return_exceptions=True,
+            )
+            # another session has a cancel bucket of its own
+            other = await OrderGatewayClient.connect(
+                unix_path=gateway.setting.ORDER_GATEWAY_UNIX_PATH
+            )
+            try:
+                with pytest.raises(InvalidOrder, match="not active"):
+                    await other.cancel_order("o3")
+            finally:
+                await other.close()
+
+        # the client bucket holds 2 cancels
+        assert "rate limit" in str(results[2])
+        assert matching_engine.cancel_order.await_count == 3
@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+
+from fifi.enums import OrderType
+
+from src.gateway.protocol import (
+    FRAME_SIZE,
+    MAX_FRAME_SIZE,
+    AmendOrder,
+    CancelOrder,
+    ExecutionReport,
+    NewOrder,
+    ProtocolError,
+    Reject,
+    pack_frame,
+    read_frame,
+    unpack_frame,
+)
+from tests.materials import *
+
+
+MESSAGES = [
+    NewOrder(
+        portfolio_id="iamrich",
+        market=Market.BTCUSD_PERP,
+        side=OrderSide.SELL,
+        type=OrderType.LIMIT,
+        price=101_234.5,
+        size=0.0125,
+    ),
+    CancelOrder(order_id=str(uuid.uuid4())),
+    AmendOrder(order_id=str(uuid.uuid4()), price=99.5, size=2.0),
+    ExecutionReport(
+        order_id=str(uuid.uuid4()),
+        portfolio_id="iamrich",
+        market=Market.ETHUSD,
+        side=OrderSide.BUY,
+        type=OrderType.MARKET,
+        status=OrderStatus.FILLED,
+        price=3_000.25,
+        size=1.5,
+        fee=0.675,
+        position_id=None,
+    ),
+    Reject(reason="portfolio_id='ß' is invalid"),
+]
+
+
+def stream_of(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+@pytest.mark.asyncio
+class TestProtocol:
+    @pytest.mark.parametrize("message", MESSAGES)
+    async def test_round_trip(self, message):
+        frame = pack_frame(request_id=4_000_000_000, message=message)
+
+        assert await read_frame(stream_of(frame)) == (4_000_000_000, message)
+
+    async def test_pipelined_frames(self):
+        reader = stream_of(b"".join(pack_frame(i, m) for i, m in enumerate(MESSAGES)))
+
+        for i, message in enumerate(MESSAGES):
+            assert await read_frame(reader) == (i, message)
+        with pytest.raises(asyncio.IncompleteReadError):
+            await read_frame(reader)
+
+    async def test_frame_too_big(self):
+        with pytest.raises(ProtocolError):
+            await read_frame(stream_of(FRAME_SIZE.pack(MAX_FRAME_SIZE + 1)))
+
+    async def test_invalid_frames(self):
+        frame = pack_frame(1, MESSAGES[0])[FRAME_SIZE.size :]
+
+        with pytest.raises(ProtocolError):
+            unpack_frame(b"\x63" + frame[1:])
+        with pytest.raises(ProtocolError):
+            unpack_frame(frame[:-4])
+        with pytest.raises(ProtocolError):
+            unpack_frame(frame.replace(b"btcusd_perp", b"dogeusd_xx"))
@@ -0,0 +1,142 @@
+import os
+import pytest
+
+from concurrent.futures import Future
+
+from src.journal import EventJournal, JournalEventType, JournalState
+from src.services import OrderService
+from tests.materials import *
+
+
+def order_data(order_id: str, market: Market = Market.BTCUSD_PERP) -> dict:
+    return {"id": order_id, "market": market.value, "status": "active"}
+
+
+class TestEventJournal:
+    def test_recover_without_log(self, provide_event_journal):
+        state, offset = provide_event_journal.recover()
+        assert offset == 0
+        assert state.events_applied == 0
+
+    def test_recover_replays_events(self, provide_event_journal):
+        journal = provide_event_journal
+        journal.append(JournalEventType.ORDER_ACCEPTED, order_data("first"))
+        journal.append(JournalEventType.ORDER_ACCEPTED, order_data("second"))
+        journal.append(JournalEventType.ORDER_CANCELED, order_data("first"))
+        journal.append(
+            JournalEventType.BALANCE_CHANGED, {"id": "usd", "quantity": 10}
+        )
+        journal.append(
+            JournalEventType.BALANCE_CHANGED, {"id": "usd", "quantity": 12}
+        )
+
+        state, offset = journal.recover()
+        assert offset == os.path.getsize(journal.events_path)
+        assert state.events_applied == 5
+        assert set(state.active_orders) == {"second"}
+        assert state.balances["usd"]["quantity"] == 12
+
+    def test_pending_perp_fills(self, provide_event_journal):
+        journal = provide_event_journal
+        journal.append(JournalEventType.ORDER_FILLED, order_data("perp"))
+        journal.append(JournalEventType.ORDER_FILLED, order_data("spot", Market.BTCUSD))
+        journal.append(JournalEventType.ORDER_FILLED, order_data("applied"))
+        journal.append(
+            JournalEventType.POSITION_OPENED, {"id": "position"}, cause_id="applied"
+        )
+
+        state, _ = journal.recover()
+        assert set(state.pending_perp_fills) == {"perp"}
+        assert set(state.open_positions) == {"position"}
+
+        journal.append(
+            JournalEventType.POSITION_LIQUIDATED, {"id": "position"}, cause_id=None
+        )
+        state, _ = journal.recover()
+        assert state.open_positions == {}
+
+    def test_snapshot_and_tail(self, provide_event_journal):
+        journal = provide_event_journal
+        for i in range(10):
+            journal.append(JournalEventType.ORDER_ACCEPTED, order_data(str(i)))
+        snapshot_state = journal.snapshot()
+        assert snapshot_state.events_applied == 10
+
+        journal.append(JournalEventType.ORDER_FILLED, order_data("3"))
+        journal.append(JournalEventType.ORDER_ACCEPTED, order_data("10"))
+
+        state, offset = journal.recover()
+        assert offset == os.path.getsize(journal.events_path)
+        assert state.events_applied == 12
+        assert "3" not in state.active_orders
+        assert len(state.active_orders) == 10
+
+    def test_snapshot_interval(self, provide_event_journal):
+        journal = provide_event_journal
+        journal.snapshot_interval = 4
+        for i in range(9):
+            journal.append(JournalEventType.ORDER_ACCEPTED, order_data(str(i)))
+        # waits for the snapshot running in the background
+        journal.close()
+
+        assert os.path.exists(journal.snapshot_path)
+        assert sorted(os.listdir(journal.path)) == ["events.log", "snapshot.json"]
+        state, _ = journal.recover()
+        assert len(state.active_orders) == 9
+
+    def test_snapshot_in_background(self, provide_event_journal):
+        journal = provide_event_journal
+        for i in range(3):
+            journal.append(JournalEventType.ORDER_ACCEPTED, order_data(str(i)))
+
+        future = journal.snapshot_in_background()
+        assert future.result().events_applied == 3
+        assert os.path.exists(journal.snapshot_path)
+
+        # a due snapshot is skipped while the previous one still runs
+        journal._pending_snapshot = Future()
+        assert journal.snapshot_in_background() is None
+        journal._pending_snapshot = None
+
+    def test_recover_stops_at_torn_tail(self, provide_event_journal):
+        journal = provide_event_journal
+        journal.append(JournalEventType.ORDER_ACCEPTED, order_data("first"))
+        journal.close()
+        with open(journal.events_path, "ab") as events_file:
+            events_file.write(b'["order_accepted", "2025')
+
+        state, offset = journal.recover()
+        assert set(state.active_orders) == {"first"}
+        assert offset < os.path.getsize(journal.events_path)
+
+    def test_state_round_trip(self, provide_event_journal):
+        journal = provide_event_journal
+        journal.append(JournalEventType.ORDER_ACCEPTED, order_data("first"))
+        state, _ = journal.recover()
+        assert JournalState.from_dict(state.to_dict()).to_dict() == state.to_dict()
+
+    def test_disabled_journal_records_nothing(self, tmp_path):
+        EventJournal.instance = None
+        journal = EventJournal(
+            path=str(tmp_path), enabled=False, snapshot_interval=0, fsync=False
+        )
+        journal.record(JournalEventType.ORDER_ACCEPTED, None)  # type: ignore
+        assert not os.path.exists(journal.events_path)
+        EventJournal.instance = None
+
+
+@pytest.mark.asyncio
+class TestEventJournalRecord:
+    order_service = OrderService()
+
+    async def test_record_entity(
+        self, database_provider_test, provide_event_journal, order_factory
+    ):
+        orders = await self.order_service.create_many(data=order_factory(count=3))
+        for order in orders:
+            provide_event_journal.record(JournalEventType.ORDER_ACCEPTED, order)
+
+        state, _ = provide_event_journal.recover()
+        assert set(state.active_orders) == {order.id for order in orders}
+        for order in orders:
+            assert state.active_orders[order.id]["market"] == order.market.value
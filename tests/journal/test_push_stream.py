@@ -0,0 +1,115 @@
+import asyncio
+import multiprocessing
+import pytest
+
+from src.common.settings import Setting
+from src.journal import EventJournal, JournalEventType
+from src.journal.push_stream import BALANCES, FILLS, ORDERS, POSITIONS
+from src.services import OrderService
+from tests.materials import *
+
+
+def order_data(portfolio_id: str = "iamrich") -> dict:
+    return {"id": "order", "portfolio_id": portfolio_id, "status": "filled"}
+
+
+@pytest.mark.asyncio
+class TestPushStream:
+    async def test_dispatch_by_portfolio_and_channel(self, provide_push_stream):
+        fills = provide_push_stream.subscribe(portfolio_id="iamrich", channels=[FILLS])
+        everything = provide_push_stream.subscribe(portfolio_id="iamrich")
+        other = provide_push_stream.subscribe(portfolio_id="poor")
+
+        provide_push_stream.dispatch(
+            JournalEventType.ORDER_FILLED.value, order_data(), None
+        )
+        provide_push_stream.dispatch(
+            JournalEventType.BALANCE_CHANGED.value, order_data(), None
+        )
+        # the events are offered on the loop of each subscription
+        await asyncio.sleep(0)
+
+        assert fills.buffer.get_nowait()["channel"] == FILLS
+        assert fills.buffer.empty()
+        assert [everything.buffer.get_nowait()["channel"] for _ in range(3)] == [
+            ORDERS,
+            FILLS,
+            BALANCES,
+        ]
+        assert other.buffer.empty()
+        for subscription in (fills, everything, other):
+            provide_push_stream.unsubscribe(subscription)
+
+    async def test_unknown_channel(self, provide_push_stream):
+        with pytest.raises(ValueError):
+            provide_push_stream.subscribe(portfolio_id="iamrich", channels=["trades"])
+
+    async def test_overflow(self, provide_push_stream):
+        subscription = provide_push_stream.subscribe(
+            portfolio_id="iamrich", channels=[POSITIONS]
+        )
+        for _ in range(provide_push_stream.buffer_size + 1):
+            provide_push_stream.dispatch(
+                JournalEventType.POSITION_OPENED.value, order_data(), "order"
+            )
+        await asyncio.sleep(0)
+
+        assert subscription.overflowed
+        assert subscription.buffer.full()
+        provide_push_stream.unsubscribe(subscription)
+
+    async def test_journal_record_is_pushed(
+        self, provide_push_stream, database_provider_test, order_factory
+    ):
+        order = await OrderService().create(data=order_factory(count=1)[0])
+        subscription = provide_push_stream.subscribe(
+            portfolio_id="iamrich", channels=[ORDERS]
+        )
+
+        EventJournal().record(JournalEventType.ORDER_ACCEPTED, order)
+        message = await asyncio.wait_for(subscription.buffer.get(), timeout=5)
+
+        assert message["event"] == JournalEventType.ORDER_ACCEPTED.value
+        assert message["data"]["id"] == order.id
+        provide_push_stream.unsubscribe(subscription)
+
+    async def test_events_published_by_a_forked_worker(self, provide_push_stream):
+        subscription = provide_push_stream.subscribe(
+            portfolio_id="iamrich", channels=[FILLS]
+        )
+        # an API worker forked after the queue was created, recording a fill
+        process = multiprocessing.get_context("fork").Process(
+            target=provide_push_stream.publish,
+            args=(JournalEventType.ORDER_FILLED, order_data()),
+        )
+        process.start()
+        process.join(timeout=5)
+
+        assert process.exitcode == 0
+        message = await asyncio.wait_for(subscription.buffer.get(), timeout=5)
+        assert message["event"] == JournalEventType.ORDER_FILLED.value
+        provide_push_stream.unsubscribe(subscription)
+
+    async def test_events_without_subscribers_are_dropped(self, provide_push_stream):
+        # more events than the queue holds, which only fit while they are drained
+        for _ in range(Setting().PUSH_STREAM_QUEUE_SIZE + 100):
+            provide_push_stream.publish(JournalEventType.ORDER_ACCEPTED, order_data())
+        # the events are dispatched in order, so they are all gone with the marker
+        marker = provide_push_stream.subscribe(portfolio_id="marker")
+        provide_push_stream.publish(
+            JournalEventType.ORDER_ACCEPTED, order_data(portfolio_id="marker")
+        )
+        await asyncio.wait_for(marker.buffer.get(), timeout=5)
+        provide_push_stream.unsubscribe(marker)
+        assert provide_push_stream.dropped == 0
+        subscription = provide_push_stream.subscribe(
+            portfolio_id="iamrich", channels=[ORDERS]
+        )
+
+        provide_push_stream.publish(JournalEventType.ORDER_FILLED, order_data())
+        message = await asyncio.wait_for(subscription.buffer.get(), timeout=5)
+
+        # no backlog from before the subscription
+        assert message["event"] == JournalEventType.ORDER_FILLED.value
+        assert subscription.buffer.empty()
+        provide_push_stream.unsubscribe(subscription)
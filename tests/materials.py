@@ -15,7 +15,10 @@ from fifi.enums import (
 from faker import Faker
 from src.schemas import PortfolioSchema, BalanceSchema, OrderSchema, LeverageSchema
 from src.common.settings import Setting
+from src.common.coalescer import ReadCoalescer
+from src.common.throttle import OrderThrottle
 from src.schemas.position_schema import PositionSchema
+from src.journal import EventJournal, PushStream
 
 
 fake = Faker()
@@ -144,3 +147,60 @@ def leverage_factory():
         return leverage_schemas
 
     return create_leverage
+
+
+@pytest.fixture
+def provide_event_journal(tmp_path):
+    EventJournal.instance = None
+    journal = EventJournal(
+        path=str(tmp_path), enabled=True, snapshot_interval=0, fsync=False
+    )
+    yield journal
+    journal.close()
+    EventJournal.instance = None
+
+
+@pytest.fixture
+def provide_push_stream():
+    push_stream = PushStream()
+    push_stream.enabled = True
+    push_stream.start_dispatcher()
+    yield push_stream
+    push_stream.enabled = False
+    push_stream.stop_dispatcher()
+
+
+
+@pytest.fixture
+def provide_order_throttle():
+    order_throttle = OrderThrottle()
+    order_throttle.enabled = True
+    order_throttle.setting = setting.model_copy(
+        update={
+            "ORDER_THROTTLE_PORTFOLIO_RATE": 10.0,
+            "ORDER_THROTTLE_PORTFOLIO_BURST": 3.0,
+            "ORDER_THROTTLE_GLOBAL_RATE": 100.0,
+            "ORDER_THROTTLE_GLOBAL_BURST": 5.0,
+            "ORDER_THROTTLE_CANCEL_RATE": 100.0,
+            "ORDER_THROTTLE_CANCEL_BURST": 4.0,
+            "ORDER_THROTTLE_CLIENT_RATE": 10.0,
+            "ORDER_THROTTLE_CLIENT_BURST": 2.0,
+        }
+    )
+    order_throttle.reset()
+    yield order_throttle
+    order_throttle.enabled = False
+    order_throttle.setting = setting
+    order_throttle.reset()
+
+
+@pytest.fixture
+def provide_read_coalescer():
+    read_coalescer = ReadCoalescer()
+    read_coalescer.enabled = True
+    read_coalescer.reset()
+    yield read_coalescer
+    read_coalescer.enabled = False
+    read_coalescer.ttl = setting.READ_COALESCING_TTL
+    read_coalescer.results.ttl = setting.READ_COALESCING_TTL or None
+    read_coalescer.reset()
@@ -0,0 +1,175 @@
+import os
+import pytest
+
+from src.common.settings import Setting
+from src.models.balance import Balance
+from src.repository import BalanceLedgerRepository, BalanceRepository
+from tests.materials import *
+
+
+@pytest.fixture
+def provide_balance_ledger(monkeypatch, tmp_path):
+    setting = Setting()
+    monkeypatch.setattr(
+        setting, "BALANCE_LEDGER_WAL_PATH", str(tmp_path / "balance_ledger.wal")
+    )
+    monkeypatch.setattr(setting, "BALANCE_LEDGER_FLUSH_BATCH_SIZE", 1000)
+    monkeypatch.setattr(setting, "BALANCE_LEDGER_FLUSH_INTERVAL", 1000)
+    BalanceLedgerRepository.instance = None
+    yield BalanceLedgerRepository()
+    BalanceLedgerRepository.instance = None
+
+
+def deposit(qty: float):
+    def mutation(balance: Balance) -> None:
+        balance.quantity += qty
+        balance.available += qty
+
+    return mutation
+
+
+@pytest.mark.asyncio
+class TestBalanceLedgerRepository:
+    balance_repo = BalanceRepository()
+
+    async def test_apply_mutation_is_write_behind(
+        self, database_provider_test, provide_balance_ledger
+    ):
+        ledger = provide_balance_ledger
+        balance = await ledger.create(
+            data=BalanceSchema(
+                portfolio_id="iamrich",
+                asset=Asset.USD,
+                quantity=100,
+                available=100,
+                frozen=0,
+            )
+        )
+
+        mutated = await ledger.apply_mutation(
+            portfolio_id="iamrich", asset=Asset.USD, mutation=deposit(50)
+        )
+        assert mutated is not None
+        assert mutated.quantity == 150
+
+        got_balance = await ledger.get_portfolio_asset(
+            portfolio_id="iamrich", asset=Asset.USD
+        )
+        assert got_balance is not None
+        assert got_balance.available == 150
+
+        db_balance = await self.balance_repo.get_one_by_id(id_=balance.id)
+        assert db_balance is not None
+        assert db_balance.quantity == 100
+        assert os.path.getsize(ledger.wal_path) > 0
+
+        flushed = await ledger.flush()
+        assert flushed == 1
+
+        db_balance = await self.balance_repo.get_one_by_id(id_=balance.id)
+        assert db_balance is not None
+        assert db_balance.quantity == 150
+        assert db_balance.available == 150
+        assert os.path.getsize(ledger.wal_path) == 0
+        assert not os.path.exists(ledger.flushing_wal_path)
+
+    async def test_apply_mutation_not_exist(
+        self, database_provider_test, provide_balance_ledger
+    ):
+        mutated = await provide_balance_ledger.apply_mutation(
+            portfolio_id="nobody", asset=Asset.USD, mutation=deposit(50)
+        )
+        assert mutated is None
+
+    async def test_flush_by_batch_size(
+        self, database_provider_test, provide_balance_ledger, monkeypatch
+    ):
+        ledger = provide_balance_ledger
+        monkeypatch.setattr(ledger.setting, "BALANCE_LEDGER_FLUSH_BATCH_SIZE", 2)
+        balances = await ledger.create_many(
+            data=[
+                BalanceSchema(
+                    portfolio_id=portfolio_id,
+                    asset=Asset.USD,
+                    quantity=10,
+                    available=10,
+                    frozen=0,
+                )
+                for portfolio_id in ("first", "second")
+            ]
+        )
+
+        await ledger.apply_mutation(
+            portfolio_id="first", asset=Asset.USD, mutation=deposit(1)
+        )
+        db_balance = await self.balance_repo.get_one_by_id(id_=balances[0].id)
+        assert db_balance is not None
+        assert db_balance.quantity == 10
+
+        await ledger.apply_mutation(
+            portfolio_id="second", asset=Asset.USD, mutation=deposit(1)
+        )
+        for balance in balances:
+            db_balance = await self.balance_repo.get_one_by_id(id_=balance.id)
+            assert db_balance is not None
+            assert db_balance.quantity == 11
+
+    async def test_recover_replays_wal(
+        self, database_provider_test, provide_balance_ledger
+    ):
+        ledger = provide_balance_ledger
+        balance = await ledger.create(
+            data=BalanceSchema(
+                portfolio_id="iamrich",
+                asset=Asset.BTC,
+                quantity=1,
+                available=1,
+                frozen=0,
+            )
+        )
+        for _ in range(3):
+            await ledger.apply_mutation(
+                portfolio_id="iamrich", asset=Asset.BTC, mutation=deposit(0.5)
+            )
+        # simulate a crash: the WAL survives but nothing is flushed
+        ledger._close_wal()
+        BalanceLedgerRepository.instance = None
+
+        recovered_ledger = BalanceLedgerRepository()
+        got_balance = await recovered_ledger.get_portfolio_asset(
+            portfolio_id="iamrich", asset=Asset.BTC
+        )
+        assert got_balance is not None
+        assert got_balance.quantity == 2.5
+
+        db_balance = await self.balance_repo.get_one_by_id(id_=balance.id)
+        assert db_balance is not None
+        assert db_balance.quantity == 2.5
+
+    async def test_recover_ignores_torn_tail(
+        self, database_provider_test, provide_balance_ledger
+    ):
+        ledger = provide_balance_ledger
+        await ledger.create(
+            data=BalanceSchema(
+                portfolio_id="iamrich",
+                asset=Asset.BTC,
+                quantity=1,
+                available=1,
+                frozen=0,
+            )
+        )
+        await ledger.apply_mutation(
+            portfolio_id="iamrich", asset=Asset.BTC, mutation=deposit(1)
+        )
+        ledger._close_wal()
+        with open(ledger.wal_path, "ab") as wal:
+            wal.write(b'{"id": "half-writ')
+        BalanceLedgerRepository.instance = None
+
+        recovered_ledger = BalanceLedgerRepository()
+        got_balance = await recovered_ledger.get_portfolio_asset(
+            portfolio_id="iamrich", asset=Asset.BTC
+        )
+        assert got_balance is not None
+        assert got_balance.quantity == 2
@@ -0,0 +1,330 @@
+import asyncio
+import threading
+import time
+import pytest
+
+from datetime import datetime, timedelta
+
+from fifi.enums import OrderType
+from fifi.exceptions import IntegrityConflictException, NotFoundException
+
+from src.common.exceptions import VersionConflict
+from src.common.settings import Setting
+from src.engines.matching_engine import MatchingEngine
+from src.engines.positions_orchestration_engine import PositionsOrchestrationEngine
+from src.models.position import Position
+from src.schemas.seed_schema import SeedSchema
+from src.repository import (
+    BalanceRepository,
+    InMemoryBalanceRepository,
+    InMemoryOrderRepository,
+    InMemoryPortfolioRepository,
+    InMemoryPositionRepository,
+    InMemoryStorage,
+    OrderRepository,
+    PortfolioRepository,
+)
+from src.services import (
+    BalanceService,
+    LeverageService,
+    PortfolioService,
+    PositionService,
+    SeedService,
+)
+from tests.materials import *
+
+
+class MarketDataRepositoryMock:
+    def __init__(self, market: Market, interval: str) -> None:
+        pass
+
+    def get_last_trade(self):
+        return 1100
+
+    def get_time(self):
+        return time.time()
+
+
+@pytest.fixture
+def provide_in_memory_storage(monkeypatch):
+    monkeypatch.setattr(Setting(), "IN_MEMORY_STORAGE_ENABLED", True)
+    storage = InMemoryStorage()
+    storage.clear()
+    yield storage
+    storage.clear()
+
+
+@pytest.fixture
+def provide_in_memory_engines(monkeypatch, provide_in_memory_storage):
+    for module in ("matching_engine", "positions_orchestration_engine"):
+        monkeypatch.setattr(
+            f"src.engines.{module}.MarketDataRepository", MarketDataRepositoryMock
+        )
+    MatchingEngine.instance = None
+    PositionsOrchestrationEngine.instance = None
+    yield MatchingEngine(), PositionsOrchestrationEngine()
+    MatchingEngine.instance = None
+    PositionsOrchestrationEngine.instance = None
+
+
+@pytest.mark.asyncio
+class TestInMemoryRepository:
+    async def test_create_applies_defaults_and_unique_constraints(
+        self, provide_in_memory_storage
+    ):
+        portfolio_repo = InMemoryPortfolioRepository()
+        portfolio = await portfolio_repo.create(data=PortfolioSchema(name="Mem"))
+        assert portfolio.id
+        assert portfolio.perp_taker_fee == Setting().DEFAULT_PERP_TAKER_FEE
+        assert portfolio.created_at and portfolio.updated_at
+        assert await portfolio_repo.get_by_name(name="Mem") is portfolio
+
+        with pytest.raises(IntegrityConflictException):
+            await portfolio_repo.create(data=PortfolioSchema(name="Mem"))
+
+        balance_repo = InMemoryBalanceRepository()
+        balance = BalanceSchema(
+            portfolio_id=portfolio.id,
+            asset=Asset.USD,
+            quantity=1,
+            available=1,
+            frozen=0,
+        )
+        with pytest.raises(IntegrityConflictException):
+            await balance_repo.create_many(data=[balance, balance])
+        # all or nothing, like the transaction of the database
+        assert await balance_repo.get_all_balances() == []
+
+        with pytest.raises(NotFoundException):
+            await portfolio_repo.update_by_id(
+                data=PortfolioSchema(name="Nobody"), id_="nobody"
+            )
+        assert await portfolio_repo.remove_by_name(name="Mem") == 1
+        assert await portfolio_repo.get_by_name(name="Mem") is None
+
+    async def test_indexes_follow_updates(self, provide_in_memory_storage):
+        order_repo = InMemoryOrderRepository()
+        order = await order_repo.create(
+            data=OrderSchema(
+                portfolio_id="iamrich",
+                market=Market.BTCUSD_PERP,
+                price=100,
+                size=1,
+                fee=0.1,
+                side=OrderSide.BUY,
+            )
+        )
+        assert await order_repo.get_all_order(status=OrderStatus.ACTIVE) == [order]
+        since = order.updated_at + timedelta(microseconds=1)
+
+        order.status = OrderStatus.FILLED
+        await order_repo.update_entity(order)
+        assert await order_repo.get_all_order(status=OrderStatus.ACTIVE) == []
+        assert await order_repo.get_filled_perp_orders() == [order]
+        assert await order_repo.get_filled_perp_orders(from_update_time=since) == [
+            order
+        ]
+        assert (
+            await order_repo.get_filled_perp_orders(
+                from_update_time=datetime.now() + timedelta(days=1)
+            )
+            == []
+        )
+        rows = await order_repo.get_rows_by_portfolio_id(
+            portfolio_id="iamrich",
+            columns=["id", "status"],
+            filters={"status": OrderStatus.FILLED},
+        )
+        assert rows == [{"id": order.id, "status": OrderStatus.FILLED}]
+
+    async def test_reads_while_another_thread_writes(self, provide_in_memory_storage):
+        order_repo = InMemoryOrderRepository()
+        since = datetime.now()
+
+        async def create_orders():
+            for _ in range(3000):
+                order = await order_repo.create(
+                    data=OrderSchema(
+                        portfolio_id="iamrich",
+                        market=Market.BTCUSD_PERP,
+                        price=100,
+                        size=1,
+                        fee=0.1,
+                        side=OrderSide.BUY,
+                    )
+                )
+                order.status = OrderStatus.FILLED
+                await order_repo.update_entity(order)
+
+        # the engines write from threads with event loops of their own
+        writer = threading.Thread(target=asyncio.run, args=(create_orders(),))
+        writer.start()
+        while writer.is_alive():
+            await order_repo.get_filled_perp_orders(from_update_time=since)
+            await order_repo.get_entities_by_portfolio_id(portfolio_id="iamrich")
+            order_repo.rows()
+        writer.join()
+        assert len(await order_repo.get_filled_perp_orders(from_update_time=since)) == (
+            3000
+        )
+
+    async def test_update_entity_from_a_stale_copy_conflicts(
+        self, provide_in_memory_storage
+    ):
+        position_repo = InMemoryPositionRepository()
+        position = await position_repo.create(
+            data=PositionSchema(
+                portfolio_id="iamrich",
+                market=Market.BTCUSD_PERP,
+                side=PositionSide.LONG,
+                size=1,
+            )
+        )
+        assert position.version == 0
+
+        copy = Position(**position.to_dict())
+        position.size = 2
+        await position_repo.update_entity(position)
+        assert position.version == 1
+
+        copy.size = 3
+        with pytest.raises(VersionConflict):
+            await position_repo.update_entity(copy)
+        assert position.size == 2
+
+        fresh_copy = Position(**position.to_dict())
+        fresh_copy.size = 4
+        await position_repo.update_entity(fresh_copy)
+        assert fresh_copy.version == position.version == 2
+        assert position.size == 4
+
+    async def test_engines_run_on_the_in_memory_storage(
+        self, provide_in_memory_engines
+    ):
+        matching_engine, positions_engine = provide_in_memory_engines
+        assert not matching_engine.run_in_process
+        assert BalanceService().repo is InMemoryBalanceRepository()
+
+        portfolio = await PortfolioService().create(data=PortfolioSchema(name="Mem"))
+        await BalanceService().create(
+            data=BalanceSchema(
+                portfolio_id=portfolio.id,
+                asset=Asset.USD,
+                quantity=1000,
+                available=1000,
+                frozen=0,
+            )
+        )
+        order = await matching_engine.create_order(
+            market=Market.BTCUSD_PERP,
+            portfolio_id=portfolio.id,
+            price=1100,
+            size=0.1,
+            side=OrderSide.BUY,
+            order_type=OrderType.LIMIT,
+        )
+        await matching_engine.run_once()
+        assert order.status == OrderStatus.FILLED
+
+        positions_engine.last_update = order.created_at
+        await positions_engine.run_once()
+        positions = await PositionService().get_positions(portfolio_id=portfolio.id)
+        assert len(positions) == 1
+        assert positions[0].size == 0.1
+        assert order.position_id == positions[0].id
+
+        balance = await BalanceService().read_by_asset(
+            portfolio_id=portfolio.id, asset=Asset.USD
+        )
+        assert balance.frozen == pytest.approx(110)
+        assert balance.quantity == pytest.approx(1000 - order.fee)
+
+        stats = await PortfolioService().repo.get_stats(portfolio_id=portfolio.id)
+        assert stats.orders == [
+            {
+                "market": Market.BTCUSD_PERP,
+                "side": OrderSide.BUY,
+                "orders": 1,
+                "volume": pytest.approx(110),
+                "fees": pytest.approx(order.fee),
+            }
+        ]
+        assert stats.positions == [
+            {"status": PositionStatus.OPEN, "positions": 1, "pnl": 0.0, "wins": 0}
+        ]
+        state = await PortfolioService().read_state(portfolio_id=portfolio.id)
+        assert state.positions == positions
+        assert state.orders == []
+
+    async def test_seed_twice_upserts(self, provide_in_memory_storage):
+        def seed_schema(leverage: float) -> SeedSchema:
+            return SeedSchema(
+                portfolios=[
+                    {
+                        "name": "bot",
+                        "perp_taker_fee": 0.001,
+                        "balances": [{"asset": Asset.USD, "quantity": 1000}],
+                        "leverages": [
+                            {"market": Market.BTCUSD_PERP, "leverage": leverage}
+                        ],
+                    }
+                ]
+            )
+
+        await SeedService().seed(data=seed_schema(leverage=5))
+        seeded = await SeedService().seed(data=seed_schema(leverage=10))
+        assert seeded.portfolios == seeded.balances == seeded.leverages == 1
+
+        portfolio = await PortfolioService().read_by_name("bot")
+        assert portfolio.perp_taker_fee == 0.001
+        balance = await BalanceService().read_by_asset(
+            portfolio_id=portfolio.id, asset=Asset.USD
+        )
+        assert balance.quantity == balance.available == 2000
+        leverage = await LeverageService().get_portfolio_market_leverage_value(
+            portfolio_id=portfolio.id, market=Market.BTCUSD_PERP
+        )
+        assert leverage == 10
+
+    async def test_dump(self, database_provider_test, provide_in_memory_storage):
+        portfolio = await InMemoryPortfolioRepository().create(
+            data=PortfolioSchema(name="Mem")
+        )
+        balance = await InMemoryBalanceRepository().create(
+            data=BalanceSchema(
+                portfolio_id=portfolio.id,
+                asset=Asset.USD,
+                quantity=10,
+                available=10,
+                frozen=0,
+            )
+        )
+        order = await InMemoryOrderRepository().create(
+            data=OrderSchema(
+                portfolio_id=portfolio.id,
+                market=Market.BTCUSD,
+                price=100,
+                size=1,
+                fee=0.1,
+                side=OrderSide.SELL,
+            )
+        )
+
+        dumped = await provide_in_memory_storage.dump()
+        assert dumped == {
+            "portfolios": 1,
+            "balances": 1,
+            "leverages": 0,
+            "positions": 0,
+            "orders": 1,
+        }
+        assert (await PortfolioRepository().get_by_name(name="Mem")).id == portfolio.id
+        assert (await OrderRepository().get_one_by_id(id_=order.id)).price == 100
+
+        # dumping again updates the rows dumped before
+        balance.quantity = 20
+        await InMemoryBalanceRepository().update_entity(balance)
+        await provide_in_memory_storage.dump()
+        db_balance = await BalanceRepository().get_one_by_id(id_=balance.id)
+        assert db_balance.quantity == 20
+        assert db_balance.version == balance.version
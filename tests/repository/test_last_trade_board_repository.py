@@ -0,0 +1,93 @@
+import multiprocessing
+import uuid
+
+import pytest
+
+from fifi.enums import Market
+
+from src.repository import LastTradeBoardReader, LastTradeBoardRepository
+from src.repository.last_trade_board_repository import LastTradeBoard, MARKET_ROWS
+
+
+class MarketDataRepositoryMock:
+    def __init__(self, market: Market, interval: str) -> None:
+        pass
+
+    def get_last_trade(self):
+        return 900
+
+    def get_time(self):
+        return 1.0
+
+    def close(self):
+        pass
+
+
+def write_ticks(name: str, count: int) -> None:
+    board = LastTradeBoardRepository(name=name)
+    board._reader = False
+    for i in range(1, count + 1):
+        board.write(market=Market.BTCUSD, last_trade=i, time=i)
+
+
+@pytest.fixture
+def last_trade_board():
+    board = LastTradeBoardRepository(name=f"board_{uuid.uuid4().hex}", create=True)
+    yield board
+    board.close()
+
+
+class TestLastTradeBoardRepository:
+    def test_write_and_read(self, last_trade_board):
+        last_trade_board.write(market=Market.BTCUSD, last_trade=1100, time=1.5)
+        reader = LastTradeBoardRepository(name=last_trade_board._name)
+
+        assert reader.read(Market.BTCUSD) == (1100, 1.5)
+        assert reader.read(Market.ETHUSD) == (0, 0)
+        view = reader.market_view(Market.BTCUSD)
+        assert view.get_last_trade() == 1100
+        assert view.get_time() == 1.5
+        assert view.read_tick() == (1100, 1.5)
+        with pytest.raises(Exception):
+            reader.write(market=Market.BTCUSD, last_trade=1, time=1)
+        reader.close()
+
+    def test_torn_row_reads_as_zero(self, last_trade_board):
+        last_trade_board.write(market=Market.BTCUSD, last_trade=1100, time=1.5)
+        # a writer which died in the middle of an update leaves the sequence odd
+        last_trade_board._data[MARKET_ROWS[Market.BTCUSD]][
+            LastTradeBoard.SEQ.value
+        ] += 1
+
+        assert last_trade_board.read(Market.BTCUSD) == (0, 0)
+
+    def test_reads_are_consistent_with_a_concurrent_writer(self, last_trade_board):
+        process = multiprocessing.get_context("fork").Process(
+            target=write_ticks, args=(last_trade_board._name, 20000)
+        )
+        process.start()
+        while process.is_alive():
+            last_trade, time = last_trade_board.read(Market.BTCUSD)
+            assert last_trade == time
+        process.join()
+
+        assert process.exitcode == 0
+        assert last_trade_board.read(Market.BTCUSD) == (20000, 20000)
+
+    def test_reader_attaches_once_the_board_exists(self, monkeypatch):
+        monkeypatch.setattr(
+            "src.repository.last_trade_board_repository.MarketDataRepository",
+            MarketDataRepositoryMock,
+        )
+        reader = LastTradeBoardReader(name=f"board_{uuid.uuid4().hex}")
+        view = reader.market_view(Market.BTCUSD)
+        # e.g. a worker which does not own the feeder creating the board
+        assert view.read_tick() == (900, 1.0)
+        assert reader.board is None
+
+        board = LastTradeBoardRepository(name=reader.name, create=True)
+        board.write(market=Market.BTCUSD, last_trade=1100, time=1.5)
+        assert view.read_tick() == (1100, 1.5)
+        assert reader.board is not None
+        reader.close()
+        board.close()
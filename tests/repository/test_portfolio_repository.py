@@ -1,8 +1,13 @@
+from datetime import UTC, datetime, timedelta
+import sqlite3
 import pytest
 
+from src.models.balance import Balance
+from src.repository import portfolio_repository
 from src.repository import PortfolioRepository
 from src.repository import BalanceRepository
 from src.repository import OrderRepository
+from src.repository import LeverageRepository, PositionRepository
 from tests.materials import *
 
 
@@ -31,3 +36,164 @@ class TestPortfolioRepository:
         third_portfolio = await self.portfilio_repo.get_one_by_id(id_=portfolios[3].id)
 
         assert third_portfolio is None
+
+    async def test_get_state(
+        self,
+        database_provider_test,
+        portfolio_factory,
+        balance_factory_for_portfolios,
+        order_factory,
+        position_factory,
+    ):
+        portfolios = await self.portfilio_repo.create_many(
+            data=[portfolio_factory() for i in range(2)]
+        )
+        for portfolio in portfolios:
+            await self.balance_repo.create_many(
+                data=balance_factory_for_portfolios(portfolio_id=portfolio.id)
+            )
+            orders = await self.order_repo.create_many(
+                data=order_factory(portfolio_id=portfolio.id, count=10)
+            )
+            positions = await PositionRepository().create_many(
+                data=position_factory(portfolio_id=portfolio.id, count=10)
+            )
+            if portfolio is portfolios[0]:
+                active_order_ids = {
+                    order.id for order in orders if order.status == OrderStatus.ACTIVE
+                }
+                open_position_ids = {
+                    position.id
+                    for position in positions
+                    if position.status == PositionStatus.OPEN
+                }
+        leverage = await LeverageRepository().create(
+            data=LeverageSchema(
+                portfolio_id=portfolios[0].id, market=Market.BTCUSD, leverage=5
+            )
+        )
+
+        state = await self.portfilio_repo.get_state(portfolio_id=portfolios[0].id)
+
+        assert state.portfolio.id == portfolios[0].id
+        assert len(state.balances) == len(Asset)
+        assert {balance.portfolio_id for balance in state.balances} == {
+            portfolios[0].id
+        }
+        assert {order.id for order in state.orders} == active_order_ids
+        assert {position.id for position in state.positions} == open_position_ids
+        assert [lev.id for lev in state.leverages] == [leverage.id]
+
+    async def test_get_state_is_one_snapshot(
+        self,
+        database_provider_test,
+        portfolio_factory,
+        balance_factory_for_portfolios,
+        monkeypatch,
+    ):
+        portfolio = await self.portfilio_repo.create(data=portfolio_factory())
+        await self.balance_repo.create_many(
+            data=balance_factory_for_portfolios(portfolio_id=portfolio.id)
+        )
+        writer = sqlite3.connect("memory")
+        # readers keep their snapshot while a writer commits
+        writer.execute("PRAGMA journal_mode=WAL")
+        select = portfolio_repository.select
+
+        def select_after_a_write(*entities):
+            if Balance in entities:
+                # the engines commit a fill between two queries of the state
+                writer.execute(
+                    "UPDATE balances SET quantity = 0, available = 0 "
+                    "WHERE portfolio_id = ?",
+                    (portfolio.id,),
+                )
+                writer.commit()
+            return select(*entities)
+
+        monkeypatch.setattr(portfolio_repository, "select", select_after_a_write)
+        try:
+            state = await self.portfilio_repo.get_state(portfolio_id=portfolio.id)
+        finally:
+            writer.execute("PRAGMA journal_mode=DELETE")
+            writer.close()
+
+        assert state.portfolio.id == portfolio.id
+        assert all(balance.quantity > 0 for balance in state.balances)
+
+    async def test_get_state_not_existed(self, database_provider_test):
+        assert await self.portfilio_repo.get_state(portfolio_id="missing") is None
+
+    async def test_get_stats(
+        self, database_provider_test, portfolio_factory, order_factory
+    ):
+        portfolio = await self.portfilio_repo.create(data=portfolio_factory())
+        orders = await self.order_repo.create_many(
+            data=order_factory(portfolio_id=portfolio.id, count=30)
+            + order_factory(portfolio_id="another", count=5)
+        )
+        position_repo = PositionRepository()
+        positions = await position_repo.create_many(
+            data=[
+                PositionSchema(portfolio_id=portfolio.id, status=status)
+                for status in (
+                    PositionStatus.OPEN,
+                    PositionStatus.CLOSE,
+                    PositionStatus.CLOSE,
+                    PositionStatus.LIQUID,
+                )
+            ]
+        )
+        for position, pnl in zip(positions, (1.5, 2.0, -0.5, -3.0)):
+            position.pnl = pnl
+            await position_repo.update_entity(position)
+
+        stats = await self.portfilio_repo.get_stats(portfolio_id=portfolio.id)
+
+        filled = [
+            order
+            for order in orders
+            if order.portfolio_id == portfolio.id
+            and order.status == OrderStatus.FILLED
+        ]
+        assert sum(group["orders"] for group in stats.orders) == len(filled)
+        for group in stats.orders:
+            grouped = [
+                order
+                for order in filled
+                if (order.market, order.side) == (group["market"], group["side"])
+            ]
+            assert group["orders"] == len(grouped)
+            assert group["volume"] == pytest.approx(
+                sum(order.price * order.size for order in grouped)
+            )
+            assert group["fees"] == pytest.approx(sum(order.fee for order in grouped))
+        assert sorted(stats.positions, key=lambda group: group["status"].value) == [
+            {"status": PositionStatus.CLOSE, "positions": 2, "pnl": 1.5, "wins": 1},
+            {"status": PositionStatus.LIQUID, "positions": 1, "pnl": -3.0, "wins": 0},
+            {"status": PositionStatus.OPEN, "positions": 1, "pnl": 1.5, "wins": 1},
+        ]
+
+    async def test_get_stats_time_window(
+        self, database_provider_test, portfolio_factory, order_factory
+    ):
+        portfolio = await self.portfilio_repo.create(data=portfolio_factory())
+        orders = order_factory(portfolio_id=portfolio.id, count=2)
+        for order in orders:
+            order.status = OrderStatus.FILLED
+        await self.order_repo.create_many(data=orders)
+        now = datetime.now(UTC).replace(tzinfo=None)
+
+        stats = await self.portfilio_repo.get_stats(
+            portfolio_id=portfolio.id, since=now - timedelta(minutes=1)
+        )
+        assert sum(group["orders"] for group in stats.orders) == 2
+
+        stats = await self.portfilio_repo.get_stats(
+            portfolio_id=portfolio.id, until=now - timedelta(minutes=1)
+        )
+        assert stats.orders == []
+        assert stats.positions == []
+
+    async def test_get_stats_not_existed(self, database_provider_test):
+        assert await self.portfilio_repo.get_stats(portfolio_id="missing") is None
@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from fifi.enums import Market
+
+from src.common.settings import Setting
+from src.repository import ReplayMarketDataRepository
+from src.repository.replay_market_data_repository import ReplayTrigger, load_ticks
+
+
+@pytest.fixture
+def provide_replay():
+    replays = []
+
+    def create_replay(files):
+        ReplayMarketDataRepository.instance = None
+        replays.append(ReplayMarketDataRepository(files=files))
+        return replays[-1]
+
+    yield create_replay
+    ReplayMarketDataRepository.instance = None
+
+
+def write_candles(path, rows):
+    np.savetxt(
+        path,
+        np.array(rows, dtype=np.float64),
+        delimiter=",",
+        header="time,open,high,low,close",
+        comments="",
+    )
+
+
+class TestReplayMarketDataRepository:
+    def test_load_candles(self, tmp_path):
+        path = tmp_path / "candles.csv"
+        start = 1_700_000_000
+        write_candles(
+            path,
+            [
+                [start * 1000, 100, 110, 90, 105],
+                [(start + 60) * 1000, 105, 106, 95, 96],
+            ],
+        )
+
+        times, prices = load_ticks(str(path), candle_interval=60)
+
+        # the candle times are in ms, a bullish candle trades its low first
+        assert (times - start).tolist() == [0, 15, 30, 45, 60, 75, 90, 105]
+        assert prices.tolist() == [100, 90, 110, 105, 105, 106, 95, 96]
+
+    def test_load_trades(self, tmp_path):
+        path = tmp_path / "trades.npz"
+        np.savez(path, time=np.array([3.0, 1.0, 2.0]), price=np.array([30, 10, 20]))
+
+        times, prices = load_ticks(str(path), candle_interval=60)
+
+        assert times.tolist() == [1, 2, 3]
+        assert prices.tolist() == [10, 20, 30]
+
+    def test_load_unknown_columns(self, tmp_path):
+        path = tmp_path / "trades.npz"
+        np.savez(path, time=np.array([1.0]), volume=np.array([1.0]))
+
+        with pytest.raises(ValueError):
+            load_ticks(str(path), candle_interval=60)
+        with pytest.raises(ValueError):
+            load_ticks(str(tmp_path / "trades.json"), candle_interval=60)
+
+    def test_advance_publishes_the_latest_tick_of_each_market(
+        self, tmp_path, provide_replay
+    ):
+        np.savez(tmp_path / "btc.npz", time=np.array([1.0, 3.0]), price=[10, 30])
+        np.savez(tmp_path / "perp.npz", time=np.array([2.0, 4.0]), price=[20, 40])
+        replay = provide_replay(
+            {
+                Market.BTCUSD: str(tmp_path / "btc.npz"),
+                Market.BTCUSD_PERP: str(tmp_path / "perp.npz"),
+            }
+        )
+        view = replay.market_view(Market.BTCUSD_PERP)
+
+        assert replay.now == 0
+        assert view.get_last_trade() == 0
+
+        replay.advance_to(2)
+
+        assert replay.cursor == 3
+        assert replay.clock() == 3
+        assert replay.read(Market.BTCUSD) == (30, 3)
+        assert (view.get_last_trade(), view.get_time()) == (20, 2)
+        assert not replay.exhausted
+
+        replay.advance_to(3)
+        assert replay.exhausted
+        replay.rewind()
+        assert replay.cursor == 0
+        assert replay.read(Market.BTCUSD) == (0, 0)
+
+    def test_window(self, tmp_path, provide_replay, monkeypatch):
+        monkeypatch.setattr(Setting(), "REPLAY_START", 2.0)
+        monkeypatch.setattr(Setting(), "REPLAY_END", 4.0)
+        np.savez(
+            tmp_path / "btc.npz",
+            time=np.array([1.0, 2.0, 3.0, 4.0]),
+            price=[10, 20, 30, 40],
+        )
+
+        replay = provide_replay({Market.BTCUSD: str(tmp_path / "btc.npz")})
+
+        assert replay.times.tolist() == [2, 3]
+        assert replay.prices.tolist() == [20, 30]
+        assert replay.start == 2
+
+    def test_next_trigger(self, tmp_path, provide_replay):
+        prices = np.full(10_000, 100.0)
+        prices[5_000] = 89
+        prices[9_000] = 111
+        np.savez(
+            tmp_path / "btc.npz", time=np.arange(10_000, dtype=np.float64), price=prices
+        )
+        replay = provide_replay({Market.BTCUSD: str(tmp_path / "btc.npz")})
+
+        assert replay.next_trigger({}) is None
+        assert replay.next_trigger({Market.BTCUSD: ReplayTrigger(low=90)}) == 5_000
+        assert replay.next_trigger({Market.BTCUSD: ReplayTrigger(high=110)}) == 9_000
+        assert replay.next_trigger({Market.ETHUSD: ReplayTrigger(low=90)}) is None
+
+        replay.advance_to(5_000)
+        assert replay.next_trigger({Market.BTCUSD: ReplayTrigger(low=90)}) is None
+        assert (
+            replay.next_trigger({Market.BTCUSD: ReplayTrigger(low=90, high=110)})
+            == 9_000
+        )
@@ -2,6 +2,7 @@ import pytest
 
 from fifi.enums import Asset
 
+from src.common.exceptions import VersionConflict
 from src.models import Position
 from src.repository import PositionRepository
 from tests.materials import *
@@ -48,3 +49,91 @@ class TestSimulatorBaseRepository:
         )
 
         assert len(newyork_positions) == 0
+
+    async def test_stream_rows_by_portfolio_id(
+        self, database_provider_test, position_factory
+    ):
+        newyork_positions_schemas: List[PositionSchema] = position_factory(
+            portfolio_id="newyork", count=20
+        )
+        tehran_positions_schemas: List[PositionSchema] = position_factory(
+            portfolio_id="tehran"
+        )
+        positions: List[Position] = await self.position_repo.create_many(
+            data=tehran_positions_schemas + newyork_positions_schemas,
+        )
+        newyork_ids = {
+            position.id for position in positions if position.portfolio_id == "newyork"
+        }
+
+        streamed_ids = set()
+        async for row in self.position_repo.stream_rows_by_portfolio_id(
+            portfolio_id="newyork", yield_per=3
+        ):
+            assert row["portfolio_id"] == "newyork"
+            streamed_ids.add(row["id"])
+
+        assert streamed_ids == newyork_ids
+
+    async def test_stream_rows_by_portfolio_id_with_status(
+        self, database_provider_test, position_factory
+    ):
+        positions_schemas: List[PositionSchema] = position_factory(
+            portfolio_id="newyork", count=20
+        )
+        positions: List[Position] = await self.position_repo.create_many(
+            data=positions_schemas,
+        )
+        open_ids = {
+            position.id
+            for position in positions
+            if position.status == PositionStatus.OPEN
+        }
+
+        streamed_ids = set()
+        async for row in self.position_repo.stream_rows_by_portfolio_id(
+            portfolio_id="newyork", status=PositionStatus.OPEN
+        ):
+            assert row["status"] == PositionStatus.OPEN
+            streamed_ids.add(row["id"])
+
+        assert streamed_ids == open_ids
+
+    async def test_update_entity_bumps_version(
+        self, database_provider_test, position_factory
+    ):
+        positions: List[Position] = await self.position_repo.create_many(
+            data=position_factory(portfolio_id="newyork", count=1),
+        )
+        position = positions[0]
+        assert position.version == 0
+
+        position.size = 42
+        await self.position_repo.update_entity(position)
+        assert position.version == 1
+
+        updated_position = await self.position_repo.get_one_by_id(position.id)
+        assert updated_position is not None
+        assert updated_position.size == 42
+        assert updated_position.version == 1
+
+    async def test_update_entity_stale_version(
+        self, database_provider_test, position_factory
+    ):
+        positions: List[Position] = await self.position_repo.create_many(
+            data=position_factory(portfolio_id="newyork", count=1),
+        )
+        first_copy = await self.position_repo.get_one_by_id(positions[0].id)
+        second_copy = await self.position_repo.get_one_by_id(positions[0].id)
+        assert first_copy is not None and second_copy is not None
+
+        first_copy.size = 42
+        await self.position_repo.update_entity(first_copy)
+
+        second_copy.size = 24
+        with pytest.raises(VersionConflict):
+            await self.position_repo.update_entity(second_copy)
+
+        updated_position = await self.position_repo.get_one_by_id(positions[0].id)
+        assert updated_position is not None
+        assert updated_position.size == 42
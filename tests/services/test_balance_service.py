@@ -223,3 +223,38 @@ class TestBalanceService:
                 balance.available - updated_balance.available, ndigits=10
             ) == round(balance.available * fee_portion, ndigits=10)
             assert updated_balance.fee_paid == balance.available * fee_portion
+
+    async def test_apply_mutation_retries_on_version_conflict(
+        self, database_provider_test, monkeypatch
+    ):
+        portfolio_id = str(uuid.uuid4())
+        balance = await self.balance_service.create_by_qty(
+            portfolio_id=portfolio_id, asset=Asset.USD, qty=100
+        )
+        repo = self.balance_service.repo
+        update_entity = repo.update_entity
+        calls = []
+
+        async def racing_update_entity(entity: Balance) -> None:
+            if not calls:
+                # another writer adds 10 between the read and the write
+                concurrent = await repo.get_one_by_id(entity.id)
+                concurrent.quantity += 10
+                concurrent.available += 10
+                await update_entity(concurrent)
+            calls.append(entity.version)
+            await update_entity(entity)
+
+        monkeypatch.setattr(repo, "update_entity", racing_update_entity)
+        is_locked = await self.balance_service.lock_balance(
+            portfolio_id=portfolio_id, asset=Asset.USD, locked_qty=30
+        )
+        assert is_locked
+        assert calls == [0, 1]
+
+        got_balance = await self.balance_service.read_by_id(balance.id)
+        assert got_balance is not None
+        assert got_balance.quantity == 110
+        assert got_balance.available == 80
+        assert got_balance.frozen == 30
+        assert got_balance.version == 2
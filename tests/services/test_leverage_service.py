@@ -1,5 +1,7 @@
 import pytest
 
+from unittest.mock import patch
+
 from fifi.helpers.get_logger import LoggerFactory
 
 from src.models import Leverage
@@ -89,3 +91,24 @@ class TestLeverageService:
                 ]
                 + 1
             )
+
+    async def test_leverage_value_is_cached_and_written_through(
+        self, database_provider_test
+    ):
+        value = await self.leverage_service.get_portfolio_market_leverage_value(
+            portfolio_id="iamrich", market=Market.BTCUSD_PERP
+        )
+        assert value is None
+
+        await self.leverage_service.create_or_update_leverage(
+            portfolio_id="iamrich", market=Market.BTCUSD_PERP, leverage=7
+        )
+        with patch.object(
+            self.leverage_service.repo,
+            "get_leverage_by_portfolio_id_and_market",
+            side_effect=AssertionError,
+        ):
+            value = await self.leverage_service.get_portfolio_market_leverage_value(
+                portfolio_id="iamrich", market=Market.BTCUSD_PERP
+            )
+        assert value == 7
@@ -102,3 +102,24 @@ class TestOrderService:
             )
             for i in range(count):
                 assert got_orders[i].to_dict() == orders[i].to_dict()
+
+    async def test_read_order_rows_by_portfolio_id(
+        self, database_provider_test, order_factory
+    ):
+        portfolio_id = str(uuid.uuid4())
+        orders: List[Order] = await self.order_service.create_many(
+            data=order_factory(portfolio_id=portfolio_id, count=5)
+        )
+        await self.order_service.create_many(data=order_factory(count=5))
+
+        rows = await self.order_service.read_order_rows_by_portfolio_id(
+            portfolio_id=portfolio_id, columns=("id", "market", "status")
+        )
+
+        assert sorted(rows, key=lambda row: row["id"]) == sorted(
+            (
+                {"id": order.id, "market": order.market, "status": order.status}
+                for order in orders
+            ),
+            key=lambda row: row["id"],
+        )
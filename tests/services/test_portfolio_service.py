@@ -1,6 +1,11 @@
 import pytest
 
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
 from fifi.helpers.get_logger import LoggerFactory
+from src.models import Balance
+from src.repository.portfolio_repository import PortfolioStats
 from src.services import PortfolioService
 from tests.materials import *
 
@@ -42,3 +47,113 @@ class TestPortfolioService:
         assert got_portfolio is not None
         LOGGER.info(f"{got_portfolio.to_dict()=}")
         assert got_portfolio.perp_maker_fee == updated_portfolio.perp_maker_fee
+
+    async def test_read_fee_schedule_is_cached(
+        self, database_provider_test, portfolio_factory
+    ):
+        portfolio = await self.portfilio_service.create(data=portfolio_factory())
+
+        first = await self.portfilio_service.read_fee_schedule(portfolio.id)
+        with patch.object(
+            self.portfilio_service, "read_by_id", side_effect=AssertionError
+        ):
+            second = await self.portfilio_service.read_fee_schedule(portfolio.id)
+
+        assert first is second
+        assert self.portfilio_service.fee_cache.hits == 1
+        assert self.portfilio_service.fee_cache.misses == 1
+        assert await self.portfilio_service.read_fee_schedule("not-existed") is None
+
+    async def test_update_by_name_invalidates_fee_schedule(
+        self, database_provider_test, portfolio_factory
+    ):
+        portfolio_schema: PortfolioSchema = portfolio_factory()
+        portfolio = await self.portfilio_service.create(data=portfolio_schema)
+        cached = await self.portfilio_service.read_fee_schedule(portfolio.id)
+
+        portfolio_schema.perp_taker_fee = 0.123
+        await self.portfilio_service.update_by_name(
+            name=portfolio_schema.name, data=portfolio_schema
+        )
+
+        fee_schedule = await self.portfilio_service.read_fee_schedule(portfolio.id)
+        assert fee_schedule is not cached
+        assert fee_schedule.perp_taker_fee == 0.123
+
+    async def test_read_state_balances_from_ledger(
+        self, database_provider_test, portfolio_factory
+    ):
+        portfolio = await self.portfilio_service.create(data=portfolio_factory())
+        ledger_balances = [Balance(portfolio_id=portfolio.id, asset=Asset.USD)]
+
+        with patch.object(setting, "BALANCE_LEDGER_ENABLED", True), patch(
+            "src.services.portfolio_service.BalanceService"
+        ) as balance_service:
+            balance_service.return_value.read_many_by_portfolio_id = AsyncMock(
+                return_value=ledger_balances
+            )
+            state = await self.portfilio_service.read_state(portfolio_id=portfolio.id)
+
+        assert state.portfolio.id == portfolio.id
+        assert state.balances == ledger_balances
+        balance_service.return_value.read_many_by_portfolio_id.assert_awaited_once_with(
+            portfolio_id=portfolio.id
+        )
+
+    async def test_read_stats(self):
+        stats = PortfolioStats(
+            orders=[
+                {
+                    "market": Market.BTCUSD,
+                    "side": OrderSide.BUY,
+                    "orders": 3,
+                    "volume": 300.0,
+                    "fees": 0.3,
+                },
+                {
+                    "market": Market.ETHUSD,
+                    "side": OrderSide.SELL,
+                    "orders": 1,
+                    "volume": 50.0,
+                    "fees": 0.05,
+                },
+            ],
+            positions=[
+                {"status": PositionStatus.OPEN, "positions": 2, "pnl": 4.0, "wins": 1},
+                {"status": PositionStatus.CLOSE, "positions": 3, "pnl": 6.0, "wins": 2},
+                {"status": PositionStatus.LIQUID, "positions": 1, "pnl": -8.0, "wins": 0},
+            ],
+        )
+        since = datetime(2026, 1, 1, 12, tzinfo=timezone(timedelta(hours=2)))
+
+        with patch.object(
+            self.portfilio_service.repo, "get_stats", return_value=stats
+        ) as mock_method:
+            result = await self.portfilio_service.read_stats(
+                portfolio_id="iamrich", since=since
+            )
+
+        mock_method.assert_awaited_once_with(
+            portfolio_id="iamrich", since=datetime(2026, 1, 1, 10), until=None
+        )
+        assert result["volume"] == pytest.approx(350.0)
+        # a spot buy pays its fee in the base asset it receives
+        assert result["fees_paid"] == {
+            Asset.BTC: pytest.approx(0.3),
+            Asset.USD: pytest.approx(0.05),
+        }
+        assert [group["fee_asset"] for group in result["orders"]] == [
+            Asset.BTC,
+            Asset.USD,
+        ]
+        assert result["realized_pnl"] == pytest.approx(2.0)
+        assert result["win_rate"] == pytest.approx(0.5)
+        assert result["orders"] == stats.orders
+
+    async def test_read_stats_without_closed_positions(self):
+        stats = PortfolioStats(orders=[], positions=[])
+        with patch.object(self.portfilio_service.repo, "get_stats", return_value=stats):
+            result = await self.portfilio_service.read_stats(portfolio_id="iamrich")
+
+        assert result["volume"] == 0
+        assert result["win_rate"] is None
@@ -3,6 +3,7 @@ from typing import Set
 
 from fifi.helpers.get_logger import LoggerFactory
 
+from src.common.exceptions import VersionConflict
 from src.models import Position
 from src.services import PositionService
 from tests.materials import *
@@ -156,6 +157,38 @@ class TestPositionService:
         for position in got_positions:
             assert position.id in positions_id_set
 
+    async def test_get_position_rows_with_all_filters(
+        self, database_provider_test, position_factory
+    ):
+        portfolio_id = str(uuid.uuid4())
+        positions_schemas: List[PositionSchema] = position_factory(
+            portfolio_id=portfolio_id, count=200
+        )
+        positions_schemas += position_factory(count=200)
+        positions: List[Position] = await self.position_service.create_many(
+            data=positions_schemas
+        )
+        expected_rows = {
+            position.id: {"id": position.id, "entry_price": position.entry_price}
+            for position in positions
+            if position.market == Market.BTCUSD_PERP
+            and position.side == PositionSide.LONG
+            and position.status == PositionStatus.OPEN
+            and position.portfolio_id == portfolio_id
+        }
+
+        rows = await self.position_service.get_position_rows(
+            portfolio_id=portfolio_id,
+            columns=("id", "entry_price"),
+            market=Market.BTCUSD_PERP,
+            status=PositionStatus.OPEN,
+            side=PositionSide.LONG,
+        )
+
+        assert len(rows) == len(expected_rows)
+        for row in rows:
+            assert row == expected_rows[row["id"]]
+
     async def test_get_open_positions_hashmap(
         self, database_provider_test, open_position_factory
     ):
@@ -179,3 +212,53 @@ class TestPositionService:
         for hash_id, open_position in got_open_positions_hashmap.items():
             assert hash_id in open_positions_hash_map
             assert open_position.to_dict() == open_positions_hash_map[hash_id].to_dict()
+
+    async def test_apply_mutation_retries_on_fresh_copy(
+        self, database_provider_test, position_factory
+    ):
+        position_schemas = position_factory(count=1)
+        position_schemas[0].status = PositionStatus.OPEN
+        positions = await self.position_service.create_many(data=position_schemas)
+        stale_position = await self.position_service.read_by_id(positions[0].id)
+        concurrent_position = await self.position_service.read_by_id(positions[0].id)
+        assert stale_position is not None and concurrent_position is not None
+
+        concurrent_position.pnl = 7
+        await self.position_service.update_entity(concurrent_position)
+
+        def add_size(position: Position) -> None:
+            position.size += 1
+
+        position = await self.position_service.apply_mutation(stale_position, add_size)
+        assert position.size == positions[0].size + 1
+        assert position.pnl == 7
+
+        got_position = await self.position_service.read_by_id(positions[0].id)
+        assert got_position is not None
+        assert got_position.size == positions[0].size + 1
+        assert got_position.pnl == 7
+        assert got_position.version == 2
+
+    async def test_apply_mutation_stops_when_the_fresh_copy_is_closed(
+        self, database_provider_test, position_factory
+    ):
+        position_schemas = position_factory(count=1)
+        position_schemas[0].status = PositionStatus.OPEN
+        positions = await self.position_service.create_many(data=position_schemas)
+        stale_position = await self.position_service.read_by_id(positions[0].id)
+        concurrent_position = await self.position_service.read_by_id(positions[0].id)
+        assert stale_position is not None and concurrent_position is not None
+
+        concurrent_position.status = PositionStatus.CLOSE
+        await self.position_service.update_entity(concurrent_position)
+
+        def add_size(position: Position) -> None:
+            position.size += 1
+
+        with pytest.raises(VersionConflict):
+            await self.position_service.apply_mutation(stale_position, add_size)
+
+        got_position = await self.position_service.read_by_id(positions[0].id)
+        assert got_position is not None
+        assert got_position.status == PositionStatus.CLOSE
+        assert got_position.size == positions[0].size
@@ -0,0 +1,122 @@
+import pytest
+
+from fifi.enums import Asset, Market
+
+from src.common.settings import Setting
+from src.models import Balance
+from src.repository import BalanceLedgerRepository, BalanceRepository
+from src.schemas.seed_schema import SeedSchema
+from src.services import BalanceService, LeverageService, PortfolioService, SeedService
+
+
+def seed_schema(count: int = 3, usd: float = 1000, leverage: float = 5) -> SeedSchema:
+    return SeedSchema(
+        portfolios=[
+            {
+                "name": f"bot-{i}",
+                "perp_taker_fee": 0.001,
+                "balances": [
+                    {"asset": Asset.USD, "quantity": usd},
+                    {"asset": Asset.BTC, "quantity": 0.5},
+                ],
+                "leverages": [{"market": Market.BTCUSD_PERP, "leverage": leverage}],
+            }
+            for i in range(count)
+        ]
+    )
+
+
+@pytest.fixture
+def provide_balance_ledger(monkeypatch, tmp_path):
+    setting = Setting()
+    monkeypatch.setattr(setting, "BALANCE_LEDGER_ENABLED", True)
+    monkeypatch.setattr(
+        setting, "BALANCE_LEDGER_WAL_PATH", str(tmp_path / "balance_ledger.wal")
+    )
+    monkeypatch.setattr(setting, "BALANCE_LEDGER_FLUSH_BATCH_SIZE", 1000)
+    monkeypatch.setattr(setting, "BALANCE_LEDGER_FLUSH_INTERVAL", 1000)
+    BalanceLedgerRepository.instance = None
+    yield BalanceLedgerRepository()
+    BalanceLedgerRepository.instance = None
+
+
+@pytest.mark.asyncio
+class TestSeedService:
+    seed_service = SeedService()
+    portfolio_service = PortfolioService()
+    balance_service = BalanceService()
+    leverage_service = LeverageService()
+
+    async def test_seed(self, database_provider_test):
+        seeded = await self.seed_service.seed(data=seed_schema(count=3))
+        assert seeded.portfolios == 3
+        assert seeded.balances == 6
+        assert seeded.leverages == 3
+
+        portfolio = await self.portfolio_service.read_by_name("bot-1")
+        assert portfolio is not None
+        assert portfolio.perp_taker_fee == 0.001
+        balance = await self.balance_service.read_by_asset(
+            portfolio_id=portfolio.id, asset=Asset.USD
+        )
+        assert balance is not None
+        assert balance.quantity == 1000
+        assert balance.available == 1000
+        assert balance.frozen == 0
+        leverage = await self.leverage_service.get_portfolio_market_leverage_value(
+            portfolio_id=portfolio.id, market=Market.BTCUSD_PERP
+        )
+        assert leverage == 5
+
+    async def test_seed_twice_upserts(self, database_provider_test):
+        await self.seed_service.seed(data=seed_schema(count=2))
+        portfolio = await self.portfolio_service.read_by_name("bot-0")
+        assert portfolio is not None
+
+        seeded = await self.seed_service.seed(
+            data=seed_schema(count=2, usd=500, leverage=10)
+        )
+        assert seeded.portfolios == 2
+
+        same_portfolio = await self.portfolio_service.read_by_name("bot-0")
+        assert same_portfolio is not None
+        assert same_portfolio.id == portfolio.id
+        balance = await self.balance_service.read_by_asset(
+            portfolio_id=portfolio.id, asset=Asset.USD
+        )
+        assert balance is not None
+        # seeded quantities are deposited on top of the existing balance
+        assert balance.quantity == 1500
+        assert balance.available == 1500
+        assert balance.version == 1
+        leverage = await self.leverage_service.get_portfolio_market_leverage_value(
+            portfolio_id=portfolio.id, market=Market.BTCUSD_PERP
+        )
+        assert leverage == 10
+
+    async def test_seed_deposits_through_the_balance_ledger(
+        self, database_provider_test, provide_balance_ledger
+    ):
+        ledger = provide_balance_ledger
+        await self.seed_service.seed(data=seed_schema(count=1))
+        portfolio = await self.portfolio_service.read_by_name("bot-0")
+        assert portfolio is not None
+
+        def spend(balance: Balance) -> None:
+            balance.quantity -= 100
+            balance.available -= 100
+
+        # an unflushed change of the ledger survives the next seed
+        await ledger.apply_mutation(
+            portfolio_id=portfolio.id, asset=Asset.USD, mutation=spend
+        )
+        seeded = await self.seed_service.seed(data=seed_schema(count=1, usd=500))
+        assert seeded.balances == 2
+
+        balance = await ledger.get_portfolio_asset(
+            portfolio_id=portfolio.id, asset=Asset.USD
+        )
+        assert balance.quantity == balance.available == 1400
+        await ledger.flush()
+        db_balance = await BalanceRepository().get_one_by_id(id_=balance.id)
+        assert db_balance.quantity == 1400
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from typing import Dict
+
+from fifi.enums import Asset, Market, OrderSide, OrderType
+
+from src.engines.replay_engine import ReplayEngine
+from src.schemas.seed_schema import SeedPortfolioSchema
+from src.sweep import Scenario, ScenarioRunner
+
+
+async def buy_the_dip(engine: ReplayEngine, portfolio_ids: Dict[str, str]) -> None:
+    await engine.matching_engine.create_order(
+        market=Market.BTCUSD_PERP,
+        portfolio_id=portfolio_ids["bot"],
+        price=900,
+        size=1,
+        side=OrderSide.BUY,
+        order_type=OrderType.LIMIT,
+    )
+
+
+@pytest.fixture
+def provide_candles(tmp_path):
+    # a flat market at 1000 whose 600th candle dips to 880
+    candles = np.tile([1000.0, 1010, 990, 1005], (1_000, 1))
+    candles[600, 2] = 880
+    path = tmp_path / "btcusd_perp.npz"
+    np.savez(
+        path,
+        time=1_700_000_000 + np.arange(1_000, dtype=np.float64) * 60,
+        open=candles[:, 0],
+        high=candles[:, 1],
+        low=candles[:, 2],
+        close=candles[:, 3],
+    )
+    yield str(path)
+
+
+def scenario(name: str, **settings) -> Scenario:
+    return Scenario(
+        name=name,
+        portfolios=[
+            SeedPortfolioSchema(
+                name="bot",
+                balances=[{"asset": Asset.USD, "quantity": 1000}],
+                leverages=[{"market": Market.BTCUSD_PERP, "leverage": 2}],
+            )
+        ],
+        strategy=buy_the_dip,
+        settings=settings,
+    )
+
+
+class TestScenarioRunner:
+    def test_sweep(self, provide_candles):
+        files = {Market.BTCUSD_PERP: provide_candles}
+        scenarios = [
+            scenario("cheap", REPLAY_FILES=files, DEFAULT_PERP_MAKER_FEE=0.0),
+            scenario("pricey", REPLAY_FILES=files, DEFAULT_PERP_MAKER_FEE=0.01),
+            # the window ends before the dip
+            scenario(
+                "window",
+                REPLAY_FILES=files,
+                REPLAY_END=1_700_000_000 + 600 * 60,
+            ),
+            scenario("missing", REPLAY_FILES={Market.BTCUSD_PERP: "missing.npz"}),
+        ]
+
+        results = ScenarioRunner(max_workers=4).run(scenarios)
+
+        cheap, pricey, window, missing = results
+        assert [result.name for result in results] == [s.name for s in scenarios]
+        assert cheap.summary.ticks == pricey.summary.ticks == 4000
+        assert window.summary.ticks == 2400
+        assert cheap.portfolios[0]["volume"] == pricey.portfolios[0]["volume"] == 900
+        assert cheap.portfolios[0]["fees_paid"] == {"USD": 0}
+        assert pricey.portfolios[0]["fees_paid"] == {"USD": pytest.approx(9)}
+        assert pricey.portfolios[0]["balances"] == {"USD": pytest.approx(991)}
+        assert window.portfolios[0]["volume"] == 0
+        assert missing.summary is None
+        assert "missing.npz" in missing.error
+
+        rows = ScenarioRunner.summary_rows(results)
+        assert [row["scenario"] for row in rows] == [s.name for s in scenarios]
+        table = ScenarioRunner.summary_table(results).splitlines()
+        assert table[0].split() == [
+            "scenario",
+            "portfolio",
+            "ticks",
+            "passes",
+            "elapsed",
+            "volume",
+            "fees_paid",
+            "realized_pnl",
+            "win_rate",
+            "balances",
+            "error",
+        ]
+        assert table[3].split()[:3] == ["pricey", "bot", "4000"]